@@ -0,0 +1,250 @@
+import os
+import time
+import math
+import asyncio
+import ipaddress
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional, Tuple, List, Sequence, Union
+from metrics import registry, Counter, Gauge
+
+ADMISSION_DECISIONS = registry.register(Counter(
+    "admission_decisions_total", "Admission control decisions by priority class", ["priority", "outcome"]))
+ADMISSION_IN_FLIGHT = registry.register(Gauge(
+    "admission_in_flight", "Requests holding an admission slot"))
+
+
+class Priority(str, Enum):
+    CRITICAL = "critical"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+@dataclass
+class PriorityClass:
+    """Admission limits for one priority class"""
+    rate: float            # tokens refilled per second, per client
+    burst: float           # bucket capacity, per client
+    in_flight_share: float # fraction of the global in-flight limit this class may use
+    max_queue_time: float  # seconds a request may wait for an in-flight slot
+
+
+DEFAULT_CLASSES: Dict[Priority, PriorityClass] = {
+    Priority.CRITICAL: PriorityClass(rate=10.0, burst=30.0, in_flight_share=1.0, max_queue_time=2.0),
+    Priority.NORMAL: PriorityClass(rate=5.0, burst=15.0, in_flight_share=0.8, max_queue_time=0.5),
+    Priority.LOW: PriorityClass(rate=0.5, burst=3.0, in_flight_share=0.5, max_queue_time=0.0),
+}
+
+# (method, path prefix) -> priority. First match wins; method None matches any method.
+DEFAULT_ROUTES: List[Tuple[Optional[str], str, Priority]] = [
+    ("GET", "/api/alerts", Priority.CRITICAL),
+    ("POST", "/api/reports", Priority.CRITICAL),
+    (None, "/api/health", Priority.CRITICAL),
+    (None, "/metrics", Priority.CRITICAL),
+    (None, "/api/dashboard/trends", Priority.LOW),
+    (None, "/api/translate", Priority.LOW),
+    (None, "/api/social-media/analyze", Priority.LOW),
+]
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, rate: float, capacity: float, now: float) -> float:
+        """Take one token. Returns 0 on success, otherwise seconds until one is available"""
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / rate if rate > 0 else 60.0
+
+
+class AdmissionController:
+    """Per-client token buckets plus a priority-aware global in-flight limit"""
+
+    def __init__(self, max_in_flight: int = 64, max_clients: int = 100_000,
+                 classes: Dict[Priority, PriorityClass] = None,
+                 routes: List[Tuple[Optional[str], str, Priority]] = None,
+                 trusted_proxies: Sequence[str] = ()):
+        self.max_in_flight = max_in_flight
+        self.max_clients = max_clients
+        self.classes = classes or DEFAULT_CLASSES
+        self.routes = routes or DEFAULT_ROUTES
+        # Peers whose X-Forwarded-For is believed (the load balancer's addresses)
+        self.trusted_proxies: List[Network] = [ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies]
+        self.in_flight = 0
+        self._buckets: "OrderedDict[Tuple[str, Priority], TokenBucket]" = OrderedDict()
+        self._slot_freed = asyncio.Condition()
+        self.counters: Dict[str, Dict[str, int]] = {
+            p.value: {"admitted": 0, "rate_limited": 0, "queue_timeout": 0, "over_capacity": 0}
+            for p in Priority
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_in_flight=int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "64")),
+            max_clients=int(os.environ.get("ADMISSION_MAX_CLIENTS", "100000")),
+            trusted_proxies=[proxy.strip() for proxy in os.environ.get("ADMISSION_TRUSTED_PROXIES", "").split(",")
+                             if proxy.strip()],
+        )
+
+    def classify(self, method: str, path: str) -> Priority:
+        for route_method, prefix, priority in self.routes:
+            if (route_method is None or route_method == method) and path.startswith(prefix):
+                return priority
+        return Priority.NORMAL
+
+    def _bucket(self, client: str, priority: Priority, now: float) -> TokenBucket:
+        key = (client, priority)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.classes[priority].burst, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _class_limit(self, priority: Priority) -> int:
+        return max(1, int(self.max_in_flight * self.classes[priority].in_flight_share))
+
+    def check_rate(self, client: str, priority: Priority) -> float:
+        """Returns 0 if the client may proceed, otherwise the Retry-After in seconds"""
+        spec = self.classes[priority]
+        now = time.monotonic()
+        return self._bucket(client, priority, now).take(spec.rate, spec.burst, now)
+
+    async def acquire(self, priority: Priority) -> bool:
+        """Wait for an in-flight slot within the class's queue-time budget"""
+        limit = self._class_limit(priority)
+        if self.in_flight < limit:
+            self.in_flight += 1
+            return True
+
+        timeout = self.classes[priority].max_queue_time
+        if timeout <= 0:
+            return False
+
+        deadline = time.monotonic() + timeout
+        async with self._slot_freed:
+            while self.in_flight >= limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(self._slot_freed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return False
+            self.in_flight += 1
+            return True
+
+    async def release(self):
+        self.in_flight -= 1
+        async with self._slot_freed:
+            self._slot_freed.notify_all()
+
+    def record(self, priority: Priority, outcome: str):
+        self.counters[priority.value][outcome] += 1
+        ADMISSION_DECISIONS.labels(priority.value, outcome).inc()
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "tracked_clients": len(self._buckets),
+            "classes": self.counters,
+        }
+
+
+def _is_trusted(address: str, trusted_proxies: Sequence[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def client_key(scope, trusted_proxies: Sequence[Network] = ()) -> str:
+    """Identify the caller by IP.
+
+    Bearer tokens are not verified at this point (and login hands every user
+    the same one), so they can neither tell users apart nor be trusted not to
+    be made up. X-Forwarded-For is only believed when the peer is a trusted
+    proxy, and then the caller is the last hop that is not one.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if trusted_proxies and _is_trusted(peer, trusted_proxies):
+        forwarded = dict(scope.get("headers") or []).get(b"x-forwarded-for", b"").decode("latin-1")
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not _is_trusted(hop, trusted_proxies):
+                return "ip:" + hop
+        if hops:
+            return "ip:" + hops[0]
+    return "ip:" + peer
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware that sheds load before it reaches Mongo or the LLM"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        priority = controller.classify(scope["method"], scope["path"])
+
+        retry_after = controller.check_rate(client_key(scope, controller.trusted_proxies), priority)
+        if retry_after > 0:
+            controller.record(priority, "rate_limited")
+            await _reject(send, 429, "Rate limit exceeded", retry_after)
+            return
+
+        if not await controller.acquire(priority):
+            outcome = "queue_timeout" if controller.classes[priority].max_queue_time > 0 else "over_capacity"
+            controller.record(priority, outcome)
+            await _reject(send, 503, "Server busy, please retry", 1.0)
+            return
+
+        controller.record(priority, "admitted")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await controller.release()
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# Global admission controller instance
+admission_controller = AdmissionController.from_env()
+ADMISSION_IN_FLIGHT.set_function(lambda: admission_controller.in_flight)
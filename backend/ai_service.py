@@ -1,23 +1,18 @@
-import os
-import asyncio
 from typing import List, Dict, Any, Optional
+from collections import Counter
 from datetime import datetime
 import json
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+import time
 from models import AIAnalysisResult, HazardType, HazardSeverity, SocialMediaPost, HazardReport
+from metrics import instrument_async_methods, set_ai_outcome, ai_outcome, AI_CALL_DURATION
+from tracing import trace_async_methods, span
+from llm_backends import LLMBackend, backend_from_env
+from language_id import language_identifier, language_name, normalize_language, mentions_hazard, HAZARD_KEYWORDS
+from surge_mode import SurgeMonitor, AI_SURGE_MODE, SURGE
+from analysis_scheduler import analysis_scheduler
+from gazetteer import place_extractor
 
-class AIService:
-    def __init__(self):
-        self.api_key = os.environ.get('EMERGENT_LLM_KEY')
-        self.chat_client = None
-        self.initialize_client()
-
-    def initialize_client(self):
-        """Initialize the LLM client for AI analysis"""
-        self.chat_client = LlmChat(
-            api_key=self.api_key,
-            session_id="ocean-hazard-analysis",
-            system_message="""You are an expert marine and coastal hazard detection AI. 
+SYSTEM_MESSAGE = """You are an expert marine and coastal hazard detection AI. 
             Analyze text content to identify ocean-related hazards, assess severity, and extract relevant information.
             
             Your analysis should focus on:
@@ -29,14 +24,62 @@ class AIService:
             6. Supporting multiple languages (Hindi, English, Bengali, Tamil, etc.)
             
             Always respond with structured JSON data for analysis results."""
-        ).with_model("openai", "gpt-4o-mini")
+
+# Surge-mode analysis without the LLM: the first row whose terms appear in the
+# lowercased text decides the hazard, its severity and the confidence
+HEURISTIC_HAZARDS = [
+    (("tsunami", "सुनामी", "त्सुनामी", "সুনামি", "சுனாமி", "సునామీ", "ಸುನಾಮಿ", "സുനാമി", "સુનામી", "ସୁନାମି",
+      "ਸੁਨਾਮੀ", "سونامی"), HazardType.TSUNAMI_WARNING, HazardSeverity.CRITICAL, 0.75),
+    (("oil", "slick", "spill", "तेल", "তেল", "எண்ணெய்", "చమురు", "ಎಣ್ಣೆ", "എണ്ണ", "તેલ", "ତେଲ", "ਤੇਲ", "تیل"),
+     HazardType.OIL_SPILL, HazardSeverity.HIGH, 0.6),
+    (("wave", "swell", "surge", "rough sea", "लहर", "लाट", "ঢেউ", "அலை", "ಅಲೆ", "തിര", "મોજા", "ଢେଉ", "ਲਹਿਰ", "لہر"),
+     HazardType.HIGH_WAVES, HazardSeverity.HIGH, 0.6),
+    (("cyclone", "storm", "strong wind", "heavy rain", "तूफान", "तूफ़ान", "चक्रवात", "वादळ", "ঝড়", "புயல்", "తుఫాను",
+      "ಚಂಡಮಾರುತ", "ചുഴലി", "વાવાઝોડ", "ବାତ୍ୟା", "ਤੂਫਾਨ", "ਤੂਫ਼ਾਨ", "طوفان"),
+     HazardType.UNUSUAL_WEATHER, HazardSeverity.MEDIUM, 0.6),
+    (("erosion", "eaten away", "कटाव", "कट रहा", "அரிப்பு"), HazardType.COASTAL_EROSION, HazardSeverity.MEDIUM, 0.6),
+    (("dead fish", "jellyfish", "whale", "dolphin", "turtle", "मरी मछलि"),
+     HazardType.UNUSUAL_MARINE_LIFE, HazardSeverity.MEDIUM, 0.6),
+    (("pollut", "sewage", "smelly", "foul smell"), HazardType.WATER_POLLUTION, HazardSeverity.MEDIUM, 0.6),
+    (("debris", "plastic", "garbage", "nets", "प्लास्टिक", "कचरा"), HazardType.DEBRIS, HazardSeverity.LOW, 0.6),
+]
+
+class AIService:
+    def __init__(self, backend: Optional[LLMBackend] = None, surge: Optional[SurgeMonitor] = None):
+        # Live mode imports the LLM SDK on the first AI call (or warm_up), not here
+        self.backend = backend or backend_from_env(SYSTEM_MESSAGE)
+        # Sheds LLM work to local fallbacks while the analysis queue or the LLM is overloaded
+        self.surge = surge or SurgeMonitor.from_env(queue_depth=analysis_scheduler.__len__)
+
+    def set_backend(self, backend: LLMBackend):
+        """Swap the LLM backend, e.g. for a replay cassette or a benchmark stand-in"""
+        self.backend = backend
+
+    async def warm_up(self):
+        """Import the SDK and build the client ahead of the first request"""
+        await self.backend.warm_up()
+
+    async def _send(self, prompt: str) -> str:
+        started = time.perf_counter()
+        try:
+            with span("llm.complete", mode=self.backend.mode, prompt_chars=len(prompt)):
+                response = await self.backend.complete(prompt)
+        except Exception:
+            self.surge.record(time.perf_counter() - started, succeeded=False)
+            raise
+        self.surge.record(time.perf_counter() - started, succeeded=True)
+        return response
 
     async def analyze_text_for_hazards(self, text: str, language: str = "en") -> AIAnalysisResult:
         """Analyze text content for ocean hazard detection"""
+        if self.surge.active:
+            self.surge.record_shed("analyze_text_for_hazards")
+            set_ai_outcome("shed")
+            return self.heuristic_result(text, language)
         try:
             prompt = f"""
             Analyze the following text for ocean and coastal hazards. The text is in language: {language}
-            
+            {self._language_hint(language)}
             Text to analyze: "{text}"
             
             Please provide analysis in the following JSON format:
@@ -55,8 +98,7 @@ class AIService:
             Focus on marine and coastal hazards. Be conservative in hazard detection to avoid false positives.
             """
             
-            user_message = UserMessage(text=prompt)
-            response = await self.chat_client.send_message(user_message)
+            response = await self._send(prompt)
             
             # Parse JSON response
             try:
@@ -93,6 +135,7 @@ class AIService:
                 
             except json.JSONDecodeError:
                 # Fallback analysis if JSON parsing fails
+                set_ai_outcome("fallback")
                 return AIAnalysisResult(
                     text=text,
                     hazard_detected=False,
@@ -106,6 +149,7 @@ class AIService:
                 
         except Exception as e:
             print(f"AI Analysis error: {e}")
+            set_ai_outcome("error")
             return AIAnalysisResult(
                 text=text,
                 hazard_detected=False,
@@ -117,9 +161,78 @@ class AIService:
                 language=language
             )
 
+    @staticmethod
+    def _language_hint(language: str) -> str:
+        """Prompt variant for non-English text; English prompts are left exactly as they were"""
+        if language == "en":
+            return ""
+        keywords = ", ".join(HAZARD_KEYWORDS.get(language, [])[:12])
+        return (f"The text is written in {language_name(language)}. Hazard words in this language include: "
+                f"{keywords}. Return key_phrases in the original language.\n")
+
+    def prefiltered_result(self, text: str, language: str = "en") -> AIAnalysisResult:
+        """Analysis for text the keyword pre-filter ruled out, without an LLM call"""
+        return AIAnalysisResult(
+            text=text,
+            hazard_detected=False,
+            hazard_types=[],
+            sentiment="neutral",
+            sentiment_score=0.0,
+            confidence_score=0.0,
+            key_phrases=[],
+            language=language
+        )
+
+    def heuristic_result(self, text: str, language: str = "en") -> AIAnalysisResult:
+        """Keyword analysis used in surge mode, marked degraded so it is re-analyzed later.
+
+        Only a tsunami keyword is confident enough to raise an alert on its own;
+        other hazards wait for the LLM's opinion.
+        """
+        lowered = text.lower()
+        hazard_types: List[HazardType] = []
+        key_phrases: List[str] = []
+        severity = None
+        confidence = 0.2
+        for terms, hazard_type, hazard_severity, hazard_confidence in HEURISTIC_HAZARDS:
+            matched = [term for term in terms if term in lowered]
+            if matched:
+                hazard_types.append(hazard_type)
+                key_phrases.extend(matched)
+                if severity is None:
+                    severity, confidence = hazard_severity, hazard_confidence
+        if not hazard_types and mentions_hazard(lowered, language):
+            hazard_types, severity, confidence = [HazardType.OTHER], HazardSeverity.LOW, 0.3
+        tag = place_extractor.geotag(text)
+        place = tag.place.name if tag is not None and tag.confidence >= place_extractor.min_confidence else None
+        detected = bool(hazard_types)
+        return AIAnalysisResult(
+            text=text,
+            hazard_detected=detected,
+            hazard_types=hazard_types,
+            severity_prediction=severity,
+            location_mentioned=place,
+            sentiment="negative" if detected else "neutral",
+            sentiment_score=-0.5 if detected else 0.0,
+            confidence_score=confidence,
+            key_phrases=key_phrases[:10],
+            language=language,
+            degraded=True
+        )
+
     async def generate_trend_analysis(self, reports: List[HazardReport], 
-                                    social_posts: List[SocialMediaPost]) -> Dict[str, Any]:
-        """Generate trend analysis from reports and social media data"""
+                                    social_posts: List[SocialMediaPost],
+                                    hotspots: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate trend analysis from reports and social media data.
+
+        ``hotspots`` are the engine's computed clusters; they ground the prompt and
+        are returned as regional_hotspots instead of the model's own guess.
+        In surge mode the LLM is skipped and only counts are summarized.
+        """
+        if self.surge.active:
+            self.surge.record_shed("generate_trend_analysis")
+            set_ai_outcome("shed")
+            return self._surge_trend_analysis(reports, hotspots)
         try:
             # Prepare data summary for analysis
             report_summary = {
@@ -129,6 +242,11 @@ class AIService:
                 "recent_descriptions": [report.description[:200] for report in reports[:10]]
             }
             
+            hotspot_summary = [
+                {key: hotspot[key] for key in ("latitude", "longitude", "radius_km", "score", "dominant_hazard")}
+                for hotspot in (hotspots or [])[:10]
+            ]
+            
             social_summary = {
                 "total_posts": len(social_posts),
                 "platforms": [post.platform for post in social_posts],
@@ -140,6 +258,7 @@ class AIService:
             
             Reports Summary: {json.dumps(report_summary)}
             Social Media Summary: {json.dumps(social_summary)}
+            Detected Hotspots: {json.dumps(hotspot_summary)}
             
             Please provide trend analysis in JSON format:
             {{
@@ -152,13 +271,13 @@ class AIService:
             }}
             """
             
-            user_message = UserMessage(text=prompt)
-            response = await self.chat_client.send_message(user_message)
+            response = await self._send(prompt)
             
             try:
-                return json.loads(response)
+                analysis = json.loads(response)
             except json.JSONDecodeError:
-                return {
+                set_ai_outcome("fallback")
+                analysis = {
                     "trending_keywords": [],
                     "emerging_patterns": [],
                     "risk_assessment": "low",
@@ -166,20 +285,46 @@ class AIService:
                     "recommendations": [],
                     "confidence_level": 0.1
                 }
+            if hotspots is not None:
+                analysis["regional_hotspots"] = hotspots
+            return analysis
                 
         except Exception as e:
             print(f"Trend analysis error: {e}")
+            set_ai_outcome("error")
             return {
                 "trending_keywords": [],
                 "emerging_patterns": [],
                 "risk_assessment": "low",
-                "regional_hotspots": [],
+                "regional_hotspots": hotspots or [],
                 "recommendations": [],
                 "confidence_level": 0.0
             }
 
+    @staticmethod
+    def _surge_trend_analysis(reports: List[HazardReport], hotspots: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        severities = [HazardSeverity(report.severity) for report in reports]
+        order = list(HazardSeverity)
+        return {
+            "trending_keywords": [hazard for hazard, _ in
+                                  Counter(HazardType(report.hazard_type).value for report in reports).most_common(5)],
+            "emerging_patterns": [],
+            "risk_assessment": max(severities, key=order.index).value if severities else "low",
+            "regional_hotspots": hotspots or [],
+            "recommendations": [],
+            "confidence_level": 0.0,
+            "degraded": True
+        }
+
     async def translate_text(self, text: str, target_language: str) -> str:
-        """Translate text to target language"""
+        """Translate text to target language; text already in that language, or any text in surge mode, is returned as is"""
+        target_code = normalize_language(target_language)
+        if target_code is not None and language_identifier.detect(text, default="").language == target_code:
+            return text
+        if self.surge.active:
+            self.surge.record_shed("translate_text")
+            set_ai_outcome("shed")
+            return text
         try:
             prompt = f"""
             Translate the following text to {target_language}:
@@ -189,18 +334,22 @@ class AIService:
             Provide only the translation, no additional text.
             """
             
-            user_message = UserMessage(text=prompt)
-            response = await self.chat_client.send_message(user_message)
+            response = await self._send(prompt)
             return response.strip()
             
         except Exception as e:
             print(f"Translation error: {e}")
+            set_ai_outcome("error")
             return text
 
     async def generate_alert_message(self, hazard_type: HazardType, 
                                    severity: HazardSeverity, 
                                    location: str) -> str:
-        """Generate appropriate alert message for hazard"""
+        """Generate appropriate alert message for hazard; a template in surge mode or if the LLM fails"""
+        if self.surge.active:
+            self.surge.record_shed("generate_alert_message")
+            set_ai_outcome("shed")
+            return self.template_alert_message(hazard_type, severity, location)
         try:
             prompt = f"""
             Generate a clear, urgent alert message for the following ocean hazard:
@@ -217,13 +366,22 @@ class AIService:
             - Suitable for both citizens and officials
             """
             
-            user_message = UserMessage(text=prompt)
-            response = await self.chat_client.send_message(user_message)
+            response = await self._send(prompt)
             return response.strip()
             
         except Exception as e:
             print(f"Alert generation error: {e}")
-            return f"Ocean hazard alert: {hazard_type.value} reported in {location}. Severity: {severity.value}. Please stay alert and follow local guidelines."
+            set_ai_outcome("error")
+            return self.template_alert_message(hazard_type, severity, location)
+
+    @staticmethod
+    def template_alert_message(hazard_type: HazardType, severity: HazardSeverity, location: str) -> str:
+        return f"Ocean hazard alert: {hazard_type.value} reported in {location}. Severity: {severity.value}. Please stay alert and follow local guidelines."
+
+# Time every AI call, labelled success/fallback/error
+instrument_async_methods(AIService, AI_CALL_DURATION, outcome_var=ai_outcome, exclude=("warm_up",))
+trace_async_methods(AIService, "ai", exclude=("warm_up",))
 
 # Global AI service instance
 ai_service = AIService()
+AI_SURGE_MODE.set_function(lambda: ai_service.surge.mode == SURGE)
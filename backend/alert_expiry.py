@@ -0,0 +1,73 @@
+import os
+import asyncio
+import logging
+from typing import Dict, Optional
+from database import database
+
+logger = logging.getLogger(__name__)
+
+
+class AlertSweeper:
+    """Background task that deactivates expired alerts and archives them.
+
+    Reads already ignore expired alerts; the sweep keeps the active set (and the
+    index range those reads scan) small, and moves expired alerts to
+    alert_history, where lookups by id still find them.
+    """
+
+    def __init__(self, db, interval: float = 60.0, archive: bool = True, batch_size: int = 1000):
+        self.db = db
+        self.interval = interval
+        self.archive = archive
+        self.batch_size = batch_size
+        self.expired = 0
+        self.archived = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, db) -> "AlertSweeper":
+        return cls(
+            db,
+            interval=float(os.environ.get("ALERT_SWEEP_INTERVAL", "60")),
+            archive=os.environ.get("ALERT_ARCHIVE", "true").lower() in ("1", "true", "yes"),
+        )
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sweep(self) -> Dict[str, int]:
+        expired = await self.db.expire_alerts()
+        archived = 0
+        if self.archive:
+            while True:
+                moved = await self.db.archive_inactive_alerts(self.batch_size)
+                archived += moved
+                if moved < self.batch_size:
+                    break
+        self.expired += expired
+        self.archived += archived
+        if expired or archived:
+            logger.info(f"Alert sweep: {expired} expired, {archived} archived")
+        return {"expired": expired, "archived": archived}
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Alert sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, int]:
+        return {"expired": self.expired, "archived": self.archived}
+
+
+# Global alert sweeper instance
+alert_sweeper = AlertSweeper.from_env(database)
@@ -0,0 +1,90 @@
+import logging
+from datetime import timedelta
+from typing import Dict, Optional, Set, Tuple
+from models import Alert, HazardSeverity, Location
+from geo import GridIndex, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Radius used when an alert has a location but no affected_area_radius
+DEFAULT_ALERT_RADIUS_KM: Dict[HazardSeverity, float] = {
+    HazardSeverity.LOW: 10.0,
+    HazardSeverity.MEDIUM: 25.0,
+    HazardSeverity.HIGH: 50.0,
+    HazardSeverity.CRITICAL: 100.0,
+}
+
+
+# Lifetime used when an alert is raised without expires_at
+DEFAULT_ALERT_LIFETIME: Dict[HazardSeverity, timedelta] = {
+    HazardSeverity.LOW: timedelta(hours=6),
+    HazardSeverity.MEDIUM: timedelta(hours=12),
+    HazardSeverity.HIGH: timedelta(hours=24),
+    HazardSeverity.CRITICAL: timedelta(hours=48),
+}
+
+
+def apply_alert_defaults(alert: Alert) -> Alert:
+    """Fill in the severity-based area radius and expiry the alert was raised without"""
+    severity = HazardSeverity(alert.severity)
+    if alert.location is not None and alert.affected_area_radius is None:
+        alert.affected_area_radius = DEFAULT_ALERT_RADIUS_KM[severity]
+    if alert.expires_at is None:
+        alert.expires_at = alert.created_at + DEFAULT_ALERT_LIFETIME[severity]
+    return alert
+
+
+def alert_covers(alert: Alert, latitude: float, longitude: float) -> bool:
+    """Whether a point is inside the alert's area; alerts without one cover everywhere"""
+    if alert.location is None or alert.affected_area_radius is None:
+        return True
+    distance = haversine_km(latitude, longitude, alert.location.latitude, alert.location.longitude)
+    return distance <= alert.affected_area_radius
+
+
+class UserLocationIndex:
+    """Registered home and current locations of users, kept in a grid for alert fan-out"""
+
+    KINDS = ("current", "home")
+
+    def __init__(self, cell_degrees: float = 0.25):
+        self.grid = GridIndex(cell_degrees)
+
+    def __len__(self) -> int:
+        return len(self.grid)
+
+    def set_user(self, user_id: str, home_location: Optional[Location] = None,
+                 current_location: Optional[Location] = None):
+        for kind, location in (("home", home_location), ("current", current_location)):
+            if location is None:
+                self.grid.remove((user_id, kind))
+            else:
+                self.grid.insert((user_id, kind), location.latitude, location.longitude)
+
+    def location_of(self, user_id: str) -> Optional[Tuple[float, float]]:
+        """The user's current location if known, else their home"""
+        for kind in self.KINDS:
+            point = self.grid.points.get((user_id, kind))
+            if point is not None:
+                return point
+        return None
+
+    def users_within(self, latitude: float, longitude: float, radius_km: float) -> Set[str]:
+        return {user_id for user_id, _ in self.grid.within(latitude, longitude, radius_km)}
+
+    def recipients(self, alert: Alert) -> Optional[Set[str]]:
+        """Users inside the alert's area, or None for alerts addressed to everyone"""
+        if alert.location is None or alert.affected_area_radius is None:
+            return None
+        return self.users_within(alert.location.latitude, alert.location.longitude,
+                                 alert.affected_area_radius)
+
+    async def load(self, db):
+        users = await db.get_user_locations()
+        for user in users:
+            self.set_user(user.id, user.home_location, user.current_location)
+        logger.info(f"Indexed locations for {len(users)} users")
+
+
+# Global user location index
+user_locations = UserLocationIndex()
@@ -0,0 +1,274 @@
+import os
+import re
+import math
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Sequence
+from models import HazardReport, HazardSeverity, Incident, Location, SocialMediaPost
+from metrics import registry, Counter, Histogram, QUEUE_DEPTH
+from language_id import mentions_hazard
+from hotspots import hotspot_engine
+from geo import haversine_km
+
+ANALYSIS_QUEUE_WAIT = registry.register(Histogram(
+    "ai_analysis_queue_seconds", "Time analysis jobs wait for a worker, by priority band", ["priority"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)))
+ANALYSIS_JOBS = registry.register(Counter(
+    "ai_analysis_jobs_total", "Analysis jobs run, by priority band and outcome", ["priority", "outcome"]))
+
+# Substring matches on lowercased text, like the language pre-filter's keywords
+CRITICAL_TERMS = (
+    "tsunami", "evacuat", "drown", "trapped", "missing", "capsiz", "storm surge", "washed away",
+    "सुनामी", "त्सुनामी", "সুনামি", "சுனாமி", "సునామీ", "ಸುನಾಮಿ", "സുനാമി", "સુનામી", "ସୁନାମି", "ਸੁਨਾਮੀ", "سونامی",
+)
+HIGH_TERMS = (
+    "cyclone", "flood", "oil spill", "spill", "high wave", "huge wave", "giant wave", "rough sea", "warning",
+    "rescue", "stranded", "injur", "inundat", "erosion",
+    "चक्रवात", "बाढ़", "चेतावनी", "वादळ", "पूर", "ঘূর্ণিঝড়", "বন্যা", "புயல்", "வெள்ள", "எச்சரிக்கை", "తుఫాను", "వరద",
+    "ಚಂಡಮಾರುತ", "ಪ್ರವಾಹ", "ചുഴലി", "വെള്ളപ്പൊക്ക", "മുന്നറിയിപ്പ്", "વાવાઝોડ", "ચેતવણી", "ବାତ୍ୟା", "ବନ୍ୟା", "ਹੜ੍ਹ", "سیلاب",
+)
+_CRITICAL_RE = re.compile("|".join(map(re.escape, CRITICAL_TERMS)))
+_HIGH_RE = re.compile("|".join(map(re.escape, HIGH_TERMS)))
+
+# Handles of agencies whose posts are worth reading first
+TRUSTED_AUTHOR_MARKERS = ("incois", "imd", "ndma", "ndrf", "sdma", "coastguard", "coast_guard", "disaster",
+                          "police", "collector", "official")
+
+SEVERITY_POINTS = {
+    HazardSeverity.CRITICAL: 50.0,
+    HazardSeverity.HIGH: 35.0,
+    HazardSeverity.MEDIUM: 15.0,
+    HazardSeverity.LOW: 0.0,
+}
+
+
+class AnalysisPriority(str, Enum):
+    CRITICAL = "critical"
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+# Lowest score in each band, highest band first
+PRIORITY_BANDS = (
+    (50.0, AnalysisPriority.CRITICAL),
+    (25.0, AnalysisPriority.HIGH),
+    (10.0, AnalysisPriority.NORMAL),
+    (float("-inf"), AnalysisPriority.LOW),
+)
+
+
+def priority_band(score: float) -> AnalysisPriority:
+    for floor, band in PRIORITY_BANDS:
+        if score >= floor:
+            return band
+    return AnalysisPriority.LOW
+
+
+class PriorityScorer:
+    """Scores analysis work from signals that cost nothing next to an LLM call.
+
+    Points add up (roughly 0-100): keyword severity (a tsunami or evacuation
+    beats a debris complaint), engagement per hour since posting, a trusted
+    author, the reporter's chosen severity, and falling inside a hotspot the
+    engine currently reports.
+    """
+
+    def __init__(self, trusted_authors: Iterable[str] = (),
+                 hotspots: Callable[[], Sequence[Any]] = lambda: hotspot_engine.latest,
+                 hotspot_margin_km: float = 10.0):
+        self.trusted_authors = {handle.lower().lstrip("@") for handle in trusted_authors}
+        self.hotspots = hotspots
+        self.hotspot_margin_km = hotspot_margin_km
+
+    @classmethod
+    def from_env(cls) -> "PriorityScorer":
+        trusted = os.environ.get("AI_PRIORITY_TRUSTED_AUTHORS", "")
+        return cls(trusted_authors=[handle.strip() for handle in trusted.split(",") if handle.strip()])
+
+    def keyword_points(self, text: str, language: str = "en") -> float:
+        lowered = text.lower()
+        if _CRITICAL_RE.search(lowered):
+            return 50.0
+        if _HIGH_RE.search(lowered):
+            return 25.0
+        return 10.0 if mentions_hazard(lowered, language) else 0.0
+
+    def engagement_points(self, post: SocialMediaPost, now: Optional[datetime] = None) -> float:
+        """Up to 15 points for interactions per hour, on a log scale (1000/h is full marks)"""
+        metrics = post.engagement_metrics or {}
+        interactions = (metrics.get("likes", 0) + 2 * (metrics.get("shares", 0) + metrics.get("retweets", 0))
+                        + metrics.get("comments", 0))
+        if interactions <= 0:
+            return 0.0
+        hours = max(((now or datetime.utcnow()) - post.created_at).total_seconds() / 3600, 0.25)
+        return min(15.0, 5.0 * math.log10(1 + interactions / hours))
+
+    def author_points(self, handle: str) -> float:
+        handle = (handle or "").lower().lstrip("@")
+        if handle in self.trusted_authors or any(marker in handle for marker in TRUSTED_AUTHOR_MARKERS):
+            return 15.0
+        return 0.0
+
+    def hotspot_points(self, location: Optional[Location]) -> float:
+        if location is None:
+            return 0.0
+        for hotspot in self.hotspots() or ():
+            reach = hotspot.radius_km + self.hotspot_margin_km
+            if haversine_km(location.latitude, location.longitude, hotspot.latitude, hotspot.longitude) <= reach:
+                return 20.0
+        return 0.0
+
+    def score_post(self, post: SocialMediaPost, now: Optional[datetime] = None) -> float:
+        return (self.keyword_points(post.content, post.language) + self.engagement_points(post, now)
+                + self.author_points(post.author_handle) + self.hotspot_points(post.location))
+
+    def score_posts(self, posts: Sequence[SocialMediaPost], location: Optional[Location] = None) -> float:
+        """An incident is as urgent as its most urgent post, or its centroid's hotspot"""
+        now = datetime.utcnow()
+        best = max((self.score_post(post, now) for post in posts), default=0.0)
+        return max(best, self.hotspot_points(location))
+
+    def score_incident(self, incident: Incident) -> float:
+        """For re-analysis, when the member posts are not at hand"""
+        return (self.keyword_points(incident.representative_text, incident.language)
+                + self.hotspot_points(incident.location))
+
+    def score_report(self, report: HazardReport) -> float:
+        return (self.keyword_points(f"{report.title} {report.description}", report.language)
+                + SEVERITY_POINTS.get(report.severity, 0.0) + self.hotspot_points(report.location))
+
+
+@dataclass(order=True)
+class _Job:
+    key: float  # -(score - aging * enqueued): lowest runs first
+    sequence: int
+    band: AnalysisPriority = field(compare=False)
+    enqueued: float = field(compare=False)
+    run: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    context: contextvars.Context = field(compare=False)  # the submitter's trace, span and AI outcome
+
+
+class AnalysisScheduler:
+    """Runs AI analysis jobs on a fixed pool of workers, most urgent first.
+
+    A job's effective priority is its score plus ``aging_per_minute`` for every
+    minute it has waited, so a low-priority job catches up with fresh critical
+    work after (score gap / aging) minutes instead of starving. Aging is linear
+    and the same for every job, so the heap key (score minus aging times
+    enqueue time) never changes while a job waits. Waits are recorded per
+    priority band. Jobs run in a copy of the submitter's context, so their
+    spans land in the submitting request's trace.
+    """
+
+    def __init__(self, concurrency: int = 8, aging_per_minute: float = 10.0, window: int = 1000):
+        self.concurrency = concurrency
+        self.aging_per_second = aging_per_minute / 60
+        self._heap: List[_Job] = []
+        self._sequence = itertools.count()
+        self._ready: Optional[asyncio.Semaphore] = None
+        self._workers: List[asyncio.Task] = []
+        self.running = 0
+        self._waits: Dict[AnalysisPriority, Deque[float]] = {band: deque(maxlen=window) for band in AnalysisPriority}
+        self.counters: Dict[str, Dict[str, int]] = {
+            band.value: {"submitted": 0, "completed": 0, "failed": 0} for band in AnalysisPriority
+        }
+
+    @classmethod
+    def from_env(cls) -> "AnalysisScheduler":
+        return cls(
+            concurrency=int(os.environ.get("AI_ANALYSIS_CONCURRENCY", "8")),
+            aging_per_minute=float(os.environ.get("AI_PRIORITY_AGING_PER_MINUTE", "10")),
+        )
+
+    async def start(self):
+        if self._workers:
+            return
+        self._ready = asyncio.Semaphore(len(self._heap))
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while self._heap:
+            job = heapq.heappop(self._heap)
+            job.future.cancel()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def submit(self, run: Callable[[], Awaitable[Any]], score: float) -> Any:
+        """Queue ``run`` at ``score`` and wait for its result"""
+        if not self._workers:
+            await self.start()
+        now = time.monotonic()
+        band = priority_band(score)
+        job = _Job(-(score - self.aging_per_second * now), next(self._sequence), band, now, run,
+                   asyncio.get_running_loop().create_future(), contextvars.copy_context())
+        heapq.heappush(self._heap, job)
+        self.counters[band.value]["submitted"] += 1
+        self._ready.release()
+        return await job.future
+
+    async def _work(self):
+        while True:
+            await self._ready.acquire()
+            job = heapq.heappop(self._heap)
+            if job.future.done():  # the caller gave up while it waited
+                continue
+            waited = time.monotonic() - job.enqueued
+            self._waits[job.band].append(waited)
+            ANALYSIS_QUEUE_WAIT.labels(job.band.value).observe(waited)
+            self.running += 1
+            try:
+                # create_task(..., context=) needs 3.11; a task started inside the context copies it
+                result = await job.context.run(asyncio.create_task, job.run())
+            except Exception as e:
+                self.counters[job.band.value]["failed"] += 1
+                ANALYSIS_JOBS.labels(job.band.value, "error").inc()
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self.counters[job.band.value]["completed"] += 1
+                ANALYSIS_JOBS.labels(job.band.value, "success").inc()
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        queued = {band.value: 0 for band in AnalysisPriority}
+        oldest = {band.value: 0.0 for band in AnalysisPriority}
+        for job in self._heap:
+            queued[job.band.value] += 1
+            oldest[job.band.value] = max(oldest[job.band.value], now - job.enqueued)
+        bands = {}
+        for band in AnalysisPriority:
+            waits = sorted(self._waits[band])
+            bands[band.value] = {
+                **self.counters[band.value],
+                "queued": queued[band.value],
+                "oldest_queued_seconds": round(oldest[band.value], 3),
+                "wait_p50_seconds": round(waits[len(waits) // 2], 3) if waits else None,
+                "wait_p95_seconds": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else None,
+                "wait_max_seconds": round(waits[-1], 3) if waits else None,
+            }
+        return {"concurrency": self.concurrency, "running": self.running, "queued": len(self._heap),
+                "aging_per_minute": round(self.aging_per_second * 60, 3), "priorities": bands}
+
+
+# Global scheduler and scorer instances
+priority_scorer = PriorityScorer.from_env()
+analysis_scheduler = AnalysisScheduler.from_env()
+QUEUE_DEPTH.labels("ai_analysis").set_function(analysis_scheduler.__len__)
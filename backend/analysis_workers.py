@@ -0,0 +1,138 @@
+import os
+import socket
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from models import SocialMediaPost
+from metrics import registry, Counter
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_LEASES = registry.register(Counter(
+    "analysis_leases_total", "Social media posts leased for analysis, by outcome", ["outcome"]))
+
+Analyze = Callable[[List[SocialMediaPost], str], Awaitable[Dict[str, Any]]]
+
+
+class AnalysisWorkerPool:
+    """Background social media analysis that any number of processes can run at once.
+
+    Each worker leases a batch of the oldest unanalyzed posts from Mongo (a
+    conditional update_many per page of candidates), renews the leases every third of
+    ``lease_seconds`` while the batch is analyzed, and hands back whatever it
+    did not finish. Leases left by a worker that died expire and are claimed
+    again, at most ``max_attempts`` times per post. A reaper task frees expired
+    leases, so throughput grows with the number of workers across replicas
+    without any post reaching the LLM twice.
+    """
+
+    def __init__(self, workers: int = 0, batch_size: int = 100, lease_seconds: float = 120.0,
+                 poll_seconds: float = 2.0, max_attempts: int = 3, owner: Optional[str] = None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.db = None
+        self.analyze: Optional[Analyze] = None
+        self.counters = {"batches": 0, "claimed": 0, "analyzed": 0, "released": 0, "requeued": 0, "failed": 0}
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls) -> "AnalysisWorkerPool":
+        return cls(
+            workers=int(os.environ.get("ANALYSIS_WORKERS", "0")),
+            batch_size=int(os.environ.get("ANALYSIS_BATCH_SIZE", "100")),
+            lease_seconds=float(os.environ.get("ANALYSIS_LEASE_SECONDS", "120")),
+            poll_seconds=float(os.environ.get("ANALYSIS_POLL_SECONDS", "2")),
+            max_attempts=int(os.environ.get("ANALYSIS_MAX_ATTEMPTS", "3")),
+        )
+
+    async def start(self, db, analyze: Analyze):
+        """Run ``workers`` leasing loops; ``analyze(posts, lease_owner)`` also serves run_batch"""
+        self.db = db
+        self.analyze = analyze
+        if self._tasks or self.workers <= 0:
+            return
+        self._tasks = [asyncio.create_task(self._work(f"{self.owner}:{i}")) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reap()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def claim(self, owner: str, limit: Optional[int] = None) -> List[SocialMediaPost]:
+        posts = await self.db.claim_posts_for_analysis(owner, limit or self.batch_size, self.lease_seconds,
+                                                       self.max_attempts)
+        self.counters["claimed"] += len(posts)
+        ANALYSIS_LEASES.labels("claimed").inc(len(posts))
+        return posts
+
+    async def run_batch(self, posts: List[SocialMediaPost], owner: str) -> Dict[str, Any]:
+        """Analyze leased posts, keeping their leases alive meanwhile and releasing any left over"""
+        post_ids = [post.id for post in posts]
+        heartbeat = asyncio.create_task(self._heartbeat(owner, post_ids))
+        try:
+            result = await self.analyze(posts, owner)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+            # Analyzed posts no longer match; the rest go back to the queue
+            released = await self.db.release_post_leases(owner, post_ids, self.max_attempts)
+            self.counters["released"] += released
+            ANALYSIS_LEASES.labels("released").inc(released)
+        self.counters["batches"] += 1
+        self.counters["analyzed"] += result.get("analyzed_posts", 0)
+        ANALYSIS_LEASES.labels("analyzed").inc(result.get("analyzed_posts", 0))
+        return result
+
+    async def _heartbeat(self, owner: str, post_ids: List[str]):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                held = await self.db.renew_post_leases(owner, post_ids, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Lease renewal failed for {owner}: {e}")
+                continue
+            if held == 0:  # everything analyzed (or lost): nothing left to renew
+                return
+
+    async def _work(self, owner: str):
+        while True:
+            try:
+                posts = await self.claim(owner)
+                if not posts:
+                    await asyncio.sleep(self.poll_seconds)
+                    continue
+                await self.run_batch(posts, owner)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis worker {owner} failed: {e}")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 2)
+            try:
+                requeued, failed = await self.db.reclaim_expired_leases(self.max_attempts)
+            except Exception as e:
+                logger.error(f"Lease reaper failed: {e}")
+                continue
+            self.counters["requeued"] += requeued
+            self.counters["failed"] += failed
+            ANALYSIS_LEASES.labels("requeued").inc(requeued)
+            ANALYSIS_LEASES.labels("failed").inc(failed)
+            if requeued or failed:
+                logger.warning(f"Reclaimed {requeued} expired analysis leases; {failed} posts out of attempts")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"owner": self.owner, "workers": self.workers, "batch_size": self.batch_size,
+                "lease_seconds": self.lease_seconds, "running": bool(self._tasks), **self.counters}
+
+
+# Global analysis worker pool (idle unless ANALYSIS_WORKERS is set)
+analysis_workers = AnalysisWorkerPool.from_env()
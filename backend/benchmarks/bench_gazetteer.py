@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Gazetteer place extraction benchmark.
+
+Geotags synthetic posts from generate_dataset.py (a hazard phrase, the town
+name and hashtags) and a held-out set of hand-written posts: other places and
+spellings, native-script names with case endings, run-together hashtags, and
+posts that name no place or only a word that happens to be a town. Reports
+throughput, how many posts were geotagged, and how many got the right place.
+
+Usage (from backend/):
+    python benchmarks/bench_gazetteer.py --posts 100000
+    python benchmarks/bench_gazetteer.py --posts 100000 --json
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+from datetime import datetime
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gazetteer import PlaceExtractor
+from generate_dataset import Generator
+
+# (text, acceptable places, or None when the post should stay unlocated)
+HELD_OUT = [
+    ("Massive waves hitting Marina Beach right now, stay away", "Marina Beach"),
+    ("Tar balls washed up at Juhu this morning #MumbaiRains", "Juhu Beach"),
+    ("Fishing boats told to return to Kasimedu harbour", "Kasimedu"),
+    ("Oil sheen spotted near Vizag port, smells like diesel", "Visakhapatnam Port"),
+    ("Sea water entered houses in Alleppey last night", "Alappuzha"),
+    ("Strong currents off Calangute, lifeguards pulling people out", ("Calangute Beach", "Calangute")),
+    ("சென்னையில் கடல் சீற்றம் அதிகமாக உள்ளது", "Chennai"),
+    ("കൊച്ചിയിൽ കടൽക്ഷോഭം രൂക്ഷം", "Kochi"),
+    ("দীঘায় সমুদ্রের জল অনেকটা উঠে এসেছে", "Digha"),
+    ("मुंबई में समुद्र में ऊँची लहरें", "Mumbai"),
+    ("ପୁରୀ ସମୁଦ୍ରରେ ବଡ଼ ବଡ଼ ଢେଉ", ("Puri", "Puri Beach")),
+    ("Road to Dhanushkodi closed due to rough sea #rameswaramalert", ("Dhanushkodi Beach", "Dhanushkodi")),
+    ("Ferries to Havelock cancelled today", "Swaraj Dweep"),
+    ("Flooding reported at #paradipport", "Paradip Port"),
+    ("Chilika fishermen stranded after the storm", "Chilika Lake"),
+    ("Erosion eating into the beach at Uppada again", ("Uppada Beach", "Uppada")),
+    ("Cyclone warning for Ganjam and nearby districts", "Ganjam"),
+    ("Dead fish floating near Ennore creek", "Ennore"),
+    ("Heavy swell at Kovalam, beach closed for swimming", "Kovalam Beach"),
+    ("High tide alert issued for Pondy promenade", "Puducherry"),
+    ("I ate puri and sabzi for breakfast", None),
+    ("Congratulations Anand on the new job!", None),
+    ("Waves are crazy today, stay safe everyone", None),
+    ("Rough sea in Mumbai and Chennai, ships held back", None),
+    ("Heavy rain across the whole coast tonight", None),
+]
+
+
+def score(extractor: PlaceExtractor, samples):
+    located = correct = false_positive = 0
+    misses = Counter()
+    for text, expected in samples:
+        tag = extractor.geotag(text)
+        place = tag.place.name if tag is not None and tag.confidence >= extractor.min_confidence else None
+        located += place is not None
+        if place == expected or (isinstance(expected, tuple) and place in expected):
+            correct += 1
+        else:
+            misses[f"{expected}->{place}"] += 1
+            false_positive += expected is None
+    return {
+        "samples": len(samples),
+        "located": round(located / len(samples), 4),
+        "accuracy": round(correct / len(samples), 4),
+        "false_positives": false_positive,
+        "misses": dict(misses.most_common(5)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gazetteer place extraction")
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    generator = Generator(seed=args.seed, days=30, events=200, end=datetime(2026, 1, 1))
+    posts = [generator.post(i, viral_share=0.0) for i in range(args.posts)]
+    for post in posts:
+        post["location"] = None
+
+    extractor = PlaceExtractor()
+    started = time.perf_counter()
+    extractor.load()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    tagged = extractor.geotag_documents(posts)
+    seconds = time.perf_counter() - started
+    # The synthetic town is the first hashtag
+    synthetic = sum(
+        post["location"] is not None
+        and (post["location"]["city"] or "").replace(" ", "") == post["hashtags"][0][1:]
+        for post in posts
+    )
+
+    summary = {
+        "places": len(extractor), "names": len(extractor.matcher), "build_ms": round(build_ms, 1),
+        "posts": args.posts, "throughput_per_s": round(args.posts / seconds),
+        "mean_us": round(seconds / args.posts * 1e6, 1),
+        "synthetic": {"located": round(tagged / args.posts, 4), "accuracy": round(synthetic / args.posts, 4)},
+        "held_out": score(extractor, HELD_OUT),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{summary['places']} places, {summary['names']} names compiled in {build_ms:.1f} ms")
+    print(f"{args.posts:,} posts: {summary['throughput_per_s']:,} posts/s ({summary['mean_us']} us each)")
+    print(f"synthetic  located {summary['synthetic']['located']:.2%}, right place {summary['synthetic']['accuracy']:.2%}")
+    result = summary["held_out"]
+    print(f"held_out   located {result['located']:.2%}, right place (or none) {result['accuracy']:.2%}, "
+          f"false positives {result['false_positives']}")
+    if result["misses"]:
+        print(f"           misses {result['misses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Hotspot engine benchmark.
+
+Scatters synthetic report/post coordinates along the coastline from
+generate_dataset.py: most points come from decaying event bursts, the rest
+are background noise. It then times bulk ingestion, the first refresh (which
+aggregates every slab), a steady-state refresh, and a refresh after a small
+batch of new points (the incremental path).
+
+Usage (from backend/):
+    python benchmarks/bench_hotspots.py --points 1000000
+    python benchmarks/bench_hotspots.py --points 1000000 --json
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hotspots import HotspotEngine, HAZARD_TYPES, SEVERITY_WEIGHTS
+from generate_dataset import COASTLINE, HAZARD_MIX
+
+
+def synthetic_points(count: int, now: float, window_hours: float, events: int, seed: int):
+    rng = np.random.default_rng(seed)
+    coast = np.array([(lat, lon) for lat, lon, _, _ in COASTLINE])
+    hazard_p = np.array([HAZARD_MIX.get(hazard, 0.0) for hazard in HAZARD_TYPES])
+    hazard_p /= hazard_p.sum()
+    severity_weights = np.array(list(SEVERITY_WEIGHTS.values()))
+    span = window_hours * 3600
+
+    def along_coast(n):
+        segment = rng.integers(0, len(coast) - 1, n)
+        t = rng.random(n)[:, None]
+        points = coast[segment] + (coast[segment + 1] - coast[segment]) * t
+        return points + rng.normal(0, 0.03, (n, 2))
+
+    # Event bursts: a few events dominate, each decays over a few hours
+    centres = along_coast(events)
+    event_start = now - rng.random(events) * span
+    event_hazard = rng.choice(len(HAZARD_TYPES), events, p=hazard_p)
+    event_share = rng.pareto(1.2, events) + 1
+    in_events = int(count * 0.7)
+    which = rng.choice(events, in_events, p=event_share / event_share.sum())
+    event_points = centres[which] + rng.normal(0, 0.02, (in_events, 2))
+    event_times = np.minimum(event_start[which] + rng.exponential(3 * 3600, in_events), now)
+
+    background = count - in_events
+    noise_points = along_coast(background)
+    noise_times = now - rng.random(background) * span
+
+    latitudes = np.concatenate([event_points[:, 0], noise_points[:, 0]])
+    longitudes = np.concatenate([event_points[:, 1], noise_points[:, 1]])
+    timestamps = np.concatenate([event_times, noise_times])
+    hazards = np.concatenate([event_hazard[which], rng.choice(len(HAZARD_TYPES), background, p=hazard_p)])
+    weights = severity_weights[rng.choice(4, count, p=[0.4, 0.3, 0.2, 0.1])]
+    order = rng.permutation(count)
+    return latitudes[order], longitudes[order], timestamps[order], weights[order], hazards[order]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hotspot detection over synthetic points")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--events", type=int, default=300)
+    parser.add_argument("--window-hours", type=float, default=72.0)
+    parser.add_argument("--increment", type=int, default=10_000, help="Points added before the incremental refresh")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    now = time.time()
+    points = synthetic_points(args.points + args.increment, now, args.window_hours, args.events, args.seed)
+    initial = [column[:args.points] for column in points]
+    increment = [column[args.points:] for column in points]
+
+    engine = HotspotEngine(window_hours=args.window_hours)
+    _, ingest_ms = timed(lambda: engine.add_points(*initial, now=now))
+    hotspots, first_ms = timed(lambda: engine.hotspots(now=now))
+    _, steady_ms = timed(lambda: engine.hotspots(now=now))
+    _, increment_ingest_ms = timed(lambda: engine.add_points(*increment, now=now))
+    _, incremental_ms = timed(lambda: engine.hotspots(now=now))
+    cells = engine.stats()["window_rows"]
+
+    summary = {
+        "points": args.points, "slabs": len(engine.slabs), "aggregated_rows": cells,
+        "hotspots": len(hotspots), "ingest_ms": round(ingest_ms, 1), "first_refresh_ms": round(first_ms, 1),
+        "steady_refresh_ms": round(steady_ms, 1), "increment_points": args.increment,
+        "increment_ingest_ms": round(increment_ingest_ms, 1), "incremental_refresh_ms": round(incremental_ms, 1),
+        "top": [hotspot.to_dict() for hotspot in hotspots[:5]],
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{args.points:,} points -> {len(engine.slabs)} slabs, {cells:,} aggregated (cell, hazard) rows")
+    print(f"  bulk ingest            {ingest_ms:9.1f} ms")
+    print(f"  first refresh          {first_ms:9.1f} ms  ({len(hotspots)} hotspots)")
+    print(f"  steady refresh         {steady_ms:9.1f} ms")
+    print(f"  +{args.increment:,} points ingest  {increment_ingest_ms:9.1f} ms")
+    print(f"  incremental refresh    {incremental_ms:9.1f} ms")
+    print("Top hotspots:")
+    for hotspot in hotspots[:5]:
+        print(f"  ({hotspot.latitude:8.4f}, {hotspot.longitude:8.4f}) r={hotspot.radius_km:6.1f} km "
+              f"score={hotspot.score:9.1f} points={hotspot.points:7d} {hotspot.dominant_hazard}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters and
+reports the cumulative import cost, plus the most expensive modules. Pass
+--baseline to fail when the import gets slower than a recorded run.
+
+Usage (from backend/):
+    python benchmarks/bench_import_time.py --json > import_baseline.json
+    python benchmarks/bench_import_time.py --baseline import_baseline.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str):
+    """Return (total_us, {module: cumulative_us}) for one cold import"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    cumulative = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        cumulative[name] = cumulative_us
+        if indent == 1:  # top-level imports; their cumulative times add up to the whole import
+            total += cumulative_us
+    return total, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track import time of the backend")
+    parser.add_argument("--module", default="server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    parser.add_argument("--baseline", help="JSON file from a previous --json run")
+    parser.add_argument("--tolerance", type=float, default=0.20,
+                        help="Allowed slowdown vs. baseline median (fraction)")
+    args = parser.parse_args()
+
+    totals = []
+    per_module = {}
+    for _ in range(args.runs):
+        total, cumulative = measure(args.module)
+        totals.append(total)
+        for name, value in cumulative.items():
+            per_module.setdefault(name, []).append(value)
+
+    median_ms = statistics.median(totals) / 1000
+    top = sorted(
+        ((name, statistics.median(values) / 1000) for name, values in per_module.items()),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+    result = {
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": round(median_ms, 2),
+        "min_ms": round(min(totals) / 1000, 2),
+        "top_modules_ms": {name: round(ms, 2) for name, ms in top},
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import {args.module}: median {result['median_ms']} ms, min {result['min_ms']} ms over {args.runs} runs")
+        for name, ms in top:
+            print(f"  {ms:9.2f} ms  {name}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        limit = baseline["median_ms"] * (1 + args.tolerance)
+        if median_ms > limit:
+            print(f"REGRESSION: {median_ms:.2f} ms > {limit:.2f} ms "
+                  f"(baseline {baseline['median_ms']} ms + {args.tolerance:.0%})", file=sys.stderr)
+            sys.exit(1)
+        print(f"OK: within {args.tolerance:.0%} of baseline {baseline['median_ms']} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Leased social media analysis benchmark.
+
+Loads a backlog of synthetic posts from generate_dataset.py into an in-memory
+Mongo (mongomock) and drains it with K worker pools, each standing in for a
+separate replica with its own lease owner. Every leased post costs one stub
+LLM call. Reports throughput for each K and checks that every post was
+analyzed exactly once. A final run "crashes" a worker: it leases a batch with
+a short lease and never finishes it, and the time until a healthy worker has
+reclaimed and analyzed those posts is measured.
+
+mongomock runs every query on the event loop, so here claiming costs CPU that
+real Mongo would spend elsewhere; scaling flattens once that dominates the
+stub LLM latency.
+
+Usage (from backend/):
+    python benchmarks/bench_job_leasing.py --posts 1000 --latency-ms 100
+    python benchmarks/bench_job_leasing.py --posts 1000 --workers 1 2 4 8 --json
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("MONGO_URL", "mongomock://localhost")
+os.environ.setdefault("DB_NAME", "bench_job_leasing")
+
+from stub_llm import StubLLM
+from generate_dataset import Generator
+from models import SocialMediaPost
+from database import database
+from analysis_workers import AnalysisWorkerPool
+
+
+async def load_backlog(count: int, seed: int):
+    await database.db.social_media_posts.delete_many({})
+    generator = Generator(seed=seed, days=30, events=200, end=datetime(2026, 1, 1))
+    documents = [SocialMediaPost(**generator.post(i, viral_share=0.0)).dict() for i in range(count)]
+    await database.db.social_media_posts.insert_many(documents)
+
+
+async def remaining() -> int:
+    return await database.db.social_media_posts.count_documents({"ai_analysis": None})
+
+
+def make_analyze(llm: StubLLM, processed: Counter):
+    async def analyze(posts, lease_owner):
+        analyzed = 0
+        for post in posts:
+            await llm.complete(post.content)
+            processed[post.id] += 1
+            analyzed += await database.apply_incident_analysis(
+                [post.id], f"incident-{post.id}", {"hazard_detected": False}, 0.0, 0.0, lease_owner)
+        return {"analyzed_posts": analyzed}
+    return analyze
+
+
+async def drain(pools, analyze, timeout: float) -> float:
+    started = time.perf_counter()
+    for pool in pools:
+        await pool.start(database, analyze)
+    while await remaining() and time.perf_counter() - started < timeout:
+        await asyncio.sleep(0.25)
+    seconds = time.perf_counter() - started
+    for pool in pools:
+        await pool.stop()
+    return seconds
+
+
+def exactly_once(processed: Counter, count: int) -> bool:
+    return len(processed) == count and all(times == 1 for times in processed.values())
+
+
+async def run_workers(args, workers: int):
+    await load_backlog(args.posts, args.seed)
+    llm = StubLLM(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4)
+    processed = Counter()
+    pools = [AnalysisWorkerPool(workers=1, batch_size=args.batch_size, lease_seconds=args.lease_seconds,
+                                poll_seconds=0.05, owner=f"replica-{i}") for i in range(workers)]
+    seconds = await drain(pools, make_analyze(llm, processed), args.timeout)
+    return {"workers": workers, "seconds": round(seconds, 2), "posts_per_s": round(args.posts / seconds, 1),
+            "left": await remaining(), "llm_calls": llm.calls, "exactly_once": exactly_once(processed, args.posts),
+            "batches_per_worker": [pool.counters["batches"] for pool in pools]}
+
+
+async def run_crash(args):
+    await load_backlog(args.posts, args.seed)
+    llm = StubLLM(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4)
+    processed = Counter()
+    lease_seconds = args.crash_lease_seconds
+
+    # The crashed worker leases a batch and is never heard from again
+    crashed = AnalysisWorkerPool(batch_size=args.batch_size, lease_seconds=lease_seconds, owner="crashed")
+    crashed.db = database
+    stranded = {post.id for post in await crashed.claim("crashed")}
+
+    healthy = [AnalysisWorkerPool(workers=1, batch_size=args.batch_size, lease_seconds=args.lease_seconds,
+                                  poll_seconds=0.05, owner=f"replica-{i}") for i in range(args.crash_workers)]
+    recovered_at = None
+    analyze = make_analyze(llm, processed)
+
+    async def watch(posts, lease_owner):
+        nonlocal recovered_at
+        result = await analyze(posts, lease_owner)
+        if recovered_at is None and stranded.issubset(processed):
+            recovered_at = time.perf_counter() - started
+        return result
+
+    started = time.perf_counter()
+    seconds = await drain(healthy, watch, args.timeout)
+    return {"workers": args.crash_workers, "lease_seconds": lease_seconds, "stranded_posts": len(stranded),
+            "seconds": round(seconds, 2), "left": await remaining(),
+            "stranded_recovered_after_s": round(recovered_at, 2) if recovered_at is not None else None,
+            "exactly_once": exactly_once(processed, args.posts)}
+
+
+async def main_async(args):
+    await database.connect_to_mongo()
+    await database.create_indexes()
+    runs = [await run_workers(args, workers) for workers in args.workers]
+    crash = await run_crash(args)
+    return {"posts": args.posts, "latency_ms": args.latency_ms, "batch_size": args.batch_size,
+            "runs": runs, "crash": crash}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark leased social media analysis across workers")
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stub LLM latency per post")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--lease-seconds", type=float, default=30.0)
+    parser.add_argument("--crash-workers", type=int, default=4)
+    parser.add_argument("--crash-lease-seconds", type=float, default=2.0,
+                        help="Lease length of the crashed worker; its posts wait this long")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{summary['posts']:,} posts, {summary['latency_ms']:.0f} ms per LLM call, "
+          f"batches of {summary['batch_size']}")
+    print(f"{'workers':>8} {'seconds':>8} {'posts/s':>9} {'speedup':>8} {'left':>6} {'exactly once':>13}")
+    base = summary["runs"][0]["posts_per_s"]
+    for run in summary["runs"]:
+        print(f"{run['workers']:>8} {run['seconds']:>8} {run['posts_per_s']:>9} "
+              f"{run['posts_per_s'] / base:>7.2f}x {run['left']:>6} {str(run['exactly_once']):>13}")
+    crash = summary["crash"]
+    print(f"\ncrashed worker: {crash['stranded_posts']} posts stranded with {crash['lease_seconds']:g} s leases, "
+          f"recovered after {crash['stranded_recovered_after_s']} s by {crash['workers']} workers; "
+          f"{crash['left']} left, exactly once: {crash['exactly_once']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Language identification benchmark.
+
+Measures accuracy and throughput of the offline identifier on two sets:
+synthetic posts from generate_dataset.py (hazard phrases in six languages
+with Latin place names and hashtags mixed in), and held-out sentences that are
+not part of the identifier's seed text, including Hindi vs Marathi, which
+share a script. Also reports how many posts the keyword pre-filter would keep
+away from the LLM.
+
+Usage (from backend/):
+    python benchmarks/bench_language_id.py --posts 100000
+    python benchmarks/bench_language_id.py --posts 100000 --json
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+from datetime import datetime
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from language_id import LanguageIdentifier, mentions_hazard
+from generate_dataset import Generator
+
+HELD_OUT = {
+    "hi": [
+        "चेन्नई के मरीना बीच पर आज शाम बहुत तेज़ लहरें देखी गईं",
+        "कृपया समुद्र तट से दूर रहें, प्रशासन ने लोगों को वहाँ से हटा दिया है",
+        "हमारे गाँव की नावें अभी तक वापस नहीं आई हैं, कोई खबर नहीं मिल रही",
+        "रात भर बारिश होती रही और सड़कों पर घुटनों तक पानी भर गया",
+        "मछली पकड़ने गए लोगों को तुरंत लौटने के लिए कहा गया है",
+        "किसी ने बताया कि बंदरगाह के पास पानी का रंग बदल गया है",
+        "यह वीडियो पुराना है, इसे शेयर मत कीजिए",
+        "स्कूल कल बंद रहेंगे क्योंकि चक्रवात आने वाला है",
+    ],
+    "mr": [
+        "मुंबईत आज जोरदार पाऊस पडत आहे आणि समुद्राला उधाण आले आहे",
+        "कृपया समुद्रकिनाऱ्यापासून दूर राहा, प्रशासनाने लोकांना तिथून हलवले आहे",
+        "आमच्या गावातील होड्या अजून परत आल्या नाहीत, काहीच बातमी मिळत नाही",
+        "रात्रभर पाऊस पडला आणि रस्त्यांवर गुडघाभर पाणी साचले",
+        "मासेमारीसाठी गेलेल्या लोकांना ताबडतोब परत येण्यास सांगितले आहे",
+        "बंदराजवळ पाण्याचा रंग बदलला आहे असे कोणीतरी सांगितले",
+        "हा व्हिडिओ जुना आहे, तो शेअर करू नका",
+        "उद्या शाळा बंद राहतील कारण चक्रीवादळ येणार आहे",
+    ],
+    "as": ["গুৱাহাটীত ৰাতিৰ পৰা বৰষুণ হৈ আছে", "নদীৰ পানী বাঢ়ি গৈছে, সকলোৱে সাৱধানে থাকক"],
+    "bn": ["দিঘায় সমুদ্রের জল অনেকটা উঠে এসেছে", "মৎস্যজীবীদের সমুদ্রে যেতে নিষেধ করা হয়েছে"],
+    "gu": ["દ્વારકા પાસે દરિયામાં ઊંચા મોજા ઉછળી રહ્યા છે", "માછીમારોને દરિયો ન ખેડવા સૂચના આપવામાં આવી છે"],
+    "kn": ["ಮಂಗಳೂರು ಕಡಲತೀರದಲ್ಲಿ ಭಾರಿ ಅಲೆಗಳು ಕಾಣಿಸಿಕೊಂಡಿವೆ", "ಮೀನುಗಾರರು ಸಮುದ್ರಕ್ಕೆ ಇಳಿಯದಂತೆ ಸೂಚಿಸಲಾಗಿದೆ"],
+    "or": ["ପୁରୀ ସମୁଦ୍ରରେ ବଡ଼ ବଡ଼ ଢେଉ ଉଠୁଛି", "ମତ୍ସ୍ୟଜୀବୀମାନଙ୍କୁ ସମୁଦ୍ରକୁ ନ ଯିବାକୁ କୁହାଯାଇଛି"],
+    "pa": ["ਸਮੁੰਦਰ ਵਿੱਚ ਬਹੁਤ ਉੱਚੀਆਂ ਲਹਿਰਾਂ ਉੱਠ ਰਹੀਆਂ ਹਨ", "ਮਛੇਰਿਆਂ ਨੂੰ ਸਮੁੰਦਰ ਵਿੱਚ ਨਾ ਜਾਣ ਦੀ ਸਲਾਹ ਦਿੱਤੀ ਗਈ ਹੈ"],
+    "ur": ["کراچی کے ساحل پر اونچی لہریں دیکھی گئی ہیں", "ماہی گیروں کو سمندر میں نہ جانے کی ہدایت کی گئی ہے"],
+    "en": ["Fishermen have been asked not to venture into the sea #CycloneAlert",
+           "Water entered houses near the harbour in Kochi last night"],
+}
+
+
+def score(identifier, samples):
+    by_language = defaultdict(lambda: [0, 0])
+    confusion = Counter()
+    for text, expected in samples:
+        detected = identifier.detect(text).language
+        by_language[expected][1] += 1
+        if detected == expected:
+            by_language[expected][0] += 1
+        else:
+            confusion[(expected, detected)] += 1
+    correct = sum(hits for hits, _ in by_language.values())
+    return {
+        "accuracy": round(correct / len(samples), 4),
+        "by_language": {language: round(hits / total, 4) for language, (hits, total) in sorted(by_language.items())},
+        "confusions": {f"{expected}->{detected}": count for (expected, detected), count in confusion.most_common(5)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline language identification")
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    generator = Generator(seed=args.seed, days=30, events=200, end=datetime(2026, 1, 1))
+    posts = [generator.post(i, viral_share=0.0) for i in range(args.posts)]
+    texts = [post["content"] for post in posts]
+
+    identifier = LanguageIdentifier()
+    started = time.perf_counter()
+    detections = identifier.detect_many(texts)
+    seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    kept = sum(mentions_hazard(text, detection.language) for text, detection in zip(texts, detections))
+    prefilter_seconds = time.perf_counter() - started
+
+    summary = {
+        "posts": args.posts,
+        "throughput_per_s": round(args.posts / seconds),
+        "mean_us": round(seconds / args.posts * 1e6, 1),
+        "prefilter_mean_us": round(prefilter_seconds / args.posts * 1e6, 1),
+        "prefilter_kept": round(kept / args.posts, 4),
+        "synthetic": score(identifier, [(post["content"], post["language"]) for post in posts]),
+        "held_out": score(identifier, [(text, language) for language, items in HELD_OUT.items() for text in items]),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{args.posts:,} posts: {summary['throughput_per_s']:,} texts/s ({summary['mean_us']} us each), "
+          f"pre-filter {summary['prefilter_mean_us']} us, keeps {summary['prefilter_kept']:.1%}")
+    for name in ("synthetic", "held_out"):
+        result = summary[name]
+        per_language = ", ".join(f"{language} {accuracy:.0%}" for language, accuracy in result["by_language"].items())
+        print(f"{name:<10} accuracy {result['accuracy']:.2%}  ({per_language})")
+        if result["confusions"]:
+            print(f"{'':<10} confusions {result['confusions']}")
+
+
+if __name__ == "__main__":
+    main()
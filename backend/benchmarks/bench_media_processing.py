@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Media processing throughput benchmark.
+
+Generates synthetic photos and runs the thumbnail/EXIF/perceptual-hash stage
+across a range of process pool sizes.
+
+Usage (from backend/):
+    python benchmarks/bench_media_processing.py --images 200 --workers 1,2,4,8
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from media_processing import process_image
+
+
+def make_images(directory: str, count: int, size: int):
+    from PIL import Image
+
+    paths = []
+    for i in range(count):
+        # Gradient plus per-image noise so the JPEG encoder does real work
+        image = Image.effect_noise((size, size * 3 // 4), 40 + i % 30).convert("RGB")
+        path = os.path.join(directory, f"img_{i}.jpg")
+        image.save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def run(paths, workers: int, out_dir: str) -> float:
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(process_image, path, os.path.join(out_dir, f"w{workers}_{i}"))
+            for i, path in enumerate(paths)
+        ]
+        for future in futures:
+            future.result()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark media processing across worker counts")
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--size", type=int, default=2048, help="Source image width in pixels")
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, os.cpu_count() or 1)))
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    worker_counts = sorted({int(n) for n in args.workers.split(",")})
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_images(tmp, args.images, args.size)
+        for workers in worker_counts:
+            elapsed = run(paths, workers, tmp)
+            results.append({
+                "workers": workers,
+                "seconds": round(elapsed, 3),
+                "images_per_sec": round(len(paths) / elapsed, 1),
+            })
+
+    if args.json:
+        print(json.dumps({"images": args.images, "size": args.size, "results": results}, indent=2))
+        return
+
+    baseline = results[0]["images_per_sec"]
+    print(f"{args.images} images at {args.size}px")
+    print(f"{'workers':>8} {'seconds':>9} {'img/s':>8} {'speedup':>8}")
+    for row in results:
+        print(f"{row['workers']:>8} {row['seconds']:>9} {row['images_per_sec']:>8} "
+              f"{row['images_per_sec'] / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
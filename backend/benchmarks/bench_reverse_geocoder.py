@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Reverse geocoder benchmark.
+
+Times bulk lookups over points scattered along the coastline from
+generate_dataset.py (bulk and one at a time, plus filling raw documents as
+ingest does), and measures accuracy on points within a few km of the named
+coastal cities there, whose state and city are known.
+
+Usage (from backend/):
+    python benchmarks/bench_reverse_geocoder.py --points 1000000
+    python benchmarks/bench_reverse_geocoder.py --points 1000000 --json
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from reverse_geocoder import ReverseGeocoder
+from generate_dataset import COASTLINE, ISLANDS
+
+
+def along_coast(count: int, rng) -> np.ndarray:
+    coast = np.array([(lat, lon) for lat, lon, _, _ in COASTLINE])
+    segment = rng.integers(0, len(coast) - 1, count)
+    t = rng.random(count)[:, None]
+    points = coast[segment] + (coast[segment + 1] - coast[segment]) * t
+    return points + rng.normal(0, 0.03, (count, 2))
+
+
+def accuracy(geocoder: ReverseGeocoder, per_city: int, rng):
+    cities = COASTLINE + ISLANDS
+    expected = [city for city in cities for _ in range(per_city)]
+    points = np.repeat(np.array([(lat, lon) for lat, lon, _, _ in cities]), per_city, axis=0)
+    points += rng.normal(0, 0.02, points.shape)  # roughly 2 km
+    places = geocoder.lookup_many(points[:, 0], points[:, 1])
+    state_hits, city_hits, misses = 0, 0, Counter()
+    for (_, _, city, state), place in zip(expected, places):
+        if place is not None and place.state == state:
+            state_hits += 1
+        else:
+            misses[f"{city}->{place.state if place else None}"] += 1
+        city_hits += place is not None and place.city == city
+    return {
+        "points": len(expected),
+        "state_accuracy": round(state_hits / len(expected), 4),
+        "city_accuracy": round(city_hits / len(expected), 4),
+        "state_misses": dict(misses.most_common(5)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline reverse geocoding")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--single", type=int, default=10_000, help="Points looked up one at a time")
+    parser.add_argument("--per-city", type=int, default=200, help="Accuracy samples around each named city")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    geocoder = ReverseGeocoder.from_district_table()
+    geocoder.load()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    points = along_coast(args.points, rng)
+    started = time.perf_counter()
+    places = geocoder.lookup_many(points[:, 0], points[:, 1])
+    bulk_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for latitude, longitude in points[:args.single].tolist():
+        geocoder.lookup(latitude, longitude)
+    single_seconds = time.perf_counter() - started
+
+    documents = [{"location": {"latitude": latitude, "longitude": longitude}}
+                 for latitude, longitude in points[:100_000].tolist()]
+    started = time.perf_counter()
+    geocoder.fill_documents(documents)
+    fill_seconds = time.perf_counter() - started
+
+    summary = {
+        "regions": len(geocoder), "build_ms": round(build_ms, 1), "points": args.points,
+        "bulk_per_s": round(args.points / bulk_seconds),
+        "single_us": round(single_seconds / max(args.single, 1) * 1e6, 1),
+        "fill_documents_per_s": round(len(documents) / fill_seconds),
+        "resolved": round(sum(place is not None for place in places) / args.points, 4),
+        "with_city": round(sum(place is not None and place.city is not None for place in places) / args.points, 4),
+        "accuracy": accuracy(geocoder, args.per_city, rng),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{summary['regions']} regions built in {build_ms:.1f} ms")
+    print(f"{args.points:,} points: {summary['bulk_per_s']:,} lookups/s in bulk, "
+          f"{summary['single_us']} us one at a time, {summary['fill_documents_per_s']:,} documents/s filled")
+    print(f"  resolved {summary['resolved']:.1%}, with a city {summary['with_city']:.1%}")
+    result = summary["accuracy"]
+    print(f"Near named cities ({result['points']:,} points): state {result['state_accuracy']:.2%}, "
+          f"city {result['city_accuracy']:.2%}")
+    if result["state_misses"]:
+        print(f"  misses {result['state_misses']}")
+
+
+if __name__ == "__main__":
+    main()
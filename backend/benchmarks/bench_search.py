@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Full-text search benchmark.
+
+Indexes synthetic reports and posts from generate_dataset.py into the
+in-process BM25 index, then times a mix of queries (common and rare terms,
+multi-term, filtered, time-ranged) and reports latency percentiles. Query
+latency covers ranking only; /api/search adds one Mongo lookup of the top hits.
+
+Usage (from backend/):
+    python benchmarks/bench_search.py --reports 1000000 --posts 1000000
+    python benchmarks/bench_search.py --reports 100000 --posts 100000 --json
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from search_index import SearchIndex
+from generate_dataset import Generator
+
+END = datetime(2026, 1, 1)
+
+QUERIES = {
+    "common_term": {"query": "waves"},
+    "two_terms": {"query": "oil spill"},
+    "three_terms": {"query": "high waves chennai"},
+    "rare_term": {"query": "jellyfish"},
+    "hindi": {"query": "समुद्र"},
+    "report_filters": {"query": "waves", "kind": "report", "severity": "high"},
+    "platform_filter": {"query": "oil slick", "platform": "twitter"},
+    "last_day": {"query": "debris", "since": END - timedelta(days=1)},
+    "deep_page": {"query": "erosion", "offset": 500},
+}
+
+
+def percentile(sorted_values, pct):
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def build(reports: int, posts: int, seed: int) -> SearchIndex:
+    generator = Generator(seed=seed, days=30, events=200, end=END)
+    index = SearchIndex()
+    for _ in range(reports):
+        index.add("hazard_reports", generator.report(users=100_000))
+    for i in range(posts):
+        index.add("social_media_posts", generator.post(i, viral_share=0.1))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 search over synthetic reports and posts")
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build(args.reports, args.posts, args.seed)
+    build_seconds = time.perf_counter() - started
+    postings = sum(len(docs) for docs, _ in index.postings.values())
+
+    rng = random.Random(args.seed)
+    results = {}
+    for name, params in QUERIES.items():
+        params = dict(params)
+        query = params.pop("query")
+        timings = []
+        total = 0
+        for _ in range(args.repeat):
+            limit = rng.choice([10, 20, 50])
+            query_started = time.perf_counter()
+            total, _ = index.search(query, limit=limit, **params)
+            timings.append((time.perf_counter() - query_started) * 1000)
+        timings.sort()
+        results[name] = {"matches": total, "p50_ms": round(percentile(timings, 50), 2),
+                         "p95_ms": round(percentile(timings, 95), 2), "max_ms": round(timings[-1], 2)}
+
+    summary = {"documents": len(index), "terms": len(index.postings), "postings": postings,
+               "build_seconds": round(build_seconds, 1), "queries": results}
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"Indexed {len(index):,} documents ({len(index.postings):,} terms, {postings:,} postings) "
+          f"in {build_seconds:.1f}s")
+    print(f"{'query':<18}{'matches':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    print("-" * 58)
+    for name, row in results.items():
+        print(f"{name:<18}{row['matches']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['max_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
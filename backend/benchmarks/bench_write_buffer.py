@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Write buffer (group commit) benchmark.
+
+Many concurrent clients each create a run of hazard reports and alerts
+through Database, with the write buffer off (one insert_one round trip per
+document) and on (one insert_many per collection per flush). Mongo is a
+simulated in-memory server: every command holds one of ``--pool``
+connections for ``--rtt-ms`` plus ``--doc-us`` per document, which is what
+makes per-document round trips queue up in a burst. Reports writes/s and
+insert latency (p50/p99/max) for each mode.
+
+Every ``--duplicate-every``-th alert reuses the id of an alert already
+written, against a unique index, so the run also checks that exactly those
+callers get a DuplicateKeyError in both modes.
+
+Usage (from backend/):
+    python benchmarks/bench_write_buffer.py --clients 500 --writes 20000
+    python benchmarks/bench_write_buffer.py --clients 500 --writes 20000 --rtt-ms 10 --pool 10 --json
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from generate_dataset import Generator
+from models import Alert, HazardReport
+from database import database
+from reverse_geocoder import reverse_geocoder
+from write_buffer import WriteBuffer
+
+
+class SimulatedCollection:
+    """Keeps documents in memory and enforces unique fields the way Mongo reports violations"""
+
+    def __init__(self, name: str, server: "SimulatedServer", unique=()):
+        self.name = name
+        self.server = server
+        self.documents = []
+        self.keys = {field: set() for field in unique}
+
+    def _violation(self, document):
+        for field, seen in self.keys.items():
+            if document.get(field) in seen:
+                return f"E11000 duplicate key error collection: {self.name} index: {field}_1"
+        return None
+
+    def _store(self, document):
+        for field, seen in self.keys.items():
+            seen.add(document.get(field))
+        self.documents.append(document)
+
+    async def insert_one(self, document):
+        await self.server.round_trip(1)
+        violation = self._violation(document)
+        if violation:
+            raise DuplicateKeyError(violation, 11000)
+        self._store(document)
+
+    async def insert_many(self, documents, ordered: bool = True):
+        await self.server.round_trip(len(documents))
+        errors = []
+        for index, document in enumerate(documents):
+            violation = self._violation(document)
+            if violation:
+                errors.append({"index": index, "code": 11000, "errmsg": violation, "op": document})
+                if ordered:
+                    break
+            else:
+                self._store(document)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [],
+                                  "nInserted": len(documents) - len(errors)})
+
+
+class SimulatedServer:
+    """Stands in for ``database.db``: every command holds a pooled connection for a round trip"""
+
+    def __init__(self, pool: int, rtt_ms: float, doc_us: float, unique=None):
+        self.pool = asyncio.Semaphore(pool)
+        self.rtt = rtt_ms / 1000
+        self.per_document = doc_us / 1e6
+        self.commands = 0
+        self.collections = {name: SimulatedCollection(name, self, fields) for name, fields in (unique or {}).items()}
+
+    async def round_trip(self, documents: int):
+        async with self.pool:
+            self.commands += 1
+            await asyncio.sleep(self.rtt + self.per_document * documents)
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = SimulatedCollection(name, self)
+        return self.collections[name]
+
+    __getattr__ = __getitem__
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2) if values else None
+
+
+async def run(args, buffered: bool):
+    server = SimulatedServer(args.pool, args.rtt_ms, args.doc_us, unique={"alerts": ["id"]})
+    database.db = server
+    database.write_buffer = WriteBuffer(enabled=buffered, max_documents=args.max_documents,
+                                        max_delay_ms=args.max_delay_ms)
+    generator = Generator(seed=args.seed, days=1, events=50, end=datetime(2026, 1, 1))
+    rng = random.Random(args.seed)
+    per_client = args.writes // args.clients
+    # Built up front so the timed part is the database path only
+    documents = [[HazardReport(**generator.report(users=100)) if i % 2 == 0 else Alert(**generator.alert())
+                  for i in range(per_client)] for _ in range(args.clients)]
+    written_alerts, latencies = [], []
+    outcome = {"alerts": 0, "duplicates_sent": 0, "duplicate_errors": 0, "other_errors": 0}
+
+    async def client(batch):
+        for document in batch:
+            if isinstance(document, HazardReport):
+                create = database.create_hazard_report
+            else:
+                create = database.create_alert
+                outcome["alerts"] += 1
+                if written_alerts and outcome["alerts"] % args.duplicate_every == 0:
+                    document.id = rng.choice(written_alerts)
+                    outcome["duplicates_sent"] += 1
+            started = time.perf_counter()
+            try:
+                await create(document)
+            except DuplicateKeyError:
+                outcome["duplicate_errors"] += 1
+            except Exception:
+                outcome["other_errors"] += 1
+            else:
+                if isinstance(document, Alert):
+                    written_alerts.append(document.id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(batch) for batch in documents))
+    seconds = time.perf_counter() - started
+    await database.write_buffer.drain()
+    stored = len(server["hazard_reports"].documents) + len(server["alerts"].documents)
+    writes = per_client * args.clients
+    return {
+        "seconds": round(seconds, 2), "writes": writes, "writes_per_s": round(writes / seconds, 1),
+        "latency_ms": {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99),
+                       "max": percentile(latencies, 1.0)},
+        "commands": server.commands, "stored": stored,
+        "duplicates_sent": outcome["duplicates_sent"], "duplicate_errors": outcome["duplicate_errors"],
+        "other_errors": outcome["other_errors"],
+        "errors_match": (outcome["duplicate_errors"] == outcome["duplicates_sent"]
+                         and stored == writes - outcome["duplicates_sent"]),
+    }
+
+
+async def main_async(args):
+    reverse_geocoder.load()
+    results = {}
+    for mode, buffered in (("insert_one", False), ("write_buffer", True)):
+        results[mode] = await run(args, buffered)
+    return {"clients": args.clients, "rtt_ms": args.rtt_ms, "pool": args.pool,
+            "max_documents": args.max_documents, "max_delay_ms": args.max_delay_ms, **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark group-committed report and alert inserts")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--writes", type=int, default=20000)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="Simulated round trip per command")
+    parser.add_argument("--doc-us", type=float, default=20.0, help="Simulated server time per document")
+    parser.add_argument("--pool", type=int, default=100, help="Connections (motor's default maxPoolSize)")
+    parser.add_argument("--max-documents", type=int, default=100)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    parser.add_argument("--duplicate-every", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable results")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{summary['clients']} clients, {summary['rtt_ms']:g} ms round trips on {summary['pool']} connections; "
+          f"buffer flushes at {summary['max_documents']} documents or {summary['max_delay_ms']:g} ms")
+    print(f"{'mode':>13} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'commands':>9} "
+          f"{'dup errors':>11} {'ok':>5}")
+    for mode in ("insert_one", "write_buffer"):
+        result = summary[mode]
+        latency = result["latency_ms"]
+        print(f"{mode:>13} {result['writes_per_s']:>9} {latency['p50']:>8} {latency['p99']:>8} {latency['max']:>8} "
+              f"{result['commands']:>9} {result['duplicate_errors']:>5}/{result['duplicates_sent']:<5} "
+              f"{str(result['errors_match']):>5}")
+
+
+if __name__ == "__main__":
+    main()
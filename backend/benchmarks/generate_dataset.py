@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Synthetic coastline dataset generator for scale testing.
+
+Produces HazardReport, SocialMediaPost, Alert and User documents spread along
+the Indian coastline. Activity is shaped around simulated events (bursts that
+decay over hours) on top of background noise. Posts are multilingual and
+include heavily re-shared viral content. Documents are bulk-loaded with
+insert_many in concurrent batches, or written as JSON lines.
+
+Usage (from backend/):
+    python benchmarks/generate_dataset.py --reports 1000000 --posts 2000000 --drop
+    python benchmarks/generate_dataset.py --reports 10000 --posts 10000 --output-dir /tmp/dataset
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from itertools import accumulate
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from models import HazardReport, SocialMediaPost, Alert, User
+
+# Coastline anchors, north-west to north-east: (lat, lon, city, state)
+COASTLINE = [
+    (23.03, 68.36, "Jakhau", "Gujarat"), (22.47, 69.07, "Dwarka", "Gujarat"),
+    (21.64, 69.60, "Porbandar", "Gujarat"), (20.91, 70.37, "Veraval", "Gujarat"),
+    (20.71, 70.98, "Diu", "Dadra and Nagar Haveli and Daman and Diu"), (21.76, 72.15, "Bhavnagar", "Gujarat"),
+    (20.38, 72.83, "Daman", "Dadra and Nagar Haveli and Daman and Diu"), (19.99, 72.73, "Dahanu", "Maharashtra"),
+    (19.07, 72.82, "Mumbai", "Maharashtra"), (18.64, 72.87, "Alibag", "Maharashtra"),
+    (17.00, 73.28, "Ratnagiri", "Maharashtra"), (15.99, 73.48, "Malvan", "Maharashtra"),
+    (15.49, 73.82, "Panaji", "Goa"), (14.81, 74.13, "Karwar", "Karnataka"),
+    (14.35, 74.43, "Honnavar", "Karnataka"), (13.34, 74.70, "Udupi", "Karnataka"),
+    (12.87, 74.84, "Mangaluru", "Karnataka"), (11.87, 75.37, "Kannur", "Kerala"),
+    (11.25, 75.77, "Kozhikode", "Kerala"), (10.52, 76.04, "Thrissur", "Kerala"),
+    (9.93, 76.26, "Kochi", "Kerala"), (9.49, 76.32, "Alappuzha", "Kerala"),
+    (8.88, 76.59, "Kollam", "Kerala"), (8.50, 76.95, "Thiruvananthapuram", "Kerala"),
+    (8.08, 77.55, "Kanyakumari", "Tamil Nadu"), (8.76, 78.13, "Thoothukudi", "Tamil Nadu"),
+    (9.29, 79.31, "Rameswaram", "Tamil Nadu"), (10.77, 79.84, "Nagapattinam", "Tamil Nadu"),
+    (11.93, 79.83, "Puducherry", "Puducherry"), (12.62, 80.19, "Mamallapuram", "Tamil Nadu"),
+    (13.05, 80.28, "Chennai", "Tamil Nadu"), (14.44, 80.00, "Nellore", "Andhra Pradesh"),
+    (15.90, 80.47, "Bapatla", "Andhra Pradesh"), (16.18, 81.14, "Machilipatnam", "Andhra Pradesh"),
+    (16.99, 82.25, "Kakinada", "Andhra Pradesh"), (17.69, 83.22, "Visakhapatnam", "Andhra Pradesh"),
+    (18.29, 83.90, "Srikakulam", "Andhra Pradesh"), (19.31, 84.79, "Gopalpur", "Odisha"),
+    (19.81, 85.83, "Puri", "Odisha"), (20.32, 86.61, "Paradip", "Odisha"),
+    (21.49, 87.04, "Balasore", "Odisha"), (21.63, 87.52, "Digha", "West Bengal"),
+    (21.80, 88.20, "Sagar Island", "West Bengal"),
+]
+ISLANDS = [
+    (11.62, 92.73, "Port Blair", "Andaman and Nicobar Islands"),
+    (10.57, 72.64, "Kavaratti", "Lakshadweep"),
+]
+
+HAZARD_MIX = {
+    "high_waves": 0.24, "debris": 0.18, "water_pollution": 0.14, "coastal_erosion": 0.11,
+    "unusual_weather": 0.12, "oil_spill": 0.06, "unusual_marine_life": 0.08,
+    "tsunami_warning": 0.01, "other": 0.06,
+}
+SEVERITY_BY_HAZARD = {
+    "tsunami_warning": [0.0, 0.05, 0.35, 0.60],
+    "high_waves": [0.25, 0.40, 0.28, 0.07],
+    "oil_spill": [0.10, 0.35, 0.40, 0.15],
+    "unusual_weather": [0.25, 0.40, 0.27, 0.08],
+}
+DEFAULT_SEVERITY = [0.45, 0.38, 0.14, 0.03]
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+HAZARD_WORDS = {
+    "en": {"high_waves": "very high waves", "debris": "plastic and nets washed ashore",
+           "water_pollution": "the water is dark and smelly", "coastal_erosion": "the beach is being eaten away",
+           "unusual_weather": "strong winds and heavy rain", "oil_spill": "oil slick on the water",
+           "unusual_marine_life": "dead fish and jellyfish on the shore", "tsunami_warning": "tsunami warning, evacuate now",
+           "other": "something unusual at the sea"},
+    "hi": {"high_waves": "बहुत ऊँची लहरें", "debris": "किनारे पर प्लास्टिक और जाल", "water_pollution": "पानी गंदा और बदबूदार है",
+           "coastal_erosion": "तट कट रहा है", "unusual_weather": "तेज़ हवा और भारी बारिश", "oil_spill": "पानी पर तेल फैला है",
+           "unusual_marine_life": "किनारे पर मरी मछलियाँ", "tsunami_warning": "सुनामी चेतावनी, तुरंत निकलें",
+           "other": "समुद्र में कुछ असामान्य"},
+    "ta": {"high_waves": "மிக உயரமான அலைகள்", "debris": "கரையில் பிளாஸ்டிக் குப்பை", "water_pollution": "நீர் மாசடைந்துள்ளது",
+           "coastal_erosion": "கடற்கரை அரிப்பு", "unusual_weather": "பலத்த காற்று மற்றும் கனமழை", "oil_spill": "கடலில் எண்ணெய் கசிவு",
+           "unusual_marine_life": "கரையில் இறந்த மீன்கள்", "tsunami_warning": "சுனாமி எச்சரிக்கை, உடனே வெளியேறுங்கள்",
+           "other": "கடலில் வித்தியாசமான நிகழ்வு"},
+    "bn": {"high_waves": "খুব উঁচু ঢেউ", "debris": "তীরে প্লাস্টিক ও জাল", "water_pollution": "জল দূষিত",
+           "coastal_erosion": "উপকূল ভাঙছে", "unusual_weather": "ঝোড়ো হাওয়া ও ভারী বৃষ্টি", "oil_spill": "জলে তেল ছড়িয়েছে",
+           "unusual_marine_life": "তীরে মরা মাছ", "tsunami_warning": "সুনামি সতর্কতা, এখনই সরে যান",
+           "other": "সমুদ্রে অস্বাভাবিক কিছু"},
+    "ml": {"high_waves": "വളരെ ഉയർന്ന തിരമാലകൾ", "debris": "തീരത്ത് പ്ലാസ്റ്റിക് മാലിന്യം", "water_pollution": "വെള്ളം മലിനമാണ്",
+           "coastal_erosion": "തീരം ഇടിയുന്നു", "unusual_weather": "ശക്തമായ കാറ്റും മഴയും", "oil_spill": "കടലിൽ എണ്ണ പടർന്നു",
+           "unusual_marine_life": "തീരത്ത് ചത്ത മീനുകൾ", "tsunami_warning": "സുനാമി മുന്നറിയിപ്പ്, ഉടൻ ഒഴിഞ്ഞുപോകുക",
+           "other": "കടലിൽ അസാധാരണമായ ഒന്ന്"},
+    "te": {"high_waves": "చాలా ఎత్తైన అలలు", "debris": "తీరంలో ప్లాస్టిక్ చెత్త", "water_pollution": "నీరు కలుషితమైంది",
+           "coastal_erosion": "తీరం కోతకు గురవుతోంది", "unusual_weather": "బలమైన గాలులు, భారీ వర్షం", "oil_spill": "సముద్రంలో చమురు లీక్",
+           "unusual_marine_life": "తీరంలో చనిపోయిన చేపలు", "tsunami_warning": "సునామీ హెచ్చరిక, వెంటనే ఖాళీ చేయండి",
+           "other": "సముద్రంలో అసాధారణ సంఘటన"},
+}
+# Language weights per state; English is used everywhere
+STATE_LANGUAGES = {
+    "Tamil Nadu": {"ta": 0.6, "en": 0.4}, "Puducherry": {"ta": 0.5, "en": 0.5},
+    "Kerala": {"ml": 0.55, "en": 0.45}, "West Bengal": {"bn": 0.6, "en": 0.4},
+    "Andhra Pradesh": {"te": 0.55, "en": 0.45}, "Maharashtra": {"hi": 0.4, "en": 0.6},
+    "Gujarat": {"hi": 0.4, "en": 0.6}, "Odisha": {"hi": 0.3, "en": 0.7},
+}
+PLATFORMS = {"twitter": 0.5, "facebook": 0.25, "instagram": 0.15, "youtube": 0.1}
+
+
+class Generator:
+    def __init__(self, seed: int, days: int, events: int, end: datetime):
+        self.rng = random.Random(seed)
+        self.start = end - timedelta(days=days)
+        self.span_seconds = days * 86400
+        self.segments = list(zip(COASTLINE, COASTLINE[1:]))
+        self.hazards, self.hazard_weights = zip(*HAZARD_MIX.items())
+        self.platforms, self.platform_weights = zip(*PLATFORMS.items())
+        self.events = [self._event() for _ in range(events)]
+        self.event_cum_weights = list(accumulate(e["weight"] for e in self.events))
+        self.viral: List[Dict[str, Any]] = []
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _coast_point(self) -> Tuple[float, float, str, str]:
+        rng = self.rng
+        if rng.random() < 0.03:
+            lat, lon, city, state = rng.choice(ISLANDS)
+            return lat + rng.gauss(0, 0.05), lon + rng.gauss(0, 0.05), city, state
+        a, b = rng.choice(self.segments)
+        t = rng.random()
+        nearest = a if t < 0.5 else b
+        # Interpolate along the segment, then push slightly inland/offshore
+        return (a[0] + (b[0] - a[0]) * t + rng.gauss(0, 0.03),
+                a[1] + (b[1] - a[1]) * t + rng.gauss(0, 0.03),
+                nearest[2], nearest[3])
+
+    def _event(self) -> Dict[str, Any]:
+        lat, lon, city, state = self._coast_point()
+        hazard = self.rng.choices(self.hazards, self.hazard_weights)[0]
+        return {
+            "lat": lat, "lon": lon, "city": city, "state": state, "hazard": hazard,
+            "start": self.rng.random() * self.span_seconds,
+            "decay_hours": self.rng.uniform(1.0, 12.0),
+            "weight": self.rng.paretovariate(1.2),  # a few events dominate
+        }
+
+    def _when_where(self, event_share: float) -> Tuple[datetime, float, float, str, str, str]:
+        rng = self.rng
+        if self.events and rng.random() < event_share:
+            event = rng.choices(self.events, cum_weights=self.event_cum_weights)[0]
+            offset = min(event["start"] + rng.expovariate(1.0 / (event["decay_hours"] * 3600)), self.span_seconds)
+            lat = event["lat"] + rng.gauss(0, 0.02)
+            lon = event["lon"] + rng.gauss(0, 0.02)
+            return (self.start + timedelta(seconds=offset), lat, lon,
+                    event["city"], event["state"], event["hazard"])
+        lat, lon, city, state = self._coast_point()
+        hazard = rng.choices(self.hazards, self.hazard_weights)[0]
+        return self.start + timedelta(seconds=rng.random() * self.span_seconds), lat, lon, city, state, hazard
+
+    def _severity(self, hazard: str) -> str:
+        return self.rng.choices(SEVERITIES, SEVERITY_BY_HAZARD.get(hazard, DEFAULT_SEVERITY))[0]
+
+    def _language(self, state: str) -> str:
+        weights = STATE_LANGUAGES.get(state, {"en": 1.0})
+        return self.rng.choices(list(weights), list(weights.values()))[0]
+
+    @staticmethod
+    def _location(lat: float, lon: float, city: str, state: str) -> Dict[str, Any]:
+        return {"latitude": round(max(-90, min(90, lat)), 6), "longitude": round(max(-180, min(180, lon)), 6),
+                "address": None, "city": city, "state": state, "country": "India"}
+
+    def user(self, i: int) -> Dict[str, Any]:
+        role = self.rng.choices(["citizen", "official", "researcher"], [0.95, 0.04, 0.01])[0]
+        created = self.start + timedelta(seconds=self.rng.random() * self.span_seconds)
+        return {
+            "id": self._uuid(), "username": f"user_{i}", "email": f"user_{i}@example.org",
+            "phone": None, "role": role, "full_name": f"Synthetic User {i}", "organization": None,
+            "verified": role != "citizen", "created_at": created, "last_login": None, "is_active": True,
+        }
+
+    def report(self, users: int) -> Dict[str, Any]:
+        created, lat, lon, city, state, hazard = self._when_where(event_share=0.7)
+        language = self._language(state)
+        phrase = HAZARD_WORDS[language][hazard]
+        reporter = self.rng.randrange(max(users, 1))
+        return {
+            "id": self._uuid(),
+            "title": f"{hazard.replace('_', ' ').title()} near {city}",
+            "description": f"{phrase} — {city}, {state}.",
+            "hazard_type": hazard,
+            "severity": self._severity(hazard),
+            "location": self._location(lat, lon, city, state),
+            "reporter_id": f"user_{reporter}",
+            "reporter_name": f"Synthetic User {reporter}",
+            "media_files": [],
+            "status": self.rng.choices(["pending", "verified", "rejected", "investigating"], [0.6, 0.25, 0.05, 0.1])[0],
+            "created_at": created, "updated_at": created,
+            "verified_by": None, "verified_at": None, "verification_notes": None,
+            "ai_analysis": None, "language": language, "tags": [hazard, city.lower()], "contact_info": None,
+        }
+
+    def post(self, index: int, viral_share: float) -> Dict[str, Any]:
+        rng = self.rng
+        if self.viral and rng.random() < viral_share:
+            # Re-share of viral content: same text, new author, shortly after the original
+            original = rng.choice(self.viral)
+            created = original["created_at"] + timedelta(seconds=rng.expovariate(1 / 1800))
+            content = original["content"] if rng.random() < 0.7 else "RT " + original["content"]
+            location, language, hashtags = original["location"], original["language"], original["hashtags"]
+        else:
+            created, lat, lon, city, state, hazard = self._when_where(event_share=0.6)
+            language = self._language(state)
+            hashtags = [f"#{city.replace(' ', '')}", f"#{hazard.title().replace('_', '')}"]
+            content = f"{HAZARD_WORDS[language][hazard]} {city} {' '.join(hashtags)}"
+            location = self._location(lat, lon, city, state) if rng.random() < 0.3 else None
+
+        handle = f"@handle_{rng.randrange(200_000)}"
+        doc = {
+            "id": self._uuid(),
+            "platform": rng.choices(self.platforms, self.platform_weights)[0],
+            "post_id": f"synthetic_{index}",
+            "content": content, "author": handle[1:], "author_handle": handle,
+            "location": location, "created_at": created, "collected_at": created,
+            "engagement_metrics": {"likes": int(rng.paretovariate(1.1)) - 1,
+                                   "shares": int(rng.paretovariate(1.3)) - 1,
+                                   "comments": int(rng.paretovariate(1.5)) - 1},
+            "ai_analysis": None, "hazard_relevance_score": None, "sentiment_score": None,
+            "language": language, "hashtags": hashtags, "mentions": [],
+        }
+        if len(self.viral) < 500 and rng.random() < 0.001:
+            self.viral.append(doc)
+        return doc
+
+    def alert(self) -> Dict[str, Any]:
+        event = self.rng.choice(self.events) if self.events else self._event()
+        severity = self.rng.choices(["medium", "high", "critical"], [0.3, 0.5, 0.2])[0]
+        created = self.start + timedelta(seconds=event["start"])
+        return {
+            "id": self._uuid(),
+            "title": "High Severity Hazard Alert",
+            "message": f"Ocean hazard alert: {event['hazard']} reported near {event['city']}. Stay away from the shore.",
+            "alert_type": "hazard_detected", "severity": severity,
+            "location": self._location(event["lat"], event["lon"], event["city"], event["state"]),
+            "affected_area_radius": round(self.rng.uniform(2, 50), 1),
+            "source_type": self.rng.choice(["citizen_report", "social_media"]),
+            "source_id": self._uuid(), "created_at": created,
+            "expires_at": created + timedelta(hours=self.rng.choice([6, 12, 24, 48])),
+            "is_active": self.rng.random() < 0.2,
+            "target_roles": ["official", "admin"] if self.rng.random() < 0.5 else [],
+            "metadata": {"synthetic": True},
+        }
+
+
+def batches(factory, count: int, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, count, batch_size):
+        yield [factory(i) for i in range(start, min(count, start + batch_size))]
+
+
+def validate_schema(generator: Generator, users: int):
+    """Fail fast if generated documents drift from the Pydantic models"""
+    User(**generator.user(0))
+    HazardReport(**generator.report(users))
+    SocialMediaPost(**generator.post(0, 0.0))
+    Alert(**generator.alert())
+
+
+async def load_mongo(args, plan):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db_name]
+    if args.drop:
+        for collection, _, _ in plan:
+            await db[collection].drop()
+
+    in_flight = asyncio.Semaphore(args.parallel)
+    pending = set()
+
+    async def insert(collection, docs):
+        try:
+            await db[collection].insert_many(docs, ordered=False)
+        finally:
+            in_flight.release()
+
+    for collection, factory, count in plan:
+        started = time.perf_counter()
+        for docs in batches(factory, count, args.batch_size):
+            await in_flight.acquire()
+            task = asyncio.create_task(insert(collection, docs))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        await asyncio.gather(*pending)
+        report_rate(collection, count, time.perf_counter() - started)
+
+    if args.indexes:
+        os.environ.setdefault("MONGO_URL", args.mongo_url)
+        os.environ.setdefault("DB_NAME", args.db_name)
+        from database import database
+        database.client, database.db = client, db
+        started = time.perf_counter()
+        await database.create_indexes()
+        print(f"indexes created in {time.perf_counter() - started:.1f}s")
+    client.close()
+
+
+def write_jsonl(args, plan):
+    os.makedirs(args.output_dir, exist_ok=True)
+    for collection, factory, count in plan:
+        started = time.perf_counter()
+        with open(os.path.join(args.output_dir, f"{collection}.jsonl"), "w", encoding="utf-8") as f:
+            for docs in batches(factory, count, args.batch_size):
+                f.write("".join(json.dumps(doc, default=str, ensure_ascii=False) + "\n" for doc in docs))
+        report_rate(collection, count, time.perf_counter() - started)
+
+
+def report_rate(collection: str, count: int, seconds: float):
+    rate = count / seconds if seconds else float("inf")
+    print(f"{collection:<20} {count:>10,} docs in {seconds:7.1f}s ({rate:,.0f}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic coastal hazard data at scale")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--alerts", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=90, help="Length of the simulated timeline")
+    parser.add_argument("--events", type=int, default=400, help="Number of simulated hazard events")
+    parser.add_argument("--viral-share", type=float, default=0.25, help="Fraction of posts that re-share viral content")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--parallel", type=int, default=4, help="insert_many batches in flight")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=os.environ.get("DB_NAME", "ocean_hazard_scale"))
+    parser.add_argument("--drop", action="store_true", help="Drop target collections first")
+    parser.add_argument("--no-indexes", dest="indexes", action="store_false",
+                        help="Skip creating the application's indexes after loading")
+    parser.add_argument("--output-dir", help="Write JSON lines here instead of loading into MongoDB")
+    args = parser.parse_args()
+
+    generator = Generator(args.seed, args.days, args.events, end=datetime.utcnow())
+    validate_schema(generator, args.users)
+
+    plan = [
+        ("users", generator.user, args.users),
+        ("hazard_reports", lambda i: generator.report(args.users), args.reports),
+        ("social_media_posts", lambda i: generator.post(i, args.viral_share), args.posts),
+        ("alerts", lambda i: generator.alert(), args.alerts),
+    ]
+    if args.output_dir:
+        write_jsonl(args, plan)
+    else:
+        asyncio.run(load_mongo(args, plan))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Local load-testing benchmark for the API.
+
+By default the FastAPI app is driven in-process through httpx's ASGI
+transport, backed by an in-memory mongomock database and a deterministic
+stub LLM, so results only depend on this code and this machine. Point
+--url at a running uvicorn to measure a real server instead.
+
+Usage (from backend/):
+    python benchmarks/load_test.py --requests 500 --concurrency 32 --output before.json
+    python benchmarks/load_test.py --requests 500 --concurrency 32 --compare before.json
+    python benchmarks/load_test.py --url http://localhost:8001 --endpoints list_reports,map_hazards
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+HEADERS = {"Authorization": "Bearer load_test_token"}
+HAZARD_TYPES = ["tsunami_warning", "high_waves", "unusual_marine_life", "water_pollution",
+                "oil_spill", "coastal_erosion", "unusual_weather", "debris", "other"]
+SEVERITIES = ["low", "medium", "high", "critical"]
+COAST_POINTS = [(19.07, 72.82), (13.05, 80.28), (15.49, 73.82), (9.93, 76.26), (11.93, 79.83),
+                (21.64, 69.60), (17.69, 83.22), (22.57, 88.36), (8.08, 77.55), (12.91, 74.85)]
+
+
+def report_body(rng: random.Random) -> Dict[str, Any]:
+    lat, lon = rng.choice(COAST_POINTS)
+    hazard = rng.choice(HAZARD_TYPES)
+    return {
+        "title": f"{hazard.replace('_', ' ').title()} observed",
+        "description": f"Citizens report {hazard.replace('_', ' ')} near the shore. Waves and debris visible.",
+        "hazard_type": hazard,
+        "severity": rng.choices(SEVERITIES, weights=[50, 30, 15, 5])[0],
+        "location": {"latitude": lat + rng.uniform(-0.2, 0.2), "longitude": lon + rng.uniform(-0.2, 0.2)},
+        "tags": ["load_test"],
+    }
+
+
+# name -> (method, path, body factory, weight in --mix mode)
+ENDPOINTS: Dict[str, Tuple[str, str, Optional[Callable[[random.Random], Dict]], int]] = {
+    "health": ("GET", "/api/health", None, 5),
+    "list_reports": ("GET", "/api/reports?limit=50", None, 20),
+    "map_hazards": ("GET", "/api/map/hazards", None, 15),
+    "alerts": ("GET", "/api/alerts", None, 25),
+    "dashboard_stats": ("GET", "/api/dashboard/stats", None, 10),
+    "social_media": ("GET", "/api/social-media", None, 5),
+    "nearby_reports": ("GET", "/api/reports/nearby/19.07/72.82", None, 5),
+    "create_report": ("POST", "/api/reports", report_body, 14),
+    "trends": ("GET", "/api/dashboard/trends", None, 1),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], statuses: Dict[int, int], elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if status >= 500 or status == 0)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+
+
+async def drive(client: httpx.AsyncClient, pick: Callable[[random.Random], str], total: int,
+                concurrency: int, seed: int) -> Dict[str, Any]:
+    """Issue ``total`` requests from ``concurrency`` workers; returns per-endpoint stats"""
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[int, int]] = {}
+    remaining = [total]
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            name = pick(rng)
+            method, path, body_factory, _ = ENDPOINTS[name]
+            body = body_factory(rng) if body_factory else None
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=HEADERS)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.setdefault(name, []).append(time.perf_counter() - started)
+            by_status = statuses.setdefault(name, {})
+            by_status[status] = by_status.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {name: summarize(latencies[name], statuses[name], elapsed) for name in latencies}
+
+
+async def seed_database(reports: int, posts: int, seed: int):
+    from database import database
+    from models import HazardReport, SocialMediaPost, Location
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    report_docs = []
+    for i in range(reports):
+        body = report_body(rng)
+        report_docs.append(HazardReport(
+            **{k: v for k, v in body.items() if k != "location"},
+            location=Location(**body["location"]),
+            reporter_id=f"seed_{i % 97}",
+            created_at=now - timedelta(minutes=rng.randint(0, 7 * 24 * 60)),
+        ).dict())
+    post_docs = []
+    for i in range(posts):
+        lat, lon = rng.choice(COAST_POINTS)
+        post_docs.append(SocialMediaPost(
+            platform=rng.choice(["twitter", "facebook", "youtube", "instagram"]),
+            post_id=f"seed_post_{i}",
+            content=f"High waves and debris seen on the beach today #{rng.choice(['Chennai', 'Mumbai', 'Goa'])}",
+            author="seed",
+            author_handle=f"@seed{i % 50}",
+            location=Location(latitude=lat, longitude=lon),
+            created_at=now - timedelta(minutes=rng.randint(0, 7 * 24 * 60)),
+        ).dict())
+    if report_docs:
+        await database.db.hazard_reports.insert_many(report_docs)
+    if post_docs:
+        await database.db.social_media_posts.insert_many(post_docs)
+
+
+def lift_admission_limits():
+    from admission_control import admission_controller, PriorityClass
+
+    admission_controller.max_in_flight = 10 ** 6
+    admission_controller.classes = {
+        priority: PriorityClass(rate=1e9, burst=1e9, in_flight_share=1.0, max_queue_time=60.0)
+        for priority in admission_controller.classes
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    names = args.endpoints.split(",") if args.endpoints else list(ENDPOINTS)
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(unknown)} (choose from {', '.join(ENDPOINTS)})")
+
+    async def measure(client: httpx.AsyncClient) -> Dict[str, Any]:
+        # Warm-up so first-request costs (imports, caches) don't skew the numbers
+        await drive(client, lambda rng: rng.choice(names), min(50, args.requests), args.concurrency, args.seed + 1)
+        if args.mix:
+            weights = [ENDPOINTS[name][3] for name in names]
+            return await drive(client, lambda rng: rng.choices(names, weights)[0],
+                               args.requests, args.concurrency, args.seed)
+        results = {}
+        for name in names:
+            results.update(await drive(client, lambda rng, n=name: n, args.requests, args.concurrency, args.seed))
+        return results
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60.0) as client:
+            return await measure(client)
+
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["SEED_MOCK_DATA"] = "false"
+    import server
+    from ai_service import ai_service
+    from llm_backends import ReplayBackend
+    from stub_llm import StubLLM
+
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.cassette:
+        ai_service.set_backend(ReplayBackend(args.cassette, latency=args.replay_latency))
+    else:
+        ai_service.set_backend(StubLLM(args.llm_latency_ms, args.llm_jitter_ms, args.seed))
+    if not args.admission:
+        lift_admission_limits()
+
+    async with server.lifespan(server.app):
+        from database import database
+        if args.mongo_url != "mongomock://":
+            await database.db.client.drop_database(args.db_name)
+            await database.create_indexes()
+        await seed_database(args.seed_reports, args.seed_posts, args.seed)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60.0) as client:
+            return await measure(client)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    header = f"{'endpoint':<18} {'reqs':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        print(f"{name:<18} {row['requests']:>6} {row['errors']:>5} {row['throughput_rps']:>9} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+        old = (baseline or {}).get(name)
+        if old:
+            def delta(key):
+                return f"{(row[key] - old[key]) / old[key] * 100:+.0f}%" if old[key] else "n/a"
+            print(f"{'  vs baseline':<18} {'':>6} {'':>5} {delta('throughput_rps'):>9} "
+                  f"{delta('p50_ms'):>9} {delta('p95_ms'):>9} {delta('p99_ms'):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmark for the API")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--endpoints", help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint (total with --mix)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", action="store_true", help="Weighted endpoint mix instead of one endpoint at a time")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seed-reports", type=int, default=1000)
+    parser.add_argument("--seed-posts", type=int, default=500)
+    parser.add_argument("--mongo-url", default="mongomock://", help="mongomock:// or a local mongodb:// URL")
+    parser.add_argument("--db-name", default="ocean_hazard_loadtest")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--cassette", help="Replay recorded LLM responses (LLM_MODE=record output) instead of the stub")
+    parser.add_argument("--replay-latency", choices=["recorded", "none"], default="recorded")
+    parser.add_argument("--admission", action="store_true", help="Keep admission control limits enabled")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from a previous --output run")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "target": args.url or "in-process",
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "endpoints": results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["endpoints"]
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
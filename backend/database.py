@@ -1,46 +1,246 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional, List, Dict, Any
+from pymongo import IndexModel, UpdateOne, ReplaceOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import Optional, List, Dict, Any, Sequence, Set, Tuple, AsyncIterator
 from models import *
+from metrics import instrument_async_methods, MONGO_OPERATION_DURATION, QUEUE_DEPTH
+from tracing import trace_async_methods
+from alert_targeting import alert_covers
+from search_index import search_index
+from hotspots import hotspot_engine
+from language_id import language_identifier
+from reverse_geocoder import reverse_geocoder
+from gazetteer import place_extractor
+from geo import haversine_km
+from write_buffer import WriteBuffer
 import os
+import math
+import uuid
+import asyncio
 from datetime import datetime, timedelta
 
+# Text that language detection runs on at ingest; these collections are also reverse geocoded
+INGEST_TEXT_FIELDS = {
+    "hazard_reports": ("title", "description"),
+    "social_media_posts": ("content",),
+}
+
 class Database:
     def __init__(self):
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
+        # Bumped after every write made through this class; response caches and
+        # ETags compare them to tell whether a collection may have changed
+        self.versions: Dict[str, int] = {}
+        # Optional group commit for report and alert inserts (DB_WRITE_BUFFER)
+        self.write_buffer = WriteBuffer.from_env()
+
+    def bump_version(self, *collections: str):
+        for collection in collections:
+            self.versions[collection] = self.versions.get(collection, 0) + 1
+
+    def get_versions(self, collections: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(self.versions.get(collection, 0) for collection in collections)
 
     async def connect_to_mongo(self):
-        self.client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        mongo_url = os.environ['MONGO_URL']
+        if mongo_url.startswith("mongomock://"):
+            # In-memory stand-in for benchmarks and offline runs (pip install mongomock-motor)
+            from mongomock_motor import AsyncMongoMockClient
+            self.client = AsyncMongoMockClient()
+        else:
+            self.client = AsyncIOMotorClient(mongo_url)
         self.db = self.client[os.environ['DB_NAME']]
-        
-        # Create indexes for better performance
-        await self.create_indexes()
 
     async def close_mongo_connection(self):
+        await self.write_buffer.drain()
         if self.client:
             self.client.close()
 
+    async def _insert(self, collection: str, document: Dict[str, Any]):
+        """insert_one, or a place in the next group commit when the write buffer is on"""
+        if self.write_buffer.enabled:
+            await self.write_buffer.insert(self.db[collection], document)
+        else:
+            await self.db[collection].insert_one(document)
+
     async def create_indexes(self):
-        # Create geospatial index for location-based queries
-        await self.db.hazard_reports.create_index([("location.latitude", 1), ("location.longitude", 1)])
-        await self.db.hazard_reports.create_index("created_at")
-        await self.db.hazard_reports.create_index("hazard_type")
-        await self.db.hazard_reports.create_index("severity")
-        await self.db.hazard_reports.create_index("status")
-        
-        await self.db.social_media_posts.create_index("created_at")
-        await self.db.social_media_posts.create_index("platform")
-        await self.db.social_media_posts.create_index("hazard_relevance_score")
-        
-        await self.db.users.create_index("username", unique=True)
-        await self.db.users.create_index("email", unique=True)
-        
-        await self.db.alerts.create_index("created_at")
-        await self.db.alerts.create_index("is_active")
+        """Create all indexes with one createIndexes command per collection, issued concurrently"""
+        indexes = {
+            "hazard_reports": [
+                IndexModel("id"),
+                IndexModel([("location.latitude", 1), ("location.longitude", 1)]),
+                IndexModel("created_at"),
+                IndexModel("hazard_type"),
+                IndexModel("severity"),
+                IndexModel("status"),
+                IndexModel("duplicate_of"),
+                IndexModel("media_files.id", sparse=True),
+                IndexModel([("corroboration_count", -1), ("created_at", -1)]),
+                IndexModel([("ai_analysis.degraded", 1), ("created_at", -1)],
+                           partialFilterExpression={"ai_analysis.degraded": True}),
+            ],
+            "social_media_posts": [
+                IndexModel("id"),
+                IndexModel("created_at"),
+                IndexModel("platform"),
+                IndexModel("hazard_relevance_score"),
+                IndexModel([("platform", 1), ("post_id", 1)]),
+                IndexModel("incident_id"),
+                IndexModel([("location.latitude", 1), ("location.longitude", 1)]),
+                IndexModel([("analysis_status", 1), ("lease_expires_at", 1)]),
+                IndexModel("lease_token", sparse=True),
+            ],
+            "incidents": [
+                IndexModel("id", unique=True),
+                IndexModel("last_seen"),
+                IndexModel([("ai_analysis.degraded", 1), ("last_seen", -1)],
+                           partialFilterExpression={"ai_analysis.degraded": True}),
+            ],
+            "users": [
+                IndexModel("username", unique=True),
+                IndexModel("email", unique=True),
+            ],
+            "alerts": [
+                IndexModel("id"),
+                IndexModel("created_at"),
+                IndexModel("source_id"),
+                IndexModel([("is_active", 1), ("expires_at", 1), ("created_at", -1)]),
+            ],
+            "alert_claims": [
+                IndexModel("key", unique=True),
+                IndexModel([("alert_type", 1), ("created_at", 1)]),
+                IndexModel([("alert_type", 1), ("bands", 1)], sparse=True),
+                # Claims only matter within an incident window
+                IndexModel("expires_at", expireAfterSeconds=0),
+            ],
+            "alert_history": [
+                IndexModel("id", unique=True),
+                IndexModel("source_id"),
+            ],
+            "media_files": [
+                IndexModel("id", unique=True),
+                IndexModel([("sha256", 1), ("processing_status", 1)]),
+                IndexModel("processing_status", sparse=True),
+                IndexModel("phash_bands"),
+            ],
+        }
+        # Archived alerts are dropped by Mongo's TTL monitor once this old (0 keeps them)
+        history_ttl_days = float(os.environ.get("ALERT_HISTORY_TTL_DAYS", "90"))
+        if history_ttl_days > 0:
+            indexes["alert_history"].append(
+                IndexModel("archived_at", expireAfterSeconds=int(history_ttl_days * 86400))
+            )
+        await asyncio.gather(*(
+            self.db[collection].create_indexes(models)
+            for collection, models in indexes.items()
+        ))
+
+    async def bulk_upsert(self, collection: str, documents: List[Dict[str, Any]],
+                          key_fields: List[str]) -> int:
+        """Insert documents that don't exist yet, matched on natural key fields.
+
+        Existing documents are left untouched, so this is safe to run on every boot.
+        Returns the number of newly inserted documents.
+        """
+        if not documents:
+            return 0
+        if collection in INGEST_TEXT_FIELDS:
+            self.detect_languages(collection, documents)
+            if collection == "social_media_posts":
+                place_extractor.geotag_documents(documents)
+            reverse_geocoder.fill_documents(documents)
+        operations = [
+            UpdateOne(
+                {field: document[field] for field in key_fields},
+                {"$setOnInsert": document},
+                upsert=True
+            )
+            for document in documents
+        ]
+        result = await self.db[collection].bulk_write(operations, ordered=False)
+        if result.upserted_count:
+            self.bump_version(collection)
+            upserted = [documents[i] for i in result.upserted_ids]
+            search_index.add_many(collection, upserted)
+            for document in upserted:
+                if collection == "hazard_reports":
+                    hotspot_engine.add_report(document)
+                elif collection == "social_media_posts":
+                    hotspot_engine.add_post(document)
+        return result.upserted_count
+
+    @staticmethod
+    def detect_languages(collection: str, documents: List[Dict[str, Any]]):
+        """Set ``language`` on ingested reports/posts that arrive with the "en" default"""
+        fields = INGEST_TEXT_FIELDS[collection]
+        for document in documents:
+            text = " ".join(document.get(field) or "" for field in fields)
+            document["language"] = language_identifier.resolve(text, document.get("language"))
+
+    async def backfill_locations(self, collection: str, batch_size: int = 5000) -> int:
+        """Reverse geocode stored documents whose location lacks a district; returns how many changed"""
+        query = {"location": {"$ne": None}, "location.district": None}
+        updated = 0
+        async for batch in self.iter_documents(collection, ["location"], batch_size=batch_size, query=query):
+            before = [dict(document["location"]) for document in batch]
+            reverse_geocoder.fill_documents(batch)
+            operations = [
+                UpdateOne({"_id": document["_id"]}, {"$set": {
+                    f"location.{field}": document["location"][field]
+                    for field in ("city", "district", "state") if document["location"].get(field) != old.get(field)
+                }})
+                for document, old in zip(batch, before) if document["location"] != old
+            ]
+            if operations:
+                await self.db[collection].bulk_write(operations, ordered=False)
+                updated += len(operations)
+        if updated:
+            self.bump_version(collection)
+        return updated
+
+    async def geotag_posts(self, batch_size: int = 5000) -> int:
+        """Give stored posts without a location the place their text names; returns how many were geotagged"""
+        fields = ["id", "content", "hashtags", "location", "created_at", "ai_analysis"]
+        tagged = 0
+        async for batch in self.iter_documents("social_media_posts", fields, batch_size=batch_size,
+                                               query={"location": None}):
+            if not place_extractor.geotag_documents(batch):
+                continue
+            located = [document for document in batch if document["location"] is not None]
+            reverse_geocoder.fill_documents(located)
+            await self.db.social_media_posts.bulk_write([
+                UpdateOne({"_id": document["_id"]}, {"$set": {
+                    "location": document["location"],
+                    "location_source": document["location_source"],
+                    "location_confidence": document["location_confidence"],
+                }})
+                for document in located
+            ], ordered=False)
+            for document in located:
+                hotspot_engine.add_post(document)
+            tagged += len(located)
+        if tagged:
+            self.bump_version("social_media_posts")
+        return tagged
+
+    async def iter_documents(self, collection: str, fields: List[str], batch_size: int = 5000,
+                             query: Optional[Dict[str, Any]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream a collection (or the part matching ``query``) in _id order, a batch at a time"""
+        projection = {field: 1 for field in fields}
+        last_id = None
+        while True:
+            page = {**(query or {}), "_id": {"$gt": last_id}} if last_id is not None else (query or {})
+            batch = await self.db[collection].find(page, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+            if not batch:
+                return
+            last_id = batch[-1]["_id"]
+            yield batch
 
     # User operations
     async def create_user(self, user: User) -> User:
         await self.db.users.insert_one(user.dict())
+        self.bump_version("users")
         return user
 
     async def get_user_by_username(self, username: str) -> Optional[User]:
@@ -56,10 +256,41 @@ class Database:
             {"id": user_id},
             {"$set": {"last_login": datetime.utcnow()}}
         )
+        self.bump_version("users")
+
+    async def update_user_location(self, user: User, home_location: Optional[Location],
+                                   current_location: Optional[Location]) -> User:
+        """Set a user's locations, creating their record from ``user`` if it is not stored yet"""
+        location = {
+            "home_location": home_location.dict() if home_location else None,
+            "current_location": current_location.dict() if current_location else None,
+            "location_updated_at": datetime.utcnow()
+        }
+        profile = {key: value for key, value in user.dict().items() if key not in location}
+        user_data = await self.db.users.find_one_and_update(
+            {"id": user.id},
+            {"$set": location, "$setOnInsert": profile},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.bump_version("users")
+        return User(**user_data)
+
+    async def get_user_locations(self) -> List[User]:
+        cursor = self.db.users.find({"$or": [
+            {"home_location": {"$ne": None}},
+            {"current_location": {"$ne": None}}
+        ]})
+        return [User(**user_data) async for user_data in cursor]
 
     # Hazard report operations
     async def create_hazard_report(self, report: HazardReport) -> HazardReport:
-        await self.db.hazard_reports.insert_one(report.dict())
+        reverse_geocoder.fill(report.location)
+        document = report.dict()
+        await self._insert("hazard_reports", document)
+        self.bump_version("hazard_reports")
+        search_index.add("hazard_reports", document)
+        hotspot_engine.add_report(document)
         return report
 
     async def get_hazard_reports(self, skip: int = 0, limit: int = 100, 
@@ -71,6 +302,10 @@ class Database:
             reports.append(HazardReport(**report_data))
         return reports
 
+    async def get_hazard_reports_by_ids(self, report_ids: List[str]) -> List[HazardReport]:
+        cursor = self.db.hazard_reports.find({"id": {"$in": report_ids}})
+        return [HazardReport(**report_data) async for report_data in cursor]
+
     async def get_hazard_report_by_id(self, report_id: str) -> Optional[HazardReport]:
         report_data = await self.db.hazard_reports.find_one({"id": report_id})
         return HazardReport(**report_data) if report_data else None
@@ -80,8 +315,52 @@ class Database:
             {"id": report_id},
             {"$set": {**update_data, "updated_at": datetime.utcnow()}}
         )
+        self.bump_version("hazard_reports")
         return result.modified_count > 0
 
+    async def record_corroboration(self, canonical_id: str, corroboration_count: int) -> bool:
+        """Raise a canonical report's corroboration count; $max keeps racing writers from lowering it"""
+        result = await self.db.hazard_reports.update_one(
+            {"id": canonical_id},
+            {"$max": {"corroboration_count": corroboration_count}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        self.bump_version("hazard_reports")
+        return result.modified_count > 0
+
+    async def update_report_duplicates(self, canonical_id: str, update_data: Dict[str, Any]) -> int:
+        result = await self.db.hazard_reports.update_many(
+            {"duplicate_of": canonical_id},
+            {"$set": {**update_data, "updated_at": datetime.utcnow()}}
+        )
+        self.bump_version("hazard_reports")
+        return result.modified_count
+
+    async def get_report_duplicates(self, canonical_ids: List[str], limit: int = 1000) -> List[HazardReport]:
+        cursor = self.db.hazard_reports.find({"duplicate_of": {"$in": canonical_ids}}).sort("created_at", 1).limit(limit)
+        return [HazardReport(**report_data) async for report_data in cursor]
+
+    async def get_duplicate_samples(self, canonical_ids: List[str], per_report: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """The first few duplicates of each canonical report, trimmed server-side"""
+        pipeline = [
+            {"$match": {"duplicate_of": {"$in": canonical_ids}}},
+            {"$sort": {"created_at": 1}},
+            {"$group": {"_id": "$duplicate_of", "duplicates": {"$push": {
+                "id": "$id", "reporter_id": "$reporter_id", "severity": "$severity",
+                "title": "$title", "created_at": "$created_at"
+            }}}},
+            {"$project": {"duplicates": {"$slice": ["$duplicates", per_report]}}},
+        ]
+        cursor = self.db.hazard_reports.aggregate(pipeline)
+        return {group["_id"]: group["duplicates"] async for group in cursor}
+
+    async def get_merged_reports(self, skip: int = 0, limit: int = 50,
+                                 filters: Dict[str, Any] = None) -> List[HazardReport]:
+        """Canonical reports only, most corroborated first"""
+        query = {**(filters or {}), "duplicate_of": None}
+        cursor = (self.db.hazard_reports.find(query)
+                  .sort([("corroboration_count", -1), ("created_at", -1)]).skip(skip).limit(limit))
+        return [HazardReport(**report_data) async for report_data in cursor]
+
     async def get_reports_near_location(self, latitude: float, longitude: float, 
                                       radius_km: float = 10) -> List[HazardReport]:
         # Simple distance calculation for demo (in production use proper geospatial queries)
@@ -95,59 +374,444 @@ class Database:
                 nearby_reports.append(report)
         return nearby_reports
 
+    # Media operations
+    async def create_media_file(self, media: MediaFile) -> MediaFile:
+        await self.db.media_files.insert_one(media.dict())
+        self.bump_version("media_files")
+        return media
+
+    async def get_media_file(self, media_id: str) -> Optional[MediaFile]:
+        media_data = await self.db.media_files.find_one({"id": media_id})
+        return MediaFile(**media_data) if media_data else None
+
+    async def get_media_files(self, media_ids: List[str]) -> List[MediaFile]:
+        cursor = self.db.media_files.find({"id": {"$in": media_ids}})
+        return [MediaFile(**media_data) async for media_data in cursor]
+
+    async def find_processed_media(self, sha256: str) -> Optional[MediaFile]:
+        """Any media with this content whose processing finished; identical bytes give identical results"""
+        media_data = await self.db.media_files.find_one({"sha256": sha256, "processing_status": "processed"})
+        return MediaFile(**media_data) if media_data else None
+
+    async def get_media_files_by_status(self, status: str) -> List[MediaFile]:
+        cursor = self.db.media_files.find({"processing_status": status}).sort("uploaded_at", 1)
+        return [MediaFile(**media_data) async for media_data in cursor]
+
+    async def get_reports_with_media(self, media_id: str) -> List[HazardReport]:
+        cursor = self.db.hazard_reports.find({"media_files.id": media_id})
+        return [HazardReport(**report_data) async for report_data in cursor]
+
+    async def attach_media_to_report(self, report_id: str, media_files: List[MediaFile]) -> bool:
+        result = await self.db.hazard_reports.update_one(
+            {"id": report_id},
+            {
+                "$push": {"media_files": {"$each": [media.dict() for media in media_files]}},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+        self.bump_version("hazard_reports")
+        return result.modified_count > 0
+
+    async def update_media_processing(self, media_id: str, update_data: Dict[str, Any]):
+        """Write processing results to the media document and every report embedding it"""
+        await self.db.media_files.update_one({"id": media_id}, {"$set": update_data})
+        # A media id appears at most once per report, so the positional operator is enough
+        await self.db.hazard_reports.update_many(
+            {"media_files.id": media_id},
+            {"$set": {f"media_files.$.{key}": value for key, value in update_data.items()}}
+        )
+        self.bump_version("media_files", "hazard_reports")
+
+    async def find_media_by_hash_bands(self, bands: List[str], exclude_id: Optional[str] = None,
+                                       limit: int = 50) -> List[MediaFile]:
+        query: Dict[str, Any] = {"phash_bands": {"$in": bands}}
+        if exclude_id:
+            query["id"] = {"$ne": exclude_id}
+        cursor = self.db.media_files.find(query).sort("uploaded_at", 1).limit(limit)
+        return [MediaFile(**media_data) async for media_data in cursor]
+
     # Social media operations
     async def create_social_media_post(self, post: SocialMediaPost) -> SocialMediaPost:
-        await self.db.social_media_posts.insert_one(post.dict())
+        post.language = language_identifier.resolve(post.content, post.language)
+        place_extractor.geotag_post(post)
+        reverse_geocoder.fill(post.location)
+        document = post.dict()
+        await self.db.social_media_posts.insert_one(document)
+        self.bump_version("social_media_posts")
+        search_index.add("social_media_posts", document)
+        hotspot_engine.add_post(document)
         return post
 
     async def get_social_media_posts(self, skip: int = 0, limit: int = 100,
-                                   platform: Optional[str] = None) -> List[SocialMediaPost]:
+                                   platform: Optional[str] = None,
+                                   incident_id: Optional[str] = None) -> List[SocialMediaPost]:
         query = {"platform": platform} if platform else {}
+        if incident_id:
+            query["incident_id"] = incident_id
         cursor = self.db.social_media_posts.find(query).skip(skip).limit(limit).sort("created_at", -1)
         posts = []
         async for post_data in cursor:
             posts.append(SocialMediaPost(**post_data))
         return posts
 
+    async def get_located_social_media_posts(self, limit: int = 500,
+                                             filters: Dict[str, Any] = None) -> List[SocialMediaPost]:
+        query = {**(filters or {}), "location": {"$ne": None}}
+        cursor = self.db.social_media_posts.find(query).sort("created_at", -1).limit(limit)
+        return [SocialMediaPost(**post_data) async for post_data in cursor]
+
+    async def get_posts_near_location(self, latitude: float, longitude: float, radius_km: float = 10,
+                                      limit: int = 100) -> List[SocialMediaPost]:
+        """Located posts (reported or geotagged) within ``radius_km``, newest first"""
+        lat_span = radius_km / 111.0
+        lon_span = radius_km / (111.0 * max(math.cos(math.radians(latitude)), 0.01))
+        query = {
+            "location.latitude": {"$gte": latitude - lat_span, "$lte": latitude + lat_span},
+            "location.longitude": {"$gte": longitude - lon_span, "$lte": longitude + lon_span},
+        }
+        cursor = self.db.social_media_posts.find(query).sort("created_at", -1)
+        posts = []
+        async for post_data in cursor:
+            location = post_data["location"]
+            if haversine_km(latitude, longitude, location["latitude"], location["longitude"]) <= radius_km:
+                posts.append(SocialMediaPost(**post_data))
+                if len(posts) >= limit:
+                    break
+        return posts
+
+    async def get_social_media_posts_by_ids(self, post_ids: List[str]) -> List[SocialMediaPost]:
+        cursor = self.db.social_media_posts.find({"id": {"$in": post_ids}})
+        return [SocialMediaPost(**post_data) async for post_data in cursor]
+
     async def update_social_media_post_analysis(self, post_id: str, analysis: Dict[str, Any]) -> bool:
         result = await self.db.social_media_posts.update_one(
             {"id": post_id},
             {"$set": {"ai_analysis": analysis}}
         )
+        self.bump_version("social_media_posts")
         return result.modified_count > 0
 
+    # Analysis leases. A post waiting for analysis (no ai_analysis) is claimed by
+    # one worker at a time: analysis_status "leased", lease_owner and
+    # lease_expires_at, plus the lease_token of the claim that took it. The owner
+    # renews the lease while it works, the analysis clears it ("done"), and a
+    # lease that expires (its worker died) is claimed again, up to max_attempts
+    # times before the post is marked "failed".
+
+    def _claimable(self, now: datetime, max_attempts: int) -> Dict[str, Any]:
+        return {
+            "ai_analysis": None,
+            "analysis_status": {"$ne": "failed"},
+            "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}],
+            "$nor": [{"lease_count": {"$gte": max_attempts}}],
+        }
+
+    async def claim_posts_for_analysis(self, owner: str, limit: int = 100, lease_seconds: float = 120.0,
+                                       max_attempts: int = 3) -> List[SocialMediaPost]:
+        """Lease up to ``limit`` of the oldest unanalyzed posts to ``owner``, in posting order.
+
+        A page of candidate ids is read in posting order and leased with one
+        conditional update_many carrying a fresh lease token, so no two workers
+        (in this process or any other) ever hold the same post; the posts won
+        are read back by owner and token. Candidates lost to another worker
+        are replaced from the next page.
+        """
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        # Never the same post twice in one claim, even if its new lease is already over
+        claimable = {**self._claimable(now, max_attempts), "lease_token": {"$ne": token}}
+        lease = {"$set": {"analysis_status": "leased", "lease_owner": owner, "lease_token": token,
+                          "lease_expires_at": now + timedelta(seconds=lease_seconds)},
+                 "$inc": {"lease_count": 1}}
+        leased = 0
+        while leased < limit:
+            cursor = self.db.social_media_posts.find(claimable, {"id": 1, "_id": 0}).sort("created_at", 1)
+            candidates = [doc["id"] async for doc in cursor.limit(limit - leased)]
+            if not candidates:
+                break
+            result = await self.db.social_media_posts.update_many({**claimable, "id": {"$in": candidates}}, lease)
+            leased += result.modified_count
+        if not leased:
+            return []
+        cursor = self.db.social_media_posts.find({"lease_token": token, "lease_owner": owner}).sort("created_at", 1)
+        return [SocialMediaPost(**post_data) async for post_data in cursor]
+
+    async def renew_post_leases(self, owner: str, post_ids: List[str], lease_seconds: float = 120.0) -> int:
+        """Heartbeat: extend the leases ``owner`` still holds; returns how many it still holds"""
+        result = await self.db.social_media_posts.update_many(
+            {"id": {"$in": post_ids}, "lease_owner": owner, "ai_analysis": None},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count
+
+    async def release_post_leases(self, owner: str, post_ids: List[str], max_attempts: int = 3) -> int:
+        """Hand back posts ``owner`` leased but did not analyze; those out of attempts are marked failed"""
+        held = {"id": {"$in": post_ids}, "lease_owner": owner, "ai_analysis": None}
+        unset = {"lease_owner": "", "lease_token": "", "lease_expires_at": ""}
+        await self.db.social_media_posts.update_many(
+            {**held, "lease_count": {"$gte": max_attempts}}, {"$set": {"analysis_status": "failed"}, "$unset": unset})
+        result = await self.db.social_media_posts.update_many(
+            held, {"$set": {"analysis_status": "pending"}, "$unset": unset})
+        return result.modified_count
+
+    async def reclaim_expired_leases(self, max_attempts: int = 3) -> Tuple[int, int]:
+        """Free the leases of workers that stopped renewing them. Returns (requeued, failed)"""
+        expired = {"analysis_status": "leased", "lease_expires_at": {"$lt": datetime.utcnow()}, "ai_analysis": None}
+        unset = {"lease_owner": "", "lease_token": "", "lease_expires_at": ""}
+        failed = await self.db.social_media_posts.update_many(
+            {**expired, "lease_count": {"$gte": max_attempts}}, {"$set": {"analysis_status": "failed"}, "$unset": unset})
+        requeued = await self.db.social_media_posts.update_many(
+            expired, {"$set": {"analysis_status": "pending"}, "$unset": unset})
+        return requeued.modified_count, failed.modified_count
+
+    async def get_analysis_lease_stats(self) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        posts = self.db.social_media_posts
+        owners = await posts.aggregate([
+            {"$match": {"analysis_status": "leased", "lease_expires_at": {"$gte": now}}},
+            {"$group": {"_id": "$lease_owner", "posts": {"$sum": 1}}},
+        ]).to_list(None)
+        return {
+            "waiting": await posts.count_documents({"ai_analysis": None, "analysis_status": {"$nin": ["leased", "failed"]}}),
+            "leased": sum(owner["posts"] for owner in owners),
+            "expired": await posts.count_documents(
+                {"analysis_status": "leased", "lease_expires_at": {"$lt": now}, "ai_analysis": None}),
+            "failed": await posts.count_documents({"analysis_status": "failed", "ai_analysis": None}),
+            "owners": {owner["_id"]: owner["posts"] for owner in owners},
+        }
+
+    async def apply_incident_analysis(self, post_ids: Optional[List[str]], incident_id: str, analysis: Dict[str, Any],
+                                      hazard_relevance_score: float, sentiment_score: float,
+                                      lease_owner: Optional[str] = None) -> int:
+        """Give the given posts (or, with None, every post already in the incident) its analysis with one update.
+
+        With ``lease_owner`` only posts still leased to it are written, and their leases are cleared.
+        """
+        query = {"id": {"$in": post_ids}} if post_ids is not None else {"incident_id": incident_id}
+        update: Dict[str, Any] = {"$set": {
+            "incident_id": incident_id,
+            "ai_analysis": analysis,
+            "hazard_relevance_score": hazard_relevance_score,
+            "sentiment_score": sentiment_score,
+        }}
+        if lease_owner is not None:
+            query["lease_owner"] = lease_owner
+            update["$set"]["analysis_status"] = "done"
+            update["$unset"] = {"lease_owner": "", "lease_token": "", "lease_expires_at": ""}
+        result = await self.db.social_media_posts.update_many(query, update)
+        self.bump_version("social_media_posts")
+        return result.modified_count
+
+    async def get_degraded_reports(self, limit: int = 100) -> List[HazardReport]:
+        """Newest canonical reports analyzed by the surge-mode fallback instead of the LLM"""
+        cursor = self.db.hazard_reports.find(
+            {"ai_analysis.degraded": True, "duplicate_of": None}
+        ).sort("created_at", -1).limit(limit)
+        return [HazardReport(**report_data) async for report_data in cursor]
+
+    # Incident operations
+    async def get_degraded_incidents(self, limit: int = 100) -> List[Incident]:
+        """Most recently active incidents analyzed by the surge-mode fallback instead of the LLM"""
+        cursor = self.db.incidents.find({"ai_analysis.degraded": True}).sort("last_seen", -1).limit(limit)
+        return [Incident(**incident_data) async for incident_data in cursor]
+
+    async def save_incident(self, incident: Incident) -> Incident:
+        await self.db.incidents.replace_one({"id": incident.id}, incident.dict(), upsert=True)
+        self.bump_version("incidents")
+        return incident
+
+    async def claim_incident_alert(self, incident_id: str, alert_id: str) -> bool:
+        """Atomically record that ``alert_id`` is this incident's alert; False if it already has one.
+
+        Keeps workers in different processes from alerting on the same incident twice.
+        """
+        try:
+            await self.db.incidents.update_one(
+                {"id": incident_id, "alert_id": None}, {"$set": {"alert_id": alert_id}}, upsert=True)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def claim_alert_area(self, alert_id: str, alert_type: str, location: Location, radius_km: float,
+                               window: timedelta, now: Optional[datetime] = None) -> Optional[str]:
+        """Claim the area around ``location`` for ``alert_id``; None if won, else the id of the alert holding it.
+
+        Replicas cluster posts independently, so the same event can become a
+        different incident in each. An alert of the same type claimed within
+        ``radius_km`` and ``window`` holds the area. The claim itself is keyed
+        on a grid cell of ``radius_km`` and a ``window``-long time bucket with a
+        unique index, so replicas racing for the same spot cannot both win.
+        """
+        now = now or datetime.utcnow()
+        degrees = radius_km / 111.32
+        lon_degrees = degrees / max(math.cos(math.radians(location.latitude)), 0.01)
+        cursor = self.db.alert_claims.find({
+            "alert_type": alert_type,
+            "created_at": {"$gt": now - window},
+            "latitude": {"$gte": location.latitude - degrees, "$lte": location.latitude + degrees},
+            "longitude": {"$gte": location.longitude - lon_degrees, "$lte": location.longitude + lon_degrees},
+        }).sort("created_at", 1)
+        async for claim in cursor:
+            if haversine_km(location.latitude, location.longitude, claim["latitude"], claim["longitude"]) <= radius_km:
+                return claim["alert_id"]
+        key = ":".join(str(part) for part in (
+            alert_type, math.floor(location.latitude / degrees), math.floor(location.longitude / degrees),
+            math.floor(now.timestamp() / window.total_seconds())))
+        try:
+            await self.db.alert_claims.insert_one({
+                "key": key, "alert_id": alert_id, "alert_type": alert_type, "latitude": location.latitude,
+                "longitude": location.longitude, "created_at": now, "expires_at": now + window,
+            })
+        except DuplicateKeyError:
+            claim = await self.db.alert_claims.find_one({"key": key})
+            return claim["alert_id"] if claim else None
+        return None
+
+    async def claim_alert_text(self, alert_id: str, alert_type: str, bands: List[str], signature: List[str],
+                               min_similarity: float, window: timedelta,
+                               now: Optional[datetime] = None) -> Optional[str]:
+        """Like claim_alert_area, for alerts with no location: the text's MinHash ``bands`` and
+        ``signature`` (see MinHasher.fingerprint) stand in for the area.
+
+        An alert of the same type claimed within ``window`` for a text sharing a
+        band and at least ``min_similarity`` similar holds it. The claim is keyed
+        on the text's lowest band key, which identical texts always share.
+        """
+        now = now or datetime.utcnow()
+        cursor = self.db.alert_claims.find({
+            "alert_type": alert_type,
+            "created_at": {"$gt": now - window},
+            "bands": {"$in": bands},
+        }).sort("created_at", 1)
+        async for claim in cursor:
+            matches = sum(a == b for a, b in zip(signature, claim["signature"]))
+            if matches / max(len(signature), 1) >= min_similarity:
+                return claim["alert_id"]
+        key = ":".join(str(part) for part in (
+            alert_type, "text", min(bands), math.floor(now.timestamp() / window.total_seconds())))
+        try:
+            await self.db.alert_claims.insert_one({
+                "key": key, "alert_id": alert_id, "alert_type": alert_type, "bands": bands,
+                "signature": signature, "created_at": now, "expires_at": now + window,
+            })
+        except DuplicateKeyError:
+            claim = await self.db.alert_claims.find_one({"key": key})
+            return claim["alert_id"] if claim else None
+        return None
+
+    async def get_incident_by_id(self, incident_id: str) -> Optional[Incident]:
+        incident_data = await self.db.incidents.find_one({"id": incident_id})
+        return Incident(**incident_data) if incident_data else None
+
+    async def get_incidents(self, skip: int = 0, limit: int = 50,
+                            since: Optional[datetime] = None) -> List[Incident]:
+        """Incidents by most recent activity; limit=0 returns all of them"""
+        query = {"last_seen": {"$gte": since}} if since else {}
+        cursor = self.db.incidents.find(query).sort("last_seen", -1).skip(skip).limit(limit)
+        return [Incident(**incident_data) async for incident_data in cursor]
+
     # Alert operations
     async def create_alert(self, alert: Alert) -> Alert:
-        await self.db.alerts.insert_one(alert.dict())
+        await self._insert("alerts", alert.dict())
+        self.bump_version("alerts")
         return alert
 
-    async def get_active_alerts(self, user_role: Optional[UserRole] = None) -> List[Alert]:
-        query = {"is_active": True}
+    @staticmethod
+    def active_alerts_query(now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Active and not yet expired; matches the (is_active, expires_at, created_at) index"""
+        return {
+            "is_active": True,
+            "$or": [{"expires_at": None}, {"expires_at": {"$gt": now or datetime.utcnow()}}]
+        }
+
+    async def get_active_alerts(self, user_role: Optional[UserRole] = None,
+                                near: Optional[Tuple[float, float]] = None,
+                                untargeted_only: bool = False, limit: int = 100) -> List[Alert]:
+        """Active alerts for a role; ``near`` keeps area alerts covering that point only,
+        ``untargeted_only`` drops area alerts altogether"""
+        query = self.active_alerts_query()
         if user_role:
-            query["$or"] = [
+            query["$and"] = [{"$or": [
                 {"target_roles": {"$in": [user_role]}},
                 {"target_roles": {"$size": 0}}
-            ]
+            ]}]
+        
+        if untargeted_only:
+            query["affected_area_radius"] = None
         
         cursor = self.db.alerts.find(query).sort("created_at", -1)
+        if near is None:
+            cursor = cursor.limit(limit)
         alerts = []
         async for alert_data in cursor:
-            alerts.append(Alert(**alert_data))
+            alert = Alert(**alert_data)
+            if near is None or alert_covers(alert, *near):
+                alerts.append(alert)
+                if len(alerts) >= limit:
+                    break
         return alerts
 
+    async def get_alert_by_id(self, alert_id: str) -> Optional[Alert]:
+        """Live alerts first, then those the sweeper archived"""
+        alert_data = await self.db.alerts.find_one({"id": alert_id})
+        if alert_data is None:
+            alert_data = await self.db.alert_history.find_one({"id": alert_id})
+        return Alert(**alert_data) if alert_data else None
+
+    async def get_alerted_source_ids(self, source_ids: List[str]) -> Set[str]:
+        """Which of these reports or incidents already have an alert, live or archived"""
+        alerted = set()
+        for collection in ("alerts", "alert_history"):
+            alerted.update(await self.db[collection].distinct("source_id", {"source_id": {"$in": source_ids}}))
+        return alerted
+
     async def deactivate_alert(self, alert_id: str) -> bool:
+        """False if no such alert exists; archived alerts are inactive already"""
         result = await self.db.alerts.update_one(
             {"id": alert_id},
             {"$set": {"is_active": False}}
         )
-        return result.modified_count > 0
+        self.bump_version("alerts")
+        if result.matched_count:
+            return True
+        return await self.db.alert_history.count_documents({"id": alert_id}, limit=1) > 0
+
+    async def expire_alerts(self, now: Optional[datetime] = None) -> int:
+        """Deactivate every active alert past its expires_at in one update"""
+        result = await self.db.alerts.update_many(
+            {"is_active": True, "expires_at": {"$lte": now or datetime.utcnow()}},
+            {"$set": {"is_active": False}}
+        )
+        if result.modified_count:
+            self.bump_version("alerts")
+        return result.modified_count
+
+    async def archive_inactive_alerts(self, batch_size: int = 1000, now: Optional[datetime] = None) -> int:
+        """Move one batch of inactive, expired alerts into alert_history; returns how many moved.
+
+        Alerts deactivated by hand before their expiry stay where they are until
+        then. The copy is an idempotent upsert, so a batch interrupted before the
+        delete is simply moved again on the next call.
+        """
+        query = {"is_active": False, "expires_at": {"$lte": now or datetime.utcnow()}}
+        documents = await self.db.alerts.find(query).limit(batch_size).to_list(batch_size)
+        if not documents:
+            return 0
+        archived_at = datetime.utcnow()
+        await self.db.alert_history.bulk_write([
+            ReplaceOne({"id": document["id"]}, {**document, "archived_at": archived_at}, upsert=True)
+            for document in documents
+        ], ordered=False)
+        await self.db.alerts.delete_many({"_id": {"$in": [document["_id"] for document in documents]}})
+        self.bump_version("alerts")
+        return len(documents)
 
     # Dashboard stats
     async def get_dashboard_stats(self) -> DashboardStats:
         total_reports = await self.db.hazard_reports.count_documents({})
         verified_reports = await self.db.hazard_reports.count_documents({"status": "verified"})
         pending_reports = await self.db.hazard_reports.count_documents({"status": "pending"})
-        active_alerts = await self.db.alerts.count_documents({"is_active": True})
+        active_alerts = await self.db.alerts.count_documents(self.active_alerts_query())
         social_media_posts = await self.db.social_media_posts.count_documents({})
         users_count = await self.db.users.count_documents({})
         
@@ -166,6 +830,16 @@ class Database:
         most_common = await self.db.hazard_reports.aggregate(pipeline).to_list(1)
         most_common_hazard = most_common[0]["_id"] if most_common else None
         
+        # Reports per state
+        pipeline = [
+            {"$match": {"location.state": {"$ne": None}}},
+            {"$group": {"_id": "$location.state", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ]
+        regional_distribution = {
+            row["_id"]: row["count"] async for row in self.db.hazard_reports.aggregate(pipeline)
+        }
+        
         return DashboardStats(
             total_reports=total_reports,
             verified_reports=verified_reports,
@@ -175,8 +849,13 @@ class Database:
             users_count=users_count,
             reports_last_24h=reports_last_24h,
             most_common_hazard=most_common_hazard,
-            regional_distribution={}
+            regional_distribution=regional_distribution
         )
 
+# Time and trace every database operation
+instrument_async_methods(Database, MONGO_OPERATION_DURATION)
+trace_async_methods(Database, "mongo")
+
 # Global database instance
 database = Database()
+QUEUE_DEPTH.labels("mongo_write_buffer").set_function(database.write_buffer.__len__)
@@ -0,0 +1,350 @@
+import os
+import re
+import json
+import time
+import logging
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from models import Location, SocialMediaPost
+from geo import haversine_km
+from reverse_geocoder import DISTRICTS_PATH
+
+logger = logging.getLogger(__name__)
+
+PLACES_PATH = Path(__file__).parent / "data" / "coastal_places.json"
+
+# Starting confidence by kind of place: a named beach or port pins a post down
+# more tightly than a town, and a town more than a whole district
+KIND_CONFIDENCE = {
+    "beach": 0.85, "port": 0.85, "island": 0.85, "lagoon": 0.8, "landmark": 0.8, "town": 0.75, "district": 0.6,
+}
+AMBIGUOUS_PENALTY = 0.35  # names that are also common words or personal names
+CUE_BONUS = 0.1  # "in Puri", "चेन्नई में"
+HASHTAG_BONUS = 0.1
+REPEAT_BONUS = 0.05  # per extra mention, at most two
+AGREEMENT_BONUS = 0.05  # other places mentioned nearby
+CONFLICT_PENALTY = 0.4  # a comparably strong place mentioned far away
+AGREEMENT_KM = 60.0
+
+# Words that mark a neighbouring name as a location: English prepositions
+# before it, Hindi/Marathi postpositions after it
+CUES_BEFORE = {"in", "at", "near", "off", "from", "around", "to", "towards", "along", "of"}
+CUES_AFTER = {"में", "पर", "के", "से", "मध्ये", "येथे", "जवळ", "किनारे"}
+
+_HASHTAG_RE = re.compile(r"#(\w+)")
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Za-z])(?=\d)|(?<=\d)(?=[A-Za-z])")
+_DROP_RE = re.compile(r"['’.]")
+_SPACE_RE = re.compile(r"[\s\-_/,]+")
+
+
+def normalize(text: str) -> str:
+    """Case-fold and collapse punctuation so "St. Mary's" and "st marys" compare equal"""
+    return _SPACE_RE.sub(" ", _DROP_RE.sub("", unicodedata.normalize("NFC", text).casefold())).strip()
+
+
+def _is_word(char: str) -> bool:
+    # Indic vowel signs and viramas are marks, not letters, but still part of the word
+    return char.isalnum() or unicodedata.category(char)[0] == "M"
+
+
+@dataclass
+class Place:
+    name: str
+    kind: str
+    latitude: float
+    longitude: float
+    state: str
+    district: Optional[str] = None
+    ambiguous: bool = False
+
+    def location(self) -> Location:
+        return Location(
+            latitude=self.latitude,
+            longitude=self.longitude,
+            address=None if self.kind in ("town", "district") else self.name,
+            city=self.name if self.kind == "town" else None,
+            district=self.district,
+            state=self.state,
+        )
+
+
+@dataclass
+class PlaceMention:
+    place: Place
+    start: int
+    end: int
+    hashtag: bool = False
+    cue: bool = False
+    ambiguous: bool = False  # an ambiguous place named in Latin script ("puri", not "ପୁରୀ")
+
+
+@dataclass
+class Geotag:
+    place: Place
+    confidence: float
+    mentions: List[str] = field(default_factory=list)  # every place named, best first
+
+    @property
+    def location(self) -> Location:
+        return self.place.location()
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: every occurrence of every pattern in one pass over the text.
+
+    A trie of the patterns with failure links (the longest proper suffix of a
+    node that is also a trie path), so the scan never backs up however many
+    patterns there are.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for pattern in patterns:
+            self._insert(pattern)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _insert(self, pattern: str):
+        node = 0
+        for char in pattern:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = child
+        self._out[node].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _link(self):
+        # Breadth first, so a node's failure target is always linked before it;
+        # the root's children fail back to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # Patterns that end at the suffix also end here
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(end offset, pattern index) for every match"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                for pattern in out[node]:
+                    yield position + 1, pattern
+
+
+def load_places(places_path: Path = PLACES_PATH, districts_path: Path = DISTRICTS_PATH
+                ) -> Tuple[List[Place], Dict[str, List[int]]]:
+    """Places and the normalized names (including aliases) that refer to each"""
+    with open(districts_path, encoding="utf-8") as f:
+        districts = json.load(f)["districts"]
+    with open(places_path, encoding="utf-8") as f:
+        gazetteer = json.load(f)
+    ambiguous = {normalize(name) for name in gazetteer.get("ambiguous", [])}
+    aliases = gazetteer.get("aliases", {})
+
+    places: List[Place] = []
+    names: Dict[str, List[int]] = {}
+
+    def add(place: Place, *spellings: str):
+        index = len(places)
+        places.append(place)
+        for spelling in dict.fromkeys(normalize(spelling) for spelling in spellings):
+            if not spelling:
+                continue
+            names.setdefault(spelling, []).append(index)
+            if " " in spelling:
+                names.setdefault(spelling.replace(" ", ""), []).append(index)  # #SagarIsland, #marinabeach
+
+    # A town listed under two districts (Mumbai) is one place, at its first entry
+    town_names = set()
+    for district in districts:
+        for name, latitude, longitude in district.get("towns", []):
+            key = normalize(name)
+            if key in town_names:
+                continue
+            town_names.add(key)
+            add(Place(name, "town", latitude, longitude, district["state"], district["district"], key in ambiguous),
+                name, *aliases.get(name, []))
+    for district in districts:
+        key = normalize(district["district"])
+        if key in town_names:
+            continue
+        latitude, longitude = district["hq"]
+        add(Place(district["district"], "district", latitude, longitude, district["state"], district["district"],
+                  key in ambiguous), district["district"])
+    for entry in gazetteer.get("places", []):
+        add(Place(entry["name"], entry["kind"], entry["latitude"], entry["longitude"], entry["state"],
+                  entry.get("district"), normalize(entry["name"]) in ambiguous),
+            entry["name"], *entry.get("aliases", []))
+    return places, names
+
+
+class PlaceExtractor:
+    """Finds coastal place names in post text and hashtags and turns them into a Location.
+
+    Names come from a bundled gazetteer (towns, districts, beaches, ports,
+    islands, with alternate spellings and native-script names) compiled into
+    one Aho-Corasick automaton. Latin-script names must stand as whole words;
+    native-script names may carry attached case endings, as in "சென்னையில்".
+    Hashtags are split on CamelCase and may continue past a long name
+    ("#chennairains"). Each post's best place gets a confidence from its kind,
+    whether the name is ambiguous, cue words, hashtags, and whether the other
+    places named agree with it.
+    """
+
+    def __init__(self, places_path: Path = PLACES_PATH, districts_path: Path = DISTRICTS_PATH,
+                 min_confidence: float = 0.5):
+        self.places_path = places_path
+        self.districts_path = districts_path
+        self.min_confidence = min_confidence
+        self.places: List[Place] = []
+        self._loaded = False
+
+    @classmethod
+    def from_env(cls) -> "PlaceExtractor":
+        return cls(
+            places_path=Path(os.environ.get("GAZETTEER_PLACES", str(PLACES_PATH))),
+            min_confidence=float(os.environ.get("GAZETTEER_MIN_CONFIDENCE", "0.5")),
+        )
+
+    def load(self):
+        """Compile the automaton; runs once, on first use unless called at startup"""
+        if self._loaded:
+            return
+        started = time.perf_counter()
+        self.places, names = load_places(self.places_path, self.districts_path)
+        self.matcher = AhoCorasick(names)
+        self._pattern_places = [names[pattern] for pattern in self.matcher.patterns]
+        self._pattern_latin = [pattern.isascii() for pattern in self.matcher.patterns]
+        self._loaded = True
+        logger.info(f"Gazetteer compiled {len(self.matcher)} names for {len(self.places)} places "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self.places)
+
+    # --- Extraction ---
+
+    def _scan(self, text: str, hashtag: bool) -> List[PlaceMention]:
+        found = []
+        for end, pattern_index in self.matcher.finditer(text):
+            start = end - len(self.matcher.patterns[pattern_index])
+            if start > 0 and _is_word(text[start - 1]):
+                continue
+            if end < len(text) and _is_word(text[end]):
+                # Latin names must end at a word boundary; native-script names may
+                # take suffixes, and hashtags run words together
+                if self._pattern_latin[pattern_index] and not (hashtag and end - start >= 5):
+                    continue
+            cue = False
+            if not hashtag:
+                before = text[max(0, start - 12):start].split()
+                after = text[end:end + 12].split()
+                cue = bool(before and before[-1] in CUES_BEFORE) or bool(after and after[0] in CUES_AFTER)
+            latin = self._pattern_latin[pattern_index]
+            for place_index in self._pattern_places[pattern_index]:
+                place = self.places[place_index]
+                found.append(PlaceMention(place, start, end, hashtag, cue, place.ambiguous and latin))
+        # Keep the longest of overlapping names: "Fort Kochi Beach", not also "Kochi"
+        found.sort(key=lambda mention: (mention.start, -(mention.end - mention.start)))
+        kept, reach = [], -1
+        for mention in found:
+            if mention.start >= reach or (kept and (mention.start, mention.end) == (kept[-1].start, kept[-1].end)):
+                kept.append(mention)
+                reach = max(reach, mention.end)
+        return kept
+
+    def extract(self, text: str, hashtags: Sequence[str] = ()) -> List[PlaceMention]:
+        """Every place named in the text and hashtags (those in the text and any given separately)"""
+        self.load()
+        tags = dict.fromkeys([*_HASHTAG_RE.findall(text), *(tag.lstrip("#") for tag in hashtags)])
+        mentions = self._scan(normalize(_HASHTAG_RE.sub(" ", text)), hashtag=False)
+        for tag in tags:
+            mentions.extend(self._scan(normalize(_CAMEL_RE.sub(" ", tag)), hashtag=True))
+        return mentions
+
+    def geotag(self, text: str, hashtags: Sequence[str] = (), cue: bool = False) -> Optional[Geotag]:
+        """The most likely place the text is about, with a confidence; ``cue`` marks text known to be a place"""
+        mentions = self.extract(text, hashtags)
+        if not mentions:
+            return None
+        evidence: Dict[int, List[PlaceMention]] = {}
+        for mention in mentions:
+            evidence.setdefault(id(mention.place), []).append(mention)
+
+        scored = []
+        for items in evidence.values():
+            place = items[0].place
+            score = (KIND_CONFIDENCE.get(place.kind, 0.6)
+                     - AMBIGUOUS_PENALTY * all(item.ambiguous for item in items)
+                     + CUE_BONUS * (cue or any(item.cue for item in items))
+                     + HASHTAG_BONUS * any(item.hashtag for item in items)
+                     + REPEAT_BONUS * min(len(items) - 1, 2))
+            scored.append((score, KIND_CONFIDENCE.get(place.kind, 0.6), place))
+        scored.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+        best_score, _, best = scored[0]
+
+        confidence = best_score
+        others = [(score, haversine_km(best.latitude, best.longitude, place.latitude, place.longitude))
+                  for score, _, place in scored[1:]]
+        if any(distance <= AGREEMENT_KM for _, distance in others):
+            confidence += AGREEMENT_BONUS
+        if any(distance > AGREEMENT_KM and score >= best_score - 0.2 for score, distance in others):
+            confidence -= CONFLICT_PENALTY
+        return Geotag(best, round(min(max(confidence, 0.0), 0.99), 3), [place.name for _, _, place in scored])
+
+    # --- Geotagging posts ---
+
+    def geotag_post(self, post: SocialMediaPost) -> bool:
+        """Give a post without a location the one its text names, if confident enough"""
+        if post.location is not None:
+            return False
+        tag = self.geotag(post.content, post.hashtags)
+        if tag is None or tag.confidence < self.min_confidence:
+            return False
+        post.location = tag.location
+        post.location_source = "gazetteer"
+        post.location_confidence = tag.confidence
+        return True
+
+    def geotag_documents(self, documents: Sequence[Dict[str, Any]]) -> int:
+        """Same for raw post documents, in place; returns how many were geotagged"""
+        tagged = 0
+        for document in documents:
+            if document.get("location") is not None:
+                continue
+            tag = self.geotag(document.get("content") or "", document.get("hashtags") or ())
+            if tag is None or tag.confidence < self.min_confidence:
+                continue
+            document["location"] = tag.location.dict()
+            document["location_source"] = "gazetteer"
+            document["location_confidence"] = tag.confidence
+            tagged += 1
+        return tagged
+
+
+# Global place extractor instance
+place_extractor = PlaceExtractor.from_env()
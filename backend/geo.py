@@ -0,0 +1,75 @@
+import math
+from typing import Dict, Hashable, Iterator, List, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """Uniform lat/lon grid of points for radius queries.
+
+    A query only visits the cells overlapping the circle's bounding box, so its
+    cost follows the number of points nearby rather than the total.
+    """
+
+    def __init__(self, cell_degrees: float = 0.25):
+        self.cell_degrees = cell_degrees
+        self.points: Dict[Hashable, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def insert(self, key: Hashable, latitude: float, longitude: float):
+        self.remove(key)
+        self.points[key] = (latitude, longitude)
+        self._cells.setdefault(self._cell(latitude, longitude), set()).add(key)
+
+    def remove(self, key: Hashable):
+        point = self.points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        members = self._cells[cell]
+        members.discard(key)
+        if not members:
+            del self._cells[cell]
+
+    def _candidate_cells(self, latitude: float, longitude: float, radius_km: float) -> Iterator[Tuple[int, int]]:
+        # Bounding box of a spherical cap; if it contains a pole, every longitude is in range
+        angular = radius_km / EARTH_RADIUS_KM
+        lat_span = math.degrees(angular)
+        min_lat, max_lat = latitude - lat_span, latitude + lat_span
+        if min_lat <= -90.0 or max_lat >= 90.0:
+            min_lat, max_lat, lon_span = max(min_lat, -90.0), min(max_lat, 90.0), 180.0
+        else:
+            lon_span = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(latitude)))))
+
+        (row_lo, col_lo), (row_hi, col_hi) = (self._cell(min_lat, longitude - lon_span),
+                                              self._cell(max_lat, longitude + lon_span))
+        cols = range(col_lo, col_hi + 1)
+        total_cols = round(360.0 / self.cell_degrees)
+        if len(cols) >= total_cols:
+            cols = range(total_cols)
+        for row in range(row_lo, row_hi + 1):
+            for col in cols:
+                # Wrap across the antimeridian
+                yield row, (col + total_cols // 2) % total_cols - total_cols // 2
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Hashable]:
+        """Keys of points within ``radius_km`` of the given point"""
+        found = []
+        for cell in set(self._candidate_cells(latitude, longitude, radius_km)):
+            for key in self._cells.get(cell, ()):
+                point_lat, point_lon = self.points[key]
+                if haversine_km(latitude, longitude, point_lat, point_lon) <= radius_km:
+                    found.append(key)
+        return found
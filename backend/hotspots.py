@@ -0,0 +1,478 @@
+import os
+import math
+import time
+import asyncio
+import logging
+from array import array
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from models import HazardType, HazardSeverity
+from geo import haversine_km
+
+logger = logging.getLogger(__name__)
+
+HAZARD_TYPES = [hazard.value for hazard in HazardType]
+SEVERITY_WEIGHTS = {HazardSeverity.LOW.value: 1.0, HazardSeverity.MEDIUM.value: 2.0,
+                    HazardSeverity.HIGH.value: 4.0, HazardSeverity.CRITICAL.value: 8.0}
+# Posts are noisier than reports; one counts as this fraction of a report
+POST_WEIGHT = 0.3
+
+# Cells are packed into one int64: (row + OFFSET) << 16 | (col + OFFSET)
+CELL_OFFSET = 1 << 15
+ROW_STRIDE = 1 << 16
+NEIGHBOURS = [dr * ROW_STRIDE + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+
+def _epoch(value: Any) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return time.time()
+
+
+@dataclass
+class Hotspot:
+    latitude: float
+    longitude: float
+    radius_km: float
+    score: float
+    points: int
+    cells: int
+    peak_density: float
+    dominant_hazard: str
+    hazard_weights: Dict[str, float]
+    recent_share: float  # share of the score from the last ``recent_hours``
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def reduce_rows(keys: np.ndarray, hazards: np.ndarray, weights: np.ndarray,
+                counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sum weights and counts of rows sharing a (cell, hazard)"""
+    combined = keys * len(HAZARD_TYPES) + hazards
+    unique, inverse = np.unique(combined, return_inverse=True)
+    return (unique // len(HAZARD_TYPES), (unique % len(HAZARD_TYPES)).astype(np.int8),
+            np.bincount(inverse, weights=weights, minlength=len(unique)),
+            np.bincount(inverse, weights=counts, minlength=len(unique)).astype(np.int64))
+
+
+class Slab:
+    """Points from one time slice, aggregated per (cell, hazard).
+
+    Weights are stored forward-decayed relative to the slab start, so the whole
+    slab is brought to "now" with a single multiplication at query time.
+    """
+
+    def __init__(self, start: float):
+        self.start = start
+        self.keys = np.empty(0, dtype=np.int64)
+        self.hazards = np.empty(0, dtype=np.int8)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self._pending_keys = array("q")
+        self._pending_hazards = array("b")
+        self._pending_weights = array("d")
+
+    def append(self, keys: np.ndarray, hazards: np.ndarray, weights: np.ndarray):
+        self._pending_keys.frombytes(keys.astype(np.int64).tobytes())
+        self._pending_hazards.frombytes(hazards.astype(np.int8).tobytes())
+        self._pending_weights.frombytes(weights.astype(np.float64).tobytes())
+
+    def aggregate(self):
+        if not self._pending_keys:
+            return
+        self.keys, self.hazards, self.weights, self.counts = reduce_rows(
+            np.concatenate([self.keys, np.frombuffer(self._pending_keys, dtype=np.int64)]),
+            np.concatenate([self.hazards, np.frombuffer(self._pending_hazards, dtype=np.int8)]),
+            np.concatenate([self.weights, np.frombuffer(self._pending_weights, dtype=np.float64)]),
+            np.concatenate([self.counts, np.ones(len(self._pending_keys), dtype=np.int64)]),
+        )
+        self._pending_keys = array("q")
+        self._pending_hazards = array("b")
+        self._pending_weights = array("d")
+
+
+class HotspotEngine:
+    """Spatio-temporal hotspots over report and post coordinates.
+
+    Points are binned into a lat/lon grid and weighted by severity and an
+    exponential recency decay. Densities are smoothed over each cell's 3x3
+    neighbourhood (a box-kernel density estimate). Core cells are those above
+    both ``min_density`` and ``contrast`` times the median occupied density, so
+    the threshold follows background activity; 8-connected core cells form one
+    hotspot - DBSCAN on the grid.
+
+    Per-cell sums for the whole window are kept forward-decayed against a
+    reference time, so new points are merged in and the sums brought to "now"
+    with one multiplication: a refresh costs O(cells), not O(points). The window
+    slides in ``slab_minutes`` steps; the sums are rebuilt from the remaining
+    slabs when one falls out.
+    """
+
+    def __init__(self, cell_degrees: float = 0.05, window_hours: float = 72.0, half_life_hours: float = 12.0,
+                 slab_minutes: float = 60.0, min_density: float = 6.0, contrast: float = 4.0,
+                 recent_hours: float = 6.0):
+        self.cell_degrees = cell_degrees
+        self.window_seconds = window_hours * 3600
+        self.half_life_seconds = half_life_hours * 3600
+        self.slab_seconds = slab_minutes * 60
+        self.min_density = min_density
+        self.contrast = contrast
+        self.recent_seconds = recent_hours * 3600
+        self.slabs: Dict[int, Slab] = {}
+        # Window totals per (cell, hazard), weights relative to ``_reference``
+        self._reference: Optional[float] = None
+        self._rows = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int8),
+                      np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64))
+        self._pending = Slab(0.0)
+        self.latest: List[Hotspot] = []
+        self._task: Optional[asyncio.Task] = None
+        # Ids counted while ``load`` runs, so a document both loaded and written meanwhile counts once
+        self._loading: Optional[Set[str]] = None
+
+    @classmethod
+    def from_env(cls) -> "HotspotEngine":
+        return cls(
+            cell_degrees=float(os.environ.get("HOTSPOT_CELL_DEGREES", "0.05")),
+            window_hours=float(os.environ.get("HOTSPOT_WINDOW_HOURS", "72")),
+            half_life_hours=float(os.environ.get("HOTSPOT_HALF_LIFE_HOURS", "12")),
+            min_density=float(os.environ.get("HOTSPOT_MIN_DENSITY", "6")),
+            contrast=float(os.environ.get("HOTSPOT_CONTRAST", "4")),
+        )
+
+    # --- Ingestion ---
+
+    def cell_keys(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        rows = np.floor(latitudes / self.cell_degrees).astype(np.int64) + CELL_OFFSET
+        cols = np.floor(longitudes / self.cell_degrees).astype(np.int64) + CELL_OFFSET
+        return rows * ROW_STRIDE + cols
+
+    def cell_centres(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows = keys // ROW_STRIDE - CELL_OFFSET
+        cols = keys % ROW_STRIDE - CELL_OFFSET
+        return (rows + 0.5) * self.cell_degrees, (cols + 0.5) * self.cell_degrees
+
+    def add_points(self, latitudes, longitudes, timestamps, weights, hazards, now: Optional[float] = None):
+        """Bulk-add points: coordinates, epoch seconds, base weights and HAZARD_TYPES indices"""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        hazards = np.asarray(hazards, dtype=np.int8)
+
+        horizon = (now or time.time()) - self.window_seconds
+        keep = timestamps >= horizon
+        if not keep.all():
+            latitudes, longitudes, timestamps = latitudes[keep], longitudes[keep], timestamps[keep]
+            weights, hazards = weights[keep], hazards[keep]
+        if not len(timestamps):
+            return
+
+        keys = self.cell_keys(latitudes, longitudes)
+        if self._reference is None:
+            self._reference = float(timestamps.min())
+        elif (timestamps.max() - self._reference) / self.half_life_seconds > 256:
+            # Keep forward-decay factors far from float overflow
+            self._rebuild(reference=float(timestamps.min()))
+        self._pending.append(keys, hazards,
+                             weights * np.exp2((timestamps - self._reference) / self.half_life_seconds))
+
+        slab_ids = np.floor(timestamps / self.slab_seconds).astype(np.int64)
+        for slab_id in np.unique(slab_ids).tolist():
+            members = slab_ids == slab_id
+            slab = self.slabs.get(slab_id)
+            if slab is None:
+                slab = self.slabs[slab_id] = Slab(slab_id * self.slab_seconds)
+            decayed = weights[members] * np.exp2((timestamps[members] - slab.start) / self.half_life_seconds)
+            slab.append(keys[members], hazards[members], decayed)
+
+    def add(self, latitude: float, longitude: float, created_at: Any, weight: float, hazard: Optional[str]):
+        hazard_index = HAZARD_TYPES.index(hazard) if hazard in HAZARD_TYPES else HAZARD_TYPES.index("other")
+        self.add_points([latitude], [longitude], [_epoch(created_at)], [weight], [hazard_index])
+
+    def _first_sighting(self, document: Dict[str, Any]) -> bool:
+        if self._loading is None or document.get("id") is None:
+            return True
+        if document["id"] in self._loading:
+            return False
+        self._loading.add(document["id"])
+        return True
+
+    def add_report(self, document: Dict[str, Any]):
+        location = document.get("location")
+        if not location or not self._first_sighting(document):
+            return
+        severity = getattr(document.get("severity"), "value", document.get("severity"))
+        hazard = getattr(document.get("hazard_type"), "value", document.get("hazard_type"))
+        self.add(location["latitude"], location["longitude"], document.get("created_at"),
+                 SEVERITY_WEIGHTS.get(severity, 1.0), hazard)
+
+    def add_post(self, document: Dict[str, Any]):
+        location = document.get("location")
+        if not location or not self._first_sighting(document):
+            return
+        analysis = document.get("ai_analysis") or {}
+        hazards = analysis.get("hazard_types") or []
+        severity = analysis.get("severity_prediction")
+        self.add(location["latitude"], location["longitude"], document.get("created_at"),
+                 POST_WEIGHT * SEVERITY_WEIGHTS.get(getattr(severity, "value", severity), 1.0),
+                 getattr(hazards[0], "value", hazards[0]) if hazards else None)
+
+    def evict(self, now: Optional[float] = None):
+        """Drop slabs that ended before the window start, rebuilding the window totals"""
+        horizon = (now or time.time()) - self.window_seconds
+        expired = [slab_id for slab_id, slab in self.slabs.items() if slab.start + self.slab_seconds <= horizon]
+        for slab_id in expired:
+            del self.slabs[slab_id]
+        if expired:
+            self._rebuild()
+
+    def _rebuild(self, reference: Optional[float] = None):
+        parts = []
+        for slab in self.slabs.values():
+            slab.aggregate()
+            parts.append(slab)
+        if reference is None:
+            reference = min((slab.start for slab in parts), default=None)
+        self._reference = reference
+        self._pending = Slab(0.0)
+        if not parts:
+            self._rows = tuple(np.empty(0, dtype=column.dtype) for column in self._rows)
+            return
+        self._rows = reduce_rows(
+            np.concatenate([slab.keys for slab in parts]),
+            np.concatenate([slab.hazards for slab in parts]),
+            np.concatenate([slab.weights * math.exp2((slab.start - reference) / self.half_life_seconds)
+                            for slab in parts]),
+            np.concatenate([slab.counts for slab in parts]),
+        )
+
+    def _window_rows(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        pending = self._pending
+        pending.aggregate()
+        if len(pending.keys):
+            keys, hazards, weights, counts = self._rows
+            self._rows = reduce_rows(np.concatenate([keys, pending.keys]),
+                                     np.concatenate([hazards, pending.hazards]),
+                                     np.concatenate([weights, pending.weights]),
+                                     np.concatenate([counts, pending.counts]))
+            self._pending = Slab(0.0)
+        return self._rows
+
+    # --- Detection ---
+
+    def _neighbour_index(self, keys: np.ndarray, offset: int) -> Tuple[np.ndarray, np.ndarray]:
+        """For each key, the position of key+offset in ``keys`` (sorted) and whether it exists"""
+        targets = keys + offset
+        positions = np.searchsorted(keys, targets)
+        positions = np.minimum(positions, len(keys) - 1)
+        return positions, keys[positions] == targets
+
+    def _recent_weight(self, cells: np.ndarray, now: float, hazard_type: Optional[str]) -> np.ndarray:
+        """Decayed weight per cell from slabs overlapping the last ``recent_seconds``"""
+        recent = np.zeros(len(cells))
+        for slab in self.slabs.values():
+            if slab.start + self.slab_seconds <= now - self.recent_seconds:
+                continue
+            slab.aggregate()
+            keys, weights = slab.keys, slab.weights
+            if hazard_type is not None:
+                selected = slab.hazards == HAZARD_TYPES.index(hazard_type)
+                keys, weights = keys[selected], weights[selected]
+            positions = np.searchsorted(cells, keys)
+            np.add.at(recent, positions, weights * math.exp2((slab.start - now) / self.half_life_seconds))
+        return recent
+
+    def hotspots(self, now: Optional[float] = None, limit: int = 20,
+                 hazard_type: Optional[str] = None) -> List[Hotspot]:
+        """Ranked hotspots, optionally counting only one hazard type"""
+        results = self._detect(now or time.time(), limit, hazard_type)
+        if hazard_type is None:
+            self.latest = results
+        return results
+
+    def _detect(self, now: float, limit: int, hazard_type: Optional[str]) -> List[Hotspot]:
+        self.evict(now)
+        keys, hazards, weights, counts = self._window_rows()
+        if not len(keys):
+            return []
+        weights = weights * math.exp2((self._reference - now) / self.half_life_seconds)
+        hazards = hazards.astype(np.int64)
+        if hazard_type is not None:
+            selected = hazards == HAZARD_TYPES.index(hazard_type)
+            keys, hazards, weights, counts = keys[selected], hazards[selected], weights[selected], counts[selected]
+            if not len(keys):
+                return []
+
+        # Per-cell totals
+        cells, inverse = np.unique(keys, return_inverse=True)
+        cell_weight = np.bincount(inverse, weights=weights, minlength=len(cells))
+        cell_count = np.bincount(inverse, weights=counts, minlength=len(cells))
+        cell_recent = self._recent_weight(cells, now, hazard_type)
+        hazard_weight = np.bincount(inverse * len(HAZARD_TYPES) + hazards, weights=weights,
+                                    minlength=len(cells) * len(HAZARD_TYPES)).reshape(len(cells), len(HAZARD_TYPES))
+
+        # Box-kernel density: each cell plus its 8 neighbours
+        neighbours = [self._neighbour_index(cells, offset) for offset in NEIGHBOURS]
+        density = cell_weight.copy()
+        for positions, exists in neighbours:
+            density += np.where(exists, cell_weight[positions], 0.0)
+
+        core = density >= max(self.min_density, self.contrast * float(np.median(density)))
+        if not core.any():
+            return []
+
+        # Connected components of core cells by min-label propagation
+        labels = np.where(core, np.arange(len(cells)), -1)
+        while True:
+            updated = labels.copy()
+            for positions, exists in neighbours:
+                linked = exists & core & core[positions]
+                updated[linked] = np.minimum(updated[linked], labels[positions[linked]])
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+
+        members = np.flatnonzero(core)
+        cluster_ids, cluster_of = np.unique(labels[members], return_inverse=True)
+        n_clusters = len(cluster_ids)
+        member_weight = cell_weight[members]
+        latitudes, longitudes = self.cell_centres(cells[members])
+
+        score = np.bincount(cluster_of, weights=member_weight, minlength=n_clusters)
+        points = np.bincount(cluster_of, weights=cell_count[members], minlength=n_clusters)
+        recent_weight = np.bincount(cluster_of, weights=cell_recent[members], minlength=n_clusters)
+        n_cells = np.bincount(cluster_of, minlength=n_clusters)
+        centre_lat = np.bincount(cluster_of, weights=member_weight * latitudes, minlength=n_clusters) / score
+        centre_lon = np.bincount(cluster_of, weights=member_weight * longitudes, minlength=n_clusters) / score
+        peak = np.zeros(n_clusters)
+        np.maximum.at(peak, cluster_of, density[members])
+        cluster_hazards = np.zeros((n_clusters, len(HAZARD_TYPES)))
+        np.add.at(cluster_hazards, cluster_of, hazard_weight[members])
+
+        # Radius: farthest member cell centre from the centroid, plus half a cell diagonal
+        lat_km = (latitudes - centre_lat[cluster_of]) * 111.32
+        lon_km = (longitudes - centre_lon[cluster_of]) * 111.32 * np.cos(np.radians(latitudes))
+        extent = np.zeros(n_clusters)
+        np.maximum.at(extent, cluster_of, np.hypot(lat_km, lon_km))
+        half_diagonal = self.cell_degrees * 111.32 * math.sqrt(2) / 2
+
+        order = np.argsort(-score)[:limit]
+        results = []
+        for i in order.tolist():
+            hazard_row = cluster_hazards[i]
+            results.append(Hotspot(
+                latitude=round(float(centre_lat[i]), 5),
+                longitude=round(float(centre_lon[i]), 5),
+                radius_km=round(float(extent[i] + half_diagonal), 2),
+                score=round(float(score[i]), 3),
+                points=int(points[i]),
+                cells=int(n_cells[i]),
+                peak_density=round(float(peak[i]), 3),
+                dominant_hazard=HAZARD_TYPES[int(np.argmax(hazard_row))],
+                hazard_weights={HAZARD_TYPES[h]: round(float(hazard_row[h]), 3)
+                                for h in np.flatnonzero(hazard_row > 0).tolist()},
+                recent_share=round(float(recent_weight[i] / score[i]), 3),
+            ))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {"slabs": len(self.slabs), "window_rows": len(self._rows[0]) + len(self._pending._pending_keys),
+                "hotspots": len(self.latest)}
+
+    # --- Background refresh and alerting ---
+
+    async def load(self, db):
+        """Ingest reports and posts inside the current window from Mongo.
+
+        Write paths keep adding documents meanwhile; until the load finishes,
+        each id is counted by whichever of the two sees it first.
+        """
+        since = datetime.utcnow() - timedelta(seconds=self.window_seconds)
+        loaded = 0
+        self._loading = set()
+        try:
+            for collection, fields, add in (
+                ("hazard_reports", ["id", "location", "severity", "hazard_type", "created_at"], self.add_report),
+                ("social_media_posts", ["id", "location", "ai_analysis", "created_at"], self.add_post),
+            ):
+                async for batch in db.iter_documents(collection, fields, query={"created_at": {"$gte": since}}):
+                    for document in batch:
+                        add(document)
+                    loaded += len(batch)
+        finally:
+            self._loading = None
+        logger.info(f"Hotspot engine loaded {loaded} documents from the last {self.window_seconds / 3600:.0f}h")
+
+    async def start(self, db, on_hotspots: Optional[Callable[[List[Hotspot]], Awaitable[None]]] = None,
+                    interval: Optional[float] = None):
+        if self._task is not None:
+            return
+        interval = interval if interval is not None else float(os.environ.get("HOTSPOT_REFRESH_SECONDS", "60"))
+        self._task = asyncio.create_task(self._run(db, on_hotspots, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, db, on_hotspots, interval: float):
+        try:
+            await self.load(db)
+        except Exception as e:
+            logger.error(f"Hotspot load failed: {e}")
+        while interval > 0:
+            try:
+                hotspots = self.hotspots()
+                if on_hotspots is not None:
+                    await on_hotspots(hotspots)
+            except Exception as e:
+                logger.error(f"Hotspot refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+
+class HotspotAlerter:
+    """Decides which hotspots deserve an alert, at most once per area per cooldown.
+
+    The cooldown here is per process, a fast path only: callers claim the area
+    in the database for ``cooldown`` before alerting, which holds across
+    replicas and restarts.
+    """
+
+    def __init__(self, min_score: float = 40.0, cooldown_hours: float = 6.0):
+        self.min_score = min_score
+        self.cooldown_seconds = cooldown_hours * 3600
+        self.cooldown = timedelta(hours=cooldown_hours)
+        self._alerted: List[Tuple[float, float, float, float]] = []  # lat, lon, radius, when
+
+    @classmethod
+    def from_env(cls) -> "HotspotAlerter":
+        return cls(
+            min_score=float(os.environ.get("HOTSPOT_ALERT_SCORE", "40")),
+            cooldown_hours=float(os.environ.get("HOTSPOT_ALERT_COOLDOWN_HOURS", "6")),
+        )
+
+    def select(self, hotspots: List[Hotspot], now: Optional[float] = None) -> List[Hotspot]:
+        now = now or time.time()
+        self._alerted = [entry for entry in self._alerted if now - entry[3] < self.cooldown_seconds]
+        selected = []
+        for hotspot in hotspots:
+            if hotspot.score < self.min_score:
+                continue
+            if any(haversine_km(hotspot.latitude, hotspot.longitude, lat, lon) <= max(radius, hotspot.radius_km)
+                   for lat, lon, radius, _ in self._alerted):
+                continue
+            self._alerted.append((hotspot.latitude, hotspot.longitude, hotspot.radius_km, now))
+            selected.append(hotspot)
+        return selected
+
+
+# Global hotspot engine instance
+hotspot_engine = HotspotEngine.from_env()
@@ -0,0 +1,268 @@
+import os
+import hashlib
+import functools
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from models import Incident, Location, SocialMediaPost
+from geo import haversine_km
+from search_index import tokenize
+from metrics import INCIDENT_POSTS
+
+logger = logging.getLogger(__name__)
+
+_U64 = np.uint64
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer; uint64 arithmetic wraps, which is what we want here"""
+    values = (values ^ (values >> _U64(30))) * _U64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> _U64(27))) * _U64(0x94D049BB133111EB)
+    return values ^ (values >> _U64(31))
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    """MinHash signatures over a post's token set, banded for LSH candidate lookup.
+
+    With the defaults (64 hashes in 32 bands of 2 rows) two posts with a Jaccard
+    similarity of 0.4 share a band 99.6% of the time, and at 0.2 still 73%;
+    candidates are then checked against the full signature estimate.
+    """
+
+    def __init__(self, permutations: int = 64, bands: int = 32, seed: int = 1):
+        if permutations % bands:
+            raise ValueError("permutations must be a multiple of bands")
+        self.permutations = permutations
+        self.bands = bands
+        self.rows = permutations // bands
+        self.seeds = np.random.default_rng(seed).integers(
+            0, np.iinfo(np.uint64).max, permutations, dtype=np.uint64, endpoint=True)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        tokens = set(tokenize(text))
+        if not tokens:
+            return None
+        hashes = np.fromiter((_token_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+        return _mix(hashes[:, None] ^ self.seeds[None, :]).min(axis=0)
+
+    def band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        raw, width = signature.tobytes(), self.rows * signature.itemsize
+        return [(band, raw[band * width:(band + 1) * width]) for band in range(self.bands)]
+
+    def fingerprint(self, text: str) -> Optional[Tuple[List[str], List[str]]]:
+        """Band keys and signature of ``text`` as strings, for matching it outside this process"""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        return ([f"{band}:{key.hex()}" for band, key in self.band_keys(signature)],
+                [format(value, "x") for value in signature.tolist()])
+
+    def similarities(self, signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Estimated Jaccard similarity between a signature and each row of ``others``"""
+        return np.count_nonzero(others == signature, axis=1) / self.permutations
+
+
+class IncidentClusterer:
+    """Online clustering of social media posts into incidents.
+
+    A post joins an open incident when it was posted within ``window_hours`` of
+    the incident's time span, is within ``radius_km`` of the incident's centroid,
+    and its text is similar enough to one of the members' (MinHash estimate).
+    Posts or incidents without a location are matched on text alone, with the
+    stricter ``unlocated_similarity``. Otherwise the post opens a new incident
+    and becomes its representative. Incidents idle for a whole window (by post
+    time) are closed and no longer take new members.
+    """
+
+    def __init__(self, window_hours: float = 6.0, radius_km: float = 25.0, similarity: float = 0.25,
+                 unlocated_similarity: float = 0.5, max_signatures: int = 16,
+                 hasher: Optional[MinHasher] = None):
+        self.window = timedelta(hours=window_hours)
+        self.radius_km = radius_km
+        self.min_similarity = similarity
+        self.min_unlocated_similarity = unlocated_similarity
+        self.max_signatures = max_signatures
+        self.hasher = hasher or MinHasher()
+        self.incidents: Dict[str, Incident] = {}
+        self.clock: Optional[datetime] = None  # newest post time seen
+        self._signatures: Dict[str, np.ndarray] = {}  # incident id -> (members, permutations)
+        self._band_keys: Dict[str, List[Tuple[int, bytes]]] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._centroids: Dict[str, Tuple[float, float, int]] = {}  # latitude sum, longitude sum, count
+        self._post_incidents: Dict[str, str] = {}  # post id -> incident id, for open incidents
+        self._members: Dict[str, List[str]] = {}
+        self._expired_at: Optional[datetime] = None
+
+    @classmethod
+    def from_env(cls) -> "IncidentClusterer":
+        return cls(
+            window_hours=float(os.environ.get("INCIDENT_WINDOW_HOURS", "6")),
+            radius_km=float(os.environ.get("INCIDENT_RADIUS_KM", "25")),
+            similarity=float(os.environ.get("INCIDENT_SIMILARITY", "0.25")),
+            unlocated_similarity=float(os.environ.get("INCIDENT_UNLOCATED_SIMILARITY", "0.5")),
+        )
+
+    def __len__(self) -> int:
+        return len(self.incidents)
+
+    # --- Assignment ---
+
+    def assign(self, post: SocialMediaPost) -> Tuple[Incident, bool]:
+        """Put a post into its incident; returns (incident, whether it was opened by this post)"""
+        # Posts whose analysis failed come back on the next run; don't count them twice
+        known = self._post_incidents.get(post.id)
+        if known is not None:
+            post.incident_id = known
+            return self.incidents[known], False
+
+        if self.clock is None or post.created_at > self.clock:
+            self.clock = post.created_at
+            # Matching checks the time span itself, so closing incidents is only
+            # housekeeping and runs every tenth of a window rather than per post
+            if self._expired_at is None or self.clock - self._expired_at >= self.window / 10:
+                self.expire(self.clock - self.window)
+                self._expired_at = self.clock
+
+        signature = self.hasher.signature(post.content)
+        incident = self._best_match(post, signature) if signature is not None else None
+        created = incident is None
+        if created:
+            incident = Incident(
+                representative_post_id=post.id,
+                representative_text=post.content,
+                language=post.language,
+                first_seen=post.created_at,
+                last_seen=post.created_at,
+            )
+            self.incidents[incident.id] = incident
+
+        incident.first_seen = min(incident.first_seen, post.created_at)
+        incident.last_seen = max(incident.last_seen, post.created_at)
+        incident.member_count += 1
+        incident.platforms[post.platform] = incident.platforms.get(post.platform, 0) + 1
+        incident.updated_at = datetime.utcnow()
+        if post.location is not None:
+            self._add_location(incident, post.location)
+        if signature is not None:
+            self._add_signature(incident.id, signature)
+        post.incident_id = incident.id
+        self._post_incidents[post.id] = incident.id
+        self._members.setdefault(incident.id, []).append(post.id)
+        INCIDENT_POSTS.labels("opened" if created else "joined").inc()
+        return incident, created
+
+    def assign_many(self, posts: List[SocialMediaPost]) -> List[Tuple[Incident, List[SocialMediaPost]]]:
+        """Assign posts in time order; returns each touched incident with its new members.
+
+        Incidents are returned as objects because later posts in the batch may
+        already have closed them.
+        """
+        groups: Dict[str, Tuple[Incident, List[SocialMediaPost]]] = {}
+        for post in sorted(posts, key=lambda post: post.created_at):
+            incident, _ = self.assign(post)
+            groups.setdefault(incident.id, (incident, []))[1].append(post)
+        return list(groups.values())
+
+    def _best_match(self, post: SocialMediaPost, signature: np.ndarray) -> Optional[Incident]:
+        buckets = self._buckets
+        candidates: Set[str] = set().union(*(buckets.get(key, ()) for key in self.hasher.band_keys(signature)))
+
+        # Time and distance gates first, then score every surviving member signature at once
+        eligible: List[Incident] = []
+        thresholds: List[float] = []
+        for incident_id in candidates:
+            incident = self.incidents[incident_id]
+            if not (incident.first_seen - self.window <= post.created_at <= incident.last_seen + self.window):
+                continue
+            threshold = self.min_unlocated_similarity
+            if post.location is not None and incident.location is not None:
+                distance = haversine_km(post.location.latitude, post.location.longitude,
+                                        incident.location.latitude, incident.location.longitude)
+                if distance > self.radius_km:
+                    continue
+                threshold = self.min_similarity
+            eligible.append(incident)
+            thresholds.append(threshold)
+        if not eligible:
+            return None
+
+        stacks = [self._signatures[incident.id] for incident in eligible]
+        starts = np.cumsum([0] + [len(stack) for stack in stacks[:-1]])
+        scores = np.maximum.reduceat(self.hasher.similarities(signature, np.concatenate(stacks)), starts)
+        scores[scores < np.array(thresholds)] = -1.0
+        best = int(np.argmax(scores))
+        return eligible[best] if scores[best] >= 0 else None
+
+    def _add_signature(self, incident_id: str, signature: np.ndarray):
+        existing = self._signatures.get(incident_id)
+        if existing is not None and len(existing) >= self.max_signatures:
+            return
+        self._signatures[incident_id] = (signature[None, :] if existing is None
+                                         else np.vstack([existing, signature]))
+        keys = self.hasher.band_keys(signature)
+        self._band_keys.setdefault(incident_id, []).extend(keys)
+        for key in keys:
+            self._buckets.setdefault(key, set()).add(incident_id)
+
+    def _add_location(self, incident: Incident, location: Location):
+        lat_sum, lon_sum, count = self._centroids.get(incident.id, (0.0, 0.0, 0))
+        lat_sum, lon_sum, count = lat_sum + location.latitude, lon_sum + location.longitude, count + 1
+        self._centroids[incident.id] = (lat_sum, lon_sum, count)
+        previous = incident.location
+        incident.location = Location(
+            latitude=lat_sum / count,
+            longitude=lon_sum / count,
+            city=previous.city if previous and previous.city else location.city,
+            district=previous.district if previous and previous.district else location.district,
+            state=previous.state if previous and previous.state else location.state,
+        )
+
+    # --- Window maintenance ---
+
+    def expire(self, before: datetime) -> int:
+        """Close incidents whose last post is older than ``before``"""
+        closed = [incident_id for incident_id, incident in self.incidents.items() if incident.last_seen < before]
+        for incident_id in closed:
+            self._drop(incident_id)
+        return len(closed)
+
+    def _drop(self, incident_id: str):
+        self.incidents.pop(incident_id, None)
+        self._signatures.pop(incident_id, None)
+        self._centroids.pop(incident_id, None)
+        for post_id in self._members.pop(incident_id, []):
+            self._post_incidents.pop(post_id, None)
+        for key in self._band_keys.pop(incident_id, []):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(incident_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    async def load(self, db):
+        """Reopen incidents still inside the window, matching on their representative text"""
+        since = datetime.utcnow() - self.window
+        for incident in await db.get_incidents(limit=0, since=since):
+            if incident.id in self.incidents:
+                continue
+            self.incidents[incident.id] = incident
+            if incident.location is not None:
+                count = max(incident.member_count, 1)
+                self._centroids[incident.id] = (incident.location.latitude * count,
+                                                incident.location.longitude * count, count)
+            signature = self.hasher.signature(incident.representative_text)
+            if signature is not None:
+                self._add_signature(incident.id, signature)
+            if self.clock is None or incident.last_seen > self.clock:
+                self.clock = incident.last_seen
+        logger.info(f"Incident clusterer reopened {len(self.incidents)} incidents")
+
+
+# Global incident clusterer instance
+incident_clusterer = IncidentClusterer.from_env()
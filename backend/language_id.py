@@ -0,0 +1,236 @@
+import re
+import math
+import bisect
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Unicode blocks of the scripts we route on, as (first code point, script)
+SCRIPT_BLOCKS: List[Tuple[int, str]] = [
+    (0x0041, "Latin"), (0x0250, None),
+    (0x0600, "Arabic"), (0x0700, None),
+    (0x0900, "Devanagari"), (0x0980, "Bengali"), (0x0A00, "Gurmukhi"), (0x0A80, "Gujarati"),
+    (0x0B00, "Oriya"), (0x0B80, "Tamil"), (0x0C00, "Telugu"), (0x0C80, "Kannada"),
+    (0x0D00, "Malayalam"), (0x0D80, None),
+]
+_BLOCK_STARTS = [start for start, _ in SCRIPT_BLOCKS]
+
+# The language of each script; for shared scripts, the most common one, used when
+# the n-gram model can't decide
+SCRIPT_LANGUAGES: Dict[str, str] = {
+    "Latin": "en", "Arabic": "ur", "Gurmukhi": "pa", "Gujarati": "gu", "Oriya": "or",
+    "Tamil": "ta", "Telugu": "te", "Kannada": "kn", "Malayalam": "ml", "Bengali": "bn",
+    "Devanagari": "hi",
+}
+
+LANGUAGE_NAMES: Dict[str, str] = {
+    "en": "English", "hi": "Hindi", "mr": "Marathi", "bn": "Bengali", "as": "Assamese",
+    "ta": "Tamil", "te": "Telugu", "kn": "Kannada", "ml": "Malayalam", "gu": "Gujarati",
+    "or": "Odia", "pa": "Punjabi", "ur": "Urdu",
+}
+_LANGUAGE_CODES = {name.lower(): code for code, name in LANGUAGE_NAMES.items()}
+_LANGUAGE_CODES.update({"oriya": "or", "bangla": "bn", "panjabi": "pa"})
+
+# Hashtags, mentions and links are mostly Latin whatever the post's language
+_NOISE_RE = re.compile(r"https?://\S+|www\.\S+|[#@]\w+")
+# Letters, plus the Indic blocks (Devanagari to Sinhala), whose vowel signs \w misses
+_LETTER_RUN_RE = re.compile(r"(?:[^\W\d_]|[\u0900-\u0DFF])+")
+
+# Seed text for languages that share a script; a few hundred words each is
+# plenty to tell them apart on trigrams.
+NGRAM_SEED: Dict[str, Dict[str, str]] = {
+    "Devanagari": {
+        "hi": (
+            "समुद्र में बहुत ऊँची लहरें उठ रही हैं और किनारे पर पानी भर गया है। मछुआरों को समुद्र में न "
+            "जाने की सलाह दी गई है। तेज़ हवा और भारी बारिश के कारण तट के पास रहने वाले लोगों को सुरक्षित "
+            "स्थान पर जाना चाहिए। किनारे पर प्लास्टिक और जाल बह कर आए हैं। पानी गंदा और बदबूदार है, कई मरी "
+            "हुई मछलियाँ दिखाई दे रही हैं। पानी पर तेल फैला है और प्रशासन ने जाँच शुरू कर दी है। सुनामी "
+            "चेतावनी जारी की गई है, तुरंत ऊँचे स्थान पर चले जाएँ। यह बहुत खतरनाक है, कृपया सावधान रहें। हम "
+            "लोग यहाँ फँसे हुए हैं, मदद चाहिए। आज सुबह से समुद्र का पानी गाँव में घुस रहा है। सरकार और "
+            "पुलिस की टीम मौके पर पहुँच गई है। क्या कोई बता सकता है कि सड़क कब खुलेगी? मैंने अपनी आँखों से "
+            "देखा कि तट कट रहा है और घर गिरने का डर है। लोगों से अनुरोध है कि वे अफवाहों पर ध्यान न दें। "
+            "मौसम विभाग ने अगले दो दिनों के लिए भारी वर्षा की चेतावनी दी है। बच्चों और बुजुर्गों को घर से "
+            "बाहर नहीं निकलना चाहिए। नाव वापस नहीं लौटी है, उनके परिवार बहुत परेशान हैं। समुद्र में कुछ "
+            "असामान्य हो रहा है, पानी अचानक पीछे चला गया।"
+        ),
+        "mr": (
+            "समुद्रात खूप उंच लाटा उसळत आहेत आणि किनाऱ्यावर पाणी शिरले आहे. मच्छीमारांना समुद्रात न "
+            "जाण्याचा सल्ला देण्यात आला आहे. जोरदार वारा आणि मुसळधार पावसामुळे किनाऱ्याजवळ राहणाऱ्या "
+            "लोकांनी सुरक्षित ठिकाणी जावे. किनाऱ्यावर प्लास्टिक आणि जाळी वाहून आली आहेत. पाणी घाण आणि "
+            "दुर्गंधीयुक्त झाले आहे, अनेक मेलेले मासे दिसत आहेत. पाण्यावर तेल पसरले आहे आणि प्रशासनाने "
+            "चौकशी सुरू केली आहे. त्सुनामीचा इशारा देण्यात आला आहे, ताबडतोब उंच ठिकाणी जा. हे खूप "
+            "धोकादायक आहे, कृपया काळजी घ्या. आम्ही इथे अडकलो आहोत, मदत हवी आहे. आज सकाळपासून समुद्राचे "
+            "पाणी गावात घुसत आहे. सरकार आणि पोलिसांचे पथक घटनास्थळी पोहोचले आहे. रस्ता कधी उघडणार हे "
+            "कोणी सांगू शकेल का? मी स्वतः पाहिले की किनारा खचत आहे आणि घरे पडण्याची भीती आहे. लोकांना "
+            "विनंती आहे की त्यांनी अफवांवर विश्वास ठेवू नये. हवामान विभागाने पुढील दोन दिवस अतिवृष्टीचा "
+            "इशारा दिला आहे. मुलांनी आणि वृद्धांनी घराबाहेर पडू नये. बोट अजून परत आलेली नाही, त्यांचे "
+            "कुटुंब खूप काळजीत आहे. समुद्रात काहीतरी विचित्र घडत आहे, पाणी अचानक मागे गेले."
+        ),
+    },
+}
+
+# Letters only one of a shared script's languages uses; Assamese is Bengali script plus ৰ and ৱ
+DISTINCT_LETTERS: Dict[str, Dict[str, str]] = {
+    "Bengali": {"as": "ৰৱ"},
+}
+
+# Lower-cased stems that make a text worth sending to the LLM, per language.
+# English is always checked as well because code-mixed posts are the norm.
+HAZARD_KEYWORDS: Dict[str, List[str]] = {
+    "en": ["wave", "tsunami", "flood", "storm", "cyclone", "surge", "tide", "swell", "current", "erosion",
+           "oil", "slick", "spill", "debris", "plastic", "garbage", "pollut", "sewage", "fish", "jellyfish",
+           "whale", "dolphin", "turtle", "sea", "ocean", "beach", "coast", "shore", "rain", "wind", "evacuat",
+           "warning", "water", "drown", "boat", "fishermen"],
+    "hi": ["लहर", "सुनामी", "बाढ़", "तूफान", "तूफ़ान", "चक्रवात", "समुद्र", "सागर", "तट", "किनार", "तेल",
+           "प्लास्टिक", "कचरा", "मछली", "मछलि", "हवा", "बारिश", "वर्षा", "पानी", "कटाव", "कट रहा", "चेतावनी",
+           "ज्वार", "नाव", "मछुआर"],
+    "mr": ["लाट", "त्सुनामी", "सुनामी", "पूर", "वादळ", "समुद्र", "किनार", "तेल", "प्लास्टिक", "कचरा", "मासे",
+           "वारा", "पाऊस", "पावसा", "अतिवृष्टी", "पाणी", "धूप", "खचत", "इशारा", "भरती", "बोट", "मच्छीमार"],
+    "bn": ["ঢেউ", "সুনামি", "বন্যা", "ঝড়", "ঘূর্ণিঝড়", "সমুদ্র", "উপকূল", "তীর", "তেল", "প্লাস্টিক",
+           "আবর্জনা", "মাছ", "হাওয়া", "বৃষ্টি", "জল", "ভাঙ", "সতর্ক", "নৌকা", "জোয়ার"],
+    "as": ["ঢৌ", "সুনামি", "বানপানী", "ধুমুহা", "সাগৰ", "সমুদ্ৰ", "তেল", "মাছ", "বতাহ", "বৰষুণ", "পানী", "সতৰ্ক"],
+    "ta": ["அலை", "சுனாமி", "வெள்ள", "புயல்", "கடல்", "கரை", "எண்ணெய்", "பிளாஸ்டிக்", "குப்பை", "மீன்",
+           "காற்று", "மழை", "நீர்", "அரிப்பு", "எச்சரிக்கை", "படகு"],
+    "te": ["అల", "సునామీ", "వరద", "తుఫాను", "సముద్ర", "తీర", "చమురు", "ప్లాస్టిక్", "చెత్త", "చేప", "గాలి",
+           "వర్ష", "నీరు", "కోత", "హెచ్చరిక", "పడవ"],
+    "kn": ["ಅಲೆ", "ಸುನಾಮಿ", "ಪ್ರವಾಹ", "ಚಂಡಮಾರುತ", "ಸಮುದ್ರ", "ಕಡಲ", "ತೀರ", "ಎಣ್ಣೆ", "ಪ್ಲಾಸ್ಟಿಕ್", "ಕಸ",
+           "ಮೀನು", "ಗಾಳಿ", "ಮಳೆ", "ನೀರು", "ಎಚ್ಚರಿಕೆ", "ದೋಣಿ"],
+    "ml": ["തിര", "സുനാമി", "വെള്ളപ്പൊക്ക", "ചുഴലി", "കടൽ", "കടലി", "തീര", "എണ്ണ", "പ്ലാസ്റ്റിക്", "മാലിന്യ",
+           "മീൻ", "മീനു", "കാറ്റ", "മഴ", "വെള്ളം", "മലിന", "ഇടിയു", "മുന്നറിയിപ്പ്", "വള്ളം"],
+    "gu": ["મોજા", "સુનામી", "પૂર", "વાવાઝોડ", "દરિયા", "સમુદ્ર", "કિનાર", "તેલ", "પ્લાસ્ટિક", "કચરો", "માછલી",
+           "પવન", "વરસાદ", "પાણી", "ચેતવણી", "હોડી"],
+    "or": ["ଢେଉ", "ସୁନାମି", "ବନ୍ୟା", "ବାତ୍ୟା", "ସମୁଦ୍ର", "କୂଳ", "ତେଲ", "ପ୍ଲାଷ୍ଟିକ", "ମାଛ", "ପବନ", "ବର୍ଷା",
+           "ପାଣି", "ସତର୍କ", "ଡଙ୍ଗା"],
+    "pa": ["ਲਹਿਰ", "ਸੁਨਾਮੀ", "ਹੜ੍ਹ", "ਤੂਫ਼ਾਨ", "ਤੂਫਾਨ", "ਸਮੁੰਦਰ", "ਕੰਢੇ", "ਤੇਲ", "ਮੱਛੀ", "ਹਵਾ", "ਮੀਂਹ", "ਪਾਣੀ"],
+    "ur": ["لہر", "سونامی", "سیلاب", "طوفان", "سمندر", "ساحل", "تیل", "مچھلی", "ہوا", "بارش", "پانی", "انتباہ"],
+}
+_KEYWORD_RES = {language: re.compile("|".join(map(re.escape, words))) for language, words in HAZARD_KEYWORDS.items()}
+# Languages sharing a script are easily confused on short texts, so their keywords are checked together
+_KEYWORD_SIBLINGS = {"hi": ("mr",), "mr": ("hi",), "bn": ("as",), "as": ("bn",)}
+
+
+def normalize_language(value: Optional[str]) -> Optional[str]:
+    """Two-letter code for a code, locale or English language name ("hi-IN", "Hindi" -> "hi")"""
+    if not value:
+        return None
+    value = value.strip().lower().replace("_", "-")
+    if value in _LANGUAGE_CODES:
+        return _LANGUAGE_CODES[value]
+    code = value.split("-")[0]
+    return code if code in LANGUAGE_NAMES else None
+
+
+def language_name(code: str) -> str:
+    return LANGUAGE_NAMES.get(code, code)
+
+
+def mentions_hazard(text: str, language: str = "en") -> bool:
+    """Cheap keyword pre-filter: does the text mention anything hazard-like?"""
+    lowered = text.lower()
+    for candidate in (language, *_KEYWORD_SIBLINGS.get(language, ()), "en"):
+        pattern = _KEYWORD_RES.get(candidate)
+        if pattern is not None and pattern.search(lowered):
+            return True
+    return False
+
+
+@dataclass
+class Detection:
+    language: str
+    script: Optional[str]
+    confidence: float
+
+
+class LanguageIdentifier:
+    """Offline language identification for the languages of India's coasts.
+
+    Most Indian languages have a script of their own, so the dominant Unicode
+    script decides. Where languages share a script (Hindi and Marathi in
+    Devanagari) a character-trigram naive Bayes model trained on NGRAM_SEED
+    picks between them. Native-script letters win over Latin ones once they
+    make up ``native_share`` of the text, since place names and English words
+    are routinely mixed into Indian-language posts.
+    """
+
+    def __init__(self, seed: Optional[Dict[str, Dict[str, str]]] = None, order: int = 3,
+                 native_share: float = 0.3):
+        self.order = order
+        self.native_share = native_share
+        self.models: Dict[str, Dict[str, Tuple[Dict[str, float], float]]] = {}
+        for script, texts in (seed or NGRAM_SEED).items():
+            self.models[script] = {language: self._train(text) for language, text in texts.items()}
+
+    def _ngrams(self, text: str) -> List[str]:
+        grams = []
+        for word in _LETTER_RUN_RE.findall(text.lower()):
+            padded = f" {word} "
+            grams.extend(padded[i:i + self.order] for i in range(len(padded) - self.order + 1))
+        return grams
+
+    def _train(self, text: str) -> Tuple[Dict[str, float], float]:
+        counts: Dict[str, int] = {}
+        for gram in self._ngrams(text):
+            counts[gram] = counts.get(gram, 0) + 1
+        # Add-one smoothing; unseen trigrams get the log-probability returned alongside
+        total = sum(counts.values()) + len(counts) + 1
+        return {gram: math.log((count + 1) / total) for gram, count in counts.items()}, math.log(1 / total)
+
+    @staticmethod
+    def _script_counts(text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for run in _LETTER_RUN_RE.findall(_NOISE_RE.sub(" ", text)):
+            for char in run:
+                script = SCRIPT_BLOCKS[bisect.bisect_right(_BLOCK_STARTS, ord(char)) - 1][1] if char >= "A" else None
+                if script is not None:
+                    counts[script] = counts.get(script, 0) + 1
+        return counts
+
+    def detect(self, text: str, default: str = "en") -> Detection:
+        counts = self._script_counts(text)
+        letters = sum(counts.values())
+        if not letters:
+            return Detection(default, None, 0.0)
+
+        native = {script: count for script, count in counts.items() if script != "Latin"}
+        if native and max(native.values()) >= self.native_share * letters:
+            script = max(native, key=native.get)
+            share = native[script] / sum(native.values())
+        else:
+            script = "Latin"
+            share = counts.get("Latin", 0) / letters
+
+        for language, letters_used in DISTINCT_LETTERS.get(script, {}).items():
+            if any(letter in text for letter in letters_used):
+                return Detection(language, script, share)
+        models = self.models.get(script)
+        if not models:
+            return Detection(SCRIPT_LANGUAGES.get(script, default), script, share)
+
+        grams = self._ngrams(text)
+        scores = {language: sum(logprobs.get(gram, unseen) for gram in grams)
+                  for language, (logprobs, unseen) in models.items()}
+        best = max(scores, key=scores.get)
+        # Posterior under a uniform prior, computed stably
+        posterior = 1.0 / sum(math.exp(score - scores[best]) for score in scores.values())
+        return Detection(best, script, share * posterior)
+
+    def detect_many(self, texts: Iterable[str], default: str = "en") -> List[Detection]:
+        return [self.detect(text, default) for text in texts]
+
+    def resolve(self, text: str, declared: Optional[str] = None, min_confidence: float = 0.6) -> str:
+        """The language to store for ingested text.
+
+        An explicit non-English declaration is kept; "en" is also what every
+        client and collector sends by default, so it is overridden when the
+        text is confidently something else, or else written in another script.
+        """
+        declared = normalize_language(declared) or "en"
+        if declared != "en":
+            return declared
+        detection = self.detect(text, declared)
+        if detection.confidence >= min_confidence:
+            return detection.language
+        return SCRIPT_LANGUAGES.get(detection.script, declared)
+
+
+# Global language identifier instance
+language_identifier = LanguageIdentifier()
@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import time
+import asyncio
+from datetime import datetime
+from itertools import cycle
+from typing import Dict, Iterator, List, Optional
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when no recorded response matches a prompt"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Key used for fuzzy replay: case-folded, whitespace-collapsed, ids/timestamps/numbers masked"""
+    text = prompt.casefold()
+    text = re.sub(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "<id>", text)
+    text = re.sub(r"\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}:\d{2}(\.\d+)?", "<ts>", text)
+    text = re.sub(r"\d+(\.\d+)?", "0", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class LLMBackend:
+    """Turns a prompt into the model's raw text response"""
+
+    mode = "base"
+
+    async def complete(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def warm_up(self):
+        pass
+
+
+class LiveBackend(LLMBackend):
+    """The Emergent LLM chat client, imported and built on first use"""
+
+    mode = "live"
+
+    def __init__(self, api_key: Optional[str], system_message: str,
+                 provider: str = "openai", model: str = "gpt-4o-mini"):
+        self.api_key = api_key
+        self.system_message = system_message
+        self.provider = provider
+        self.model = model
+        self.chat_client = None
+        self._message_type = None
+
+    def initialize_client(self):
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+        self._message_type = UserMessage
+        self.chat_client = LlmChat(
+            api_key=self.api_key,
+            session_id="ocean-hazard-analysis",
+            system_message=self.system_message
+        ).with_model(self.provider, self.model)
+        return self.chat_client
+
+    async def warm_up(self):
+        if self.chat_client is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.initialize_client)
+
+    async def complete(self, prompt: str) -> str:
+        client = self.chat_client or self.initialize_client()
+        return await client.send_message(self._message_type(text=prompt))
+
+
+class RecordingBackend(LLMBackend):
+    """Passes prompts to another backend and appends prompt/response pairs to a cassette file"""
+
+    mode = "record"
+
+    def __init__(self, inner: LLMBackend, path: str):
+        self.inner = inner
+        self.path = path
+
+    async def warm_up(self):
+        await self.inner.warm_up()
+
+    async def complete(self, prompt: str) -> str:
+        started = time.perf_counter()
+        response = await self.inner.complete(prompt)
+        entry = {
+            "prompt": prompt,
+            "key": normalize_prompt(prompt),
+            "response": response,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "recorded_at": datetime.utcnow().isoformat(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        await asyncio.get_running_loop().run_in_executor(None, self._append, line)
+        return response
+
+    def _append(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line)
+
+
+class ReplayBackend(LLMBackend):
+    """Serves responses from a cassette, optionally sleeping for the recorded latency.
+
+    Repeated prompts cycle through every response recorded for them.
+    """
+
+    mode = "replay"
+
+    def __init__(self, path: str, match: str = "normalized", latency: str = "recorded",
+                 latency_scale: float = 1.0):
+        if match not in ("exact", "normalized"):
+            raise ValueError("match must be 'exact' or 'normalized'")
+        self.path = path
+        self.match = match
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.hits = 0
+        self.misses = 0
+        self._exact: Dict[str, Iterator[dict]] = {}
+        self._normalized: Dict[str, Iterator[dict]] = {}
+        self._load()
+
+    def _load(self):
+        exact: Dict[str, List[dict]] = {}
+        normalized: Dict[str, List[dict]] = {}
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                exact.setdefault(entry["prompt"], []).append(entry)
+                normalized.setdefault(entry.get("key") or normalize_prompt(entry["prompt"]), []).append(entry)
+        self._exact = {prompt: cycle(entries) for prompt, entries in exact.items()}
+        self._normalized = {key: cycle(entries) for key, entries in normalized.items()}
+        self.size = sum(len(entries) for entries in exact.values())
+
+    def lookup(self, prompt: str) -> Optional[dict]:
+        entries = self._exact.get(prompt)
+        if entries is None and self.match == "normalized":
+            entries = self._normalized.get(normalize_prompt(prompt))
+        return next(entries) if entries is not None else None
+
+    async def complete(self, prompt: str) -> str:
+        entry = self.lookup(prompt)
+        if entry is None:
+            self.misses += 1
+            raise CassetteMissError(f"No recorded response for prompt ({len(prompt)} chars)")
+        self.hits += 1
+        if self.latency == "recorded" and entry.get("latency_ms"):
+            await asyncio.sleep(entry["latency_ms"] / 1000.0 * self.latency_scale)
+        return entry["response"]
+
+
+def backend_from_env(system_message: str) -> LLMBackend:
+    """Build the backend selected by LLM_MODE (live, record or replay)"""
+    mode = os.environ.get("LLM_MODE", "live").lower()
+    live = LiveBackend(os.environ.get("EMERGENT_LLM_KEY"), system_message)
+    if mode == "live":
+        return live
+
+    cassette = os.environ.get("LLM_CASSETTE")
+    if not cassette:
+        raise ValueError(f"LLM_MODE={mode} requires LLM_CASSETTE")
+    if mode == "record":
+        return RecordingBackend(live, cassette)
+    if mode == "replay":
+        return ReplayBackend(
+            cassette,
+            match=os.environ.get("LLM_REPLAY_MATCH", "normalized"),
+            latency=os.environ.get("LLM_REPLAY_LATENCY", "recorded"),
+            latency_scale=float(os.environ.get("LLM_REPLAY_LATENCY_SCALE", "1.0")),
+        )
+    raise ValueError(f"Unknown LLM_MODE: {mode}")
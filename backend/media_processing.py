@@ -0,0 +1,277 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from models import HazardReport
+from storage import media_storage
+from database import database
+from metrics import QUEUE_DEPTH
+from geo import haversine_km
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = (128, 320, 640)
+HASH_BANDS = 4                 # 64-bit dHash split into 4 x 16-bit bands for candidate lookup
+REPOST_MAX_DISTANCE = 6        # max Hamming distance to call two images the same picture
+LOCATION_TOLERANCE_KM = 25.0   # EXIF GPS further than this from the report is flagged
+
+
+# --- Worker-side functions (run inside the process pool) ---
+
+def _to_degrees(value) -> float:
+    d, m, s = (float(x) for x in value)
+    return d + m / 60.0 + s / 3600.0
+
+
+def extract_exif(image) -> Dict[str, Any]:
+    """Pull capture time and GPS position out of an image's EXIF block"""
+    exif = image.getexif()
+    if not exif:
+        return {}
+
+    result: Dict[str, Any] = {}
+    # 0x8769 = Exif IFD (DateTimeOriginal lives there), 0x8825 = GPS IFD
+    taken = exif.get_ifd(0x8769).get(0x9003) or exif.get(0x0132)
+    if taken:
+        try:
+            result["taken_at"] = datetime.strptime(str(taken).strip("\x00"), "%Y:%m:%d %H:%M:%S").isoformat()
+        except ValueError:
+            pass
+    if exif.get(0x010F):
+        result["camera_make"] = str(exif.get(0x010F)).strip("\x00")
+    if exif.get(0x0110):
+        result["camera_model"] = str(exif.get(0x0110)).strip("\x00")
+
+    gps = exif.get_ifd(0x8825)
+    if gps and 2 in gps and 4 in gps:
+        try:
+            latitude = _to_degrees(gps[2])
+            longitude = _to_degrees(gps[4])
+            if gps.get(1) == "S":
+                latitude = -latitude
+            if gps.get(3) == "W":
+                longitude = -longitude
+            result["latitude"] = round(latitude, 6)
+            result["longitude"] = round(longitude, 6)
+        except (TypeError, ValueError, ZeroDivisionError):
+            pass
+    return result
+
+
+def difference_hash(image, hash_size: int = 8) -> str:
+    """64-bit dHash: robust to re-encoding, resizing and small edits"""
+    from PIL import Image
+
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:016x}"
+
+
+def process_image(source_path: str, thumbnail_dir: str,
+                  sizes: Tuple[int, ...] = THUMBNAIL_SIZES) -> Dict[str, Any]:
+    """Generate thumbnails, read EXIF and compute a perceptual hash for one image"""
+    from PIL import Image, ImageOps
+
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    with Image.open(source_path) as image:
+        exif = extract_exif(image)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        phash = difference_hash(image)
+
+        thumbnails = {}
+        # Largest first so each step downsamples the previous, already-small result
+        working = image
+        for size in sorted(sizes, reverse=True):
+            working = working.copy()
+            working.thumbnail((size, size))
+            path = os.path.join(thumbnail_dir, f"{size}.jpg")
+            working.save(path, "JPEG", quality=80, optimize=True)
+            thumbnails[str(size)] = path
+
+        return {
+            "width": image.width,
+            "height": image.height,
+            "thumbnails": thumbnails,
+            "exif": exif,
+            "phash": phash,
+        }
+
+
+# --- Event-loop side ---
+
+def hash_bands(phash: str) -> List[str]:
+    width = len(phash) // HASH_BANDS
+    return [f"{i}:{phash[i * width:(i + 1) * width]}" for i in range(HASH_BANDS)]
+
+
+def hamming_distance(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+@dataclass
+class MediaJob:
+    media_id: str
+    sha256: str
+
+
+class MediaProcessor:
+    """Queues media jobs from the upload path and runs them on a process pool.
+
+    Each distinct blob is processed once: uploads of content already processed,
+    or being processed, reuse its thumbnails, EXIF and hash. Media still queued
+    when the process stopped is queued again on start.
+    """
+
+    def __init__(self, storage, db, max_workers: Optional[int] = None, concurrency: Optional[int] = None):
+        self.storage = storage
+        self.db = db
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.concurrency = concurrency or self.max_workers
+        self.queue: "asyncio.Queue[MediaJob]" = asyncio.Queue()
+        self.processed = 0
+        self.reused = 0
+        self.failed = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}  # sha256 -> pool job
+
+    @classmethod
+    def from_env(cls, storage, db) -> "MediaProcessor":
+        workers = os.environ.get("MEDIA_WORKERS")
+        return cls(storage, db, max_workers=int(workers) if workers else None)
+
+    def thumbnail_dir(self, sha256: str) -> Path:
+        return self.storage.root / "thumbs" / sha256[:2] / sha256
+
+    async def start(self):
+        if self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        # The queue is in memory; pick up what a previous run left unprocessed
+        for media in await self.db.get_media_files_by_status("queued"):
+            if media.sha256:
+                self.enqueue(media.id, media.sha256)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def enqueue(self, media_id: str, sha256: str):
+        self.queue.put_nowait(MediaJob(media_id, sha256))
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self.queue.qsize(), "processed": self.processed, "reused": self.reused,
+                "failed": self.failed}
+
+    async def _consume(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._process(job)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Media processing failed for {job.media_id}: {e}")
+                try:
+                    await self.db.update_media_processing(job.media_id, {"processing_status": "failed"})
+                except Exception as e:
+                    logger.error(f"Could not mark media {job.media_id} as failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _results(self, sha256: str) -> Dict[str, Any]:
+        """Thumbnails (relative paths), EXIF and perceptual hash of a blob, computed at most once"""
+        known = await self.db.find_processed_media(sha256)
+        if known is not None:
+            self.reused += 1
+            return {"thumbnails": known.thumbnails, "exif": known.exif or {}, "phash": known.phash}
+
+        running = self._running.get(sha256)
+        if running is None:
+            running = asyncio.get_running_loop().run_in_executor(
+                self._pool, process_image, str(self.storage.blob_path(sha256)), str(self.thumbnail_dir(sha256)))
+            self._running[sha256] = running
+        else:
+            self.reused += 1
+        result = await asyncio.shield(running)
+        return {
+            "thumbnails": {size: str(Path(path).relative_to(self.storage.root))
+                           for size, path in result["thumbnails"].items()},
+            "exif": result["exif"],
+            "phash": result["phash"],
+        }
+
+    async def _process(self, job: MediaJob):
+        try:
+            result = await self._results(job.sha256)
+            repost_of = await self._find_reposts(job.media_id, result["phash"])
+            await self.db.update_media_processing(job.media_id, {
+                "processing_status": "processed",
+                **result,
+                "phash_bands": hash_bands(result["phash"]),
+                "repost_of": repost_of,
+            })
+        finally:
+            # Kept until results are stored, so later jobs for the blob find them one way or
+            # the other; a failed run is dropped so the next job tries again
+            running = self._running.get(job.sha256)
+            if running is not None and running.done():
+                del self._running[job.sha256]
+        # Reports the media was attached to before it was processed
+        for report in await self.db.get_reports_with_media(job.media_id):
+            await self._check_report_location(report, job.media_id, result["exif"])
+
+    async def check_report_media(self, report: HazardReport):
+        """Cross-check a new report's location against its already processed media.
+
+        Media still being processed is checked when its job finishes.
+        """
+        for media in await self.db.get_media_files([media.id for media in report.media_files]):
+            if media.processing_status == "processed":
+                await self._check_report_location(report, media.id, media.exif or {})
+
+    async def _find_reposts(self, media_id: str, phash: str) -> List[str]:
+        candidates = await self.db.find_media_by_hash_bands(hash_bands(phash), exclude_id=media_id)
+        return [
+            media.id for media in candidates
+            if media.phash and hamming_distance(media.phash, phash) <= REPOST_MAX_DISTANCE
+        ]
+
+    async def _check_report_location(self, report: HazardReport, media_id: str, exif: Dict[str, Any]):
+        if "latitude" not in exif:
+            return
+        distance = haversine_km(report.location.latitude, report.location.longitude,
+                                exif["latitude"], exif["longitude"])
+        await self.db.update_hazard_report(report.id, {
+            "media_location_check": {
+                "media_id": media_id,
+                "exif_latitude": exif["latitude"],
+                "exif_longitude": exif["longitude"],
+                "exif_taken_at": exif.get("taken_at"),
+                "distance_km": round(distance, 2),
+                "consistent": distance <= LOCATION_TOLERANCE_KM,
+            }
+        })
+
+
+# Global media processor instance
+media_processor = MediaProcessor.from_env(media_storage, database)
+QUEUE_DEPTH.labels("media_processing").set_function(media_processor.queue.qsize)
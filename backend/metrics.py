@@ -0,0 +1,265 @@
+import time
+import math
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._new_child()
+            self._children[key] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class _Value:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from a callback at scrape time (for queue depths etc.)"""
+        self.function = function
+
+    def get(self) -> float:
+        return float(self.function()) if self.function else self.value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set_function(self, function: Callable[[], float]):
+        self.labels().set_function(function)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, key, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]))
+HTTP_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method", "route"]))
+MONGO_OPERATION_DURATION = registry.register(Histogram(
+    "mongo_operation_duration_seconds", "Database method latency", ["operation", "outcome"]))
+AI_CALL_DURATION = registry.register(Histogram(
+    "ai_call_duration_seconds", "AIService call latency", ["operation", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)))
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by result", ["cache", "result"]))
+ALERT_RECIPIENTS = registry.register(Histogram(
+    "alert_recipients", "Users inside an alert's area when it is raised", ["alert_type"],
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000, 1000000)))
+QUEUE_DEPTH = registry.register(Gauge(
+    "queue_depth", "Items waiting in background queues", ["queue"]))
+INCIDENT_POSTS = registry.register(Counter(
+    "incident_posts_total", "Social media posts assigned to incidents", ["outcome"]))
+
+
+# --- Method instrumentation ---
+
+# AIService methods swallow their own errors and return fallbacks, so they report
+# how a call ended through this context variable rather than by raising.
+ai_outcome: ContextVar[str] = ContextVar("ai_outcome", default="success")
+
+
+def set_ai_outcome(outcome: str):
+    """Mark the current AIService call as 'fallback' or 'error'"""
+    ai_outcome.set(outcome)
+
+
+def instrument_async_methods(cls, histogram: Histogram, outcome_var: Optional[ContextVar] = None,
+                             exclude: Sequence[str] = ()):
+    """Wrap every public coroutine method of ``cls`` so its latency lands in ``histogram``"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or name in exclude or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _timed(method, name, histogram, outcome_var))
+    return cls
+
+
+def _timed(method, operation: str, histogram: Histogram, outcome_var: Optional[ContextVar]):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = outcome_var.set("success") if outcome_var is not None else None
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            result = await method(*args, **kwargs)
+            if outcome_var is not None:
+                outcome = outcome_var.get()
+            return result
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            histogram.labels(operation, outcome).observe(time.perf_counter() - started)
+            if token is not None:
+                outcome_var.reset(token)
+    return wrapper
+
+
+# --- HTTP instrumentation ---
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _route_template(self, scope) -> str:
+        from starlette.routing import Match
+
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(method, route, status["code"]).observe(time.perf_counter() - started)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -38,6 +38,7 @@ class Location(BaseModel):
     longitude: float = Field(..., ge=-180, le=180)
     address: Optional[str] = None
     city: Optional[str] = None
+    district: Optional[str] = None
     state: Optional[str] = None
     country: Optional[str] = "India"
 
@@ -47,7 +48,16 @@ class MediaFile(BaseModel):
     file_type: str  # image, video, audio
     file_path: str
     file_size: Optional[int] = None
+    content_type: Optional[str] = None
+    sha256: Optional[str] = None
+    uploaded_by: Optional[str] = None
     uploaded_at: datetime = Field(default_factory=datetime.utcnow)
+    processing_status: Optional[str] = None  # queued, processed, failed
+    thumbnails: Dict[str, str] = {}  # size -> path relative to media storage root
+    exif: Optional[Dict[str, Any]] = None
+    phash: Optional[str] = None
+    phash_bands: List[str] = []
+    repost_of: List[str] = []  # ids of earlier media with a near-identical perceptual hash
 
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -61,6 +71,9 @@ class User(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_login: Optional[datetime] = None
     is_active: bool = True
+    home_location: Optional[Location] = None
+    current_location: Optional[Location] = None
+    location_updated_at: Optional[datetime] = None
 
 class UserCreate(BaseModel):
     username: str
@@ -75,6 +88,10 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
+class UserLocationUpdate(BaseModel):
+    home_location: Optional[Location] = None
+    current_location: Optional[Location] = None
+
 class HazardReport(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -95,6 +112,9 @@ class HazardReport(BaseModel):
     language: str = "en"
     tags: List[str] = []
     contact_info: Optional[str] = None
+    media_location_check: Optional[Dict[str, Any]] = None
+    duplicate_of: Optional[str] = None  # canonical report this one corroborates
+    corroboration_count: int = 0  # duplicates attached to this (canonical) report
 
 class HazardReportCreate(BaseModel):
     title: str
@@ -105,6 +125,7 @@ class HazardReportCreate(BaseModel):
     contact_info: Optional[str] = None
     language: str = "en"
     tags: List[str] = []
+    media_ids: List[str] = []  # ids returned by /api/upload
 
 class SocialMediaPost(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -114,6 +135,8 @@ class SocialMediaPost(BaseModel):
     author: str
     author_handle: str
     location: Optional[Location] = None
+    location_source: Optional[str] = None  # "gazetteer" when inferred from the text
+    location_confidence: Optional[float] = None
     created_at: datetime
     collected_at: datetime = Field(default_factory=datetime.utcnow)
     engagement_metrics: Dict[str, int] = {}  # likes, shares, comments
@@ -123,6 +146,24 @@ class SocialMediaPost(BaseModel):
     language: str = "en"
     hashtags: List[str] = []
     mentions: List[str] = []
+    incident_id: Optional[str] = None  # set when the post is clustered into an incident
+
+class Incident(BaseModel):
+    """A cluster of social media posts about the same event; analyzed and alerted once"""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    representative_post_id: str
+    representative_text: str
+    language: str = "en"
+    location: Optional[Location] = None  # centroid of the members that have a location
+    first_seen: datetime
+    last_seen: datetime
+    member_count: int = 0
+    platforms: Dict[str, int] = {}
+    hazard_type: Optional[HazardType] = None
+    severity: Optional[HazardSeverity] = None
+    ai_analysis: Optional[Dict[str, Any]] = None
+    alert_id: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class AIAnalysisResult(BaseModel):
     text: str
@@ -136,6 +177,7 @@ class AIAnalysisResult(BaseModel):
     key_phrases: List[str] = []
     language: str
     analysis_timestamp: datetime = Field(default_factory=datetime.utcnow)
+    degraded: bool = False  # keyword fallback from surge mode, due for re-analysis by the LLM
 
 class Alert(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -0,0 +1,158 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+# Leaf frames that mean the event loop is idle, waiting for I/O
+IDLE_LEAVES = {("select", "selectors.py"), ("poll", "selectors.py"), ("_run_once", "base_events.py")}
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+class ProfileSession:
+    def __init__(self, thread_id: int, interval: float, max_requests: int, include_idle: bool,
+                 loop: asyncio.AbstractEventLoop):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_requests = max_requests
+        self.include_idle = include_idle
+        self.loop = loop
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.requests = 0
+        self.started = time.monotonic()
+        self.finished = asyncio.Event()
+        self._stop = threading.Event()
+        self._labels: Dict[object, str] = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        leaf = (frame.f_code.co_name, os.path.basename(frame.f_code.co_filename))
+        if leaf in IDLE_LEAVES:
+            self.idle_samples += 1
+            if not self.include_idle:
+                return
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def run(self):
+        """Sampler thread body"""
+        next_sample = time.perf_counter()
+        while not self._stop.is_set():
+            self._sample()
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_sample = time.perf_counter()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def stop(self):
+        self._stop.set()
+        if not self.finished.is_set():
+            self.loop.call_soon_threadsafe(self.finished.set)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format, ready for flamegraph.pl or speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """On-demand sampling profiler for the worker's event-loop thread.
+
+    Nothing runs while it is off; the request hook is a single attribute check.
+    """
+
+    def __init__(self):
+        self.session: Optional[ProfileSession] = None
+
+    @property
+    def active(self) -> bool:
+        return self.session is not None
+
+    async def profile(self, seconds: float, max_requests: int = 0, interval_ms: float = 5.0,
+                      include_idle: bool = False) -> Tuple[str, Dict]:
+        """Sample the current thread until ``seconds`` elapse or ``max_requests`` complete"""
+        if self.session is not None:
+            raise ProfilerBusyError("A profiling session is already running")
+
+        session = ProfileSession(
+            thread_id=threading.get_ident(),
+            interval=max(interval_ms, 1.0) / 1000.0,
+            max_requests=max_requests,
+            include_idle=include_idle,
+            loop=asyncio.get_running_loop(),
+        )
+        self.session = session
+        sampler = threading.Thread(target=session.run, name="sampling-profiler", daemon=True)
+        sampler.start()
+        try:
+            await asyncio.wait_for(session.finished.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            session.stop()
+            self.session = None
+            await asyncio.get_running_loop().run_in_executor(None, sampler.join)
+
+        summary = {
+            "duration_seconds": round(time.monotonic() - session.started, 3),
+            "samples": session.samples,
+            "idle_samples": session.idle_samples,
+            "requests": session.requests,
+            "unique_stacks": len(session.stacks),
+        }
+        return session.collapsed(), summary
+
+    def request_finished(self):
+        session = self.session
+        if session is None or session.stopped:
+            return
+        session.requests += 1
+        if session.max_requests and session.requests >= session.max_requests:
+            session.stop()
+
+
+class ProfilerMiddleware:
+    """Counts completed requests for request-bounded profiling sessions"""
+
+    def __init__(self, app, profiler: SamplingProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.active:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished()
+
+
+# Global profiler instance
+profiler = SamplingProfiler()
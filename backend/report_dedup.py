@@ -0,0 +1,127 @@
+import os
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import numpy as np
+from models import HazardReport
+from geo import GridIndex
+from incidents import MinHasher
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CanonicalReport:
+    """A recent report that later near-duplicates attach to"""
+    id: str
+    hazard_type: str
+    signatures: np.ndarray  # (members, permutations)
+    last_seen: datetime
+    corroboration_count: int = 0
+    ai_analysis: Optional[Dict[str, Any]] = None
+    alerted: bool = False
+
+
+class ReportDeduplicator:
+    """Spots citizen reports that repeat a recent nearby report of the same hazard.
+
+    Recent canonical reports sit in a grid index; a new report is compared with
+    those within ``radius_km`` that were filed (or last corroborated) within
+    ``window_minutes``, and matches when its title and description are similar
+    enough to the canonical report or one of its duplicates (MinHash estimate).
+    """
+
+    def __init__(self, window_minutes: float = 120.0, radius_km: float = 3.0, similarity: float = 0.2,
+                 max_signatures: int = 16, hasher: Optional[MinHasher] = None):
+        self.window = timedelta(minutes=window_minutes)
+        self.radius_km = radius_km
+        self.min_similarity = similarity
+        self.max_signatures = max_signatures
+        self.hasher = hasher or MinHasher()
+        self.grid = GridIndex(cell_degrees=0.05)
+        self.canonical: Dict[str, CanonicalReport] = {}
+        self._expired_at: Optional[datetime] = None
+
+    @classmethod
+    def from_env(cls) -> "ReportDeduplicator":
+        return cls(
+            window_minutes=float(os.environ.get("REPORT_DEDUP_WINDOW_MINUTES", "120")),
+            radius_km=float(os.environ.get("REPORT_DEDUP_RADIUS_KM", "3")),
+            similarity=float(os.environ.get("REPORT_DEDUP_SIMILARITY", "0.2")),
+        )
+
+    def __len__(self) -> int:
+        return len(self.canonical)
+
+    @staticmethod
+    def _text(report: HazardReport) -> str:
+        return f"{report.title} {report.description}"
+
+    def match(self, report: HazardReport) -> Optional[CanonicalReport]:
+        """The canonical report this one duplicates, if any"""
+        self._expire(report.created_at)
+        signature = self.hasher.signature(self._text(report))
+        if signature is None:
+            return None
+        hazard_type = getattr(report.hazard_type, "value", report.hazard_type)
+        best, best_score = None, self.min_similarity
+        for canonical_id in self.grid.within(report.location.latitude, report.location.longitude, self.radius_km):
+            entry = self.canonical[canonical_id]
+            if entry.hazard_type != hazard_type or report.created_at - entry.last_seen > self.window:
+                continue
+            score = float(self.hasher.similarities(signature, entry.signatures).max())
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def add(self, report: HazardReport) -> CanonicalReport:
+        """Register a report as canonical for the reports that follow it"""
+        signature = self.hasher.signature(self._text(report))
+        entry = CanonicalReport(
+            id=report.id,
+            hazard_type=getattr(report.hazard_type, "value", report.hazard_type),
+            signatures=(signature[None, :] if signature is not None
+                        else np.empty((0, self.hasher.permutations), dtype=np.uint64)),
+            last_seen=report.created_at,
+            corroboration_count=report.corroboration_count,
+            ai_analysis=report.ai_analysis,
+        )
+        self.canonical[report.id] = entry
+        self.grid.insert(report.id, report.location.latitude, report.location.longitude)
+        return entry
+
+    def attach(self, entry: CanonicalReport, report: HazardReport):
+        """Count a duplicate against its canonical report; its text widens future matches"""
+        entry.corroboration_count += 1
+        entry.last_seen = max(entry.last_seen, report.created_at)
+        if len(entry.signatures) < self.max_signatures:
+            signature = self.hasher.signature(self._text(report))
+            if signature is not None:
+                entry.signatures = np.vstack([entry.signatures, signature])
+
+    def _expire(self, now: datetime):
+        if self._expired_at is not None and now - self._expired_at < self.window / 10:
+            return
+        self._expired_at = now
+        for canonical_id in [key for key, entry in self.canonical.items() if now - entry.last_seen > self.window]:
+            del self.canonical[canonical_id]
+            self.grid.remove(canonical_id)
+
+    async def load(self, db):
+        """Pick up canonical reports filed within the window before a restart"""
+        since = datetime.utcnow() - self.window
+        fields = ["id", "title", "description", "hazard_type", "severity", "location", "reporter_id",
+                  "created_at", "ai_analysis", "corroboration_count"]
+        async for batch in db.iter_documents("hazard_reports", fields,
+                                             query={"created_at": {"$gte": since}, "duplicate_of": None}):
+            alerted = await db.get_alerted_source_ids([document["id"] for document in batch])
+            for document in batch:
+                document.pop("_id", None)
+                entry = self.add(HazardReport(**document))
+                entry.alerted = entry.id in alerted
+        logger.info(f"Report deduplicator loaded {len(self.canonical)} recent reports")
+
+
+# Global report deduplicator instance
+report_deduplicator = ReportDeduplicator.from_env()
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import Response
+from database import database, Database
+from metrics import CACHE_REQUESTS
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    versions: Tuple[int, ...]
+    expires: float
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header, as GET requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    """LRU of encoded JSON responses for read-heavy endpoints, with ETags.
+
+    Entries are valid while the Database version counters of the collections they
+    read are unchanged. Those counters only see writes made by this process, so
+    entries also expire after ``ttl`` seconds to pick up anything written elsewhere.
+    """
+
+    def __init__(self, db: Database, max_entries: int = 512, ttl: float = 30.0):
+        self.db = db
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls, db: Database) -> "ResponseCache":
+        return cls(
+            db,
+            max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "512")),
+            ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "30")),
+        )
+
+    @staticmethod
+    def make_key(name: str, params: Dict[str, Any]) -> CacheKey:
+        values = {k: getattr(v, "value", v) for k, v in params.items() if v is not None}
+        return name, tuple(sorted((k, str(v)) for k, v in values.items()))
+
+    def get(self, key: CacheKey, versions: Tuple[int, ...]) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.versions != versions or entry.expires <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, versions: Tuple[int, ...], body: bytes) -> CachedResponse:
+        # Body bytes are part of the tag so a refill after ttl expiry that picked up
+        # another process's write never matches a tag handed out before it
+        digest = hashlib.blake2b(repr((key, versions)).encode() + body, digest_size=12)
+        entry = CachedResponse(body, f'"{digest.hexdigest()}"', versions, time.monotonic() + self.ttl)
+        if self.max_entries > 0:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    async def respond(self, request: Request, name: str, collections: Sequence[str],
+                      params: Dict[str, Any], compute: Callable[[], Awaitable[Any]]) -> Response:
+        """Serve ``compute()`` as JSON, from cache when possible, honouring If-None-Match"""
+        key = self.make_key(name, params)
+        # Read versions before computing: a write racing with compute() leaves the
+        # entry tagged with the old versions, so the next lookup misses
+        versions = self.db.get_versions(collections)
+        entry = self.get(key, versions)
+        CACHE_REQUESTS.labels("response", "miss" if entry is None else "hit").inc()
+        if entry is None:
+            body = json.dumps(
+                jsonable_encoder(await compute()),
+                ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+            ).encode("utf-8")
+            entry = self.put(key, versions, body)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+
+# Global response cache instance
+response_cache = ResponseCache.from_env(database)
@@ -0,0 +1,419 @@
+import os
+import json
+import math
+import time
+import logging
+import functools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from models import Location
+
+logger = logging.getLogger(__name__)
+
+DISTRICTS_PATH = Path(__file__).parent / "data" / "coastal_districts.json"
+KM_PER_DEGREE_LAT = 110.57
+KM_PER_DEGREE_LON = 111.32  # at the equator
+
+
+@dataclass
+class Place:
+    district: str
+    state: str
+    city: Optional[str] = None
+
+
+@dataclass
+class Region:
+    """A district, or one piece of it: rings of (longitude, latitude) vertices"""
+    district: str
+    state: str
+    rings: List[np.ndarray]
+    latitude: float  # anchor, used to settle points that fall in two overlapping regions
+    longitude: float
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        vertices = np.concatenate(self.rings)
+        return (float(vertices[:, 0].min()), float(vertices[:, 1].min()),
+                float(vertices[:, 0].max()), float(vertices[:, 1].max()))
+
+
+def _clip(polygon: np.ndarray, normal: np.ndarray, offset: float) -> np.ndarray:
+    """Sutherland-Hodgman: the part of a convex polygon where ``point . normal <= offset``"""
+    side = polygon @ normal - offset
+    inside = side <= 0
+    if inside.all() or not inside.any():
+        return polygon if inside.all() else np.empty((0, 2))
+    following, following_side = np.roll(polygon, -1, axis=0), np.roll(side, -1)
+    crossing = inside != np.roll(inside, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = side / (side - following_side)
+    intersections = polygon + t[:, None] * (following - polygon)
+    # Each vertex is followed by the edge's crossing point, if it has one
+    return np.stack([polygon, intersections], axis=1).reshape(-1, 2)[np.stack([inside, crossing], axis=1).ravel()]
+
+
+def voronoi_regions(sites: Sequence[Dict[str, Any]], default_radius_km: float = 100.0,
+                    vertices: int = 32) -> List[Region]:
+    """Approximate district boundaries from known points in each district.
+
+    Every site (a district headquarters or town) gets the points closer to it
+    than to any other site, its Voronoi cell, cut off at its ``radius_km`` so
+    inland and open-sea points far from every site resolve to nothing. A
+    district is the union of its sites' cells. Cells are built in a local
+    equirectangular projection around their own site, so neighbouring cells
+    can overlap or leave slivers by a fraction of a percent.
+    """
+    anchors = np.array([(site["latitude"], site["longitude"]) for site in sites], dtype=float)
+    radii = np.array([site.get("radius_km") or default_radius_km for site in sites], dtype=float)
+    angles = np.linspace(0, 2 * math.pi, vertices, endpoint=False)
+    circle = np.column_stack([np.cos(angles), np.sin(angles)])
+
+    regions = []
+    for i, site in enumerate(sites):
+        lat0, lon0 = anchors[i]
+        lon_scale = KM_PER_DEGREE_LON * math.cos(math.radians(lat0))
+        offsets = np.column_stack([(anchors[:, 1] - lon0) * lon_scale, (anchors[:, 0] - lat0) * KM_PER_DEGREE_LAT])
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        polygon = circle * radii[i]
+        reach = radii[i]
+        for j in np.argsort(distances):
+            if j == i or distances[j] == 0:
+                continue
+            # Sites are visited nearest first; once a bisector lies beyond the
+            # cell's farthest vertex, no further site can cut it
+            if distances[j] / 2 >= reach:
+                break
+            # Half-plane of points nearer this site than the other one
+            polygon = _clip(polygon, offsets[j], distances[j] ** 2 / 2)
+            reach = float(np.hypot(polygon[:, 0], polygon[:, 1]).max()) if len(polygon) else 0.0
+        ring = np.column_stack([lon0 + polygon[:, 0] / lon_scale, lat0 + polygon[:, 1] / KM_PER_DEGREE_LAT])
+        regions.append(Region(site["district"], site["state"], [ring], float(lat0), float(lon0)))
+    return regions
+
+
+def _district_sites(districts: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Headquarters and towns of the district table as Voronoi sites, without repeats"""
+    sites, seen = [], set()
+    for district in districts:
+        points = [tuple(district["hq"])] + [(lat, lon) for _, lat, lon in district.get("towns", [])]
+        for latitude, longitude in points:
+            if (latitude, longitude) in seen:
+                continue
+            seen.add((latitude, longitude))
+            sites.append({"district": district["district"], "state": district["state"],
+                          "latitude": latitude, "longitude": longitude, "radius_km": district.get("radius_km")})
+    return sites
+
+
+def district_table_regions(path: Path = DISTRICTS_PATH) -> Tuple[List[Region], List[Tuple[str, float, float]]]:
+    """Boundaries approximated from the bundled table of district headquarters and towns"""
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    districts = table["districts"]
+    regions = voronoi_regions(_district_sites(districts), table.get("default_radius_km", 100.0))
+    return regions, [tuple(town) for district in districts for town in district.get("towns", [])]
+
+
+def geojson_regions(path: str, district_property: str = "district", state_property: str = "state",
+                    towns_path: Path = DISTRICTS_PATH) -> Tuple[List[Region], List[Tuple[str, float, float]]]:
+    """Boundaries from a GeoJSON FeatureCollection of (Multi)Polygon districts; towns from the bundled table"""
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    regions = []
+    for feature in collection["features"]:
+        geometry, properties = feature["geometry"], feature.get("properties") or {}
+        polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+        rings = [np.array(ring, dtype=float)[:, :2] for polygon in polygons for ring in polygon]
+        outer = np.concatenate([np.array(polygon[0], dtype=float)[:, :2] for polygon in polygons])
+        regions.append(Region(properties[district_property], properties[state_property], rings,
+                              float(outer[:, 1].mean()), float(outer[:, 0].mean())))
+    with open(towns_path, encoding="utf-8") as f:
+        towns = [tuple(town) for district in json.load(f)["districts"] for town in district.get("towns", [])]
+    return regions, towns
+
+
+def _str_pack(boxes: np.ndarray, capacity: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sort-Tile-Recursive order for ``boxes`` and the start of each node's run"""
+    count = len(boxes)
+    slice_size = math.ceil(math.sqrt(math.ceil(count / capacity))) * capacity
+    order = np.argsort((boxes[:, 0] + boxes[:, 2]) / 2, kind="stable")
+    centre_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    starts = []
+    for begin in range(0, count, slice_size):
+        tile = order[begin:begin + slice_size]
+        order[begin:begin + slice_size] = tile[np.argsort(centre_y[tile], kind="stable")]
+        starts.extend(range(begin, min(begin + slice_size, count), capacity))
+    return order, np.array(starts)
+
+
+def _edges(rings: List[np.ndarray]) -> np.ndarray:
+    """(x1, y1, x2, y2) rows for every edge of every ring"""
+    return np.concatenate([np.column_stack([ring, np.roll(ring, -1, axis=0)]) for ring in rings])
+
+
+def _contains(edges: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Even-odd point-in-polygon; counting crossings over all rings at once handles holes and multipart regions"""
+    x1, y1, x2, y2 = edges[:, 0], edges[:, 1], edges[:, 2], edges[:, 3]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        straddles = (y1 > y[:, None]) != (y2 > y[:, None])
+        crossing_x = x1 + (x2 - x1) * (y[:, None] - y1) / (y2 - y1)
+        return np.count_nonzero(straddles & (x[:, None] < crossing_x), axis=1) % 2 == 1
+
+
+class RTree:
+    """Static R-tree over bounding boxes, bulk-loaded with Sort-Tile-Recursive.
+
+    Queries take whole arrays of points and walk the tree a level at a time,
+    carrying (point, node) pairs, so a batch costs a few array operations per
+    level instead of a Python descent per point.
+    """
+
+    def __init__(self, boxes: np.ndarray, capacity: int = 8):
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        order, starts = _str_pack(boxes, capacity)
+        self.entries = order  # input index of each leaf slot
+        self.entry_boxes = boxes[order]
+        levels = []
+        children = self.entry_boxes
+        while True:
+            ends = np.append(starts[1:], len(children))
+            nodes = np.column_stack([
+                np.minimum.reduceat(children[:, 0], starts), np.minimum.reduceat(children[:, 1], starts),
+                np.maximum.reduceat(children[:, 2], starts), np.maximum.reduceat(children[:, 3], starts),
+            ])
+            if len(nodes) == 1:
+                levels.append((nodes, starts, ends))
+                break
+            order, parent_starts = _str_pack(nodes, capacity)
+            levels.append((nodes[order], starts[order], ends[order]))
+            children, starts = nodes[order], parent_starts
+        self.levels = levels[::-1]  # root first
+        self._level_lists = [(boxes.tolist(), starts.tolist(), ends.tolist()) for boxes, starts, ends in self.levels]
+        self._entry_lists = (self.entries.tolist(), self.entry_boxes.tolist())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _inside(boxes: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return (x >= boxes[:, 0]) & (y >= boxes[:, 1]) & (x <= boxes[:, 2]) & (y <= boxes[:, 3])
+
+    def query_points(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point index, entry index) pairs for every box containing a point"""
+        points = np.arange(len(x))
+        nodes = np.zeros(len(x), dtype=np.int64)
+        for boxes, starts, ends in self.levels:
+            keep = self._inside(boxes[nodes], x[points], y[points])
+            points, nodes = points[keep], nodes[keep]
+            counts = ends[nodes] - starts[nodes]
+            first = np.repeat(starts[nodes], counts)
+            rank = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+            points, nodes = np.repeat(points, counts), first + rank
+        keep = self._inside(self.entry_boxes[nodes], x[points], y[points])
+        return points[keep], self.entries[nodes[keep]]
+
+    def query_point(self, x: float, y: float) -> List[int]:
+        """Entries whose box contains one point; a plain descent beats the array walk for a single lookup"""
+        frontier = [0]
+        for boxes, starts, ends in self._level_lists:
+            frontier = [child for node in frontier
+                        if boxes[node][0] <= x <= boxes[node][2] and boxes[node][1] <= y <= boxes[node][3]
+                        for child in range(starts[node], ends[node])]
+        entries, boxes = self._entry_lists
+        return [entries[slot] for slot in frontier
+                if boxes[slot][0] <= x <= boxes[slot][2] and boxes[slot][1] <= y <= boxes[slot][3]]
+
+
+class ReverseGeocoder:
+    """Offline coordinates -> (city, district, state) for the coastal districts.
+
+    District boundaries sit in an R-tree keyed by bounding box; candidates from
+    the tree are confirmed with a point-in-polygon test. The city is the nearest
+    known town in the matched district within ``city_radius_km``. The index is
+    built from ``source`` on first use, so importing this module stays cheap.
+    """
+
+    def __init__(self, source: Callable[[], Tuple[List[Region], Sequence[Tuple[str, float, float]]]],
+                 city_radius_km: float = 30.0, chunk_size: int = 65536):
+        self.source = source
+        self.city_radius_km = city_radius_km
+        self.chunk_size = chunk_size
+        self.regions: List[Region] = []
+        self._loaded = False
+
+    @classmethod
+    def from_district_table(cls, path: Path = DISTRICTS_PATH, **kwargs) -> "ReverseGeocoder":
+        return cls(functools.partial(district_table_regions, path), **kwargs)
+
+    @classmethod
+    def from_geojson(cls, path: str, district_property: str = "district", state_property: str = "state",
+                     **kwargs) -> "ReverseGeocoder":
+        return cls(functools.partial(geojson_regions, path, district_property, state_property), **kwargs)
+
+    @classmethod
+    def from_env(cls) -> "ReverseGeocoder":
+        city_radius_km = float(os.environ.get("REVERSE_GEOCODER_CITY_RADIUS_KM", "30"))
+        boundaries = os.environ.get("REVERSE_GEOCODER_BOUNDARIES")
+        if boundaries:
+            return cls.from_geojson(
+                boundaries,
+                district_property=os.environ.get("REVERSE_GEOCODER_DISTRICT_PROPERTY", "district"),
+                state_property=os.environ.get("REVERSE_GEOCODER_STATE_PROPERTY", "state"),
+                city_radius_km=city_radius_km,
+            )
+        return cls.from_district_table(city_radius_km=city_radius_km)
+
+    def load(self):
+        """Build the index; runs once, on first lookup unless called at startup"""
+        if self._loaded:
+            return
+        started = time.perf_counter()
+        regions, towns = self.source()
+        self.regions = regions
+        self.tree = RTree(np.array([region.bbox for region in regions]))
+        self._anchors = np.array([(region.latitude, region.longitude) for region in regions], dtype=float)
+        self._edges = [_edges(region.rings) for region in regions]
+        # Towns belong to whichever region their coordinates fall in
+        self._town_names = [name for name, _, _ in towns]
+        town_points = np.array([(lat, lon) for _, lat, lon in towns], dtype=float).reshape(-1, 2)
+        town_regions = self._locate(town_points[:, 0], town_points[:, 1])
+        self._towns: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        for index in np.unique(town_regions[town_regions >= 0]):
+            members = np.flatnonzero(town_regions == index)
+            self._towns[int(index)] = (members, town_points[members])
+        self._loaded = True
+        logger.info(f"Reverse geocoder indexed {len(regions)} regions and {len(towns)} towns "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self.regions)
+
+    # --- Lookups ---
+
+    def _locate(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """Region index for each point, -1 outside every region"""
+        result = np.full(len(latitudes), -1, dtype=np.int64)
+        points, candidates = self.tree.query_points(longitudes, latitudes)
+        if not len(points):
+            return result
+        hits = np.zeros(len(points), dtype=bool)
+        order = np.argsort(candidates, kind="stable")
+        points, candidates = points[order], candidates[order]
+        bounds = np.flatnonzero(np.diff(candidates)) + 1
+        for begin, end in zip(np.r_[0, bounds], np.r_[bounds, len(candidates)]):
+            subset = points[begin:end]
+            hits[begin:end] = _contains(self._edges[candidates[begin]], longitudes[subset], latitudes[subset])
+        points, candidates = points[hits], candidates[hits]
+        # A point in two regions (overlapping edges) goes to the nearer anchor
+        anchors = self._anchors[candidates]
+        lon_scale = np.cos(np.radians(latitudes[points]))
+        distances = (anchors[:, 0] - latitudes[points]) ** 2 + ((anchors[:, 1] - longitudes[points]) * lon_scale) ** 2
+        order = np.lexsort((-distances, points))
+        result[points[order]] = candidates[order]  # last write per point wins: the nearest
+        return result
+
+    def _nearest_towns(self, regions: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray) -> List[Optional[str]]:
+        cities: List[Optional[str]] = [None] * len(regions)
+        for index in np.unique(regions[regions >= 0]):
+            towns = self._towns.get(int(index))
+            if towns is None:
+                continue
+            members, town_points = towns
+            subset = np.flatnonzero(regions == index)
+            lat, lon = latitudes[subset, None], longitudes[subset, None]
+            distances = np.hypot((town_points[None, :, 0] - lat) * KM_PER_DEGREE_LAT,
+                                 (town_points[None, :, 1] - lon) * KM_PER_DEGREE_LON * np.cos(np.radians(lat)))
+            nearest = distances.argmin(axis=1)
+            for point, town, distance in zip(subset, nearest, distances[np.arange(len(subset)), nearest]):
+                if distance <= self.city_radius_km:
+                    cities[point] = self._town_names[members[town]]
+        return cities
+
+    def lookup_many(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> List[Optional[Place]]:
+        self.load()
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        places: List[Optional[Place]] = []
+        for begin in range(0, len(latitudes), self.chunk_size):
+            lat, lon = latitudes[begin:begin + self.chunk_size], longitudes[begin:begin + self.chunk_size]
+            regions = self._locate(lat, lon)
+            cities = self._nearest_towns(regions, lat, lon)
+            places.extend(self._place(index, city) for index, city in zip(regions.tolist(), cities))
+        return places
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[Place]:
+        self.load()
+        x, y = np.array([longitude], dtype=float), np.array([latitude], dtype=float)
+        containing = [index for index in self.tree.query_point(longitude, latitude)
+                      if _contains(self._edges[index], x, y)[0]]
+        if not containing:
+            return None
+        lon_scale = math.cos(math.radians(latitude))
+        index = min(containing, key=lambda i: (self.regions[i].latitude - latitude) ** 2
+                    + ((self.regions[i].longitude - longitude) * lon_scale) ** 2)
+        city, best = None, self.city_radius_km
+        members, town_points = self._towns.get(index, ((), ()))
+        for member, (town_lat, town_lon) in zip(members, town_points):
+            distance = math.hypot((town_lat - latitude) * KM_PER_DEGREE_LAT,
+                                  (town_lon - longitude) * KM_PER_DEGREE_LON * lon_scale)
+            if distance <= best:
+                city, best = self._town_names[member], distance
+        return self._place(index, city)
+
+    def _place(self, index: int, city: Optional[str]) -> Optional[Place]:
+        if index < 0:
+            return None
+        region = self.regions[index]
+        return Place(region.district, region.state, city)
+
+    # --- Filling locations ---
+
+    def fill_many(self, locations: Sequence[Any]) -> int:
+        """Fill missing city/district/state on Location models or location dicts.
+
+        Values already present are kept. Returns how many locations changed.
+        """
+        pending = [location for location in locations if location is not None and not all(
+            _get(location, field) for field in ("city", "district", "state"))]
+        if not pending:
+            return 0
+        places = self.lookup_many([_get(location, "latitude") for location in pending],
+                                  [_get(location, "longitude") for location in pending])
+        changed = 0
+        for location, place in zip(pending, places):
+            if place is None:
+                continue
+            updated = False
+            for field, value in (("city", place.city), ("district", place.district), ("state", place.state)):
+                if value and not _get(location, field):
+                    _set(location, field, value)
+                    updated = True
+            changed += updated
+        return changed
+
+    def fill(self, location: Optional[Location]) -> Optional[Location]:
+        self.fill_many([location])
+        return location
+
+    def fill_documents(self, documents: Sequence[Dict[str, Any]]) -> int:
+        """Fill the ``location`` of raw report/post documents in place"""
+        return self.fill_many([document.get("location") for document in documents])
+
+
+def _get(location: Any, field: str) -> Any:
+    return location.get(field) if isinstance(location, dict) else getattr(location, field, None)
+
+
+def _set(location: Any, field: str, value: Any):
+    if isinstance(location, dict):
+        location[field] = value
+    else:
+        setattr(location, field, value)
+
+
+# Global reverse geocoder instance
+reverse_geocoder = ReverseGeocoder.from_env()
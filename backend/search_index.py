@@ -0,0 +1,326 @@
+import os
+import re
+import html
+import math
+import asyncio
+import logging
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Word characters plus the Indic blocks (Devanagari to Sinhala), whose vowel signs \w misses
+TOKEN_RE = re.compile(r"[\w\u0900-\u0DFF]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its near of on or that the "
+    "this to was were will with rt".split()
+)
+
+KINDS = ("report", "post")
+HAZARD_TYPES = ("tsunami_warning", "high_waves", "unusual_marine_life", "water_pollution", "oil_spill",
+                "coastal_erosion", "unusual_weather", "debris", "other")
+SEVERITIES = ("low", "medium", "high", "critical")
+PLATFORMS = ("twitter", "facebook", "youtube", "instagram", "news")
+# Fields of each indexed collection that loading reads from Mongo
+INDEXED_FIELDS = {
+    "hazard_reports": ["id", "title", "description", "tags", "hazard_type", "severity", "created_at"],
+    "social_media_posts": ["id", "content", "hashtags", "platform", "created_at"],
+}
+# How far back each refresh looks before the previous one started: documents are
+# stamped when built, and may reach Mongo later (write buffer, other hosts' clocks)
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+
+def normalize_token(token: str) -> str:
+    token = token.lower()
+    # Light plural folding so "waves" finds "wave"; non-Latin tokens are left alone
+    if token.isascii() and len(token) > 3:
+        if token.endswith("ies"):
+            return token[:-3] + "y"
+        if token.endswith("s") and not token.endswith("ss"):
+            return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = (normalize_token(match.group()) for match in TOKEN_RE.finditer(text))
+    return [token for token in tokens if token not in STOP_WORDS]
+
+
+def highlight(text: str, terms: Set[str], width: int = 160) -> Tuple[str, bool]:
+    """HTML-escaped window of ``text`` around the first query term, terms wrapped in <mark>"""
+    matches = [m for m in TOKEN_RE.finditer(text) if normalize_token(m.group()) in terms]
+    if not matches:
+        return html.escape(text[:width]) + ("…" if len(text) > width else ""), False
+
+    start = max(0, matches[0].start() - width // 4)
+    end = min(len(text), start + width)
+    parts, cursor = [], start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[cursor:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        cursor = match.end()
+    parts.append(html.escape(text[cursor:end]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else ""), True
+
+
+def _code(values: Tuple[str, ...], value: Any) -> int:
+    value = getattr(value, "value", value)
+    return values.index(value) if value in values else -1
+
+
+def _timestamp(value: Any) -> float:
+    """Epoch seconds; naive datetimes are UTC, as everywhere else in this app"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SearchIndex:
+    """In-memory BM25 inverted index over report and post text.
+
+    Postings and per-document columns are append-only ``array`` buffers that
+    NumPy reads without copying, so a query scores whole posting lists at once.
+    Updated documents are re-added under a new number and the old one is marked
+    dead; the index is compacted once too much of it is dead.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[array, array]] = {}  # term -> (doc numbers, term frequencies)
+        self.ids: List[str] = []
+        self.numbers: Dict[str, int] = {}  # document id -> live doc number
+        self.kind = array("b")
+        self.hazard = array("b")
+        self.severity = array("b")
+        self.platform = array("b")
+        self.created = array("d")
+        self.length = array("I")
+        self.alive = array("b")
+        self.live_count = 0
+        self.live_length = 0
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.numbers
+
+    # --- Indexing ---
+
+    def add(self, collection: str, document: Dict[str, Any]):
+        """Index a hazard_reports or social_media_posts document, replacing any older version"""
+        if collection == "hazard_reports":
+            text = " ".join([document.get("title") or "", document.get("description") or "",
+                             " ".join(document.get("tags") or [])])
+            kind, platform = 0, -1
+            hazard = _code(HAZARD_TYPES, document.get("hazard_type"))
+            severity = _code(SEVERITIES, document.get("severity"))
+        elif collection == "social_media_posts":
+            text = " ".join([document.get("content") or "", " ".join(document.get("hashtags") or [])])
+            kind, hazard, severity = 1, -1, -1
+            platform = _code(PLATFORMS, document.get("platform"))
+        else:
+            return
+
+        self.remove(document["id"])
+        terms = tokenize(text)
+        number = len(self.ids)
+        self.ids.append(document["id"])
+        self.numbers[document["id"]] = number
+        self.kind.append(kind)
+        self.hazard.append(hazard)
+        self.severity.append(severity)
+        self.platform.append(platform)
+        self.created.append(_timestamp(document.get("created_at")))
+        self.length.append(len(terms))
+        self.alive.append(1)
+        self.live_count += 1
+        self.live_length += len(terms)
+
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("I"), array("H"))
+            entry[0].append(number)
+            entry[1].append(min(count, 65535))
+
+    def add_many(self, collection: str, documents: Iterable[Dict[str, Any]]):
+        for document in documents:
+            self.add(collection, document)
+
+    def remove(self, doc_id: str):
+        number = self.numbers.pop(doc_id, None)
+        if number is None:
+            return
+        self.alive[number] = 0
+        self.live_count -= 1
+        self.live_length -= self.length[number]
+        if len(self.ids) > 10_000 and self.live_count < len(self.ids) * 0.7:
+            self.compact()
+
+    def compact(self):
+        """Rebuild postings and columns without dead documents"""
+        alive = np.frombuffer(self.alive, dtype=np.int8).astype(bool)
+        renumber = np.cumsum(alive, dtype=np.int64) - 1
+        for term in list(self.postings):
+            docs, freqs = self.postings[term]
+            doc_array = np.frombuffer(docs, dtype=np.uint32)
+            keep = alive[doc_array]
+            if not keep.any():
+                del self.postings[term]
+                continue
+            self.postings[term] = (array("I", renumber[doc_array[keep]].astype(np.uint32).tobytes()),
+                                   array("H", np.frombuffer(freqs, dtype=np.uint16)[keep].tobytes()))
+            del doc_array
+        for name in ("kind", "hazard", "severity", "platform", "created", "length"):
+            column = getattr(self, name)
+            values = np.frombuffer(column, dtype=np.dtype(column.typecode))[alive]
+            setattr(self, name, array(column.typecode, values.tobytes()))
+        self.ids = [doc_id for doc_id, keep in zip(self.ids, alive) if keep]
+        self.numbers = {doc_id: number for number, doc_id in enumerate(self.ids)}
+        self.alive = array("b", b"\x01" * len(self.ids))
+
+    async def load(self, db, batch_size: int = 5000, since: Optional[datetime] = None) -> int:
+        """Index what is in Mongo (created after ``since``, if given) and not indexed yet.
+
+        Documents written through this process are indexed by the write paths;
+        the periodic refresh (see ``start``) picks up those written elsewhere.
+        """
+        loaded = 0
+        query = {"created_at": {"$gt": since}} if since is not None else None
+        for collection, fields in INDEXED_FIELDS.items():
+            async for batch in db.iter_documents(collection, fields, batch_size, query=query):
+                for document in batch:
+                    if document["id"] not in self.numbers:
+                        self.add(collection, document)
+                        loaded += 1
+        if since is None:
+            self.ready = True
+            logger.info(f"Search index loaded {loaded} documents, {len(self.postings)} terms")
+        return loaded
+
+    # --- Background refresh ---
+
+    async def start(self, db, interval: Optional[float] = None):
+        """Load the index in the background, then poll for documents other processes wrote"""
+        if self._task is not None:
+            return
+        interval = interval if interval is not None else float(os.environ.get("SEARCH_REFRESH_SECONDS", "30"))
+        self._task = asyncio.create_task(self._run(db, interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, db, interval: float):
+        started = datetime.utcnow()
+        try:
+            await self.load(db)
+        except Exception as e:
+            logger.error(f"Search index load failed: {e}")
+        while interval > 0:
+            await asyncio.sleep(interval)
+            since, started = started - REFRESH_OVERLAP, datetime.utcnow()
+            try:
+                added = await self.load(db, since=since)
+                if added:
+                    logger.debug(f"Search index refresh added {added} documents")
+            except Exception as e:
+                logger.error(f"Search index refresh failed: {e}")
+
+    # --- Querying ---
+
+    def search(self, query: str, kind: Optional[str] = None, hazard_type: Optional[str] = None,
+               severity: Optional[str] = None, platform: Optional[str] = None,
+               since: Optional[datetime] = None, until: Optional[datetime] = None,
+               limit: int = 20, offset: int = 0) -> Tuple[int, List[Tuple[str, str, float]]]:
+        """BM25-rank matching documents; returns (total matches, [(kind, id, score)]).
+
+        hazard_type and severity only match reports, platform only matches posts;
+        a filter value the index has no code for matches nothing.
+        """
+        filters = [(self.hazard, HAZARD_TYPES, hazard_type, "report"), (self.severity, SEVERITIES, severity, "report"),
+                   (self.platform, PLATFORMS, platform, "post")]
+        codes = []
+        for column, values, value, filter_kind in filters:
+            if value is None:
+                continue
+            code = _code(values, value)
+            if code < 0 or kind not in (None, filter_kind):
+                return 0, []
+            codes.append((column, code, filter_kind))
+        terms = list(dict.fromkeys(tokenize(query)))
+        terms = [term for term in terms if term in self.postings]
+        if not terms or not self.live_count:
+            return 0, []
+
+        average_length = self.live_length / self.live_count
+        lengths = np.frombuffer(self.length, dtype=np.uint32)
+        alive = np.frombuffer(self.alive, dtype=np.int8)
+        doc_parts, score_parts = [], []
+        for term in terms:
+            docs_buffer, freqs_buffer = self.postings[term]
+            docs = np.frombuffer(docs_buffer, dtype=np.uint32)
+            freqs = np.frombuffer(freqs_buffer, dtype=np.uint16).astype(np.float32)
+            df = int(np.count_nonzero(alive[docs]))
+            idf = math.log(1.0 + (self.live_count - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / average_length)
+            doc_parts.append(docs)
+            score_parts.append(idf * freqs * (self.k1 + 1.0) / (freqs + norm))
+
+        if len(terms) == 1:
+            candidates, scores = doc_parts[0], score_parts[0]
+        else:
+            # Dense accumulation over all doc numbers beats sorting the merged postings
+            totals = np.bincount(np.concatenate(doc_parts), weights=np.concatenate(score_parts),
+                                 minlength=len(self.ids))
+            candidates = np.flatnonzero(totals).astype(np.uint32)
+            scores = totals[candidates].astype(np.float32)
+
+        mask = alive[candidates] == 1
+        kinds = np.frombuffer(self.kind, dtype=np.int8)
+        if kind is not None:
+            mask &= kinds[candidates] == KINDS.index(kind)
+        for column, code, filter_kind in codes:
+            mask &= kinds[candidates] == KINDS.index(filter_kind)
+            mask &= np.frombuffer(column, dtype=np.int8)[candidates] == code
+        if since is not None or until is not None:
+            created = np.frombuffer(self.created, dtype=np.float64)[candidates]
+            if since is not None:
+                mask &= created >= _timestamp(since)
+            if until is not None:
+                mask &= created < _timestamp(until)
+
+        candidates, scores = candidates[mask], scores[mask]
+        total = len(candidates)
+        wanted = offset + limit
+        if total > wanted:
+            top = np.argpartition(-scores, wanted - 1)[:wanted]
+        else:
+            top = np.arange(total)
+        # Ties go to the newer document
+        created = np.frombuffer(self.created, dtype=np.float64)[candidates[top]]
+        order = top[np.lexsort((-created, -scores[top]))][offset:wanted]
+        return total, [(KINDS[kinds[number]], self.ids[number], float(score))
+                       for number, score in zip(candidates[order].tolist(), scores[order].tolist())]
+
+
+# Global search index instance
+search_index = SearchIndex()
@@ -1,23 +1,46 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Form, Request, Query
+from fastapi.responses import StreamingResponse, FileResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from starlette.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import os
+import time
 import logging
 import asyncio
 import json
+import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
+ROOT_DIR = Path(__file__).parent
+# Load .env before importing local modules; several read their settings at import time
+load_dotenv(ROOT_DIR / '.env')
+
 # Import local modules
 from models import *
 from database import database
 from ai_service import ai_service
-
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from admission_control import AdmissionControlMiddleware, admission_controller
+from storage import (media_storage, media_kind, iter_multipart, parse_range_header, MediaTooLargeError,
+                     InvalidRangeError, InvalidMultipartError)
+from media_processing import media_processor
+from metrics import registry, MetricsMiddleware, CACHE_REQUESTS, ALERT_RECIPIENTS, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import TracingMiddleware, trace_exporter
+from profiler import profiler, ProfilerMiddleware, ProfilerBusyError
+from response_cache import response_cache
+from alert_targeting import user_locations, apply_alert_defaults
+from alert_expiry import alert_sweeper
+from search_index import search_index, tokenize, highlight
+from hotspots import hotspot_engine, HotspotAlerter
+from incidents import incident_clusterer
+from report_dedup import report_deduplicator
+from language_id import language_identifier, mentions_hazard
+from reverse_geocoder import reverse_geocoder
+from gazetteer import place_extractor
+from analysis_scheduler import analysis_scheduler, priority_scorer, priority_band
+from analysis_workers import analysis_workers
 
 # Security
 security = HTTPBearer()
@@ -25,15 +48,79 @@ security = HTTPBearer()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    timings = {}
+    startup_started = time.perf_counter()
+
+    phase_started = time.perf_counter()
     await database.connect_to_mongo()
+    timings["connect"] = time.perf_counter() - phase_started
     print("Connected to MongoDB")
-    
-    # Initialize some mock data
-    await initialize_mock_data()
+
+    phase_started = time.perf_counter()
+    await database.create_indexes()
+    timings["indexes"] = time.perf_counter() - phase_started
+
+    phase_started = time.perf_counter()
+    await user_locations.load(database)
+    timings["user_locations"] = time.perf_counter() - phase_started
+
+    phase_started = time.perf_counter()
+    reverse_geocoder.load()
+    place_extractor.load()
+    timings["geocoding"] = time.perf_counter() - phase_started
+
+    phase_started = time.perf_counter()
+    await incident_clusterer.load(database)
+    await report_deduplicator.load(database)
+    timings["incidents"] = time.perf_counter() - phase_started
+
+    phase_started = time.perf_counter()
+    await media_processor.start()
+    await trace_exporter.start()
+    await alert_sweeper.start()
+    await analysis_scheduler.start()
+    await ai_service.surge.start()
+    await analysis_workers.start(database, analyze=analyze_posts)
+    # Large collections take a while to index; searches return partial results meanwhile
+    await search_index.start(database)
+    await hotspot_engine.start(database, on_hotspots=raise_hotspot_alerts)
+    timings["background_workers"] = time.perf_counter() - phase_started
+
+    # Optionally pay the LLM SDK import/client cost before the first request
+    if os.environ.get("AI_WARMUP", "false").lower() in ("1", "true", "yes"):
+        phase_started = time.perf_counter()
+        try:
+            await ai_service.warm_up()
+        except Exception as e:
+            logger.error(f"AI warm-up failed: {e}")
+        timings["ai_warmup"] = time.perf_counter() - phase_started
+
+    # Seed demo data only when explicitly requested
+    if os.environ.get("SEED_MOCK_DATA", "false").lower() in ("1", "true", "yes"):
+        phase_started = time.perf_counter()
+        phase = "seed"
+        try:
+            await initialize_mock_data()
+        except Exception:
+            phase = "seed_failed"  # logged by initialize_mock_data; the app still starts
+        timings[phase] = time.perf_counter() - phase_started
+
+    timings["total"] = time.perf_counter() - startup_started
+    logger.info("Startup timings: " + ", ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in timings.items()))
     
     yield
     
     # Shutdown
+    await media_processor.stop()
+    await trace_exporter.stop()
+    await alert_sweeper.stop()
+    await analysis_workers.stop()
+    await ai_service.surge.stop()
+    await analysis_scheduler.stop()
+    await search_index.stop()
+    await hotspot_engine.stop()
+    # Cached bodies were keyed on this connection's collection versions
+    response_cache.clear()
     await database.close_mongo_connection()
     print("Disconnected from MongoDB")
 
@@ -43,6 +130,9 @@ app = FastAPI(lifespan=lifespan, title="Ocean Hazard Reporting Platform", versio
 # Create API router
 api_router = APIRouter(prefix="/api")
 
+# Configure admission control (added before CORS so rejections still carry CORS headers)
+app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -52,6 +142,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route latency for everything, including shed requests
+app.add_middleware(MetricsMiddleware)
+
+# Trace every request; send X-Debug-Timing: 1 for a Server-Timing breakdown
+app.add_middleware(TracingMiddleware, exporter=trace_exporter)
+
+# Counts requests for request-bounded profiling sessions (no-op while idle)
+app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -61,20 +160,18 @@ logger = logging.getLogger(__name__)
 
 # Initialize mock data
 async def initialize_mock_data():
-    """Initialize the system with mock data for demonstration"""
+    """Initialize the system with mock data for demonstration.
+
+    Every document is upserted on its natural key, so repeated boots are no-ops.
+    """
     try:
-        # Create admin user if not exists
-        admin_user = await database.get_user_by_username("admin")
-        if not admin_user:
-            admin = User(
-                username="admin",
-                email="admin@oceanhazard.com",
-                role=UserRole.ADMIN,
-                full_name="System Administrator",
-                verified=True
-            )
-            await database.create_user(admin)
-            print("Created admin user")
+        admin = User(
+            username="admin",
+            email="admin@oceanhazard.com",
+            role=UserRole.ADMIN,
+            full_name="System Administrator",
+            verified=True
+        )
 
         # Create some mock social media posts
         mock_posts = [
@@ -113,11 +210,6 @@ async def initialize_mock_data():
             )
         ]
 
-        for post in mock_posts:
-            try:
-                await database.create_social_media_post(post)
-            except:
-                pass  # Skip if already exists
 
         # Create some mock hazard reports
         mock_reports = [
@@ -147,16 +239,17 @@ async def initialize_mock_data():
             )
         ]
 
-        for report in mock_reports:
-            try:
-                await database.create_hazard_report(report)
-            except:
-                pass  # Skip if already exists
+        users_added, posts_added, reports_added = await asyncio.gather(
+            database.bulk_upsert("users", [admin.dict()], ["username"]),
+            database.bulk_upsert("social_media_posts", [post.dict() for post in mock_posts], ["platform", "post_id"]),
+            database.bulk_upsert("hazard_reports", [report.dict() for report in mock_reports], ["reporter_id", "title"])
+        )
 
-        print("Mock data initialized successfully")
+        print(f"Mock data initialized: {users_added} users, {posts_added} posts, {reports_added} reports added")
         
-    except Exception as e:
-        print(f"Error initializing mock data: {e}")
+    except Exception:
+        logger.exception("Error initializing mock data")
+        raise
 
 # Authentication dependency (simplified for demo)
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -216,6 +309,60 @@ async def login_user(login_data: UserLogin):
         "user": user
     }
 
+@api_router.put("/users/me/location", response_model=User)
+async def update_my_location(
+    location_data: UserLocationUpdate,
+    current_user: User = Depends(get_current_user)
+):
+    """Register home and/or current location; area alerts are matched against them"""
+    user = await database.update_user_location(
+        current_user, location_data.home_location, location_data.current_location
+    )
+    user_locations.set_user(user.id, user.home_location, user.current_location)
+    return user
+
+async def publish_alert(alert: Alert) -> Alert:
+    """Store an alert with default area and lifetime, counting the users inside its area"""
+    apply_alert_defaults(alert)
+    recipients = user_locations.recipients(alert)
+    if recipients is not None:
+        alert.metadata["recipient_count"] = len(recipients)
+        ALERT_RECIPIENTS.labels(alert.alert_type).observe(len(recipients))
+    return await database.create_alert(alert)
+
+hotspot_alerter = HotspotAlerter.from_env()
+
+async def raise_hotspot_alerts(hotspots):
+    """Alert officials about hotspots strong enough to act on, once per area per cooldown"""
+    for hotspot in hotspot_alerter.select(hotspots):
+        if hotspot.score >= hotspot_alerter.min_score * 4:
+            severity = HazardSeverity.CRITICAL
+        elif hotspot.score >= hotspot_alerter.min_score * 2:
+            severity = HazardSeverity.HIGH
+        else:
+            severity = HazardSeverity.MEDIUM
+        hazard_label = hotspot.dominant_hazard.replace("_", " ")
+        location = reverse_geocoder.fill(Location(latitude=hotspot.latitude, longitude=hotspot.longitude))
+        place = location.city or location.district
+        alert = Alert(
+            title=f"Hazard hotspot: {hazard_label}",
+            message=(f"{hotspot.points} reports and posts about {hazard_label} clustered within "
+                     f"{hotspot.radius_km:.0f} km of {place + ' ' if place else ''}"
+                     f"({hotspot.latitude:.3f}, {hotspot.longitude:.3f})."),
+            alert_type="hotspot",
+            severity=severity,
+            location=location,
+            affected_area_radius=max(hotspot.radius_km, 10.0),
+            source_type="hotspot_engine",
+            source_id=f"{hotspot.latitude:.3f},{hotspot.longitude:.3f}",
+            target_roles=[UserRole.OFFICIAL, UserRole.ADMIN],
+            metadata={"hotspot": hotspot.to_dict()}
+        )
+        # Other replicas, and this one before a restart, may have alerted on the area already
+        if await database.claim_alert_area(alert.id, alert.alert_type, location, hotspot.radius_km,
+                                           hotspot_alerter.cooldown) is None:
+            await publish_alert(alert)
+
 # Hazard report endpoints
 @api_router.post("/reports", response_model=HazardReport)
 async def create_report(
@@ -232,28 +379,64 @@ async def create_report(
         reporter_id=current_user.id,
         reporter_name=current_user.full_name,
         contact_info=report_data.contact_info,
-        language=report_data.language,
+        language=language_identifier.resolve(f"{report_data.title} {report_data.description}", report_data.language),
         tags=report_data.tags
     )
     
+    if report_data.media_ids:
+        new_report.media_files = await database.get_media_files(report_data.media_ids)
+        missing = set(report_data.media_ids) - {media.id for media in new_report.media_files}
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Unknown media ids: {', '.join(sorted(missing))}")
+    
+    # A near-copy of a recent nearby report corroborates it instead of being
+    # analyzed and alerted on again. Match and register before any await so
+    # concurrent duplicates find the canonical report.
+    canonical = report_deduplicator.match(new_report)
+    if canonical is not None:
+        report_deduplicator.attach(canonical, new_report)
+        new_report.duplicate_of = canonical.id
+        new_report.ai_analysis = canonical.ai_analysis
+    else:
+        canonical = report_deduplicator.add(new_report)
+    
     # Perform AI analysis on the report
-    try:
-        ai_analysis = await ai_service.analyze_text_for_hazards(
-            f"{report_data.title} {report_data.description}",
-            report_data.language
-        )
-        new_report.ai_analysis = ai_analysis.dict()
-    except Exception as e:
-        logger.error(f"AI analysis failed: {e}")
+    if new_report.duplicate_of is None:
+        try:
+            ai_analysis = await analysis_scheduler.submit(
+                lambda: ai_service.analyze_text_for_hazards(
+                    f"{report_data.title} {report_data.description}",
+                    new_report.language
+                ),
+                priority_scorer.score_report(new_report)
+            )
+            new_report.ai_analysis = canonical.ai_analysis = ai_analysis.dict()
+        except Exception as e:
+            logger.error(f"AI analysis failed: {e}")
+        # Duplicates that arrived during the analysis are already counted here
+        new_report.corroboration_count = canonical.corroboration_count
     
     created_report = await database.create_hazard_report(new_report)
+    if created_report.media_files:
+        await media_processor.check_report_media(created_report)
+    if new_report.duplicate_of is None:
+        if canonical.corroboration_count and canonical.ai_analysis is not None:
+            # Duplicates stored while this report was analyzed copied no analysis
+            await database.update_report_duplicates(canonical.id, {"ai_analysis": canonical.ai_analysis})
+    else:
+        await database.record_corroboration(canonical.id, canonical.corroboration_count)
+        if created_report.ai_analysis is None and canonical.ai_analysis is not None:
+            # The canonical's analysis finished while this duplicate was being stored
+            created_report.ai_analysis = canonical.ai_analysis
+            await database.update_hazard_report(created_report.id, {"ai_analysis": canonical.ai_analysis})
     
-    # Generate alert if high severity
-    if report_data.severity in [HazardSeverity.HIGH, HazardSeverity.CRITICAL]:
+    # Generate alert if high severity, once per canonical report and its duplicates
+    if report_data.severity in [HazardSeverity.HIGH, HazardSeverity.CRITICAL] and not canonical.alerted:
+        canonical.alerted = True
         alert_message = await ai_service.generate_alert_message(
             report_data.hazard_type,
             report_data.severity,
-            report_data.location.city or "Unknown location"
+            new_report.location.city or new_report.location.district or "Unknown location"
         )
         
         alert = Alert(
@@ -261,17 +444,18 @@ async def create_report(
             message=alert_message,
             alert_type="hazard_detected",
             severity=report_data.severity,
-            location=report_data.location,
+            location=new_report.location,
             source_type="citizen_report",
-            source_id=created_report.id,
+            source_id=canonical.id,
             target_roles=[UserRole.OFFICIAL, UserRole.ADMIN]
         )
-        await database.create_alert(alert)
+        await publish_alert(alert)
     
     return created_report
 
 @api_router.get("/reports", response_model=List[HazardReport])
 async def get_reports(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     hazard_type: Optional[HazardType] = None,
@@ -287,8 +471,11 @@ async def get_reports(
     if status:
         filters["status"] = status.value
     
-    reports = await database.get_hazard_reports(skip, limit, filters)
-    return reports
+    return await response_cache.respond(
+        request, "reports", ["hazard_reports"],
+        {"skip": skip, "limit": limit, **filters},
+        lambda: database.get_hazard_reports(skip, limit, filters)
+    )
 
 @api_router.get("/reports/{report_id}", response_model=HazardReport)
 async def get_report(report_id: str, current_user: User = Depends(get_current_user)):
@@ -314,7 +501,40 @@ async def verify_report(
     if not success:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return {"message": "Report verified successfully"}
+    # Verifying a canonical report verifies the duplicates that corroborate it
+    duplicates_verified = await database.update_report_duplicates(report_id, update_data)
+    
+    return {"message": "Report verified successfully", "duplicates_verified": duplicates_verified}
+
+@api_router.get("/reports/{report_id}/duplicates", response_model=List[HazardReport])
+async def get_report_duplicates(
+    report_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Reports merged into this canonical report, oldest first"""
+    return await database.get_report_duplicates([report_id], limit)
+
+@api_router.get("/admin/reports/merged")
+async def get_merged_reports(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[ReportStatus] = None,
+    duplicates_per_report: int = Query(5, ge=0, le=50),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Canonical reports, most corroborated first, each with a sample of its duplicates"""
+    filters = {"status": status.value} if status else {}
+    reports = await database.get_merged_reports(skip, limit, filters)
+    corroborated = [report.id for report in reports if report.corroboration_count]
+    duplicates = {}
+    if corroborated and duplicates_per_report:
+        duplicates = await database.get_duplicate_samples(corroborated, duplicates_per_report)
+    return [
+        {"report": report, "corroboration_count": report.corroboration_count,
+         "duplicates": duplicates.get(report.id, [])}
+        for report in reports
+    ]
 
 @api_router.get("/reports/nearby/{latitude}/{longitude}")
 async def get_nearby_reports(
@@ -332,54 +552,286 @@ async def get_social_media_posts(
     skip: int = 0,
     limit: int = 50,
     platform: Optional[str] = None,
+    incident_id: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    posts = await database.get_social_media_posts(skip, limit, platform)
+    posts = await database.get_social_media_posts(skip, limit, platform, incident_id)
     return posts
 
-@api_router.post("/social-media/analyze")
-async def analyze_social_media_batch(admin_user: User = Depends(get_admin_user)):
-    """Analyze all unanalyzed social media posts"""
-    posts = await database.get_social_media_posts(limit=100)
-    analyzed_count = 0
-    
-    for post in posts:
-        if not post.ai_analysis:
-            try:
-                analysis = await ai_service.analyze_text_for_hazards(post.content)
-                analysis_dict = analysis.dict()
-                
-                # Update hazard relevance score
-                post.hazard_relevance_score = analysis.confidence_score if analysis.hazard_detected else 0.0
-                post.sentiment_score = analysis.sentiment_score
-                
-                await database.update_social_media_post_analysis(post.id, analysis_dict)
-                analyzed_count += 1
-                
-                # Create alert for high-confidence hazard detection
-                if analysis.hazard_detected and analysis.confidence_score > 0.7:
-                    alert = Alert(
-                        title="Social Media Hazard Detection",
-                        message=f"Potential hazard detected on {post.platform}: {post.content[:100]}...",
-                        alert_type="social_media_detection",
-                        severity=analysis.severity_prediction or HazardSeverity.MEDIUM,
-                        location=post.location,
-                        source_type="social_media",
-                        source_id=post.id,
-                        target_roles=[UserRole.OFFICIAL, UserRole.ADMIN]
+@api_router.get("/social-media/nearby/{latitude}/{longitude}", response_model=List[SocialMediaPost])
+async def get_nearby_posts(
+    latitude: float,
+    longitude: float,
+    radius: float = Query(10.0, gt=0, le=200),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    """Posts within ``radius`` km, whether they came with a location or were geotagged from their text"""
+    return await database.get_posts_near_location(latitude, longitude, radius, limit)
+
+async def settle_incident(incident: Incident, post_ids: Optional[List[str]],
+                          lease_owner: Optional[str] = None) -> Tuple[int, bool]:
+    """Copy an analyzed incident's result to its posts (all of them when ``post_ids`` is None,
+    only those still leased to ``lease_owner`` if given), locate it, alert once if it is a
+    confident hazard, and save it. Returns (posts updated, alerted)."""
+    analysis = AIAnalysisResult(**incident.ai_analysis)
+    # Incidents with no located post fall back to the place the analysis mentions
+    if incident.location is None and analysis.location_mentioned:
+        tag = place_extractor.geotag(analysis.location_mentioned, cue=True)
+        if tag is not None and tag.confidence >= place_extractor.min_confidence:
+            incident.location = reverse_geocoder.fill(tag.location)
+
+    analyzed = await database.apply_incident_analysis(
+        post_ids, incident.id, incident.ai_analysis,
+        analysis.confidence_score if analysis.hazard_detected else 0.0,
+        analysis.sentiment_score,
+        lease_owner
+    )
+
+    # One alert per high-confidence incident, however many posts it grows to and
+    # however many workers see it: the alert is claimed on the stored incident, then
+    # for the incident's area (its text, if unlocated), which replicas clustering on
+    # their own share
+    alerted = False
+    if analysis.hazard_detected and analysis.confidence_score > 0.7 and incident.alert_id is None:
+        platforms = ", ".join(sorted(incident.platforms))
+        alert = Alert(
+            title="Social Media Hazard Detection",
+            message=(f"Potential hazard reported in {incident.member_count} posts on {platforms}: "
+                     f"{incident.representative_text[:100]}..."),
+            alert_type="social_media_detection",
+            severity=analysis.severity_prediction or HazardSeverity.MEDIUM,
+            location=incident.location,
+            source_type="social_media",
+            source_id=incident.id,
+            target_roles=[UserRole.OFFICIAL, UserRole.ADMIN],
+            metadata={"incident_id": incident.id, "representative_post_id": incident.representative_post_id}
+        )
+        if await database.claim_incident_alert(incident.id, alert.id):
+            holder = None
+            if incident.location is not None:
+                holder = await database.claim_alert_area(alert.id, alert.alert_type, incident.location,
+                                                         incident_clusterer.radius_km, incident_clusterer.window)
+            else:
+                fingerprint = incident_clusterer.hasher.fingerprint(incident.representative_text)
+                if fingerprint is not None:
+                    holder = await database.claim_alert_text(
+                        alert.id, alert.alert_type, *fingerprint,
+                        incident_clusterer.min_unlocated_similarity, incident_clusterer.window)
+            if holder is None:
+                await publish_alert(alert)
+                incident.alert_id = alert.id
+                alerted = True
+            else:
+                # Another replica clustered the same posts into an incident of its own and alerted on it
+                incident.alert_id = holder
+        else:
+            stored = await database.get_incident_by_id(incident.id)
+            incident.alert_id = stored.alert_id if stored else None
+
+    await database.save_incident(incident)
+    return analyzed, alerted
+
+async def analyze_posts(posts: List[SocialMediaPost], lease_owner: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze posts, one AI call and at most one alert per incident.
+
+    Posts are first clustered into incidents (same time window, nearby, similar
+    text); each incident's representative post is analyzed once and the result
+    is copied to every member. Incidents are analyzed concurrently through the
+    analysis scheduler, most urgent first, and alert as soon as their own
+    analysis is done. Posts whose incident could not be analyzed stay
+    unanalyzed and rejoin it on the next run. With ``lease_owner`` results are
+    only written to posts still leased to it.
+    """
+    groups = incident_clusterer.assign_many(posts)
+    counts = {"analyzed_posts": 0, "ai_calls": 0, "prefiltered": 0, "alerts_raised": 0}
+    by_priority: Dict[str, int] = {}
+
+    async def analyze_incident(incident: Incident, members: List[SocialMediaPost]):
+        try:
+            if incident.ai_analysis is None:
+                # Posts without a single hazard keyword in their language skip the LLM
+                if mentions_hazard(incident.representative_text, incident.language):
+                    score = priority_scorer.score_posts(members, incident.location)
+                    band = priority_band(score).value
+                    by_priority[band] = by_priority.get(band, 0) + 1
+                    analysis = await analysis_scheduler.submit(
+                        lambda: ai_service.analyze_text_for_hazards(incident.representative_text, incident.language),
+                        score
                     )
-                    await database.create_alert(alert)
-                
-            except Exception as e:
-                logger.error(f"Failed to analyze post {post.id}: {e}")
-    
-    return {"analyzed_posts": analyzed_count}
+                    counts["ai_calls"] += 1
+                else:
+                    analysis = ai_service.prefiltered_result(incident.representative_text, incident.language)
+                    counts["prefiltered"] += 1
+                incident.ai_analysis = analysis.dict()
+                incident.hazard_type = analysis.hazard_types[0] if analysis.hazard_types else None
+                incident.severity = analysis.severity_prediction
+            analyzed, alerted = await settle_incident(incident, [post.id for post in members], lease_owner)
+            counts["analyzed_posts"] += analyzed
+            counts["alerts_raised"] += alerted
+        except Exception as e:
+            logger.error(f"Failed to analyze incident {incident.id} ({len(members)} posts): {e}")
+
+    await asyncio.gather(*(analyze_incident(incident, members) for incident, members in groups))
+    return {**counts, "incidents": len(groups), "ai_calls_by_priority": by_priority}
+
+@api_router.post("/social-media/analyze")
+async def analyze_social_media_batch(
+    limit: int = Query(100, ge=1, le=5000),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Lease and analyze up to ``limit`` of the oldest unanalyzed posts now.
+
+    Posts already leased by a background worker (here or in another replica)
+    are skipped, so this never analyzes a post twice.
+    """
+    owner = f"{analysis_workers.owner}:request-{uuid.uuid4().hex[:8]}"
+    posts = await analysis_workers.claim(owner, limit)
+    if not posts:
+        return {"analyzed_posts": 0, "ai_calls": 0, "prefiltered": 0, "alerts_raised": 0, "incidents": 0,
+                "ai_calls_by_priority": {}}
+    return await analysis_workers.run_batch(posts, owner)
+
+async def reanalyze_degraded(batch_size: int = 200) -> Dict[str, int]:
+    """Give reports and incidents analyzed by the surge-mode fallback a real LLM analysis.
+
+    Works newest first, a batch at a time through the analysis scheduler, and
+    stops early if surge mode comes back. Incidents that now turn out to be
+    confident hazards alert as usual; duplicates follow their canonical report.
+    """
+    counts = {"reports": 0, "incidents": 0, "alerts_raised": 0}
+
+    async def reanalyze_report(report: HazardReport):
+        analysis = await analysis_scheduler.submit(
+            lambda: ai_service.analyze_text_for_hazards(f"{report.title} {report.description}", report.language),
+            priority_scorer.score_report(report)
+        )
+        if analysis.degraded:
+            return
+        update = {"ai_analysis": analysis.dict()}
+        await database.update_hazard_report(report.id, update)
+        await database.update_report_duplicates(report.id, update)
+        canonical = report_deduplicator.canonical.get(report.id)
+        if canonical is not None:
+            canonical.ai_analysis = update["ai_analysis"]
+        counts["reports"] += 1
+
+    async def reanalyze_incident(stored: Incident):
+        # An incident still open in the clusterer is the copy new posts join
+        incident = incident_clusterer.incidents.get(stored.id, stored)
+        analysis = await analysis_scheduler.submit(
+            lambda: ai_service.analyze_text_for_hazards(incident.representative_text, incident.language),
+            priority_scorer.score_incident(incident)
+        )
+        if analysis.degraded:
+            return
+        incident.ai_analysis = analysis.dict()
+        incident.hazard_type = analysis.hazard_types[0] if analysis.hazard_types else None
+        incident.severity = analysis.severity_prediction
+        _, alerted = await settle_incident(incident, None)
+        counts["incidents"] += 1
+        counts["alerts_raised"] += alerted
+
+    while not ai_service.surge.active:
+        reports = await database.get_degraded_reports(batch_size)
+        incidents = await database.get_degraded_incidents(batch_size)
+        if not reports and not incidents:
+            break
+        done = counts["reports"] + counts["incidents"]
+        results = await asyncio.gather(*(reanalyze_report(report) for report in reports),
+                                       *(reanalyze_incident(incident) for incident in incidents),
+                                       return_exceptions=True)
+        for error in (result for result in results if isinstance(result, Exception)):
+            logger.error(f"Re-analysis failed: {error}")
+        if counts["reports"] + counts["incidents"] == done:
+            break
+    if any(counts.values()):
+        logger.info(f"Re-analyzed {counts['reports']} reports and {counts['incidents']} incidents after surge mode")
+    return counts
+
+reanalysis_task: Optional[asyncio.Task] = None
+
+def on_surge_change(mode: str):
+    """Once load subsides, re-analyze what surge mode only skimmed"""
+    global reanalysis_task
+    if mode == "normal" and (reanalysis_task is None or reanalysis_task.done()):
+        reanalysis_task = asyncio.create_task(reanalyze_degraded())
+
+ai_service.surge.on_change(on_surge_change)
+
+# Incident endpoints
+@api_router.get("/incidents", response_model=List[Incident])
+async def get_incidents(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """Social media incidents, most recently active first"""
+    return await response_cache.respond(
+        request, "incidents", ["incidents"], {"skip": skip, "limit": limit},
+        lambda: database.get_incidents(skip, limit)
+    )
+
+@api_router.get("/incidents/{incident_id}", response_model=Incident)
+async def get_incident(incident_id: str, current_user: User = Depends(get_current_user)):
+    incident = incident_clusterer.incidents.get(incident_id) or await database.get_incident_by_id(incident_id)
+    if not incident:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    return incident
 
 # Alert endpoints
 @api_router.get("/alerts", response_model=List[Alert])
-async def get_alerts(current_user: User = Depends(get_current_user)):
-    alerts = await database.get_active_alerts(current_user.role)
-    return alerts
+async def get_alerts(
+    request: Request,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    """Newest unexpired alerts covering the caller: the given point, else their registered location.
+
+    Callers with no known location only get alerts that are not tied to an area,
+    except officials and admins, who see every alert.
+    """
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(status_code=400, detail="latitude and longitude must be given together")
+    near = (latitude, longitude) if latitude is not None else user_locations.location_of(current_user.id)
+    if near is None and latitude is None:
+        # The location may have been registered through another process; seed this one's index
+        user = current_user
+        if user.current_location is None and user.home_location is None:
+            user = await database.get_user_by_id(current_user.id) or current_user
+        if user.current_location is not None or user.home_location is not None:
+            user_locations.set_user(user.id, user.home_location, user.current_location)
+            near = user_locations.location_of(user.id)
+    untargeted_only = near is None and current_user.role not in [UserRole.ADMIN, UserRole.OFFICIAL]
+    return await response_cache.respond(
+        request, "alerts", ["alerts"],
+        {"role": current_user.role, "near": near, "untargeted_only": untargeted_only, "limit": limit},
+        lambda: database.get_active_alerts(current_user.role, near, untargeted_only, limit)
+    )
+
+@api_router.get("/alerts/{alert_id}/recipients")
+async def get_alert_recipients(
+    alert_id: str,
+    limit: int = Query(1000, ge=0, le=100000),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Users whose home or current location is inside the alert's area"""
+    alert = await database.get_alert_by_id(alert_id)
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    recipients = user_locations.recipients(alert)
+    if recipients is None:
+        return {"alert_id": alert_id, "targeted": False, "recipient_count": None, "user_ids": []}
+    return {
+        "alert_id": alert_id,
+        "targeted": True,
+        "radius_km": alert.affected_area_radius,
+        "recipient_count": len(recipients),
+        "user_ids": sorted(recipients)[:limit]
+    }
 
 @api_router.post("/alerts/{alert_id}/deactivate")
 async def deactivate_alert(
@@ -391,11 +843,84 @@ async def deactivate_alert(
         raise HTTPException(status_code=404, detail="Alert not found")
     return {"message": "Alert deactivated successfully"}
 
+# Admission control stats
+@api_router.get("/admin/admission")
+async def get_admission_stats(admin_user: User = Depends(get_admin_user)):
+    """Show in-flight requests and what has been shed per priority class"""
+    return admission_controller.stats()
+
+# AI analysis scheduling
+@api_router.get("/admin/analysis/queue")
+async def get_analysis_queue(admin_user: User = Depends(get_admin_user)):
+    """Queued and running analysis jobs, with recent queue waits per priority band"""
+    return analysis_scheduler.stats()
+
+@api_router.get("/admin/analysis/leases")
+async def get_analysis_leases(admin_user: User = Depends(get_admin_user)):
+    """Posts waiting, leased (per worker), expired and failed across all replicas, plus this process's workers"""
+    return {"posts": await database.get_analysis_lease_stats(), "workers": analysis_workers.stats()}
+
+# Surge mode
+@api_router.get("/ai/status")
+async def get_ai_status(current_user: User = Depends(get_current_user)):
+    """Whether AI work is running normally or shed to local fallbacks, since when, and why"""
+    return ai_service.surge.status()
+
+@api_router.post("/admin/ai/reanalyze")
+async def reanalyze_degraded_results(
+    batch_size: int = Query(200, ge=1, le=2000),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Re-analyze surge-mode fallback results now rather than waiting for surge mode to end"""
+    if ai_service.surge.active:
+        raise HTTPException(status_code=409, detail="AI service is in surge mode")
+    return await reanalyze_degraded(batch_size)
+
+# Reverse geocoding
+@api_router.post("/admin/geocode/backfill")
+async def backfill_locations(admin_user: User = Depends(get_admin_user)):
+    """Geotag stored posts from their text, then fill city, district and state where missing"""
+    started = time.perf_counter()
+    geotagged = await database.geotag_posts()
+    updated = {
+        collection: await database.backfill_locations(collection)
+        for collection in ("hazard_reports", "social_media_posts")
+    }
+    return {"geotagged_posts": geotagged, "updated": updated, "seconds": round(time.perf_counter() - started, 3)}
+
+# Live profiling
+@api_router.post("/admin/profile")
+async def profile_worker(
+    seconds: float = 10.0,
+    requests: int = 0,
+    interval_ms: float = 5.0,
+    include_idle: bool = False,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Sample this worker for N seconds (or until N requests finish) and return collapsed stacks"""
+    if not 0 < seconds <= 300:
+        raise HTTPException(status_code=400, detail="seconds must be between 0 and 300")
+    try:
+        collapsed, summary = await profiler.profile(seconds, requests, interval_ms, include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return Response(
+        collapsed,
+        media_type="text/plain",
+        headers={
+            "Content-Disposition": f"attachment; filename=profile-{os.getpid()}.collapsed",
+            "X-Profile-Summary": json.dumps(summary),
+        }
+    )
+
 # Dashboard endpoints
 @api_router.get("/dashboard/stats", response_model=DashboardStats)
-async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
-    stats = await database.get_dashboard_stats()
-    return stats
+async def get_dashboard_stats(request: Request, current_user: User = Depends(get_current_user)):
+    return await response_cache.respond(
+        request, "dashboard_stats", ["hazard_reports", "alerts", "social_media_posts", "users"], {},
+        database.get_dashboard_stats
+    )
 
 @api_router.get("/dashboard/trends")
 async def get_trend_analysis(
@@ -410,8 +935,9 @@ async def get_trend_analysis(
     )
     social_posts = await database.get_social_media_posts(limit=200)
     
-    # Generate AI-powered trend analysis
-    trends = await ai_service.generate_trend_analysis(reports, social_posts)
+    # Generate AI-powered trend analysis, grounded in the computed hotspots
+    hotspots = [hotspot.to_dict() for hotspot in hotspot_engine.hotspots(limit=10)]
+    trends = await ai_service.generate_trend_analysis(reports, social_posts, hotspots)
     
     return {
         "analysis_period_days": days,
@@ -422,9 +948,25 @@ async def get_trend_analysis(
         "trends": trends
     }
 
+@api_router.get("/hotspots")
+async def get_hotspots(
+    limit: int = Query(20, ge=1, le=200),
+    hazard_type: Optional[HazardType] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Ranked spatio-temporal hotspots over the engine's sliding window"""
+    hotspots = hotspot_engine.hotspots(limit=limit, hazard_type=hazard_type.value if hazard_type else None)
+    return {
+        "generated_at": datetime.utcnow(),
+        "window_hours": hotspot_engine.window_seconds / 3600,
+        "half_life_hours": hotspot_engine.half_life_seconds / 3600,
+        "hotspots": [hotspot.to_dict() for hotspot in hotspots]
+    }
+
 # Map data endpoints
 @api_router.get("/map/hazards")
 async def get_map_hazards(
+    request: Request,
     hazard_type: Optional[HazardType] = None,
     severity: Optional[HazardSeverity] = None,
     current_user: User = Depends(get_current_user)
@@ -436,6 +978,12 @@ async def get_map_hazards(
     if severity:
         filters["severity"] = severity.value
     
+    return await response_cache.respond(
+        request, "map_hazards", ["hazard_reports"], filters,
+        lambda: map_hazard_features(filters)
+    )
+
+async def map_hazard_features(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
     reports = await database.get_hazard_reports(limit=500, filters=filters)
     
     # Format for map display
@@ -452,6 +1000,8 @@ async def get_map_hazards(
             "longitude": report.location.longitude,
             "address": report.location.address,
             "city": report.location.city,
+            "district": report.location.district,
+            "state": report.location.state,
             "created_at": report.created_at.isoformat(),
             "reporter_name": report.reporter_name,
             "tags": report.tags
@@ -459,6 +1009,108 @@ async def get_map_hazards(
     
     return map_data
 
+@api_router.get("/map/posts")
+async def get_map_posts(
+    request: Request,
+    platform: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Located social media posts formatted for map display, newest first"""
+    filters = {"platform": platform} if platform else {}
+    return await response_cache.respond(
+        request, "map_posts", ["social_media_posts"], filters,
+        lambda: map_post_features(filters)
+    )
+
+async def map_post_features(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    posts = await database.get_located_social_media_posts(limit=500, filters=filters)
+    return [
+        {
+            "id": post.id,
+            "platform": post.platform,
+            "content": post.content[:200] + "..." if len(post.content) > 200 else post.content,
+            "latitude": post.location.latitude,
+            "longitude": post.location.longitude,
+            "place": post.location.address or post.location.city or post.location.district,
+            "state": post.location.state,
+            "location_source": post.location_source or "reported",
+            "location_confidence": post.location_confidence,
+            "hazard_relevance_score": post.hazard_relevance_score,
+            "incident_id": post.incident_id,
+            "created_at": post.created_at.isoformat(),
+        }
+        for post in posts
+    ]
+
+# Search endpoint
+@api_router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = Query(None, alias="type", pattern="^(report|post)$"),
+    hazard_type: Optional[HazardType] = None,
+    severity: Optional[HazardSeverity] = None,
+    platform: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    """Ranked full-text search over report titles/descriptions and post content.
+
+    hazard_type and severity restrict results to reports, platform to posts.
+    The index is per process: documents written through other processes are
+    searchable after its next refresh (SEARCH_REFRESH_SECONDS).
+    """
+    started = time.perf_counter()
+    total, hits = search_index.search(
+        q, kind=kind, hazard_type=hazard_type, severity=severity, platform=platform,
+        since=since, until=until, limit=limit, offset=offset
+    )
+    reports, posts = await asyncio.gather(
+        database.get_hazard_reports_by_ids([doc_id for hit_kind, doc_id, _ in hits if hit_kind == "report"]),
+        database.get_social_media_posts_by_ids([doc_id for hit_kind, doc_id, _ in hits if hit_kind == "post"])
+    )
+    documents = {document.id: document for document in [*reports, *posts]}
+    terms = set(tokenize(q))
+    
+    results = []
+    for hit_kind, doc_id, score in hits:
+        document = documents.get(doc_id)
+        if document is None:
+            continue
+        if hit_kind == "report":
+            results.append({
+                "type": "report",
+                "id": document.id,
+                "score": round(score, 4),
+                "title": highlight(document.title, terms, width=len(document.title) + 1)[0],
+                "snippet": highlight(document.description, terms)[0],
+                "hazard_type": document.hazard_type.value,
+                "severity": document.severity.value,
+                "status": document.status.value,
+                "city": document.location.city,
+                "created_at": document.created_at.isoformat()
+            })
+        else:
+            results.append({
+                "type": "post",
+                "id": document.id,
+                "score": round(score, 4),
+                "snippet": highlight(document.content, terms)[0],
+                "platform": document.platform,
+                "author_handle": document.author_handle,
+                "created_at": document.created_at.isoformat()
+            })
+    
+    return {
+        "query": q,
+        "total": total,
+        "index_ready": search_index.ready,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results
+    }
+
 # Translation endpoint
 @api_router.post("/translate")
 async def translate_text(
@@ -466,27 +1118,160 @@ async def translate_text(
     target_language: str = Form(...),
     current_user: User = Depends(get_current_user)
 ):
+    degraded = ai_service.surge.active
     translated = await ai_service.translate_text(text, target_language)
-    return {"translated_text": translated}
+    return {"translated_text": translated, "degraded": degraded}
+
+# File upload endpoint
+UPLOAD_FIELD_MAX_BYTES = 4096
+# Room for the multipart boundaries, part headers and small form fields around the file
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+async def check_report_owner(report_id: str, current_user: User):
+    report = await database.get_hazard_report_by_id(report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if report.reporter_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.OFFICIAL]:
+        raise HTTPException(status_code=403, detail="Not allowed to attach media to this report")
 
-# File upload endpoint (simplified)
-@api_router.post("/upload")
+@api_router.post("/upload", response_model=MediaFile)
 async def upload_file(
-    file: UploadFile = File(...),
+    request: Request,
+    report_id: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user)
 ):
-    # For demo purposes, just return file info
-    # In production, save to cloud storage
-    return {
-        "filename": file.filename,
-        "content_type": file.content_type,
-        "size": file.size,
-        "message": "File upload functionality - would save to cloud storage in production"
+    """Store an uploaded photo/video, deduplicated by SHA-256, optionally attaching it to a report.
+
+    The multipart body (one ``file`` part, plus an optional ``report_id`` field
+    if not given in the query) is parsed as it arrives and the file streamed to
+    storage while it is hashed, so nothing is spooled first. Bodies declaring
+    more than MEDIA_MAX_BYTES are refused before they are read.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > media_storage.max_bytes + UPLOAD_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {media_storage.max_bytes} bytes")
+    if report_id:
+        await check_report_owner(report_id, current_user)
+
+    fields: Dict[str, str] = {}
+    stored, filename, content_type = None, None, None
+    try:
+        events = iter_multipart(request.stream(), request.headers.get("content-type"))
+
+        async def part_body():
+            async for kind, chunk in events:
+                if kind == "end":
+                    return
+                yield chunk
+
+        async for kind, value in events:
+            if kind != "part":
+                continue
+            name, part_filename, part_type = value
+            if part_filename is None:
+                data = b""
+                async for chunk in part_body():
+                    data += chunk
+                    if len(data) > UPLOAD_FIELD_MAX_BYTES:
+                        raise HTTPException(status_code=400, detail=f"Form field {name!r} is too long")
+                fields[name] = data.decode("utf-8", "replace")
+            elif name != "file" or stored is not None:
+                raise HTTPException(status_code=400, detail="Expected a single 'file' part")
+            else:
+                filename, content_type = part_filename, part_type
+                stored = await media_storage.store_stream(part_body())
+    except InvalidMultipartError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except MediaTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if stored is None:
+        raise HTTPException(status_code=400, detail="Missing 'file' part")
+    sha256, size, created = stored
+    CACHE_REQUESTS.labels("media_blob", "miss" if created else "hit").inc()
+
+    if not report_id and fields.get("report_id"):
+        report_id = fields["report_id"]
+        await check_report_owner(report_id, current_user)
+
+    file_type = media_kind(content_type)
+    media = MediaFile(
+        filename=filename or sha256,
+        file_type=file_type,
+        file_path=str(media_storage.blob_path(sha256).relative_to(media_storage.root)),
+        file_size=size,
+        content_type=content_type,
+        sha256=sha256,
+        uploaded_by=current_user.id,
+        processing_status="queued" if file_type == "image" else None
+    )
+    await database.create_media_file(media)
+
+    if report_id:
+        await database.attach_media_to_report(report_id, [media])
+
+    # Thumbnails, EXIF and perceptual hashing run on the process pool; the EXIF
+    # location is checked against every report the media is attached to by then
+    if file_type == "image":
+        media_processor.enqueue(media.id, sha256)
+
+    return media
+
+@api_router.get("/media/{media_id}")
+async def get_media(
+    media_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Serve a stored media file, honouring single-range Range requests"""
+    media = await database.get_media_file(media_id)
+    if not media or not media.sha256 or not media_storage.exists(media.sha256):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    size = media.file_size or 0
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{media.sha256}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
     }
+    try:
+        byte_range = parse_range_header(request.headers.get("range"), size)
+    except InvalidRangeError:
+        raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(max(0, end - start + 1))
+
+    return StreamingResponse(
+        media_storage.iter_range(media.sha256, start, end),
+        status_code=status_code,
+        media_type=media.content_type or "application/octet-stream",
+        headers=headers
+    )
+
+@api_router.get("/media/{media_id}/thumbnail/{size}")
+async def get_media_thumbnail(
+    media_id: str,
+    size: str,
+    current_user: User = Depends(get_current_user)
+):
+    media = await database.get_media_file(media_id)
+    if not media or size not in media.thumbnails:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    return FileResponse(media_storage.root / media.thumbnails[size], media_type="image/jpeg")
 
 # Include router in app
 app.include_router(api_router)
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -0,0 +1,195 @@
+import os
+import re
+import uuid
+import asyncio
+import hashlib
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple
+from multipart.multipart import MultipartParser, parse_options_header
+from multipart.exceptions import MultipartParseError
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class MediaTooLargeError(Exception):
+    pass
+
+
+class InvalidRangeError(Exception):
+    pass
+
+
+class InvalidMultipartError(Exception):
+    pass
+
+
+class MediaStorage:
+    """Content-addressed local media store.
+
+    Blobs live at ``<root>/<sha[:2]>/<sha[2:4]>/<sha>`` so identical uploads are
+    stored once no matter how many reports reference them.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 100 * 1024 * 1024):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> "MediaStorage":
+        default_root = Path(__file__).parent / "media"
+        return cls(
+            root=os.environ.get("MEDIA_STORAGE_DIR", str(default_root)),
+            max_bytes=int(os.environ.get("MEDIA_MAX_BYTES", str(100 * 1024 * 1024))),
+        )
+
+    def blob_path(self, sha256: str) -> Path:
+        if not re.fullmatch(r"[0-9a-f]{64}", sha256):
+            raise ValueError("Invalid content hash")
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self.blob_path(sha256).is_file()
+
+    async def store_stream(self, chunks: AsyncIterator[bytes]) -> Tuple[str, int, bool]:
+        """Stream chunks to disk while hashing them.
+
+        Returns (sha256, size, created) where ``created`` is False when an
+        identical blob was already stored.
+        """
+        loop = asyncio.get_running_loop()
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.tmp_dir / uuid.uuid4().hex
+        digest = hashlib.sha256()
+        size = 0
+
+        handle = await loop.run_in_executor(None, open, tmp_path, "wb")
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise MediaTooLargeError(f"File exceeds {self.max_bytes} bytes")
+                digest.update(chunk)
+                await loop.run_in_executor(None, handle.write, chunk)
+        except BaseException:
+            handle.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        handle.close()
+
+        sha256 = digest.hexdigest()
+        created = await loop.run_in_executor(None, self._commit, tmp_path, sha256)
+        return sha256, size, created
+
+    def _commit(self, tmp_path: Path, sha256: str) -> bool:
+        target = self.blob_path(sha256)
+        if target.exists():
+            tmp_path.unlink(missing_ok=True)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+        return True
+
+    def iter_range(self, sha256: str, start: int, end: int) -> Iterator[bytes]:
+        """Yield bytes [start, end] inclusive from a stored blob"""
+        with open(self.blob_path(sha256), "rb") as handle:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = handle.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range. Returns None when the whole file is wanted"""
+    if not header:
+        return None
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header)
+    if not match or (not match.group(1) and not match.group(2)):
+        raise InvalidRangeError(header)
+
+    first, last = match.group(1), match.group(2)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise InvalidRangeError(header)
+        start = max(0, size - length)
+        end = size - 1
+
+    if start >= size or start > end:
+        raise InvalidRangeError(header)
+    return start, end
+
+
+async def iter_multipart(chunks: AsyncIterator[bytes], content_type: Optional[str]) -> AsyncIterator[Tuple[str, Any]]:
+    """Parse a multipart/form-data body as it arrives, without spooling it.
+
+    Yields ("part", (name, filename, content_type)) when a part starts, then
+    ("data", bytes) for its body as it streams in, then ("end", None).
+    """
+    media_type, options = parse_options_header(content_type or "")
+    boundary = options.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise InvalidMultipartError("Expected a multipart/form-data body")
+
+    events = deque()
+    headers = {}
+    header_field, header_value = bytearray(), bytearray()
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        events.append(("part", (disposition.get(b"name", b"").decode("utf-8", "replace"),
+                                filename.decode("utf-8", "replace") if filename is not None else None,
+                                headers.get(b"content-type", b"").decode("latin-1") or None)))
+        headers.clear()
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": lambda data, start, end: events.append(("data", bytes(data[start:end]))),
+        "on_part_end": lambda: events.append(("end", None)),
+    })
+    try:
+        async for chunk in chunks:
+            parser.write(chunk)
+            while events:
+                yield events.popleft()
+        parser.finalize()
+    except MultipartParseError as e:
+        raise InvalidMultipartError(str(e))
+    while events:
+        yield events.popleft()
+
+
+def media_kind(content_type: Optional[str]) -> str:
+    """Map a MIME type to the MediaFile.file_type vocabulary"""
+    major = (content_type or "").split("/")[0]
+    return major if major in ("image", "video", "audio") else "other"
+
+
+# Global media storage instance
+media_storage = MediaStorage.from_env()
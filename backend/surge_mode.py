@@ -0,0 +1,196 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from metrics import registry, Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+AI_SURGE_MODE = registry.register(Gauge(
+    "ai_surge_mode", "1 while AIService is shedding LLM work, 0 otherwise"))
+AI_SURGE_SHED = registry.register(Counter(
+    "ai_surge_shed_total", "LLM calls replaced by a local fallback in surge mode", ["operation"]))
+
+NORMAL = "normal"
+SURGE = "surge"
+
+
+class SurgeMonitor:
+    """Decides when AIService should stop calling the LLM.
+
+    Surge mode switches on as soon as the analysis queue is deeper than
+    ``max_queue_depth``, or, over the last ``window_seconds`` of LLM calls (at
+    least ``min_calls`` of them), the p95 latency exceeds ``max_p95_seconds`` or
+    the error rate exceeds ``max_error_rate``. It switches off once none of
+    those has held for ``cooldown_seconds``, so a backlog that drains in a
+    burst of cheap fallbacks does not flap straight back to the LLM.
+    ``AI_SURGE_MODE=on|off`` pins the mode instead.
+
+    The mode is re-evaluated when read and, once ``start`` has run, every
+    ``check_interval`` in the background, so surge mode ends on time even when
+    no request asks for it.
+    """
+
+    def __init__(self, queue_depth: Callable[[], int] = lambda: 0, max_queue_depth: int = 200,
+                 max_p95_seconds: float = 15.0, max_error_rate: float = 0.3, window_seconds: float = 60.0,
+                 min_calls: int = 10, cooldown_seconds: float = 120.0, check_interval: float = 1.0,
+                 forced: Optional[str] = None):
+        self.queue_depth = queue_depth
+        self.max_queue_depth = max_queue_depth
+        self.max_p95_seconds = max_p95_seconds
+        self.max_error_rate = max_error_rate
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.check_interval = check_interval
+        self.forced = forced if forced in (NORMAL, SURGE) else None
+        self.mode = self.forced or NORMAL
+        self.changed_at = datetime.utcnow()
+        self.reason: Optional[str] = "forced" if self.forced else None
+        self.transitions = 0
+        self.shed: Dict[str, int] = {}
+        self._calls: Deque[Tuple[float, float, bool]] = deque()  # when, seconds, succeeded
+        self._checked_at = float("-inf")
+        self._calm_since: Optional[float] = None
+        self._listeners: List[Callable[[str], Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, queue_depth: Callable[[], int] = lambda: 0) -> "SurgeMonitor":
+        mode = os.environ.get("AI_SURGE_MODE", "auto").lower()
+        return cls(
+            queue_depth=queue_depth,
+            max_queue_depth=int(os.environ.get("AI_SURGE_QUEUE_DEPTH", "200")),
+            max_p95_seconds=float(os.environ.get("AI_SURGE_P95_SECONDS", "15")),
+            max_error_rate=float(os.environ.get("AI_SURGE_ERROR_RATE", "0.3")),
+            window_seconds=float(os.environ.get("AI_SURGE_WINDOW_SECONDS", "60")),
+            cooldown_seconds=float(os.environ.get("AI_SURGE_COOLDOWN_SECONDS", "120")),
+            forced={"on": SURGE, "off": NORMAL}.get(mode),
+        )
+
+    def on_change(self, listener: Callable[[str], Any]):
+        """Call ``listener(mode)`` whenever the mode flips"""
+        self._listeners.append(listener)
+
+    def record(self, seconds: float, succeeded: bool):
+        """Note one LLM call's latency and whether it raised"""
+        self._calls.append((time.monotonic(), seconds, succeeded))
+
+    def record_shed(self, operation: str):
+        self.shed[operation] = self.shed.get(operation, 0) + 1
+        AI_SURGE_SHED.labels(operation).inc()
+
+    @property
+    def active(self) -> bool:
+        """Whether to shed LLM work right now"""
+        self.refresh()
+        return self.mode == SURGE
+
+    def refresh(self):
+        """Re-evaluate the mode, at most every ``check_interval``"""
+        now = time.monotonic()
+        if self.forced is None and now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._evaluate(now)
+
+    async def start(self):
+        if self._task is None and self.forced is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Surge mode check failed: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    def _window(self, now: float) -> Tuple[int, Optional[float], Optional[float]]:
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            self._calls.popleft()
+        calls = len(self._calls)
+        if calls < self.min_calls:
+            return calls, None, None
+        latencies = sorted(seconds for _, seconds, _ in self._calls)
+        p95 = latencies[min(calls - 1, int(calls * 0.95))]
+        error_rate = sum(not succeeded for _, _, succeeded in self._calls) / calls
+        return calls, p95, error_rate
+
+    def _breaches(self, now: float) -> List[str]:
+        depth = self.queue_depth()
+        _, p95, error_rate = self._window(now)
+        breaches = []
+        if depth > self.max_queue_depth:
+            breaches.append(f"queue depth {depth} > {self.max_queue_depth}")
+        if p95 is not None and p95 > self.max_p95_seconds:
+            breaches.append(f"LLM p95 {p95:.1f}s > {self.max_p95_seconds:g}s")
+        if error_rate is not None and error_rate > self.max_error_rate:
+            breaches.append(f"LLM error rate {error_rate:.0%} > {self.max_error_rate:.0%}")
+        return breaches
+
+    def _evaluate(self, now: float):
+        breaches = self._breaches(now)
+        if breaches:
+            self._calm_since = None
+            if self.mode == NORMAL:
+                self._switch(SURGE, "; ".join(breaches))
+        elif self.mode == SURGE:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.cooldown_seconds:
+                self._switch(NORMAL, f"calm for {self.cooldown_seconds:g}s")
+
+    def _switch(self, mode: str, reason: str):
+        self.mode = mode
+        self.changed_at = datetime.utcnow()
+        self.reason = reason
+        self.transitions += 1
+        self._calm_since = None
+        if mode == SURGE:
+            # Calls made before the surge say nothing about when it is over
+            self._calls.clear()
+            logger.warning(f"AI service entered surge mode: {reason}")
+        else:
+            logger.info(f"AI service back to normal mode: {reason}")
+        for listener in self._listeners:
+            try:
+                listener(mode)
+            except Exception as e:
+                logger.error(f"Surge mode listener failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        active = self.active
+        calls, p95, error_rate = self._window(time.monotonic())
+        return {
+            "mode": self.mode,
+            "active": active,
+            "forced": self.forced is not None,
+            "changed_at": self.changed_at,
+            "reason": self.reason,
+            "transitions": self.transitions,
+            "calm_for_seconds": (round(time.monotonic() - self._calm_since, 1)
+                                 if self._calm_since is not None else None),
+            "current": {
+                "queue_depth": self.queue_depth(),
+                "llm_calls_in_window": calls,
+                "llm_p95_seconds": round(p95, 3) if p95 is not None else None,
+                "llm_error_rate": round(error_rate, 3) if error_rate is not None else None,
+            },
+            "thresholds": {
+                "queue_depth": self.max_queue_depth,
+                "llm_p95_seconds": self.max_p95_seconds,
+                "llm_error_rate": self.max_error_rate,
+                "window_seconds": self.window_seconds,
+                "cooldown_seconds": self.cooldown_seconds,
+            },
+            "shed": dict(self.shed),
+        }
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAX_SPANS_PER_TRACE = 1000
+DEBUG_HEADER = b"x-debug-timing"
+
+
+def _new_id(nbytes: int) -> str:
+    return f"{random.getrandbits(nbytes * 8):0{nbytes * 2}x}"
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    sampled: bool
+    spans: List[Span] = field(default_factory=list)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a span under the current trace. A no-op outside a traced request"""
+    trace = _current_trace.get()
+    if trace is None or len(trace.spans) >= MAX_SPANS_PER_TRACE:
+        yield None
+        return
+
+    record = Span(
+        trace_id=trace.trace_id,
+        span_id=_new_id(8),
+        parent_id=_current_span.get(),
+        name=name,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    token = _current_span.set(record.span_id)
+    try:
+        yield record
+    except BaseException as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        record.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.spans.append(record)
+
+
+def trace_async_methods(cls, component: str, exclude: Sequence[str] = ()):
+    """Wrap every public coroutine method of ``cls`` in a ``<component>.<method>`` span"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or name in exclude or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _traced(method, f"{component}.{name}"))
+    return cls
+
+
+def _traced(method, span_name: str):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        with span(span_name):
+            return await method(*args, **kwargs)
+    return wrapper
+
+
+class TraceExporter:
+    """Batches finished traces and appends them as OTLP/JSON lines to a local file"""
+
+    def __init__(self, path: Optional[str], sample_rate: float = 1.0, service_name: str = "ocean-hazard-api"):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self.dropped = 0
+        self._queue: "asyncio.Queue[Trace]" = asyncio.Queue(maxsize=10_000)
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "TraceExporter":
+        return cls(
+            path=os.environ.get("TRACE_EXPORT_PATH") or None,
+            sample_rate=float(os.environ.get("TRACE_SAMPLE_RATE", "1.0")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def export(self, trace: Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._flush(self._drain())
+
+    def _drain(self) -> List[Trace]:
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            batch.extend(self._drain())
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Trace]):
+        if not batch or not self.path:
+            return
+        lines = "".join(json.dumps(self._to_otlp(trace)) + "\n" for trace in batch)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._append, lines)
+        except OSError as e:
+            logger.error(f"Trace export failed: {e}")
+
+    def _append(self, lines: str):
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+    def _to_otlp(self, trace: Trace) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "ocean-hazard-tracing"},
+                    "spans": [s.to_otlp() for s in trace.spans],
+                }],
+            }]
+        }
+
+
+def _incoming_trace_id(headers: Dict[bytes, bytes]) -> Optional[str]:
+    """Accept a W3C traceparent header so callers can stitch our spans into theirs"""
+    traceparent = headers.get(b"traceparent", b"").decode("latin-1").split("-")
+    if len(traceparent) == 4 and len(traceparent[1]) == 32:
+        return traceparent[1]
+    return None
+
+
+def server_timing(trace: Trace) -> str:
+    """Summarise a trace as a Server-Timing header (total per span name)"""
+    totals: Dict[str, List[float]] = {}
+    for s in trace.spans:
+        totals.setdefault(s.name, []).append(s.duration_ms)
+    entries = []
+    for name, durations in totals.items():
+        metric = name.replace(" ", "_").replace("/", "_")
+        entries.append(f'{metric};dur={sum(durations):.2f};desc="{len(durations)}x"')
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    """Starts a trace per request; X-Debug-Timing: 1 returns a Server-Timing breakdown"""
+
+    def __init__(self, app, exporter: TraceExporter):
+        self.app = app
+        self.exporter = exporter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        debug = headers.get(DEBUG_HEADER, b"").lower() in (b"1", b"true")
+        trace = Trace(trace_id=_incoming_trace_id(headers) or _new_id(16),
+                      sampled=self.exporter.should_sample())
+        trace_token = _current_trace.set(trace)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                extra = [(b"x-trace-id", trace.trace_id.encode())]
+                if debug:
+                    extra.append((b"server-timing", server_timing(trace).encode()))
+                message = {**message, "headers": list(message.get("headers", [])) + extra}
+            await send(message)
+
+        try:
+            with span(f"{scope['method']} {scope['path']}"):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(trace_token)
+            if trace.sampled:
+                self.exporter.export(trace)
+
+
+# Global trace exporter instance
+trace_exporter = TraceExporter.from_env()
@@ -0,0 +1,110 @@
+import os
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteConcernError, WriteError
+from metrics import registry, Histogram
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = registry.register(Histogram(
+    "mongo_write_batch_documents", "Documents per insert_many flushed by the write buffer", ["collection"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500)))
+
+Pending = Tuple[Dict[str, Any], asyncio.Future]
+
+
+class WriteBuffer:
+    """Group commit for inserts: many callers, one insert_many per collection.
+
+    The first insert into an empty buffer starts a ``max_delay_ms`` timer;
+    whatever has arrived for that collection when it fires, or as soon as
+    ``max_documents`` are waiting, goes out as one unordered insert_many. Each
+    caller awaits its own document: it gets the same DuplicateKeyError or
+    WriteError insert_one would have raised for it, while the rest of the
+    batch is written. A failure of the whole command fails every caller in
+    the batch. Batches for a collection may overlap in flight.
+    """
+
+    def __init__(self, enabled: bool = False, max_documents: int = 100, max_delay_ms: float = 5.0):
+        self.enabled = enabled
+        self.max_documents = max_documents
+        self.max_delay = max_delay_ms / 1000
+        self._pending: Dict[str, List[Pending]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._collections: Dict[str, Any] = {}
+        self._flushes: set = set()
+        self.counters = {"documents": 0, "flushes": 0, "failed": 0}
+
+    @classmethod
+    def from_env(cls) -> "WriteBuffer":
+        return cls(
+            enabled=os.environ.get("DB_WRITE_BUFFER", "false").lower() in ("1", "true", "on"),
+            max_documents=int(os.environ.get("DB_WRITE_BUFFER_MAX_DOCUMENTS", "100")),
+            max_delay_ms=float(os.environ.get("DB_WRITE_BUFFER_MAX_DELAY_MS", "5")),
+        )
+
+    def __len__(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
+
+    async def insert(self, collection, document: Dict[str, Any]):
+        """Queue ``document`` for ``collection`` (a motor collection) and wait until it is written"""
+        future = asyncio.get_running_loop().create_future()
+        self._collections[collection.name] = collection
+        pending = self._pending.setdefault(collection.name, [])
+        pending.append((document, future))
+        if len(pending) >= self.max_documents:
+            self._flush(collection)
+        elif collection.name not in self._timers:
+            self._timers[collection.name] = asyncio.get_running_loop().call_later(
+                self.max_delay, self._flush, collection)
+        await future
+
+    def _flush(self, collection):
+        timer = self._timers.pop(collection.name, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(collection.name, [])
+        if batch:
+            task = asyncio.ensure_future(self._write(collection, batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, collection, batch: List[Pending]):
+        WRITE_BATCH_SIZE.labels(collection.name).observe(len(batch))
+        self.counters["flushes"] += 1
+        self.counters["documents"] += len(batch)
+        failures: Dict[int, Exception] = {}
+        try:
+            await collection.insert_many([document for document, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                error_type = DuplicateKeyError if error.get("code") == 11000 else WriteError
+                failures[error["index"]] = error_type(error.get("errmsg"), error.get("code"), error)
+            if e.details.get("writeConcernErrors"):
+                # Written, but not acknowledged as asked: nobody left in the batch can be told it is safe
+                concern = e.details["writeConcernErrors"][0]
+                for index in range(len(batch)):
+                    failures.setdefault(index, WriteConcernError(concern.get("errmsg"), concern.get("code"), concern))
+        except Exception as e:
+            logger.warning(f"Write buffer: insert_many of {len(batch)} documents into {collection.name} failed: {e}")
+            failures = {index: e for index in range(len(batch))}
+        self.counters["failed"] += len(failures)
+        for index, (_, future) in enumerate(batch):
+            if future.done():  # the caller was cancelled; its document was written anyway
+                continue
+            if index in failures:
+                future.set_exception(failures[index])
+            else:
+                future.set_result(None)
+
+    async def drain(self):
+        """Flush everything still waiting and wait for writes in flight, e.g. before disconnecting"""
+        for name in list(self._pending):
+            self._flush(self._collections[name])
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "max_documents": self.max_documents,
+                "max_delay_ms": self.max_delay * 1000, "waiting": len(self), **self.counters}
@@ -1,3 +1,4 @@
+import os
 import requests
 import sys
 import json
@@ -5,7 +6,7 @@ from datetime import datetime
 from typing import Dict, Any
 
 class OceanHazardAPITester:
-    def __init__(self, base_url="https://pdf-blueprint-3.preview.emergentagent.com"):
+    def __init__(self, base_url=os.environ.get("BACKEND_URL", "http://localhost:8001")):
         self.base_url = base_url
         self.api_url = f"{base_url}/api"
         self.headers = {
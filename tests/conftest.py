@@ -0,0 +1,39 @@
+import os
+import sys
+import contextlib
+
+import pytest
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(BACKEND))
+
+# Database.connect_to_mongo uses mongomock-motor for this scheme, as the benchmarks do
+os.environ.setdefault("MONGO_URL", "mongomock://localhost")
+os.environ.setdefault("DB_NAME", "ocean_hazard_test")
+os.environ.setdefault("SEED_MOCK_DATA", "false")
+os.environ.setdefault("HOTSPOT_REFRESH_SECONDS", "0")
+
+
+@contextlib.asynccontextmanager
+async def serve(admin: bool = False):
+    """The app with its lifespan run against a fresh in-memory database, and an httpx client for it"""
+    import httpx
+    import server
+    from models import User, UserRole
+
+    async with server.app.router.lifespan_context(server.app):
+        if admin:
+            server.app.dependency_overrides[server.get_admin_user] = lambda: User(
+                username="admin", email="admin@example.com", role=UserRole.ADMIN)
+        transport = httpx.ASGITransport(app=server.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                         headers={"Authorization": "Bearer test"}) as client:
+                yield client
+        finally:
+            server.app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def api():
+    return serve
@@ -0,0 +1,54 @@
+import asyncio
+
+from admission_control import AdmissionController, Priority, client_key
+
+
+def scope(peer, headers=None):
+    return {"client": (peer, 50000), "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()]}
+
+
+def test_bearer_tokens_do_not_pick_the_bucket():
+    shared = client_key(scope("203.0.113.5", {"authorization": "Bearer mock_jwt_token"}))
+    random = client_key(scope("203.0.113.5", {"authorization": "Bearer anything-at-all"}))
+    assert shared == random == "ip:203.0.113.5"
+    assert client_key(scope("203.0.113.6", {"authorization": "Bearer mock_jwt_token"})) != shared
+
+
+def test_forwarded_for_ignored_from_untrusted_peers():
+    controller = AdmissionController(trusted_proxies=["10.0.0.0/8"])
+    key = client_key(scope("203.0.113.5", {"x-forwarded-for": "198.51.100.1"}), controller.trusted_proxies)
+    assert key == "ip:203.0.113.5"
+
+
+def test_forwarded_for_from_trusted_proxy_uses_last_untrusted_hop():
+    controller = AdmissionController(trusted_proxies=["10.0.0.0/8"])
+    headers = {"x-forwarded-for": "1.2.3.4, 198.51.100.1, 10.0.0.7"}  # first hop is client-supplied
+    assert client_key(scope("10.0.0.2", headers), controller.trusted_proxies) == "ip:198.51.100.1"
+
+
+def test_buckets_are_per_client_and_priority():
+    controller = AdmissionController()
+    burst = int(controller.classes[Priority.LOW].burst)
+    assert all(controller.check_rate("ip:a", Priority.LOW) == 0 for _ in range(burst))
+    assert controller.check_rate("ip:a", Priority.LOW) > 0
+    assert controller.check_rate("ip:b", Priority.LOW) == 0
+    assert controller.check_rate("ip:a", Priority.CRITICAL) == 0
+
+
+def test_classify_routes():
+    controller = AdmissionController()
+    assert controller.classify("GET", "/api/alerts/active") == Priority.CRITICAL
+    assert controller.classify("GET", "/api/dashboard/trends") == Priority.LOW
+    assert controller.classify("GET", "/api/reports") == Priority.NORMAL
+
+
+def test_in_flight_limit_by_class():
+    async def main():
+        controller = AdmissionController(max_in_flight=2)
+        assert await controller.acquire(Priority.LOW)  # LOW may use half: one slot
+        assert not await controller.acquire(Priority.LOW)
+        assert await controller.acquire(Priority.CRITICAL)
+        await controller.release()
+        await controller.release()
+        assert controller.in_flight == 0
+    asyncio.run(main())
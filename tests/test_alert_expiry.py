@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from alert_expiry import AlertSweeper
+from database import Database
+from models import Alert
+
+
+def alert(expires_in_hours, active=True):
+    now = datetime.utcnow()
+    return Alert(title="t", message="m", alert_type="hazard_detected", severity="high",
+                 source_type="citizen_report", source_id="r", is_active=active,
+                 created_at=now - timedelta(hours=1), expires_at=now + timedelta(hours=expires_in_hours))
+
+
+async def connected() -> Database:
+    db = Database()
+    await db.connect_to_mongo()
+    await db.create_indexes()
+    return db
+
+
+def test_sweep_expires_and_archives_only_expired_alerts():
+    async def main():
+        db = await connected()
+        expired, live, switched_off = alert(-1), alert(5), alert(5, active=False)
+        for item in (expired, live, switched_off):
+            await db.create_alert(item)
+
+        result = await AlertSweeper(db, interval=0).sweep()
+        assert result == {"expired": 1, "archived": 1}
+        assert await db.db.alerts.count_documents({}) == 2
+        assert (await db.db.alert_history.find_one({"id": expired.id}))["archived_at"] is not None
+        # Deactivated by hand but not expired: still live and addressable
+        assert (await db.get_alert_by_id(switched_off.id)).is_active is False
+        assert [a.id for a in await db.get_active_alerts()] == [live.id]
+    asyncio.run(main())
+
+
+def test_archived_alerts_are_still_found_by_id():
+    async def main():
+        db = await connected()
+        old = alert(-2)
+        await db.create_alert(old)
+        await AlertSweeper(db, interval=0).sweep()
+        assert await db.db.alerts.count_documents({"id": old.id}) == 0
+        found = await db.get_alert_by_id(old.id)
+        assert found is not None and found.is_active is False
+        assert await db.deactivate_alert(old.id)
+        assert not await db.deactivate_alert("missing")
+    asyncio.run(main())
+
+
+def test_archive_batches_are_idempotent():
+    async def main():
+        db = await connected()
+        for _ in range(5):
+            await db.create_alert(alert(-1, active=False))
+        assert await db.archive_inactive_alerts(batch_size=2) == 2
+        assert await db.archive_inactive_alerts(batch_size=10) == 3
+        assert await db.archive_inactive_alerts(batch_size=10) == 0
+        assert await db.db.alert_history.count_documents({}) == 5
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import timedelta
+
+from alert_targeting import UserLocationIndex, alert_covers, apply_alert_defaults
+from models import Alert, HazardSeverity, Location
+
+
+def alert(latitude=19.8, longitude=85.8, radius=None, severity=HazardSeverity.HIGH):
+    return Alert(title="t", message="m", alert_type="hazard_detected", severity=severity,
+                 location=Location(latitude=latitude, longitude=longitude), affected_area_radius=radius,
+                 source_type="citizen_report", source_id="r1")
+
+
+def test_defaults_fill_radius_and_expiry_by_severity():
+    filled = apply_alert_defaults(alert(severity=HazardSeverity.CRITICAL))
+    assert filled.affected_area_radius == 100.0
+    assert filled.expires_at == filled.created_at + timedelta(hours=48)
+    kept = apply_alert_defaults(alert(radius=5.0))
+    assert kept.affected_area_radius == 5.0
+
+
+def test_alert_covers_points_inside_its_radius():
+    area = alert(radius=10.0)
+    assert alert_covers(area, 19.85, 85.85)
+    assert not alert_covers(area, 20.5, 85.8)
+    assert alert_covers(Alert(title="t", message="m", alert_type="system_alert", severity="low",
+                              source_type="system", source_id="s"), 0.0, 0.0)
+
+
+def test_recipients_use_current_location_before_home():
+    index = UserLocationIndex()
+    index.set_user("near", home_location=Location(latitude=19.81, longitude=85.81))
+    index.set_user("moved", home_location=Location(latitude=19.81, longitude=85.81),
+                   current_location=Location(latitude=13.0, longitude=80.3))
+    index.set_user("far", current_location=Location(latitude=13.0, longitude=80.3))
+    assert index.recipients(alert(radius=10.0)) == {"near", "moved"}  # home still counts
+    assert index.location_of("moved") == (13.0, 80.3)
+    index.set_user("moved")
+    assert index.recipients(alert(radius=10.0)) == {"near"}
+    assert index.recipients(Alert(title="t", message="m", alert_type="system_alert", severity="low",
+                                  source_type="system", source_id="s")) is None
+
+
+def test_location_update_creates_the_stub_user(api):
+    async def main():
+        async with api() as client:
+            body = {"home_location": {"latitude": 19.81, "longitude": 85.82}}
+            response = await client.put("/api/users/me/location", json=body)
+            assert response.status_code == 200
+            assert response.json()["home_location"]["latitude"] == 19.81
+            response = await client.put("/api/users/me/location",
+                                        json={"current_location": {"latitude": 13.0, "longitude": 80.3}})
+            assert response.json()["home_location"] is None
+            assert response.json()["username"] == "demo_user"
+            from alert_targeting import user_locations
+            assert user_locations.location_of("current_user_id") == (13.0, 80.3)
+    asyncio.run(main())
+
+
+def test_alerts_use_a_location_registered_through_another_process(api):
+    from alert_targeting import user_locations
+    from database import database
+
+    async def main():
+        async with api() as client:
+            await client.put("/api/users/me/location", json={"home_location": {"latitude": 19.81, "longitude": 85.82}})
+            user_locations.set_user("current_user_id")  # this process never saw the update
+            await database.create_alert(apply_alert_defaults(alert(radius=10.0)))
+            await database.create_alert(apply_alert_defaults(alert(latitude=13.0, longitude=80.3, radius=10.0)))
+
+            alerts = (await client.get("/api/alerts")).json()
+            assert [item["location"]["latitude"] for item in alerts] == [19.8]
+            assert user_locations.location_of("current_user_id") == (19.81, 85.82)
+    asyncio.run(main())
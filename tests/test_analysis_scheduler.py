@@ -0,0 +1,145 @@
+import json
+import asyncio
+import contextvars
+
+import analysis_scheduler as scheduler_module
+from analysis_scheduler import AnalysisPriority, AnalysisScheduler, PriorityScorer, priority_band
+from llm_backends import LLMBackend
+from models import HazardReport, Location
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+async def run_in_order(scheduler, submissions):
+    """Hold the only worker busy while ``submissions`` queue up; the order they ran in.
+
+    Each submission is a (name, score) pair, or a callable run at that point.
+    """
+    order, gate = [], asyncio.Event()
+
+    async def blocker():
+        await gate.wait()
+
+    def job(name):
+        async def run():
+            order.append(name)
+        return run
+
+    first = asyncio.create_task(scheduler.submit(blocker, 100))
+    await asyncio.sleep(0)
+    waiting = []
+    for submission in submissions:
+        if callable(submission):
+            submission()
+            continue
+        name, score = submission
+        waiting.append(asyncio.create_task(scheduler.submit(job(name), score)))
+        await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(first, *waiting)
+    await scheduler.stop()
+    return order
+
+
+def test_priority_bands():
+    assert priority_band(80) == AnalysisPriority.CRITICAL
+    assert priority_band(50) == AnalysisPriority.CRITICAL
+    assert priority_band(30) == AnalysisPriority.HIGH
+    assert priority_band(10) == AnalysisPriority.NORMAL
+    assert priority_band(-5) == AnalysisPriority.LOW
+
+
+def test_most_urgent_runs_first():
+    scheduler = AnalysisScheduler(concurrency=1, aging_per_minute=0)
+    order = asyncio.run(run_in_order(scheduler, [("low", 0), ("critical", 60), ("normal", 15), ("high", 30)]))
+    assert order == ["critical", "high", "normal", "low"]
+    assert scheduler.counters["low"] == {"submitted": 1, "completed": 1, "failed": 0}
+
+
+def test_waiting_jobs_age_past_fresh_urgent_work(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(scheduler_module.time, "monotonic", lambda: clock[0])
+
+    def later():
+        clock[0] += 300
+
+    # 'old' waits 5 minutes (+50 points), then 'fresh' arrives 40 points ahead of it
+    scheduler = AnalysisScheduler(concurrency=1, aging_per_minute=10)
+    order = asyncio.run(run_in_order(scheduler, [("old", 0), later, ("fresh", 40)]))
+    assert order == ["old", "fresh"]
+
+
+def test_failures_reach_the_submitter():
+    async def main():
+        scheduler = AnalysisScheduler(concurrency=2)
+
+        async def fail():
+            raise ValueError("boom")
+
+        try:
+            await scheduler.submit(fail, 0)
+        except ValueError as e:
+            assert str(e) == "boom"
+        else:
+            raise AssertionError("expected ValueError")
+        await scheduler.stop()
+        assert scheduler.counters["low"]["failed"] == 1
+
+    asyncio.run(main())
+
+
+def test_jobs_run_in_the_submitters_context():
+    async def main():
+        scheduler = AnalysisScheduler(concurrency=2)
+        await scheduler.start()
+
+        async def read():
+            return request_id.get()
+
+        async def submit_as(value):
+            request_id.set(value)
+            return await scheduler.submit(read, 0)
+
+        assert await asyncio.gather(submit_as("a"), submit_as("b")) == ["a", "b"]
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_report_scores_follow_keywords_and_severity():
+    scorer = PriorityScorer(hotspots=lambda: [])
+
+    def report(title, severity):
+        return HazardReport(title=title, description="", hazard_type="other", severity=severity,
+                            location=Location(latitude=10.0, longitude=76.0), reporter_id="r", reporter_name="R")
+
+    assert scorer.score_report(report("Tsunami, evacuate now", "critical")) == 100
+    assert priority_band(scorer.score_report(report("Nice sunset today", "low"))) == AnalysisPriority.LOW
+
+
+class InstantBackend(LLMBackend):
+    mode = "test"
+
+    async def complete(self, prompt: str) -> str:
+        return json.dumps({"hazard_detected": True, "hazard_types": ["debris"], "severity_prediction": "low",
+                           "sentiment": "neutral", "sentiment_score": 0, "confidence_score": 0.5,
+                           "key_phrases": [], "language": "en"})
+
+
+def test_report_analysis_shows_in_server_timing(api):
+    from ai_service import ai_service
+
+    async def main():
+        previous = ai_service.backend
+        ai_service.set_backend(InstantBackend())
+        try:
+            async with api() as client:
+                response = await client.post("/api/reports", headers={"X-Debug-Timing": "1"}, json={
+                    "title": "Plastic washed up", "description": "Bags and bottles along the tide line",
+                    "hazard_type": "debris", "severity": "low", "location": {"latitude": 11.5, "longitude": 75.6}})
+                assert response.status_code == 200
+                assert "ai.analyze_text_for_hazards" in response.headers["server-timing"]
+        finally:
+            ai_service.set_backend(previous)
+
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from models import Location, SocialMediaPost
+
+
+async def fresh_database(posts=0):
+    from database import Database
+
+    db = Database()
+    await db.connect_to_mongo()
+    await db.db.social_media_posts.delete_many({})
+    await db.db.alert_claims.delete_many({})
+    await db.create_indexes()
+    start = datetime.utcnow() - timedelta(hours=1)
+    documents = [SocialMediaPost(platform="twitter", post_id=str(i), content=f"post {i}", author="a",
+                                 author_handle="@a", created_at=start + timedelta(seconds=i)).dict()
+                 for i in range(posts)]
+    if documents:
+        await db.db.social_media_posts.insert_many(documents)
+    return db
+
+
+def test_concurrent_claims_are_disjoint_and_in_posting_order():
+    async def main():
+        db = await fresh_database(posts=50)
+        batches = await asyncio.gather(*(db.claim_posts_for_analysis(f"worker-{i}", limit=20) for i in range(4)))
+        claimed = [post.post_id for batch in batches for post in batch]
+        assert len(claimed) == len(set(claimed)) == 50
+        for batch in batches:
+            assert [post.created_at for post in batch] == sorted(post.created_at for post in batch)
+
+        stats = await db.get_analysis_lease_stats()
+        assert stats["leased"] == 50 and stats["waiting"] == 0
+        assert await db.claim_posts_for_analysis("late", limit=10) == []
+
+    asyncio.run(main())
+
+
+def test_expired_leases_are_reclaimed_until_attempts_run_out():
+    async def main():
+        db = await fresh_database(posts=3)
+        assert len(await db.claim_posts_for_analysis("crashed", lease_seconds=-1, max_attempts=2)) == 3
+        assert await db.reclaim_expired_leases(max_attempts=2) == (3, 0)
+
+        # A live worker renews what it holds; the posts it let expire are taken by others
+        held = await db.claim_posts_for_analysis("second", limit=1, lease_seconds=-1, max_attempts=2)
+        assert await db.renew_post_leases("second", [held[0].id], lease_seconds=60) == 1
+        others = await db.claim_posts_for_analysis("third", lease_seconds=-1, max_attempts=2)
+        assert len(others) == 2 and held[0].id not in {post.id for post in others}
+
+        # Second attempt expired too: out of attempts, so failed rather than requeued
+        assert await db.reclaim_expired_leases(max_attempts=2) == (0, 2)
+        stats = await db.get_analysis_lease_stats()
+        assert stats["failed"] == 2 and stats["leased"] == 1
+
+    asyncio.run(main())
+
+
+def test_released_and_analyzed_leases():
+    async def main():
+        db = await fresh_database(posts=4)
+        posts = await db.claim_posts_for_analysis("worker")
+        ids = [post.id for post in posts]
+        # Only the owner can write results or hand posts back
+        assert await db.apply_incident_analysis(ids[:2], "incident", {"hazard_detected": False}, 0.0, 0.0,
+                                                lease_owner="someone-else") == 0
+        assert await db.apply_incident_analysis(ids[:2], "incident", {"hazard_detected": False}, 0.0, 0.0,
+                                                lease_owner="worker") == 2
+        assert await db.release_post_leases("worker", ids) == 2
+
+        again = await db.claim_posts_for_analysis("other")
+        assert {post.id for post in again} == set(ids[2:])
+        assert await db.db.social_media_posts.count_documents({"lease_token": {"$exists": True},
+                                                               "analysis_status": "done"}) == 0
+
+    asyncio.run(main())
+
+
+def test_alert_area_claims_dedupe_by_place_and_time():
+    async def main():
+        db = await fresh_database()
+        window = timedelta(hours=6)
+        now = datetime.utcnow()
+        kochi = Location(latitude=9.97, longitude=76.28)
+        nearby = Location(latitude=10.05, longitude=76.30)
+        chennai = Location(latitude=13.08, longitude=80.27)
+
+        assert await db.claim_alert_area("a1", "social_media_detection", kochi, 25, window, now=now) is None
+        assert await db.claim_alert_area("a2", "social_media_detection", nearby, 25, window,
+                                         now=now + timedelta(hours=1)) == "a1"
+        assert await db.claim_alert_area("a3", "social_media_detection", chennai, 25, window, now=now) is None
+        assert await db.claim_alert_area("a4", "hotspot_detected", kochi, 25, window, now=now) is None
+        assert await db.claim_alert_area("a5", "social_media_detection", kochi, 25, window,
+                                         now=now + timedelta(hours=7)) is None
+
+        # Racing replicas at the same spot: one wins, the other is told who did
+        racing = await asyncio.gather(*(
+            db.claim_alert_area(f"r{i}", "racing", kochi, 25, window, now=now) for i in range(5)))
+        winners = [result for result in racing if result is None]
+        assert len(winners) == 1 and len(set(racing) - {None}) == 1
+
+    asyncio.run(main())
+
+
+def test_unlocated_incidents_alert_once_across_replicas(api):
+    import server
+    from incidents import IncidentClusterer
+
+    text = "Sea water suddenly receded far from the shore, fishermen running back, tsunami warning please"
+    start = datetime.utcnow() - timedelta(minutes=30)
+    posts = [SocialMediaPost(platform="twitter", post_id=str(i), content=text if i < 2 else f"{text} now",
+                             author="a", author_handle="@a", created_at=start + timedelta(minutes=i))
+             for i in range(3)]
+    analysis = {"text": text, "hazard_detected": True, "hazard_types": ["tsunami_warning"], "severity_prediction": "high",
+                "sentiment": "negative", "sentiment_score": -0.8, "confidence_score": 0.9, "language": "en"}
+
+    async def main():
+        async with api():
+            # Each replica clusters the posts into an incident of its own
+            settled = []
+            for replica, members in (("a", posts[:2]), ("b", posts[1:])):
+                incident = IncidentClusterer().assign_many([post.copy() for post in members])[0][0]
+                assert incident.location is None
+                incident.ai_analysis = analysis
+                settled.append((incident, *(await server.settle_incident(incident, []))))
+
+            (first, _, first_alerted), (second, _, second_alerted) = settled
+            assert first.id != second.id
+            assert first_alerted and not second_alerted
+            assert second.alert_id == first.alert_id
+            assert await server.database.db.alerts.count_documents(
+                {"source_id": {"$in": [first.id, second.id]}}) == 1
+
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from gazetteer import AhoCorasick, PlaceExtractor, normalize
+from models import SocialMediaPost
+
+extractor = PlaceExtractor()
+
+
+def names(mentions):
+    return [mention.place.name for mention in mentions]
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+    found = sorted((end, matcher.patterns[index]) for end, index in matcher.finditer("ushers"))
+    assert found == [(4, "he"), (4, "she"), (6, "hers")]
+
+
+def test_normalize():
+    assert normalize("Elliot's  Beach") == normalize("elliots-beach") == "elliots beach"
+
+
+def test_extract_whole_words_aliases_and_longest_match():
+    assert names(extractor.extract("Water entering homes in Madras")) == ["Chennai"]
+    assert names(extractor.extract("Chennaiyil rain")) == []  # Latin names stand as whole words
+    assert names(extractor.extract("சென்னையில் பெரிய அலைகள்")) == ["Chennai"]  # case endings allowed
+    assert names(extractor.extract("Swell at Fort Kochi Beach")) == ["Fort Kochi Beach"]
+    assert names(extractor.extract("Flooding now #MarinaBeach #chennairains")) == ["Marina Beach", "Chennai"]
+
+
+def test_geotag_confidence():
+    beach = extractor.geotag("Huge waves at Marina Beach near Chennai")
+    assert beach.place.name == "Marina Beach" and beach.mentions == ["Marina Beach", "Chennai"]
+    assert beach.confidence > 0.9  # a cue word and a nearby place agreeing
+
+    # "Puri" is also a common word; a lone Latin mention stays below the default threshold
+    assert extractor.geotag("had puri for breakfast").confidence < 0.5
+    # Two strong places far apart conflict
+    alone = extractor.geotag("Oil spill at Juhu Beach").confidence
+    assert extractor.geotag("Oil spill at Juhu Beach and Marina Beach").confidence < alone - 0.3
+    assert extractor.geotag("Nothing to see here") is None
+
+
+def test_geotag_post_and_documents():
+    post = SocialMediaPost(platform="twitter", post_id="1", content="High tide flooding the road at Juhu Beach",
+                           author="a", author_handle="@a", created_at=datetime(2026, 1, 1))
+    assert extractor.geotag_post(post)
+    assert post.location.address == "Juhu Beach" and post.location_source == "gazetteer"
+    assert not extractor.geotag_post(post)  # already located
+
+    documents = [{"content": "Boats capsized off Kovalam Beach"}, {"content": "had puri for breakfast"},
+                 {"content": "in Chennai", "location": {"latitude": 1.0, "longitude": 2.0}}]
+    assert extractor.geotag_documents(documents) == 1
+    assert documents[0]["location"]["state"] == "Kerala" and "location" not in documents[1]
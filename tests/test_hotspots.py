@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from hotspots import HotspotAlerter, HotspotEngine
+
+
+def report(report_id, latitude=19.07, longitude=72.87, severity="high", created_at=None):
+    return {"id": report_id, "location": {"latitude": latitude, "longitude": longitude},
+            "severity": severity, "hazard_type": "high_waves", "created_at": created_at or datetime.utcnow()}
+
+
+class RacingDatabase:
+    """Serves reports a batch at a time, letting a write path add documents between batches"""
+
+    def __init__(self, batches, between):
+        self.batches = batches
+        self.between = between
+
+    async def iter_documents(self, collection, fields, batch_size=5000, query=None):
+        if collection != "hazard_reports":
+            return
+        for index, batch in enumerate(self.batches):
+            yield batch
+            for document in self.between.get(index, []):
+                self.engine.add_report(document)
+
+
+def total_points(engine):
+    return sum(hotspot.points for hotspot in engine.hotspots())
+
+
+def test_hotspot_forms_over_dense_reports():
+    engine = HotspotEngine(min_density=6, contrast=1)
+    for i in range(10):
+        engine.add_report(report(f"r{i}"))
+    engine.add_report(report("far", latitude=8.0, longitude=77.0, severity="low"))
+
+    hotspots = engine.hotspots()
+
+    assert len(hotspots) == 1
+    assert hotspots[0].points == 10
+    assert hotspots[0].dominant_hazard == "high_waves"
+
+
+def test_old_points_fall_out_of_the_window():
+    engine = HotspotEngine(window_hours=1, slab_minutes=10, min_density=1, contrast=1)
+    for i in range(5):
+        engine.add_report(report(f"old{i}", created_at=datetime.utcnow() - timedelta(minutes=50)))
+    assert total_points(engine) == 5
+
+    later = datetime.utcnow().timestamp() + 3600
+    assert engine.hotspots(now=later) == []
+
+
+def test_load_counts_documents_written_meanwhile_once():
+    engine = HotspotEngine(min_density=1, contrast=1)
+    first = [report(f"r{i}") for i in range(5)]
+    second = [report(f"r{i}") for i in range(5, 10)]
+    # While the load runs, one report of the next batch is created and one already loaded is re-upserted
+    db = RacingDatabase([first, second], between={0: [second[0], first[1]]})
+    db.engine = engine
+
+    asyncio.run(engine.load(db))
+    assert total_points(engine) == 10
+
+    # Once loaded, write paths count every new document again
+    engine.add_report(report("r10"))
+    assert total_points(engine) == 11
+
+
+def test_alerter_cools_down_per_area():
+    engine = HotspotEngine(min_density=6, contrast=1)
+    for i in range(20):
+        engine.add_report(report(f"r{i}"))
+    hotspots = engine.hotspots()
+    alerter = HotspotAlerter(min_score=1, cooldown_hours=1)
+    now = datetime.utcnow().timestamp()
+
+    assert alerter.select(hotspots, now=now) == hotspots
+    assert alerter.select(hotspots, now=now + 60) == []
+    assert alerter.select(hotspots, now=now + 3601) == hotspots
+    assert HotspotAlerter(min_score=1e9).select(hotspots, now=now) == []
+
+
+def test_hotspot_alerts_are_claimed_across_processes(api, monkeypatch):
+    import server
+
+    engine = HotspotEngine(min_density=6, contrast=1)
+    for i in range(20):
+        engine.add_report(report(f"r{i}"))
+    hotspots = engine.hotspots()
+
+    async def main():
+        async with api():
+            # Each replica, or the same one after a restart, starts with an empty cooldown
+            for _ in range(2):
+                monkeypatch.setattr(server, "hotspot_alerter", HotspotAlerter(min_score=1, cooldown_hours=1))
+                await server.raise_hotspot_alerts(hotspots)
+            assert await server.database.db.alerts.count_documents({"alert_type": "hotspot"}) == len(hotspots)
+
+    asyncio.run(main())
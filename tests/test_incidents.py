@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from incidents import IncidentClusterer, MinHasher
+from models import Location, SocialMediaPost
+
+START = datetime(2026, 1, 1, 6)
+
+
+def post(content, minutes=0, location=(13.08, 80.28), platform="twitter"):
+    return SocialMediaPost(platform=platform, post_id=content[:8], content=content, author="a", author_handle="@a",
+                           created_at=START + timedelta(minutes=minutes),
+                           location=Location(latitude=location[0], longitude=location[1]) if location else None)
+
+
+TEXT = "Huge waves crashing over Marina beach road, water entering homes near the lighthouse"
+
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher()
+    a = hasher.signature("high waves at marina beach road today")
+    b = hasher.signature("high waves at marina beach road")
+    c = hasher.signature("oil spill near ennore port")
+    assert hasher.similarities(a, a[None, :])[0] == 1.0
+    assert hasher.similarities(a, b[None, :])[0] > 0.6
+    assert hasher.similarities(a, c[None, :])[0] < 0.2
+    assert hasher.signature("   ") is None
+
+
+def test_similar_nearby_posts_join_one_incident():
+    clusterer = IncidentClusterer()
+    groups = clusterer.assign_many([
+        post(TEXT),
+        post(TEXT + " #ChennaiRains", minutes=30, location=(13.10, 80.29), platform="facebook"),
+        post("Oil slick spreading along Ennore creek, fishermen warned", minutes=10),
+    ])
+
+    assert len(groups) == 2
+    incident, members = next(group for group in groups if len(group[1]) == 2)
+    assert incident.member_count == 2
+    assert incident.platforms == {"twitter": 1, "facebook": 1}
+    assert abs(incident.location.latitude - 13.09) < 1e-9
+    assert incident.first_seen == START and incident.last_seen == START + timedelta(minutes=30)
+
+
+def test_distance_and_time_keep_incidents_apart():
+    clusterer = IncidentClusterer(window_hours=6, radius_km=25)
+    first, _ = clusterer.assign(post(TEXT))
+    far, created_far = clusterer.assign(post(TEXT, minutes=5, location=(15.0, 80.0)))
+    later, created_later = clusterer.assign(post(TEXT, minutes=7 * 60))
+    assert created_far and far.id != first.id
+    assert created_later and later.id != first.id
+    assert first.id not in clusterer.incidents  # idle for a whole window: closed
+
+
+def test_unlocated_posts_need_closer_text():
+    variant = "Waves crashing over Marina beach road this morning, stay away from the lighthouse"
+    clusterer = IncidentClusterer(similarity=0.25, unlocated_similarity=0.9)
+    incident, _ = clusterer.assign(post(TEXT))
+    assert clusterer.assign(post(variant, minutes=1, location=None))[1]
+
+    clusterer = IncidentClusterer(similarity=0.25, unlocated_similarity=0.9)
+    incident, _ = clusterer.assign(post(TEXT))
+    assert clusterer.assign(post(variant, minutes=1))[0] is incident
+
+
+def test_reassigning_a_post_does_not_count_it_twice():
+    clusterer = IncidentClusterer()
+    item = post(TEXT)
+    incident, created = clusterer.assign(item)
+    again, created_again = clusterer.assign(item)
+    assert created and not created_again
+    assert again is incident and incident.member_count == 1
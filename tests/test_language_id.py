@@ -0,0 +1,46 @@
+from language_id import LanguageIdentifier, mentions_hazard, normalize_language
+
+identifier = LanguageIdentifier()
+
+
+def test_normalize_language():
+    assert normalize_language("hi-IN") == "hi"
+    assert normalize_language("Hindi") == "hi"
+    assert normalize_language("Oriya") == "or"
+    assert normalize_language("ta_IN") == "ta"
+    assert normalize_language("xx") is None
+    assert normalize_language("") is None
+
+
+def test_script_decides_for_single_script_languages():
+    assert identifier.detect("கடலில் பெரிய அலைகள் எழுகின்றன").language == "ta"
+    assert identifier.detect("సముద్రంలో పెద్ద అలలు వస్తున్నాయి").language == "te"
+    assert identifier.detect("High waves at Marina beach").language == "en"
+    assert identifier.detect("12345 !!!", default="hi").confidence == 0.0
+
+
+def test_trigrams_split_hindi_and_marathi():
+    assert identifier.detect("समुद्र में ऊँची लहरें उठ रही हैं, मछुआरों को सलाह दी गई है").language == "hi"
+    assert identifier.detect("समुद्रात उंच लाटा उसळत आहेत, मच्छीमारांना सल्ला देण्यात आला आहे").language == "mr"
+
+
+def test_distinct_letters_and_mixed_text():
+    assert identifier.detect("সাগৰত ডাঙৰ ঢৌ উঠিছে").language == "as"
+    assert identifier.detect("সমুদ্রে বড় ঢেউ উঠছে").language == "bn"
+    # Hashtags and place names in Latin don't outvote the native script
+    mixed = identifier.detect("#ChennaiRains Marina கடலில் பெரிய அலைகள் https://t.co/x")
+    assert mixed.language == "ta" and mixed.script == "Tamil"
+
+
+def test_resolve_keeps_declarations_but_overrides_default_english():
+    assert identifier.resolve("High waves at Marina beach", declared="ml") == "ml"
+    assert identifier.resolve("கடலில் பெரிய அலைகள் எழுகின்றன", declared="en") == "ta"
+    assert identifier.resolve("Oil slick near the harbour", declared=None) == "en"
+
+
+def test_mentions_hazard():
+    assert mentions_hazard("Huge WAVES at the beach")
+    assert mentions_hazard("கடலில் பெரிய அலைகள்", "ta")
+    # Hindi and Marathi keywords are checked together
+    assert mentions_hazard("समुद्रात लाटा", "hi")
+    assert not mentions_hazard("Lovely sunset today", "en")
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from llm_backends import (CassetteMissError, LLMBackend, RecordingBackend, ReplayBackend, backend_from_env,
+                          normalize_prompt)
+
+
+class EchoBackend(LLMBackend):
+    mode = "echo"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, prompt: str) -> str:
+        self.calls += 1
+        return f"answer {self.calls}"
+
+
+def test_normalize_prompt_masks_volatile_parts():
+    first = normalize_prompt("Analyze  post 3f2b1c4d-1111-2222-3333-444455556666 at 2026-01-01T10:00:00.5, 42 likes")
+    second = normalize_prompt("analyze post 0a0b0c0d-aaaa-bbbb-cccc-ddddeeeeffff at 2026-03-09 23:59:59, 7 likes")
+    assert first == second == "analyze post <id> at <ts>, 0 likes"
+
+
+def test_record_then_replay(tmp_path):
+    cassette = tmp_path / "cassette.jsonl"
+
+    async def main():
+        recorder = RecordingBackend(EchoBackend(), str(cassette))
+        assert await recorder.complete("Is this a tsunami? 12 posts") == "answer 1"
+        assert await recorder.complete("Is this a tsunami? 12 posts") == "answer 2"
+
+        replay = ReplayBackend(str(cassette), latency="none")
+        assert replay.size == 2
+        # Repeated prompts cycle through their recordings; normalized matching ignores numbers
+        assert await replay.complete("Is this a tsunami? 12 posts") == "answer 1"
+        assert await replay.complete("Is this a tsunami? 12 posts") == "answer 2"
+        assert await replay.complete("is this a  TSUNAMI? 99 posts") == "answer 1"
+        with pytest.raises(CassetteMissError):
+            await replay.complete("Something else")
+        assert (replay.hits, replay.misses) == (3, 1)
+
+        exact = ReplayBackend(str(cassette), match="exact", latency="none")
+        with pytest.raises(CassetteMissError):
+            await exact.complete("is this a  TSUNAMI? 99 posts")
+
+    asyncio.run(main())
+
+
+def test_backend_from_env(tmp_path, monkeypatch):
+    cassette = tmp_path / "cassette.jsonl"
+    cassette.write_text("")
+    monkeypatch.setenv("LLM_CASSETTE", str(cassette))
+    monkeypatch.setenv("LLM_MODE", "replay")
+    assert backend_from_env("system").mode == "replay"
+    monkeypatch.setenv("LLM_MODE", "record")
+    assert backend_from_env("system").mode == "record"
+    monkeypatch.setenv("LLM_MODE", "bogus")
+    with pytest.raises(ValueError):
+        backend_from_env("system")
+    monkeypatch.delenv("LLM_CASSETTE")
+    monkeypatch.setenv("LLM_MODE", "replay")
+    with pytest.raises(ValueError):
+        backend_from_env("system")
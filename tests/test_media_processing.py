@@ -0,0 +1,145 @@
+import os
+import asyncio
+
+from PIL import Image, ImageDraw
+
+from media_processing import REPOST_MAX_DISTANCE, difference_hash, hamming_distance, hash_bands, process_image
+
+
+def photo(size=(400, 300)):
+    image = Image.new("RGB", size, (30, 90, 160))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((40, 60, 220, 200), fill=(240, 240, 230))
+    draw.ellipse((250, 30, 380, 160), fill=(200, 60, 40))
+    return image
+
+
+def test_difference_hash_survives_resizing_but_not_other_pictures():
+    original = difference_hash(photo())
+    resized = difference_hash(photo().resize((200, 150)))
+    other = difference_hash(Image.effect_mandelbrot((400, 300), (-2, -1.5, 1, 1.5), 50).convert("RGB"))
+
+    assert len(original) == 16
+    assert hamming_distance(original, resized) <= REPOST_MAX_DISTANCE
+    assert hamming_distance(original, other) > REPOST_MAX_DISTANCE
+
+
+def test_hash_bands_split_the_hash():
+    assert hash_bands("0123456789abcdef") == ["0:0123", "1:4567", "2:89ab", "3:cdef"]
+
+
+def test_process_image_writes_thumbnails_and_reads_gps(tmp_path):
+    exif = Image.Exif()
+    exif[0x010F] = "Acme"
+    exif[0x8825] = {1: "N", 2: (19.0, 4.0, 30.0), 3: "E", 4: (72.0, 52.0, 12.0)}
+    source = tmp_path / "upload.jpg"
+    photo().save(source, "JPEG", exif=exif)
+
+    result = process_image(str(source), str(tmp_path / "thumbs"), sizes=(64, 128))
+
+    assert (result["width"], result["height"]) == (400, 300)
+    assert sorted(result["thumbnails"]) == ["128", "64"]
+    with Image.open(result["thumbnails"]["64"]) as thumbnail:
+        assert max(thumbnail.size) == 64
+    assert all(os.path.exists(path) for path in result["thumbnails"].values())
+    assert result["exif"]["camera_make"] == "Acme"
+    assert result["exif"]["latitude"] == 19.075
+    assert result["exif"]["longitude"] == 72.87
+    assert result["phash"] == difference_hash(photo())
+
+
+def gps_photo(path, latitude=(19.0, 4.0, 30.0), longitude=(72.0, 52.0, 12.0)):
+    exif = Image.Exif()
+    exif[0x8825] = {1: "N", 2: latitude, 3: "E", 4: longitude}
+    photo().save(path, "JPEG", exif=exif)
+    return path.read_bytes()
+
+
+async def processor_with_blob(tmp_path):
+    from database import Database
+    from storage import MediaStorage
+    from media_processing import MediaProcessor
+
+    db = Database()
+    await db.connect_to_mongo()
+    for collection in ("media_files", "hazard_reports"):
+        await db.db[collection].delete_many({})
+    await db.create_indexes()
+    storage = MediaStorage(str(tmp_path / "media"))
+
+    async def chunks():
+        yield gps_photo(tmp_path / "upload.jpg")
+
+    sha256, _, _ = await storage.store_stream(chunks())
+    return db, sha256, MediaProcessor(storage, db, max_workers=1, concurrency=4)
+
+
+def media(sha256, status="queued"):
+    from models import MediaFile
+    return MediaFile(filename="wave.jpg", file_type="image", file_path=sha256, sha256=sha256,
+                     processing_status=status)
+
+
+def report(media_files, latitude=19.07, longitude=72.87):
+    from models import HazardReport, Location
+    return HazardReport(title="Swell", description="Big swell", hazard_type="high_waves", severity="low",
+                        location=Location(latitude=latitude, longitude=longitude), reporter_id="r",
+                        reporter_name="R", media_files=media_files)
+
+
+def test_identical_uploads_are_processed_once_and_queued_media_resumes(tmp_path):
+    async def main():
+        db, sha256, processor = await processor_with_blob(tmp_path)
+        # Left queued by a previous run, then re-uploaded several times
+        left_over = media(sha256)
+        await db.create_media_file(left_over)
+        await processor.start()
+        try:
+            copies = [media(sha256) for _ in range(4)]
+            for item in copies:
+                await db.create_media_file(item)
+                processor.enqueue(item.id, sha256)
+            await asyncio.wait_for(processor.queue.join(), 30)
+        finally:
+            await processor.stop()
+
+        assert processor.stats()["processed"] == 5 and processor.stats()["reused"] == 4
+        stored = await db.get_media_files([left_over.id] + [item.id for item in copies])
+        assert {item.processing_status for item in stored} == {"processed"}
+        assert len({tuple(sorted(item.thumbnails.items())) for item in stored}) == 1
+        assert all(item.exif["latitude"] == 19.075 for item in stored)
+
+    asyncio.run(main())
+
+
+def test_media_attached_at_report_creation_is_location_checked(tmp_path):
+    async def main():
+        db, sha256, processor = await processor_with_blob(tmp_path)
+        await processor.start()
+        try:
+            # Processed before the report existed: checked when the report is created
+            processed = media(sha256)
+            await db.create_media_file(processed)
+            processor.enqueue(processed.id, sha256)
+            await asyncio.wait_for(processor.queue.join(), 30)
+            far = await db.create_hazard_report(report([await db.get_media_file(processed.id)],
+                                                       latitude=13.08, longitude=80.27))
+            await processor.check_report_media(far)
+
+            # Still queued when the report was created: checked when its job finishes
+            pending = media(sha256)
+            await db.create_media_file(pending)
+            near = await db.create_hazard_report(report([pending]))
+            await processor.check_report_media(near)
+            assert (await db.get_hazard_report_by_id(near.id)).media_location_check is None
+            processor.enqueue(pending.id, sha256)
+            await asyncio.wait_for(processor.queue.join(), 30)
+        finally:
+            await processor.stop()
+
+        far_check = (await db.get_hazard_report_by_id(far.id)).media_location_check
+        assert far_check["media_id"] == processed.id and not far_check["consistent"]
+        near_check = (await db.get_hazard_report_by_id(near.id)).media_location_check
+        assert near_check["media_id"] == pending.id and near_check["consistent"]
+
+    asyncio.run(main())
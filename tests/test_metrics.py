@@ -0,0 +1,74 @@
+import asyncio
+from contextvars import ContextVar
+
+import pytest
+
+from metrics import Counter, Gauge, Histogram, Registry, instrument_async_methods
+
+
+def test_exposition_format():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ["route"]))
+    depth = registry.register(Gauge("depth", "Queue depth"))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    depth.set_function(lambda: 7)
+    for value in (0.05, 0.5, 3.0):
+        latency.labels().observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a\\"b"} 3' in lines
+    assert "depth 7" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 3.55" in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_instrumented_methods_record_outcomes():
+    histogram = Histogram("calls_seconds", "Calls", ["operation", "outcome"])
+    outcome = ContextVar("outcome", default="success")
+
+    class Service:
+        async def ok(self):
+            return 1
+
+        async def degraded(self):
+            outcome.set("fallback")
+            return 2
+
+        async def broken(self):
+            raise RuntimeError
+
+        async def _private(self):
+            return 3
+
+    instrument_async_methods(Service, histogram, outcome)
+    service = Service()
+
+    async def main():
+        assert await service.ok() == 1
+        assert await service.degraded() == 2
+        with pytest.raises(RuntimeError):
+            await service.broken()
+        await service._private()
+
+    asyncio.run(main())
+    recorded = {key: child.count for key, child in histogram._children.items()}
+    assert recorded == {("ok", "success"): 1, ("degraded", "fallback"): 1, ("broken", "error"): 1}
+
+
+def test_metrics_endpoint_reports_routes_by_template(api):
+    async def main():
+        async with api() as client:
+            await client.get("/api/reports/some-id")
+            response = await client.get("/metrics")
+            assert response.status_code == 200
+            assert 'route="/api/reports/{report_id}"' in response.text
+            assert "some-id" not in response.text
+
+    asyncio.run(main())
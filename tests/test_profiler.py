@@ -0,0 +1,58 @@
+import json
+import time
+import asyncio
+
+import pytest
+
+from profiler import ProfilerBusyError, SamplingProfiler
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_samples_collapse_into_stacks():
+    async def main():
+        profiler = SamplingProfiler()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            busy_loop(0.2)
+
+        collapsed, summary = (await asyncio.gather(profiler.profile(0.3, interval_ms=2), work()))[0]
+        return profiler, collapsed, summary
+
+    profiler, collapsed, summary = asyncio.run(main())
+    assert not profiler.active
+    assert summary["samples"] > 10
+    assert "busy_loop (test_profiler.py:" in collapsed
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+
+def test_one_session_at_a_time_and_request_bound():
+    async def main():
+        profiler = SamplingProfiler()
+        session = asyncio.create_task(profiler.profile(5.0, max_requests=2))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ProfilerBusyError):
+            await profiler.profile(1.0)
+        profiler.request_finished()
+        profiler.request_finished()
+        _, summary = await asyncio.wait_for(session, 1.0)
+        assert summary["requests"] == 2 and summary["duration_seconds"] < 1.0
+
+    asyncio.run(main())
+
+
+def test_admin_profile_endpoint(api):
+    async def main():
+        async with api(admin=True) as client:
+            response = await client.post("/api/admin/profile", params={"seconds": 0.05})
+            assert response.status_code == 200
+            assert "samples" in json.loads(response.headers["x-profile-summary"])
+            assert (await client.post("/api/admin/profile", params={"seconds": 0})).status_code == 400
+
+    asyncio.run(main())
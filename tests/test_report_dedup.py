@@ -0,0 +1,114 @@
+import json
+import asyncio
+from datetime import datetime, timedelta
+
+from llm_backends import LLMBackend
+from models import Alert, HazardReport, Location
+from report_dedup import ReportDeduplicator
+
+
+def report(title="High waves flooding the fish market", description="Waves over the sea wall near the jetty",
+           hazard_type="high_waves", severity="medium", latitude=15.49, longitude=73.82, minutes_later=0):
+    return HazardReport(title=title, description=description, hazard_type=hazard_type, severity=severity,
+                        location=Location(latitude=latitude, longitude=longitude), reporter_id="r",
+                        reporter_name="Reporter", created_at=datetime(2026, 1, 1) + timedelta(minutes=minutes_later))
+
+
+def test_near_copy_nearby_matches_its_canonical():
+    dedup = ReportDeduplicator(window_minutes=120, radius_km=3)
+    canonical = dedup.add(report())
+
+    assert dedup.match(report(description="Waves over the sea wall near the jetty, market flooded",
+                              latitude=15.50, minutes_later=30)) is canonical
+
+
+def test_other_hazard_distance_time_or_text_do_not_match():
+    dedup = ReportDeduplicator(window_minutes=120, radius_km=3)
+    dedup.add(report())
+
+    assert dedup.match(report(hazard_type="debris")) is None
+    assert dedup.match(report(latitude=15.7)) is None
+    assert dedup.match(report(title="Oil on the beach", description="Black sludge along the shore")) is None
+    assert dedup.match(report(minutes_later=121)) is None
+
+
+def test_attached_duplicates_widen_later_matches():
+    dedup = ReportDeduplicator(window_minutes=120, radius_km=3)
+    canonical = dedup.add(report())
+    duplicate = report(title="Sea wall breached", description="Sea wall breached and water entering the road",
+                       minutes_later=60)
+    dedup.attach(canonical, duplicate)
+
+    assert canonical.corroboration_count == 1
+    assert canonical.last_seen == duplicate.created_at
+    # Within the window of the last corroboration, not of the original report
+    assert dedup.match(report(title="Sea wall breached", description="water entering the road",
+                              minutes_later=170)) is canonical
+
+
+def test_load_marks_alerted_only_reports_with_an_alert():
+    from database import Database
+
+    async def main():
+        db = Database()
+        await db.connect_to_mongo()
+        await db.create_indexes()
+        alerted, quiet = report(severity="high"), report(severity="critical", latitude=12.0)
+        for item in (alerted, quiet):
+            item.created_at = datetime.utcnow()
+            await db.create_hazard_report(item)
+        await db.create_alert(Alert(title="t", message="m", alert_type="hazard_detected", severity="high",
+                                    source_type="citizen_report", source_id=alerted.id))
+
+        dedup = ReportDeduplicator()
+        await dedup.load(db)
+        assert dedup.canonical[alerted.id].alerted
+        assert not dedup.canonical[quiet.id].alerted
+
+    asyncio.run(main())
+
+
+class GatedBackend(LLMBackend):
+    """Holds every hazard analysis until released"""
+
+    mode = "test"
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.waiting = asyncio.Event()
+
+    async def complete(self, prompt: str) -> str:
+        self.waiting.set()
+        await self.release.wait()
+        return json.dumps({"hazard_detected": True, "hazard_types": ["high_waves"], "severity_prediction": "medium",
+                           "sentiment": "negative", "sentiment_score": -0.5, "confidence_score": 0.9,
+                           "key_phrases": ["waves"], "language": "en"})
+
+
+def test_duplicate_filed_during_canonical_analysis_gets_its_analysis(api):
+    from ai_service import ai_service
+
+    async def main():
+        body = {"title": "Huge waves at Kovalam lighthouse beach", "hazard_type": "high_waves",
+                "description": "Waves crossing the promenade at the lighthouse", "severity": "medium",
+                "location": {"latitude": 8.38, "longitude": 76.97}}
+        previous = ai_service.backend
+        backend = GatedBackend()
+        ai_service.set_backend(backend)
+        try:
+            async with api() as client:
+                canonical = asyncio.create_task(client.post("/api/reports", json=body))
+                await backend.waiting.wait()
+                duplicate = await client.post("/api/reports", json=body)
+                assert duplicate.json()["duplicate_of"] is not None
+                assert duplicate.json()["ai_analysis"] is None
+                backend.release.set()
+                canonical = (await canonical).json()
+
+                stored = (await client.get(f"/api/reports/{duplicate.json()['id']}")).json()
+                assert stored["ai_analysis"]["text"] == canonical["ai_analysis"]["text"]
+                assert stored["ai_analysis"]["confidence_score"] == 0.9
+        finally:
+            ai_service.set_backend(previous)
+
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import time
+import asyncio
+
+from response_cache import ResponseCache, etag_matches
+
+
+class Versions:
+    def __init__(self):
+        self.versions = {}
+
+    def get_versions(self, collections):
+        return tuple(self.versions.get(name, 0) for name in collections)
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_entries_follow_versions_ttl_and_lru(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    cache = ResponseCache(Versions(), max_entries=2, ttl=30)
+    key = cache.make_key("reports", {"limit": 10, "severity": None})
+    assert key == ("reports", (("limit", "10"),))
+
+    cache.put(key, (1,), b"[]")
+    assert cache.get(key, (1,)).body == b"[]"
+    assert cache.get(key, (2,)) is None  # a local write bumped the version
+
+    cache.put(key, (2,), b"[]")
+    clock[0] += 30
+    assert cache.get(key, (2,)) is None  # expired, picks up other processes' writes
+
+    for name in ("a", "b", "c"):
+        cache.put((name, ()), (0,), b"{}")
+    assert cache.get(("a", ()), (0,)) is None
+    assert cache.get(("c", ()), (0,)) is not None
+
+
+def test_list_endpoint_revalidates_with_etags(api):
+    from database import database
+    from models import HazardReport, Location
+
+    async def main():
+        async with api() as client:
+            first = await client.get("/api/reports")
+            etag = first.headers["etag"]
+            unchanged = await client.get("/api/reports", headers={"If-None-Match": etag})
+            assert unchanged.status_code == 304 and unchanged.content == b""
+
+            await database.create_hazard_report(HazardReport(
+                title="Oil sheen", description="Near the harbour", hazard_type="oil_spill", severity="low",
+                location=Location(latitude=17.7, longitude=83.3), reporter_id="r", reporter_name="R"))
+            changed = await client.get("/api/reports", headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.headers["etag"] != etag
+            assert any(report["title"] == "Oil sheen" for report in changed.json())
+
+    asyncio.run(main())
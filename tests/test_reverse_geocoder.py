@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+
+from models import Location
+from reverse_geocoder import Place, RTree, ReverseGeocoder
+
+geocoder = ReverseGeocoder.from_district_table()
+
+
+def test_lookup_resolves_district_state_and_nearby_town():
+    assert geocoder.lookup(13.05, 80.28) == Place("Chennai", "Tamil Nadu", "Chennai")
+    assert geocoder.lookup(8.40, 76.98) == Place("Thiruvananthapuram", "Kerala", "Kovalam")
+    # Open sea, far beyond every district's radius
+    assert geocoder.lookup(15.0, 65.0) is None
+
+
+def test_batch_lookup_matches_single_lookups():
+    rng = np.random.default_rng(7)
+    latitudes = rng.uniform(8, 23, 500)
+    longitudes = rng.uniform(68, 90, 500)
+    batched = ReverseGeocoder.from_district_table(chunk_size=64).lookup_many(latitudes, longitudes)
+    assert batched == [geocoder.lookup(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+    assert any(place is not None for place in batched) and any(place is None for place in batched)
+
+
+def test_rtree_finds_every_containing_box():
+    rng = np.random.default_rng(3)
+    corners = rng.uniform(0, 100, (300, 2))
+    boxes = np.column_stack([corners, corners + rng.uniform(1, 10, (300, 2))])
+    tree = RTree(boxes, capacity=4)
+    x, y = rng.uniform(0, 110, 200), rng.uniform(0, 110, 200)
+
+    points, entries = tree.query_points(x, y)
+    for i in range(len(x)):
+        expected = set(np.flatnonzero((boxes[:, 0] <= x[i]) & (boxes[:, 1] <= y[i])
+                                      & (boxes[:, 2] >= x[i]) & (boxes[:, 3] >= y[i])).tolist())
+        assert set(entries[points == i].tolist()) == expected
+        assert set(tree.query_point(x[i], y[i])) == expected
+
+
+def test_fill_keeps_values_already_present():
+    model = Location(latitude=13.05, longitude=80.28, city="Mylapore")
+    document = {"latitude": 8.40, "longitude": 76.98}
+    assert geocoder.fill_many([model, document, None, {"latitude": 15.0, "longitude": 65.0}]) == 2
+    assert (model.city, model.district, model.state) == ("Mylapore", "Chennai", "Tamil Nadu")
+    assert document["district"] == "Thiruvananthapuram" and document["city"] == "Kovalam"
+
+
+def test_geojson_boundaries_with_holes(tmp_path):
+    outer = [[80.0, 13.0], [80.4, 13.0], [80.4, 13.4], [80.0, 13.4], [80.0, 13.0]]
+    hole = [[80.15, 13.15], [80.25, 13.15], [80.25, 13.25], [80.15, 13.25], [80.15, 13.15]]
+    path = tmp_path / "districts.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [{
+        "type": "Feature", "properties": {"NAME": "Chennai", "STATE": "Tamil Nadu"},
+        "geometry": {"type": "Polygon", "coordinates": [outer, hole]},
+    }]}))
+
+    boundaries = ReverseGeocoder.from_geojson(str(path), district_property="NAME", state_property="STATE")
+    assert boundaries.lookup(13.08, 80.27) == Place("Chennai", "Tamil Nadu", "Chennai")
+    assert boundaries.lookup(13.2, 80.2) is None
+    assert boundaries.lookup_many([13.08, 13.2], [80.27, 80.2]) == [Place("Chennai", "Tamil Nadu", "Chennai"), None]
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from search_index import SearchIndex, highlight, tokenize
+
+
+def build() -> SearchIndex:
+    index = SearchIndex()
+    index.add("hazard_reports", {"id": "r1", "title": "High waves near Puri", "description": "Huge waves hit the beach",
+                                 "hazard_type": "high_waves", "severity": "high", "created_at": datetime(2026, 1, 1)})
+    index.add("hazard_reports", {"id": "r2", "title": "Oil spill", "description": "Oil slick and waves",
+                                 "hazard_type": "oil_spill", "severity": "medium", "created_at": datetime(2026, 1, 2)})
+    index.add("social_media_posts", {"id": "p1", "content": "Massive waves at Marina beach", "hashtags": ["#waves"],
+                                     "platform": "twitter", "created_at": datetime(2026, 1, 3)})
+    index.add("social_media_posts", {"id": "p2", "content": "waves on reddit", "platform": "reddit",
+                                     "created_at": datetime(2026, 1, 4)})
+    return index
+
+
+def ids(result):
+    return {doc_id for _, doc_id, _ in result[1]}
+
+
+def test_tokenize_folds_plurals_and_drops_stop_words():
+    assert tokenize("The waves AND the cities") == ["wave", "city"]
+
+
+def test_ranking_prefers_more_matching_terms():
+    total, hits = build().search("oil waves")
+    assert total == 4
+    assert hits[0][1] == "r2"
+
+
+def test_filters_restrict_to_their_kind():
+    index = build()
+    assert ids(index.search("waves", platform="twitter")) == {"p1"}
+    assert ids(index.search("waves", hazard_type="high_waves")) == {"r1"}
+    assert ids(index.search("waves", severity="medium")) == {"r2"}
+    assert ids(index.search("waves", kind="report")) == {"r1", "r2"}
+
+
+def test_unknown_filter_values_match_nothing():
+    index = build()
+    assert index.search("waves", platform="reddit") == (0, [])  # not a platform the index codes
+    assert index.search("waves", hazard_type="volcano") == (0, [])
+    assert index.search("waves", kind="report", platform="twitter") == (0, [])
+
+
+def test_time_window_and_paging():
+    index = build()
+    assert ids(index.search("waves", since=datetime(2026, 1, 2), until=datetime(2026, 1, 4))) == {"r2", "p1"}
+    total, page = index.search("waves", limit=1, offset=1)
+    assert total == 4 and len(page) == 1
+
+
+def test_updates_replace_and_compaction_keeps_results():
+    index = build()
+    index.add("hazard_reports", {"id": "r1", "title": "Debris", "description": "Plastic on the shore",
+                                 "hazard_type": "debris", "severity": "low"})
+    assert "r1" not in ids(index.search("waves"))
+    assert ids(index.search("plastic")) == {"r1"}
+    index.remove("p2")
+    index.compact()
+    assert len(index) == 3
+    assert ids(index.search("waves")) == {"r2", "p1"}
+
+
+def test_highlight_escapes_and_marks_terms():
+    text, matched = highlight("<b>Huge</b> waves here", {"wave"})
+    assert matched
+    assert "<mark>waves</mark>" in text and "&lt;b&gt;" in text
+
+
+def test_refresh_picks_up_documents_written_by_other_processes():
+    from database import Database
+
+    async def main():
+        db = Database()
+        await db.connect_to_mongo()
+        await db.db.hazard_reports.delete_many({})
+        await db.db.social_media_posts.delete_many({})
+        index = SearchIndex()
+        await index.start(db, interval=0.01)
+        try:
+            await asyncio.sleep(0.05)
+            assert index.ready and len(index) == 0
+            # Written by another replica, stamped a little before it reached Mongo
+            await db.db.social_media_posts.insert_one({
+                "id": "p9", "content": "Swell flooding the Kovalam promenade", "platform": "twitter",
+                "created_at": datetime.utcnow() - timedelta(minutes=1)})
+            for _ in range(100):
+                if "p9" in index:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await index.stop()
+        assert ids(index.search("kovalam")) == {"p9"}
+
+    asyncio.run(main())
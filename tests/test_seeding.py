@@ -0,0 +1,41 @@
+import asyncio
+import logging
+
+
+def test_seeding_is_idempotent(api, monkeypatch):
+    monkeypatch.setenv("SEED_MOCK_DATA", "true")
+    import server
+    from database import database
+
+    async def counts():
+        return [await database.db[name].count_documents({})
+                for name in ("users", "social_media_posts", "hazard_reports")]
+
+    async def main():
+        async with api():
+            seeded = await counts()
+            await server.initialize_mock_data()  # as on the next boot
+            assert await counts() == seeded and all(seeded)
+
+    asyncio.run(main())
+
+
+def test_failed_seeding_is_logged_and_timed(api, monkeypatch, caplog):
+    monkeypatch.setenv("SEED_MOCK_DATA", "true")
+    from database import database
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("bulk write failed")
+
+    monkeypatch.setattr(database, "bulk_upsert", broken)
+
+    async def main():
+        async with api() as client:
+            assert (await client.get("/api/health")).status_code == 200
+
+    with caplog.at_level(logging.INFO, logger="server"):
+        asyncio.run(main())
+    failure = next(record for record in caplog.records if record.getMessage() == "Error initializing mock data")
+    assert failure.exc_info and "bulk write failed" in str(failure.exc_info[1])
+    timings = next(record.getMessage() for record in caplog.records if record.getMessage().startswith("Startup timings"))
+    assert "seed_failed=" in timings and " seed=" not in timings
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from storage import (InvalidMultipartError, InvalidRangeError, MediaStorage, MediaTooLargeError, iter_multipart,
+                     media_kind, parse_range_header)
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    storage = MediaStorage(str(tmp_path))
+
+    async def main():
+        first = await storage.store_stream(stream(b"wave ", b"photo"))
+        second = await storage.store_stream(stream(b"wave photo"))
+        return first, second
+
+    first, second = asyncio.run(main())
+    sha256 = hashlib.sha256(b"wave photo").hexdigest()
+    assert first == (sha256, 10, True)
+    assert second == (sha256, 10, False)
+    assert storage.blob_path(sha256) == tmp_path / sha256[:2] / sha256[2:4] / sha256
+    assert b"".join(storage.iter_range(sha256, 5, 9)) == b"photo"
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_oversized_upload_leaves_nothing_behind(tmp_path):
+    storage = MediaStorage(str(tmp_path), max_bytes=8)
+    with pytest.raises(MediaTooLargeError):
+        asyncio.run(storage.store_stream(stream(b"12345", b"67890")))
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_blob_path_rejects_anything_but_a_hash(tmp_path):
+    with pytest.raises(ValueError):
+        MediaStorage(str(tmp_path)).blob_path("../../etc/passwd")
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=-10", (990, 999)),
+    ("bytes=-5000", (0, 999)),
+])
+def test_range_headers(header, expected):
+    assert parse_range_header(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5-2", "bytes=-0", "bytes=-", "items=0-1", "bytes=0-1,5-9"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(InvalidRangeError):
+        parse_range_header(header, 1000)
+
+
+def test_media_kind():
+    assert media_kind("image/jpeg") == "image"
+    assert media_kind("video/mp4") == "video"
+    assert media_kind("application/pdf") == "other"
+    assert media_kind(None) == "other"
+
+
+def multipart_body(*parts, boundary="XyZ"):
+    body = b""
+    for headers, data in parts:
+        body += f"--{boundary}\r\n{headers}\r\n\r\n".encode() + data + b"\r\n"
+    return body + f"--{boundary}--\r\n".encode(), f"multipart/form-data; boundary={boundary}"
+
+
+def test_multipart_bodies_are_parsed_as_they_stream():
+    body, content_type = multipart_body(
+        ('Content-Disposition: form-data; name="report_id"', b"r1"),
+        ('Content-Disposition: form-data; name="file"; filename="wave.jpg"\r\nContent-Type: image/jpeg',
+         b"\xff\xd8" + b"x" * 100),
+    )
+
+    async def main():
+        # One byte at a time: part boundaries and headers split across chunks
+        return [event async for event in iter_multipart(stream(*(body[i:i + 1] for i in range(len(body)))),
+                                                        content_type)]
+
+    events = asyncio.run(main())
+    assert [kind for kind, _ in events if kind != "data"] == ["part", "end", "part", "end"]
+    assert events[0] == ("part", ("report_id", None, None))
+    assert next(value for kind, value in events if kind == "part" and value[0] == "file") == (
+        "file", "wave.jpg", "image/jpeg")
+    assert b"".join(value for kind, value in events[events.index(("end", None)):] if kind == "data") == (
+        b"\xff\xd8" + b"x" * 100)
+
+
+    async def not_multipart():
+        return [event async for event in iter_multipart(stream(body), "text/plain")]
+
+    with pytest.raises(InvalidMultipartError):
+        asyncio.run(not_multipart())
+
+
+def test_upload_endpoint_streams_checks_ownership_and_limits(api, tmp_path, monkeypatch):
+    import server
+    from database import database
+    from models import HazardReport, Location
+
+    monkeypatch.setattr(server, "media_storage", MediaStorage(str(tmp_path), max_bytes=1024))
+
+    def report(reporter_id):
+        return HazardReport(title="Swell", description="Big swell", hazard_type="high_waves", severity="low",
+                            location=Location(latitude=17.7, longitude=83.3), reporter_id=reporter_id,
+                            reporter_name="R")
+
+    async def main():
+        async with api() as client:
+            mine = await database.create_hazard_report(report("current_user_id"))
+            theirs = await database.create_hazard_report(report("someone_else"))
+            files = {"file": ("notes.txt", b"tide log", "text/plain")}
+
+            uploaded = await client.post("/api/upload", files=files, data={"report_id": mine.id})
+            assert uploaded.status_code == 200
+            assert uploaded.json()["sha256"] == hashlib.sha256(b"tide log").hexdigest()
+            stored = await database.get_hazard_report_by_id(mine.id)
+            assert [media.id for media in stored.media_files] == [uploaded.json()["id"]]
+
+            assert (await client.post("/api/upload", files=files, params={"report_id": theirs.id})).status_code == 403
+            assert (await client.post("/api/upload", files=files, data={"report_id": "nope"})).status_code == 404
+            assert (await client.post("/api/upload", data={"report_id": mine.id})).status_code == 400
+
+            big = {"file": ("big.bin", b"x" * 2048, "application/octet-stream")}
+            assert (await client.post("/api/upload", files=big)).status_code == 413
+            too_long = await client.post("/api/upload", content=b"x" * 200_000,
+                                         headers={"Content-Type": "multipart/form-data; boundary=b"})
+            assert too_long.status_code == 413
+            assert list((tmp_path / "tmp").iterdir()) == []
+
+            new_report = {"title": "Swell", "description": "Big swell", "hazard_type": "high_waves",
+                          "severity": "low", "location": {"latitude": 17.7, "longitude": 83.3}}
+            missing = await client.post("/api/reports", json={**new_report, "media_ids": ["missing"]})
+            assert missing.status_code == 400 and "missing" in missing.json()["detail"]
+            attached = await client.post("/api/reports", json={**new_report, "media_ids": [uploaded.json()["id"]]})
+            assert [media["id"] for media in attached.json()["media_files"]] == [uploaded.json()["id"]]
+
+    asyncio.run(main())
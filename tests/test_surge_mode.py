@@ -0,0 +1,72 @@
+import asyncio
+
+import surge_mode
+from surge_mode import NORMAL, SURGE, SurgeMonitor
+
+
+def fake_clock(monkeypatch, start=1000.0):
+    clock = [start]
+    monkeypatch.setattr(surge_mode.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def test_queue_depth_enters_surge_and_cooldown_leaves_it(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    depth = [500]
+    monitor = SurgeMonitor(queue_depth=lambda: depth[0], max_queue_depth=200, cooldown_seconds=120)
+    modes = []
+    monitor.on_change(modes.append)
+
+    assert monitor.active
+    assert "queue depth 500 > 200" in monitor.reason
+
+    depth[0] = 0
+    clock[0] += 1
+    assert monitor.active  # calm, but not for long enough
+    clock[0] += 119
+    assert monitor.active
+    clock[0] += 1
+    assert not monitor.active
+    assert modes == [SURGE, NORMAL]
+
+
+def test_llm_error_rate_needs_enough_calls(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    monitor = SurgeMonitor(max_error_rate=0.3, min_calls=10)
+    for _ in range(5):
+        monitor.record(0.5, succeeded=False)
+    assert not monitor.active
+
+    for _ in range(5):
+        monitor.record(0.5, succeeded=True)
+    clock[0] += 1
+    assert monitor.active
+    assert "error rate 50%" in monitor.reason
+
+
+def test_forced_mode_ignores_load():
+    monitor = SurgeMonitor(queue_depth=lambda: 10 ** 6, forced=NORMAL)
+    assert not monitor.active
+    assert SurgeMonitor(forced=SURGE).active
+
+
+def test_background_check_ends_surge_without_reads():
+    async def main():
+        depth = [500]
+        monitor = SurgeMonitor(queue_depth=lambda: depth[0], cooldown_seconds=0.05, check_interval=0.01)
+        modes = []
+        monitor.on_change(modes.append)
+        await monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            assert modes == [SURGE]
+            depth[0] = 0
+            for _ in range(100):
+                if modes[-1] == NORMAL:
+                    break
+                await asyncio.sleep(0.01)
+            assert modes == [SURGE, NORMAL]
+        finally:
+            await monitor.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+import json
+import asyncio
+
+import tracing
+from tracing import Trace, TraceExporter, server_timing, span
+
+
+def test_spans_nest_under_the_current_trace():
+    trace = Trace(trace_id="t" * 32, sampled=True)
+    token = tracing._current_trace.set(trace)
+    try:
+        with span("outer") as outer:
+            with span("inner", rows=3) as inner:
+                pass
+    finally:
+        tracing._current_trace.reset(token)
+
+    assert [s.name for s in trace.spans] == ["inner", "outer"]
+    assert inner.parent_id == outer.span_id and outer.parent_id is None
+    assert inner.attributes == {"rows": 3}
+    assert 'inner;dur=' in server_timing(trace) and 'desc="1x"' in server_timing(trace)
+
+
+def test_span_is_a_no_op_outside_a_trace():
+    with span("untraced") as record:
+        assert record is None
+
+
+def test_exporter_appends_otlp_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+
+    async def main():
+        exporter = TraceExporter(str(path))
+        await exporter.start()
+        trace = Trace(trace_id="a" * 32, sampled=True)
+        token = tracing._current_trace.set(trace)
+        with span("GET /api/health"):
+            pass
+        tracing._current_trace.reset(token)
+        exporter.export(trace)
+        await exporter.stop()
+
+    asyncio.run(main())
+    [line] = path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["name"] == "GET /api/health" and spans[0]["traceId"] == "a" * 32
+
+
+def test_requests_continue_an_incoming_traceparent(api):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    async def main():
+        async with api() as client:
+            response = await client.get("/api/reports", headers={
+                "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01", "X-Debug-Timing": "1"})
+            assert response.headers["x-trace-id"] == trace_id
+            assert "mongo.get_hazard_reports" in response.headers["server-timing"]
+
+    asyncio.run(main())
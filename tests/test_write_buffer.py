@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from pymongo.errors import (BulkWriteError, DuplicateKeyError, ServerSelectionTimeoutError, WriteConcernError,
+                            WriteError)
+
+from write_buffer import WriteBuffer
+
+
+class FakeCollection:
+    """Records insert_many batches; documents with a ``fail`` code come back as write errors"""
+
+    def __init__(self, name="alerts", error=None, concern_error=None):
+        self.name = name
+        self.error = error
+        self.concern_error = concern_error
+        self.batches = []
+
+    async def insert_many(self, documents, ordered=True):
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        self.batches.append(documents)
+        errors = [{"index": index, "code": document["fail"], "errmsg": f"failed with {document['fail']}"}
+                  for index, document in enumerate(documents) if "fail" in document]
+        if errors or self.concern_error:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors),
+                                  "writeConcernErrors": [self.concern_error] if self.concern_error else []})
+
+
+async def insert_all(buffer, collection, documents):
+    return await asyncio.gather(*(buffer.insert(collection, document) for document in documents),
+                                return_exceptions=True)
+
+
+def test_each_caller_gets_its_own_error():
+    async def main():
+        buffer = WriteBuffer(enabled=True, max_documents=10, max_delay_ms=1)
+        collection = FakeCollection()
+        results = await insert_all(buffer, collection, [{"id": 1}, {"id": 2, "fail": 11000}, {"id": 3},
+                                                        {"id": 4, "fail": 121}])
+        assert len(collection.batches) == 1
+        assert results[0] is None and results[2] is None
+        assert type(results[1]) is DuplicateKeyError and results[1].code == 11000
+        assert type(results[3]) is WriteError and results[3].code == 121
+        assert buffer.counters == {"documents": 4, "flushes": 1, "failed": 2}
+
+    asyncio.run(main())
+
+
+def test_write_concern_error_fails_everyone_not_already_failed():
+    async def main():
+        buffer = WriteBuffer(enabled=True, max_documents=10, max_delay_ms=1)
+        collection = FakeCollection(concern_error={"code": 64, "errmsg": "waiting for replication timed out"})
+        results = await insert_all(buffer, collection, [{"id": 1, "fail": 11000}, {"id": 2}])
+        assert isinstance(results[0], DuplicateKeyError)
+        assert isinstance(results[1], WriteConcernError)
+
+    asyncio.run(main())
+
+
+def test_whole_command_failure_fails_the_batch():
+    async def main():
+        buffer = WriteBuffer(enabled=True, max_documents=10, max_delay_ms=1)
+        collection = FakeCollection(error=ServerSelectionTimeoutError("no servers"))
+        results = await insert_all(buffer, collection, [{"id": 1}, {"id": 2}])
+        assert all(isinstance(result, ServerSelectionTimeoutError) for result in results)
+        assert buffer.counters["failed"] == 2
+
+    asyncio.run(main())
+
+
+def test_flushes_at_size_or_after_the_delay():
+    async def main():
+        buffer = WriteBuffer(enabled=True, max_documents=3, max_delay_ms=20)
+        collection = FakeCollection()
+        full = asyncio.gather(*(buffer.insert(collection, {"id": i}) for i in range(3)))
+        await asyncio.wait_for(full, 0.01)  # a full batch goes out without waiting for the timer
+        assert [len(batch) for batch in collection.batches] == [3]
+
+        single = asyncio.ensure_future(buffer.insert(collection, {"id": 3}))
+        await asyncio.sleep(0.005)
+        assert not single.done() and len(buffer) == 1
+        await asyncio.wait_for(single, 0.1)
+        assert [len(batch) for batch in collection.batches] == [3, 1]
+
+    asyncio.run(main())
+
+
+def test_batches_are_per_collection_and_drain_flushes_waiting_documents():
+    async def main():
+        buffer = WriteBuffer(enabled=True, max_documents=100, max_delay_ms=10_000)
+        alerts, reports = FakeCollection("alerts"), FakeCollection("hazard_reports")
+        waiting = [asyncio.ensure_future(buffer.insert(alerts, {"id": 1})),
+                   asyncio.ensure_future(buffer.insert(reports, {"id": 2})),
+                   asyncio.ensure_future(buffer.insert(alerts, {"id": 3}))]
+        await asyncio.sleep(0)
+        assert len(buffer) == 3
+
+        await buffer.drain()
+        await asyncio.gather(*waiting)
+        assert [len(batch) for batch in alerts.batches] == [2]
+        assert [len(batch) for batch in reports.batches] == [1]
+        assert len(buffer) == 0
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_database_inserts_raise_duplicate_key_either_way(enabled):
+    from database import Database
+    from models import Alert
+
+    async def main():
+        db = Database()
+        await db.connect_to_mongo()
+        await db.db.alert_history.delete_many({})
+        await db.create_indexes()
+        db.write_buffer = WriteBuffer(enabled=enabled, max_delay_ms=1)
+        alert = Alert(title="t", message="m", alert_type="system_alert", severity="low",
+                      source_type="system", source_id="s")
+        await db._insert("alert_history", alert.dict())
+        with pytest.raises(DuplicateKeyError):
+            await db._insert("alert_history", alert.dict())
+
+    asyncio.run(main())